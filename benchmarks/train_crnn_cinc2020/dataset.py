@@ -154,6 +154,7 @@ class CINC2020(ReprMixin, Dataset):
             siglen=self.siglen,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
@@ -391,6 +392,7 @@ class FastDataReader(ReprMixin, Dataset):
             siglen=self.config.input_len,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
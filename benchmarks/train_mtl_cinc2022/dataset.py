@@ -220,6 +220,7 @@ class FastDataReader(ReprMixin, Dataset):
             siglen=self.config[self.task].input_len,
             fmt=self.config[self.task].data_format,
             tolerance=self.config[self.task].sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if waveforms.ndim == 2:
             waveforms = waveforms[np.newaxis, ...]
@@ -268,6 +269,7 @@ class FastDataReader(ReprMixin, Dataset):
                 siglen=self.config[self.task].input_len,
                 fmt="channel_last",
                 tolerance=self.config[self.task].sig_slice_tol,
+                copy=False,
             ).astype(self.dtype)
             return {"waveforms": waveforms, "segmentation": label}
         else:
@@ -321,6 +323,7 @@ class MutiTaskFastDataReader(ReprMixin, Dataset):
             siglen=self.config[self.task].input_len,
             fmt=self.config[self.task].data_format,
             tolerance=self.config[self.task].sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if waveforms.ndim == 2:
             waveforms = waveforms[np.newaxis, ...]
@@ -369,6 +372,7 @@ class MutiTaskFastDataReader(ReprMixin, Dataset):
                 siglen=self.config[self.task].input_len,
                 fmt="channel_last",
                 tolerance=self.config[self.task].sig_slice_tol,
+                copy=False,
             ).astype(self.dtype)
             out_tensors["segmentation"] = mask
 
@@ -20,8 +20,11 @@ from torch_ecg.augmenters import (
     StretchCompress,
     StretchCompressOffline,
 )
-from torch_ecg.augmenters.baseline_wander import _gen_baseline_wander
+from torch_ecg.augmenters.baseline_wander import _gen_baseline_wander, _get_ampl
+from torch_ecg.augmenters.random_masking import _sample_indices
+from torch_ecg.augmenters.stretch_compress import _apply_grid, _stretch_compress_grid
 from torch_ecg.cfg import CFG
+from torch_ecg.utils.utils_signal import get_ampl
 
 SIG_LEN = 2000
 BATCH_SIZE = 2
@@ -137,6 +140,21 @@ def test_baseline_wander_augmenter():
 
     assert str(blw) == repr(blw)
 
+    # per-sample probability, reproducible with `seed`
+    sig = torch.randn(64, N_LEADS, SIG_LEN)
+    outputs = [BaselineWanderAugmenter(500, prob=0.5, inplace=False, seed=0)(sig, label)[0] for _ in range(2)]
+    assert torch.equal(outputs[0], outputs[1])
+    augmented = (outputs[0] - sig).abs().amax(dim=(1, 2)) > 0
+    assert 0 < augmented.sum() < 64
+    assert torch.equal(outputs[0][~augmented], sig[~augmented])
+    # noise amplitudes are bounded by the ratios of the amplitudes of the ECGs
+    ampl = _get_ampl(sig, 500)
+    bound = blw.ampl_ratio.max(axis=0).sum() + 6 * blw.gaussian[:, 1].max()
+    assert ((outputs[0] - sig).abs() <= bound * ampl).all()
+    assert torch.allclose(ampl.squeeze(-1), torch.as_tensor(np.array([get_ampl(s.numpy(), 500) for s in sig]), dtype=sig.dtype))
+    blw = BaselineWanderAugmenter(500, prob=0.0)
+    assert torch.equal(blw(sig.clone(), label)[0], sig)
+
     noise = _gen_baseline_wander(
         siglen=sig.shape[-1],
         fs=blw.fs,
@@ -248,6 +266,31 @@ def test_random_masking():
 
     assert str(rm) == repr(rm)
 
+    # masks are shared by the leads, and centered at the critical points
+    rm = RandomMasking(fs=500, prob=[1.0, 0.5])
+    sig, _ = rm(torch.ones(BATCH_SIZE, N_LEADS, SIG_LEN), None, critical_points=critical_points)
+    assert (sig == sig[:, :1]).all()
+    masked = (sig[:, 0] == 0).nonzero()[:, 1].numpy()
+    assert len(masked) > 0
+    assert np.abs(masked[:, np.newaxis] - critical_points[0][np.newaxis]).min(axis=1).max() <= rm.mask_width[1] // 2
+    sig, _ = rm(torch.ones(3, N_LEADS, SIG_LEN), None, critical_points=[[], [0, SIG_LEN - 1], [10]])
+    assert (sig[0] == 1).all() and (sig[1:] == 0).any()
+    # mask value other than 0
+    rm = RandomMasking(fs=500, prob=[1.0, 0.15], mask_value=0.5)
+    sig, _ = rm(torch.ones(BATCH_SIZE, N_LEADS, SIG_LEN), None)
+    assert set(sig.unique().tolist()) == {0.5, 1.0}
+    # fraction of masked samples, 0.7 * 0.15 in expectation
+    rm = RandomMasking(fs=500, prob=[0.7, 0.15], inplace=False)
+    sig = torch.ones(32, 1, SIG_LEN)
+    fraction = np.mean([(rm(sig, None)[0] == 0).float().mean().item() for _ in range(20)])
+    assert 0.04 < fraction < 0.14
+    assert (sig == 1).all()
+
+    rows, cols = _sample_indices(np.array([0, 5, 100, 100]), prob=0.3, scale_ratio=0.0)
+    assert rows.tolist() == [1, 1] + [2] * 30 + [3] * 30
+    assert all(len(set(cols[rows == r])) == (rows == r).sum() for r in range(4))
+    assert (cols[rows == 1] < 5).all() and (cols < 100).all()
+
 
 def test_random_renormalize():
     rrn = RandomRenormalize(per_channel=True, prob=0.7)
@@ -315,6 +358,28 @@ def test_stretch_compress():
 
     assert str(sc) == repr(sc)
 
+    # the sampling grid coincides with stretching (compressing) via interpolation and cutting (padding)
+    sig = torch.sin(torch.linspace(0, 20, SIG_LEN) * torch.arange(1, N_LEADS + 1).unsqueeze(-1)).repeat(4, 1, 1)
+    new_lens = np.array([2100, 1900, 2000, 2127])
+    offsets = np.array([50, -50, 0, 63])
+    out = _apply_grid(sig, _stretch_compress_grid(SIG_LEN, new_lens, offsets, sig.device))
+    for idx, (new_len, offset) in enumerate(zip(new_lens, offsets)):
+        expected = torch.nn.functional.interpolate(sig[idx : idx + 1], size=(new_len,), mode="linear", align_corners=True)
+        if offset >= 0:
+            expected = expected[..., offset : offset + SIG_LEN]
+        else:
+            expected = torch.nn.functional.pad(expected, (-offset, SIG_LEN - new_len + offset))
+        assert torch.allclose(out[idx], expected[0], atol=1e-4)
+    assert torch.allclose(out[2], sig[2], atol=1e-4)
+
+    sc = StretchCompress(prob=1.0, inplace=False)
+    sig = torch.randn((BATCH_SIZE, N_LEADS, SIG_LEN))
+    mask = torch.ones((BATCH_SIZE, SIG_LEN // 2, 3))
+    new_sig, new_mask = sc(sig, mask)
+    assert new_sig.shape == sig.shape and new_mask.shape == mask.shape
+    assert not torch.equal(new_sig, sig)
+    assert new_mask.max() <= 1 and new_mask.min() >= 0
+
 
 def test_stretch_compress_offline():
     sco = StretchCompressOffline()
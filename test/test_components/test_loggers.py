@@ -81,6 +81,23 @@ def test_csv_logger():
     assert Path(logger.filename).exists()
     assert str(logger) == repr(logger)
 
+    logger = CSVLogger(_LOG_DIR, "test_buffer", buffer_size=3)
+    for step in range(5):
+        logger.log_metrics({"loss": torch.scalar_tensor(0.1 * step)}, step=step, epoch=0)
+    # the first 3 rows are flushed
+    assert len(logger._rows) == 2
+    logger.log_metrics({"loss": 0.5, "acc": 0.9}, step=5, epoch=0, part="val")
+    logger.epoch_end(0)
+    assert len(logger._rows) == 0
+    logger.log_metrics({"f1": 0.8}, step=6)
+    df = logger.logger
+    assert df.columns.tolist() == ["step", "time", "part", "epoch", "loss", "acc", "f1"]
+    assert df["step"].tolist() == list(range(7))
+    assert df["part"].tolist() == ["train"] * 5 + ["val", "train"]
+    assert df["acc"].isna().sum() == 6 and df.loc[5, "acc"] == 0.9
+    assert df.loc[6, "f1"] == 0.8 and df["loss"].isna().sum() == 1
+    logger.close()
+
 
 def test_tensorboardx_logger():
     config = {
@@ -3,14 +3,22 @@
 
 import numpy as np
 import pytest
+import torch
 
 from torch_ecg.cfg import DEFAULTS
 from torch_ecg.components.metrics import ClassificationMetrics, Metrics, RPeaksDetectionMetrics, WaveDelineationMetrics
 from torch_ecg.utils.utils_metrics import (
+    ECGWaveForm,
+    QRS_score,
+    _compute_metrics_base,
     accuracy,
     auc,
     cls_to_bin,
+    compute_metrics_waveform,
+    confusion_matrix,
     f_measure,
+    metrics_from_confusion_matrix,
+    ovr_confusion_matrix,
     precision,
     sensitivity,
     specificity,
@@ -119,6 +127,71 @@ def test_classification_metrics():
     assert str(cm) == repr(cm)
 
 
+def test_classification_metrics_update():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, (1000, 5))
+    # bin centers, so that the histograms are lossless
+    outputs = (rng.integers(0, 100, (1000, 5)) + 0.5) / 100
+    expected = ClassificationMetrics(macro=False).compute(labels, outputs)
+
+    cm = ClassificationMetrics(macro=False, auc_bins=100)
+    for batch in np.array_split(np.arange(1000), 7):
+        cm.update(labels[batch], torch.from_numpy(outputs[batch]))
+    cm.compute()
+    assert np.array_equal(cm._cm, expected._cm)
+    assert np.array_equal(cm._cm_ovr, expected._cm_ovr)
+    for key, value in expected._metrics.items():
+        assert np.allclose(cm._metrics[key], value, rtol=1e-12), key
+
+    cm.reset()
+    with pytest.raises(AssertionError, match="no batch has been accumulated"):
+        cm.compute()
+    cm.update(labels[:10], outputs[:10])
+    with pytest.raises(AssertionError, match="`thr` should be the same for all batches"):
+        cm.update(labels[:10], outputs[:10], thr=0.3)
+
+    # categorical outputs
+    cm.reset()
+    cm.update(labels[:, 0], labels[:, 0], num_classes=2)
+    # AUCs are not available, NaN filled with 0
+    assert (cm.compute()._metrics["auroc"] == 0).all()
+
+    # torch tensors (on the device of the model)
+    res = ClassificationMetrics(macro=False).compute(torch.from_numpy(labels), torch.from_numpy(outputs))
+    for key, value in expected._metrics.items():
+        assert np.allclose(res._metrics[key], value, rtol=1e-12), key
+
+
+def test_confusion_matrix_kernels():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, (200, 6))
+    outputs = rng.integers(0, 2, (200, 6))
+    cm = np.zeros((6, 6))
+    ovr_cm = np.zeros((6, 2, 2))
+    for k in range(200):
+        cm[np.argmax(outputs[k]), np.argmax(labels[k])] += 1
+        for j in range(6):
+            ovr_cm[j, 1 - outputs[k, j], 1 - labels[k, j]] += 1
+    assert np.array_equal(confusion_matrix(labels, outputs), cm)
+    assert np.array_equal(ovr_confusion_matrix(labels, outputs), ovr_cm)
+    assert np.array_equal(confusion_matrix(torch.from_numpy(labels), torch.from_numpy(outputs)), cm)
+    assert np.array_equal(ovr_confusion_matrix(labels, torch.from_numpy(outputs)), ovr_cm)
+    with pytest.raises(AssertionError, match="outputs must be binary"):
+        ovr_confusion_matrix(labels, outputs * 2)
+
+    # AUROC with ties, against the trapezoidal rule over the thresholds
+    outputs = rng.integers(0, 10, (200, 6)) / 10
+    auroc = metrics_from_confusion_matrix(labels, outputs)["auroc"]
+    for j in range(6):
+        thresholds = np.append(np.unique(outputs[:, j])[::-1], -np.inf)
+        tpr = np.array([0] + [((outputs[:, j] >= t) & (labels[:, j] == 1)).sum() for t in thresholds]) / labels[:, j].sum()
+        fpr = (
+            np.array([0] + [((outputs[:, j] >= t) & (labels[:, j] == 0)).sum() for t in thresholds]) / (1 - labels[:, j]).sum()
+        )
+        trapezoid = getattr(np, "trapezoid", None) or np.trapz
+        assert auroc[j] == pytest.approx(trapezoid(tpr, fpr))
+
+
 def test_rpeaks_detection_metrics():
     rdm = RPeaksDetectionMetrics()
 
@@ -162,6 +235,83 @@ def test_wave_delineation_metrics():
     assert str(wdm) == repr(wdm)
 
 
+def _loop_qrs_score(rpeaks_truths, rpeaks_preds, fs, thr=0.075):
+    """the per-record (loop) implementation of `QRS_score`"""
+    record_flags = np.ones((len(rpeaks_truths),), dtype=float)
+    thr_ = thr * fs
+    for idx, (truth_arr, pred_arr) in enumerate(zip(rpeaks_truths, rpeaks_preds)):
+        false_negative, false_positive = 0, 0
+        for j, t_ind in enumerate(truth_arr):
+            next_t_ind = truth_arr[j + 1] if j < len(truth_arr) - 1 else 9.5 * fs
+            loc = np.where(np.abs(pred_arr - t_ind) <= thr_)[0]
+            if j == 0:
+                false_positive += len(np.where((pred_arr >= 0.5 * fs + thr_) & (pred_arr <= t_ind - thr_))[0])
+            false_positive += len(np.where((pred_arr >= t_ind + thr_) & (pred_arr <= next_t_ind - thr_))[0])
+            false_negative += len(loc) == 0
+            false_positive += max(len(loc) - 1, 0)
+        if false_negative + false_positive > 1:
+            record_flags[idx] = 0
+        elif false_negative == 1 and false_positive == 0:
+            record_flags[idx] = 0.3
+        elif false_negative == 0 and false_positive == 1:
+            record_flags[idx] = 0.7
+    return round(np.sum(record_flags) / len(rpeaks_truths), 4)
+
+
+def _loop_match(truths, preds, tolerance):
+    """the per-point (loop) matching of critical points"""
+    truth_positive, errors = 0, []
+    preds = np.array(preds)
+    for point in truths:
+        loc = np.where(np.abs(preds - point) <= tolerance)[0]
+        if len(loc) > 0:
+            truth_positive += 1
+            errors.append(preds[loc[np.argmin(np.abs(preds[loc] - point))]] - point)
+    return truth_positive, len(truths) - truth_positive, len(preds) - truth_positive, errors
+
+
+def test_metric_kernels():
+    rng = np.random.default_rng(42)
+    for _ in range(100):
+        fs = int(rng.choice([250, 360, 500]))
+        n_records = int(rng.integers(1, 6))
+        truths = [np.sort(rng.integers(0, 5000, rng.integers(0, 15))) for _ in range(n_records)]
+        preds = [
+            np.sort(np.concatenate([t + rng.integers(-40, 40, len(t)), rng.integers(0, 5000, rng.integers(0, 4))]))
+            for t in truths
+        ]
+        for thr in [0.05, 0.075, 0.1]:
+            assert QRS_score(truths, preds, fs, thr) == _loop_qrs_score(truths, preds, fs, thr)
+
+        # critical points of multiple samples, with ties
+        tol = float(rng.choice([0.02, 0.05, 0.15]))
+        truth_waveforms, pred_waveforms = [], []
+        truth_positive, false_negative, false_positive, errors = 0, 0, 0, []
+        for t, p in zip(truths, preds):
+            p = rng.permutation(np.concatenate([p, t[: len(t) // 3] + 2, t[: len(t) // 3] - 2]))
+            truth_waveforms.append([ECGWaveForm("qrs", on, on + 10, 0, 0) for on in t])
+            pred_waveforms.append([ECGWaveForm("qrs", on, on + 10, 0, 0) for on in p])
+            res = _loop_match(t, p, round(tol * fs))
+            truth_positive, false_negative, false_positive = (
+                truth_positive + res[0],
+                false_negative + res[1],
+                false_positive + res[2],
+            )
+            errors += res[3]
+        scorings = compute_metrics_waveform(truth_waveforms, pred_waveforms, fs, tol)
+        sensitivity = truth_positive / (truth_positive + false_negative + DEFAULTS.eps)
+        precision = truth_positive / (truth_positive + false_positive + DEFAULTS.eps)
+        assert scorings["qrs_onset"]["sensitivity"] == sensitivity
+        assert scorings["qrs_onset"]["precision"] == precision
+        if len(errors) > 0:
+            assert scorings["qrs_onset"]["mean_error"] == np.mean(errors) * 1000 / fs
+            assert scorings["qrs_onset"]["standard_deviation"] == np.std(errors) * 1000 / fs
+        else:
+            assert np.isnan(scorings["qrs_onset"]["mean_error"])
+        assert np.isnan(scorings["pwave_onset"]["mean_error"])
+        assert _compute_metrics_base(truths[0], preds[0], fs, tol)[:3] == _loop_match(truths[0], preds[0], round(tol * fs))[:3]
+
+
 def test_base_metrics():
     with pytest.raises(TypeError, match="Can't instantiate abstract class"):
         Metrics()
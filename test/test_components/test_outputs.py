@@ -1,6 +1,8 @@
 """
 """
 
+import pickle
+
 import numpy as np
 import pytest
 
@@ -88,6 +90,43 @@ class TestClassificationOutput:
             )
             output.append(output_5)
 
+    def test_append_buffer(self):
+        batches = []
+        for n in [32, 1, 17, 32, 5]:
+            prob = DEFAULTS.RNG.random((n, self.num_classes))
+            batches.append(ClassificationOutput(classes=self.classes, pred=np.argmax(prob, axis=1), prob=prob))
+        output = ClassificationOutput(classes=self.classes, pred=batches[0].pred.copy(), prob=batches[0].prob.copy())
+        for batch in batches[1:]:
+            output.append(batch)
+            # the attribute and the item are the same view of the buffer
+            assert output.prob is output["prob"]
+        expected_prob = np.concatenate([b.prob for b in batches])
+        expected_pred = np.concatenate([b.pred for b in batches])
+        assert np.array_equal(output.prob, expected_prob)
+        assert np.array_equal(output.pred, expected_pred)
+        assert set(output.keys()) == {"classes", "prob", "pred"}
+
+        # reassigned fields are not overwritten via stale buffers
+        output.prob = expected_prob.copy()
+        output.append(batches[0])
+        assert np.array_equal(output.prob, np.concatenate([expected_prob, batches[0].prob]))
+        # dtype promotion as `np.concatenate`
+        output.append(ClassificationOutput(classes=self.classes, pred=np.array([0.5]), prob=np.ones((1, 3))))
+        assert output.pred.dtype == np.float64 and output.pred[-1] == 0.5
+
+        output = pickle.loads(pickle.dumps(output))
+        assert "_BaseOutput__buffers" not in output.__dict__
+        output.append(batches[1])
+        assert output.prob.shape == (len(expected_prob) + 32 + 1 + 1, self.num_classes)
+
+        concatenated = ClassificationOutput.concat(batches)
+        assert isinstance(concatenated, ClassificationOutput)
+        assert concatenated.classes == self.classes
+        assert np.array_equal(concatenated.prob, expected_prob)
+        assert np.array_equal(concatenated.pred, expected_pred)
+        with pytest.raises(AssertionError, match="`outputs` must be of type `MultiLabelClassificationOutput`"):
+            MultiLabelClassificationOutput.concat(batches)
+
 
 class TestMultiLabelClassificationOutput:
     classes = ["AF", "NSR", "SPB"]
@@ -109,6 +148,13 @@ class TestMultiLabelClassificationOutput:
         metrics = output.compute_metrics()
         assert isinstance(metrics, ClassificationMetrics)
 
+        output.append([output, output])
+        assert output.prob.shape == (self.batch_size * 3, self.num_classes)
+        with pytest.raises(AssertionError, match="the field of ordered sequence `thr` must be the identical"):
+            output.append(
+                MultiLabelClassificationOutput(classes=self.classes, thr=0.3, pred=pred, prob=prob, label=output.label)
+            )
+
 
 class TestSequenceTaggingOutput:
     classes = ["AF", "NSR", "SPB"]
@@ -207,6 +253,10 @@ class TestRPeaksDetectionOutput:
         metrics = output.compute_metrics(fs=500)
         assert isinstance(metrics, RPeaksDetectionMetrics)
 
+        output = RPeaksDetectionOutput.concat([output, output])
+        assert len(output.rpeak_indices) == 4 and len(output.label) == 4
+        assert output.prob.shape == (self.batch_size * 2, self.signal_length)
+
 
 def test_base_output():
     with pytest.raises(NotImplementedError, match="Subclass must implement method `required_fields`"):
@@ -474,3 +474,48 @@ def test_trainer():
             lazy=True,
         )
         del trainer
+
+
+def test_trainer_amp_grad_accumulation():
+    train_cfg_fl = deepcopy(LUDBTrainCfg)
+    train_cfg_fl.use_single_lead = False
+    train_cfg_fl.loss = "FocalLoss"
+
+    train_cfg_fl.db_dir = _DB_DIR
+    train_cfg_fl.log_dir = _CWD / "logs"
+    train_cfg_fl.model_dir = _CWD / "saved_models"
+    train_cfg_fl.checkpoints = _CWD / "checkpoints"
+    train_cfg_fl.log_dir.mkdir(parents=True, exist_ok=True)
+    train_cfg_fl.model_dir.mkdir(parents=True, exist_ok=True)
+    train_cfg_fl.checkpoints.mkdir(parents=True, exist_ok=True)
+
+    train_cfg_fl.keep_checkpoint_max = 0
+    train_cfg_fl.monitor = None
+    train_cfg_fl.n_epochs = 1
+    train_cfg_fl.amp = True
+    train_cfg_fl.grad_accumulation_steps = 3
+    train_cfg_fl.max_grad_norm = 1.0
+
+    model_config = deepcopy(ModelCfg)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    model = ECG_UNET_LUDB(model_config.n_leads, model_config)
+    model.to(device=device)
+
+    trainer = LUDBTrainer(
+        model=model,
+        model_config=model_config,
+        train_config=train_cfg_fl,
+        device=device,
+        lazy=False,
+    )
+    assert trainer.grad_accumulation_steps == 3
+    assert trainer.amp_dtype == (torch.float16 if device.type == "cuda" else torch.bfloat16)
+    assert trainer.grad_scaler.is_enabled() == (device.type == "cuda")
+
+    bmd = trainer.train()
+    # one optimization step per `grad_accumulation_steps` batches
+    assert trainer.global_step == -(-len(trainer.train_loader) // 3)
+    assert all(torch.isfinite(v).all() for v in bmd.values() if v.is_floating_point())
+
+    del model, trainer, bmd
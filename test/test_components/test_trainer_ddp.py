@@ -0,0 +1,146 @@
+"""
+Tests for the distributed data-parallel (DDP) mode of `BaseTrainer`,
+using the gloo backend on CPU.
+"""
+
+import os
+import shutil
+import socket
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as tmp
+from torch import nn
+from torch.utils.data import DataLoader, Dataset, DistributedSampler, TensorDataset
+
+from torch_ecg.cfg import CFG
+from torch_ecg.components.trainer import BaseTrainer
+
+_CWD = Path(__file__).absolute().parents[1] / "tmp" / "test_trainer_ddp"
+_WORLD_SIZE = 2
+
+
+class _Model(nn.Module):
+    __name__ = "DDPTestModel"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fc = nn.Linear(8, 2)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.fc(x)
+
+    def save(self, path: str, train_config: CFG) -> None:
+        torch.save({"model_state_dict": self.state_dict()}, path)
+
+
+class _Trainer(BaseTrainer):
+    __name__ = "DDPTestTrainer"
+
+    def _setup_dataloaders(self, train_dataset: Optional[Dataset] = None, val_dataset: Optional[Dataset] = None) -> None:
+        gen = torch.Generator().manual_seed(0)
+        signals, labels = torch.randn(50, 8, generator=gen), torch.randint(0, 2, (50,), generator=gen)
+        self.train_loader = DataLoader(TensorDataset(signals, labels), batch_size=4, shuffle=True)
+        self.val_loader = DataLoader(TensorDataset(signals[:21], labels[:21]), batch_size=4, shuffle=False)
+
+    def run_one_step(self, *data: Tuple[torch.Tensor, torch.Tensor]) -> Tuple[torch.Tensor, torch.Tensor]:
+        signals, labels = data
+        return self.model(signals.to(self.device)), labels.to(self.device)
+
+    @torch.no_grad()
+    def evaluate(self, data_loader: DataLoader) -> Dict[str, float]:
+        self.model.eval()
+        n_correct, n_total = 0, 0
+        for signals, labels in data_loader:
+            n_correct += (self._model(signals).argmax(dim=-1) == labels).sum().item()
+            n_total += len(labels)
+        self.model.train()
+        return {"acc": n_correct / n_total, "n_samples": n_total, "rank": self.rank}
+
+    @property
+    def batch_dim(self) -> int:
+        return 0
+
+    @property
+    def extra_required_train_config_fields(self) -> List[str]:
+        return []
+
+
+def _get_train_config(n_epochs: int) -> CFG:
+    return CFG(
+        classes=["0", "1"],
+        n_epochs=n_epochs,
+        batch_size=4,
+        log_step=2,
+        optimizer="sgd",
+        lr_scheduler="step",
+        lr_step_size=1,
+        lr_gamma=0.5,
+        learning_rate=0.1,
+        loss="CrossEntropyLoss",
+        monitor="acc",
+        keep_checkpoint_max=-1,
+        checkpoints=_CWD / "checkpoints",
+        model_dir=_CWD / "saved_models",
+        log_dir=_CWD / "logs",
+        ddp=True,
+        ddp_backend="gloo",
+    )
+
+
+def _worker(rank: int, port: int, results: dict) -> None:
+    os.environ.update(MASTER_ADDR="127.0.0.1", MASTER_PORT=str(port), RANK=str(rank), WORLD_SIZE=str(_WORLD_SIZE))
+    torch.manual_seed(0)
+    trainer = _Trainer(_Model(), None, CFG(), _get_train_config(n_epochs=2), device=torch.device("cpu"))
+    assert trainer.distributed and trainer.world_size == _WORLD_SIZE and trainer.rank == rank
+    assert type(trainer.model).__name__ == "DistributedDataParallel"
+    assert trainer.is_main_process == (rank == 0)
+    assert (len(trainer.log_manager.loggers) > 0) == (rank == 0)
+    trainer.train()
+    assert len(trainer.train_loader.sampler) == 25
+    # only the main process saves checkpoints
+    assert len(trainer.saved_models) == (2 if rank == 0 else 0)
+
+    # the metrics are computed by the main process on the whole validation set,
+    # the same as a single-process run (without the samples padded by distributed samplers)
+    assert not isinstance(trainer.val_loader.sampler, DistributedSampler)
+    eval_res = trainer._evaluate(trainer.val_loader)
+    assert eval_res["rank"] == 0 and eval_res["n_samples"] == 21
+    signals, labels = trainer.val_loader.dataset.tensors
+    with torch.no_grad():
+        assert eval_res["acc"] == (trainer._model(signals).argmax(dim=-1) == labels).sum().item() / len(labels)
+    # the params are synchronized
+    params = torch.cat([p.detach().flatten() for p in trainer._model.parameters()])
+    gathered = [torch.zeros_like(params) for _ in range(_WORLD_SIZE)]
+    dist.all_gather(gathered, params)
+    assert all(torch.equal(gathered[0], p) for p in gathered[1:])
+    global_step = trainer.global_step
+    dist.barrier()
+
+    # resume from the checkpoint of the first epoch
+    ckpt = sorted((_CWD / "checkpoints").glob("*epoch0_*.pth.tar"))
+    assert len(ckpt) == 1
+    trainer = _Trainer(_Model(), None, CFG(), _get_train_config(n_epochs=2), device=torch.device("cpu"))
+    trainer.resume_from_checkpoint(str(ckpt[0]))
+    assert trainer.epoch == 1 and trainer.global_step == global_step // 2
+    trainer.train()
+    assert trainer.global_step == global_step
+    assert trainer.scheduler.last_epoch == global_step
+    results[rank] = True
+    dist.destroy_process_group()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_trainer_ddp():
+    shutil.rmtree(_CWD, ignore_errors=True)
+    results = tmp.Manager().dict()
+    tmp.spawn(_worker, args=(_free_port(), results), nprocs=_WORLD_SIZE, join=True)
+    assert dict(results) == {rank: True for rank in range(_WORLD_SIZE)}
+    shutil.rmtree(_CWD, ignore_errors=True)
@@ -1,8 +1,13 @@
 """
 """
 
+import os
+import pickle
+import shutil
 from pathlib import Path
 
+import numpy as np
+import pyedflib
 import pytest
 
 from torch_ecg.databases import AFDB, list_databases
@@ -16,9 +21,12 @@ from torch_ecg.databases.base import (
     WFDB_Non_Beat_Annotations,
     WFDB_Rhythm_Annotations,
     _DataBase,
+    _EdfReaderPool,
 )
 from torch_ecg.databases.datasets import list_datasets
 
+_TMP_DIR = Path(__file__).resolve().parents[2] / "tmp" / "test_edf_reader_pool"
+
 
 def test_base_database():
     with pytest.raises(
@@ -106,3 +114,51 @@ def test_list_datasets():
     assert isinstance(list_datasets(), list)
     assert len(list_datasets()) > 0
     assert all([item.endswith("Dataset") for item in list_datasets()]), list_datasets()
+
+
+def test_edf_reader_pool():
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+    _TMP_DIR.mkdir(parents=True, exist_ok=True)
+    files = [_TMP_DIR / f"{i}.edf" for i in range(3)]
+    for fp in files:
+        writer = pyedflib.EdfWriter(str(fp), 1, file_type=pyedflib.FILETYPE_EDFPLUS)
+        writer.setSignalHeaders(
+            [
+                dict(
+                    label="ecg",
+                    dimension="mV",
+                    sample_frequency=125,
+                    physical_max=10,
+                    physical_min=-10,
+                    digital_max=32767,
+                    digital_min=-32768,
+                )
+            ]
+        )
+        writer.writeSamples([np.random.uniform(-5, 5, 125 * 10)])
+        writer.close()
+
+    pool = _EdfReaderPool(maxsize=2)
+    reader = pool.get(files[0])
+    assert pool.get(files[0]) is reader
+    # windowed reads are consistent with slicing the whole signal
+    assert np.array_equal(reader.readSignal(0, start=100, n=300), reader.readSignal(0)[100:400])
+    pool.get(files[1])
+    reader = pool.get(files[2])
+    assert len(pool) == 2 and files[0] not in pool and files[2] in pool
+    # modified files are re-opened
+    os.utime(files[2], ns=(1, 1))
+    assert pool.get(files[2]) is not reader
+    assert len(pool) == 2
+
+    pool_copy = pickle.loads(pickle.dumps(pool))
+    assert pool_copy.maxsize == 2 and len(pool_copy) == 0
+
+    pool.close(files[1])
+    assert files[1] not in pool and len(pool) == 1
+    pool.close()
+    assert len(pool) == 0
+    with pytest.raises(AssertionError, match="`maxsize` should be a positive integer"):
+        _EdfReaderPool(maxsize=0)
+
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
@@ -6,6 +6,7 @@ subsampling: accomplished
 """
 
 import json
+import shutil
 from copy import deepcopy
 from pathlib import Path
 
@@ -24,6 +25,7 @@ from torch_ecg.databases.aux_data.cinc2020_aux_data import (
     load_weights,
 )
 from torch_ecg.databases.datasets import CINC2020Dataset, CINC2020TrainCfg
+from torch_ecg.databases.datasets.cinc2020 import cinc2020_dataset
 from torch_ecg.databases.physionet_databases.cinc2020 import compute_all_metrics
 from torch_ecg.utils import dicts_equal
 
@@ -142,6 +144,34 @@ class TestCINC2020:
         for k, v in dist.items():
             assert v == dist_1[k]
 
+    def test_build_ann_index(self, tmp_path):
+        for fp in _CWD.glob("*.*"):
+            if fp.suffix in [".hea", ".mat"]:
+                shutil.copy(fp, tmp_path)
+        # built along with the list of records of each diagnosis
+        new_reader = CINC2020(tmp_path)
+        assert new_reader._get_ann_index_filepath().is_file()
+        assert len(new_reader._ann_index) == len(new_reader)
+        new_reader.build_ann_index(num_workers=2, force_reload=True)
+        assert len(new_reader._ann_index) == len(new_reader)
+        # answered from the index, loaded along with the reader
+        new_reader = CINC2020(tmp_path)
+        new_reader.load_ann = None
+        for rec in new_reader:
+            ann = reader.load_ann(rec)
+            assert (
+                new_reader.get_labels(rec, scored_only=False, fmt="f", normalize=False)
+                == ann["diagnosis"]["diagnosis_fullname"]
+            )
+            assert new_reader.get_labels(rec, fmt="a") == reader.get_labels(rec, fmt="a")
+            for k, v in new_reader.get_subject_info(rec).items():
+                assert v == ann[k] or (np.isnan(v) and np.isnan(ann[k]))
+        # the official statistics by default
+        dist = new_reader.get_tranche_class_distribution(list("EF"), scored_only=False)
+        assert dist == reader.get_tranche_class_distribution(list("EF"), scored_only=False)
+        dist = new_reader.get_tranche_class_distribution(list("EF"), scored_only=False, from_index=True)
+        assert sum(dist.values()) == sum(len(reader.get_labels(rec, scored_only=False)) for rec in new_reader)
+
     def test_load_resampled_data(self):
         for rec in reader:
             data = reader.load_resampled_data(rec)
@@ -292,6 +322,33 @@ class TestCINC2020Dataset:
     def test_persistence(self):
         ds.persistence()
 
+    def test_preload(self, tmp_path, monkeypatch):
+        # parallel preloading
+        new_ds = CINC2020Dataset(config, training=False, lazy=False, num_workers=2)
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+
+        # memory-mapped cache
+        new_ds = CINC2020Dataset(config, training=False, lazy=False, num_workers=2, cache_dir=tmp_path)
+        assert isinstance(new_ds.signals, np.memmap) and not new_ds.signals.flags.writeable
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+        assert len(list(tmp_path.glob("CINC2020Dataset_*/meta.json"))) == 1
+        data, target = new_ds[:2]
+        assert data.shape == (2, len(config.leads), config.input_len)
+
+        # later runs with the same configurations read the cache
+        with monkeypatch.context() as mp:
+            mp.setattr(cinc2020_dataset._FastDataReader, "__getitem__", lambda *args: pytest.fail("cache not used"))
+            new_ds = CINC2020Dataset(config, training=False, lazy=False, cache_dir=tmp_path)
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+
+        # different preprocessing configurations
+        new_config = deepcopy(config)
+        new_config.normalize = False
+        new_ds = CINC2020Dataset(new_config, training=False, lazy=False, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob("CINC2020Dataset_*/meta.json"))) == 2
+        assert not np.allclose(new_ds.signals, ds.signals)
+        del new_ds, new_config
+
     def test_check_nan(self):
         ds._check_nan()
 
@@ -6,6 +6,7 @@ subsampling: accomplished
 """
 
 import json
+import shutil
 from copy import deepcopy
 from pathlib import Path
 
@@ -24,9 +25,11 @@ from torch_ecg.databases.aux_data.cinc2021_aux_data import (
     load_weights,
 )
 from torch_ecg.databases.datasets import CINC2021Dataset, CINC2021TrainCfg
+from torch_ecg.databases.datasets.cinc2021 import cinc2021_dataset
 from torch_ecg.databases.datasets.cinc2021.cinc2021_cfg import four_leads, six_leads, three_leads, twelve_leads, two_leads
 from torch_ecg.databases.physionet_databases.cinc2021 import compute_metrics, compute_metrics_detailed
 from torch_ecg.utils import dicts_equal
+from torch_ecg.utils.misc import list_sum
 
 ###############################################################################
 # set paths
@@ -154,6 +157,36 @@ class TestCINC2021:
         for k, v in dist.items():
             assert v == dist_1[k]
 
+    def test_build_ann_index(self, tmp_path):
+        for fp in _CWD.glob("*.*"):
+            if fp.suffix in [".hea", ".mat"]:
+                shutil.copy(fp, tmp_path)
+        new_reader = CINC2021(tmp_path)
+        assert len(new_reader._ann_index) == 0
+        labels = {rec: new_reader.get_labels(rec, scored_only=False, fmt="f", normalize=False) for rec in new_reader}
+        info = {rec: new_reader.get_subject_info(rec) for rec in new_reader}
+        dist = new_reader.get_tranche_class_distribution(list("EFG"), scored_only=False)
+        with pytest.raises(AssertionError, match="the annotation index does not contain all the records of the tranches"):
+            new_reader.get_tranche_class_distribution(list("EFG"), from_index=True)
+        new_reader.build_ann_index(num_workers=2)
+        assert new_reader._get_ann_index_filepath().is_file()
+        assert len(new_reader._ann_index) == len(new_reader)
+        # answered from the index, loaded along with the reader
+        new_reader = CINC2021(tmp_path)
+        new_reader.load_ann = None
+        for rec in new_reader:
+            assert new_reader.get_labels(rec, scored_only=False, fmt="f", normalize=False) == labels[rec]
+            assert set(new_reader.get_labels(rec, fmt="a")) <= set(reader.get_labels(rec, scored_only=False, fmt="a"))
+            assert new_reader.get_fs(rec) == reader.get_fs(rec)
+            assert new_reader.get_subject_info(rec).keys() == info[rec].keys()
+            for k, v in new_reader.get_subject_info(rec).items():
+                assert v == info[rec][k] or (np.isnan(v) and np.isnan(info[rec][k]))
+        # the official statistics by default
+        assert new_reader.get_tranche_class_distribution(list("EFG"), scored_only=False) == dist
+        new_dist = new_reader.get_tranche_class_distribution(list("EFG"), scored_only=False, from_index=True)
+        assert set(new_dist.keys()) <= set(dist.keys())
+        assert sum(new_dist.values()) == sum(len(v) for v in labels.values())
+
     def test_load_resampled_data(self):
         for rec in reader:
             data = reader.load_resampled_data(rec)
@@ -162,8 +195,28 @@ class TestCINC2021:
             assert np.allclose(data, data_1.T)
             data_1 = reader.load_resampled_data(rec, siglen=2000)
             assert data_1.ndim == 3 and data_1.shape[1:] == (12, 2000)
+            # lead subsets read from the memory-mapped files
+            data_1 = reader.load_resampled_data(rec, leads=["II", "V1"])
+            assert data_1.dtype == DEFAULTS.DTYPE.NP and data_1.flags.writeable
+            assert np.array_equal(data_1, data[[1, 6]])
         reader.load_resampled_data(0)
 
+    def test_build_resampled_cache(self, tmp_path):
+        for fp in _CWD.glob("*.*"):
+            if fp.suffix in [".hea", ".mat"]:
+                shutil.copy(fp, tmp_path)
+        new_reader = CINC2021(tmp_path)
+        records = list_sum(new_reader.all_records.values())
+        assert sorted(new_reader.build_resampled_cache(records[:2])) == sorted(records[:2])
+        assert sorted(new_reader.build_resampled_cache(num_workers=2)) == sorted(records[2:])
+        assert new_reader.build_resampled_cache() == []
+        for rec in records:
+            assert new_reader._get_resampled_data_filepath(rec).is_file()
+            assert np.array_equal(new_reader.load_resampled_data(rec), reader.load_resampled_data(rec))
+        assert new_reader.build_resampled_cache([0, 1], siglen=2000, num_workers=2) == records[:2]
+        data = new_reader.load_resampled_data(0, siglen=2000)
+        assert np.array_equal(data, reader.load_resampled_data(0, siglen=2000))
+
     def test_load_raw_data(self):
         for rec in reader:
             data_1 = reader.load_raw_data(rec, backend="wfdb")  # lead-last
@@ -374,6 +427,35 @@ class TestCINC2021Dataset:
     def test_persistence(self):
         ds.persistence()
 
+    def test_preload(self, tmp_path, monkeypatch):
+        # parallel preloading
+        new_ds = CINC2021Dataset(config, training=False, lazy=False, num_workers=2)
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+
+        # memory-mapped cache
+        new_ds = CINC2021Dataset(config, training=False, lazy=False, num_workers=2, cache_dir=tmp_path)
+        assert isinstance(new_ds.signals, np.memmap) and not new_ds.signals.flags.writeable
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+        assert len(list(tmp_path.glob("CINC2021Dataset_*/meta.json"))) == 1
+        data, target = new_ds[:2]
+        assert data.shape == (2, len(config.leads), config.input_len)
+
+        # later runs with the same configurations read the cache
+        with monkeypatch.context() as mp:
+            mp.setattr(cinc2021_dataset._FastDataReader, "__getitem__", lambda *args: pytest.fail("cache not used"))
+            new_ds = CINC2021Dataset(config, training=False, lazy=False, cache_dir=tmp_path)
+        assert np.array_equal(new_ds.signals, ds.signals) and np.array_equal(new_ds.labels, ds.labels)
+        new_ds.to(config.leads[:2])
+        assert new_ds.signals.shape == (len(new_ds.records), 2, config.input_len)
+
+        # different preprocessing configurations
+        new_config = deepcopy(config)
+        new_config.normalize = False
+        new_ds = CINC2021Dataset(new_config, training=False, lazy=False, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob("CINC2021Dataset_*/meta.json"))) == 2
+        assert not np.allclose(new_ds.signals, ds.signals)
+        del new_ds, new_config
+
     def test_check_nan(self):
         ds._check_nan()
 
@@ -6,6 +6,7 @@ subsampling: accomplished
 """
 
 import json
+import shutil
 from copy import deepcopy
 from pathlib import Path
 
@@ -433,3 +434,26 @@ class TestCPSC2021Dataset:
     def test_clear_cached_rr_seq(self):
         ds_1._clear_cached_rr_seq(recs=[ds_1.reader.all_records[0]])
         ds_1._clear_cached_rr_seq()
+
+    def test_persistence_num_workers(self):
+        # serial and parallel persistence give identical (randomly sliced) segments and rr sequences
+        stores = []
+        for num_workers in [0, 2]:
+            db_dir = _ANS_JSON_FILE.parent / f"persistence-{num_workers}"
+            shutil.rmtree(db_dir, ignore_errors=True)
+            db_dir.mkdir(parents=True)
+            for fp in _CWD.glob("data_*"):
+                shutil.copy(fp, db_dir)
+            config_3 = deepcopy(config)
+            config_3.db_dir = db_dir
+            ds_3 = CPSC2021Dataset(config_3, task="main", training=False, lazy=True)
+            ds_3.persistence(num_workers=num_workers)
+            seg_store = ds_3.seg_store
+            ds_3.reset_task(task="rr_lstm", lazy=True)
+            stores.append((seg_store, ds_3.rr_seq_store))
+        for store, store_1 in zip(*stores):
+            assert sorted(store.names()) == sorted(store_1.names()) != []
+            for name in store.names():
+                seg, seg_1 = store.get(name), store_1.get(name)
+                assert seg.keys() == seg_1.keys()
+                assert all(np.array_equal(seg[k], seg_1[k]) for k in seg)
@@ -18,6 +18,7 @@ import pytest
 
 from torch_ecg.databases import LUDB, DataBaseInfo
 from torch_ecg.databases.datasets import LUDBDataset, LUDBTrainCfg
+from torch_ecg.databases.physionet_databases._wave_ann import intervals_to_mask, parse_bracketed_waves, parse_peak_waves
 from torch_ecg.utils.download import PHYSIONET_DB_VERSION_PATTERN
 
 ###############################################################################
@@ -105,6 +106,45 @@ class TestLUDB:
                 assert ann[lead][i].onset == ann_1[lead][i].onset
                 assert ann[lead][i].offset == ann_1[lead][i].offset
 
+    def test_wave_ann_cache(self):
+        masks = reader.load_masks(0)
+        # a new reader loads the annotations from the cache files
+        reader_1 = LUDB(_CWD)
+        assert len(list(reader_1._wave_ann_store.cache_dir.glob("*.npz"))) > 0
+        assert np.array_equal(reader_1.load_masks(0), masks)
+        ann = reader.load_ann(0)["waves"]
+        ann_1 = reader_1.load_ann(0)["waves"]
+        for lead in reader.all_leads:
+            assert [(w.name, w.onset, w.offset, w.peak) for w in ann[lead]] == [
+                (w.name, w.onset, w.offset, w.peak) for w in ann_1[lead]
+            ]
+
+    def test_wave_ann_parsers(self):
+        symbols = ["p", ")", "(", "N", ")", "(", "t", "(", "p", ")", "N", "t"]
+        samples = np.array([10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120])
+        waves = parse_peak_waves(symbols, samples)
+        assert waves["symbol"].tolist() == ["p", "N", "t", "p", "N", "t"]
+        assert waves["onset"].tolist() == [10, 30, 60, 80, 110, 120]
+        assert waves["peak"].tolist() == [10, 40, 70, 90, 110, 120]
+        assert waves["offset"].tolist() == [20, 50, 70, 100, 110, 120]
+
+        symbols = ["(", "p", ")", "(", "N", ")", "t", ")", "(", ")"]
+        waves = parse_bracketed_waves(symbols, samples[: len(symbols)])
+        assert waves["symbol"].tolist() == ["p", "N", "t", ""]
+        assert np.allclose(waves["onset"], [10, 40, np.nan, 90], equal_nan=True)
+        assert np.allclose(waves["peak"], [20, 50, 70, np.nan], equal_nan=True)
+        assert waves["offset"].tolist() == [30, 60, 80, 100]
+        waves = parse_bracketed_waves(symbols, samples[: len(symbols)], sampfrom=25, sampto=85)
+        assert waves["symbol"].tolist() == ["", "N", "t"]
+        assert waves["offset"].tolist() == [30, 60, 80]
+
+        mask = intervals_to_mask([2, 6], [4, 12], [1, 2], siglen=10)
+        assert mask.tolist() == [0, 0, 1, 1, 0, 0, 2, 2, 2, 2]
+        # overlapping intervals, later ones override earlier ones
+        mask = intervals_to_mask([5, 2], [8, 6], [1, 2], siglen=10, fill_value=-1)
+        assert mask.tolist() == [-1, -1, 2, 2, 2, 2, 1, 1, -1, -1]
+        assert intervals_to_mask([], [], 1, siglen=3).tolist() == [0, 0, 0]
+
     def test_meta_data(self):
         assert isinstance(reader.version, str) and re.match(PHYSIONET_DB_VERSION_PATTERN, reader.version)
         assert isinstance(reader.webpage, str) and len(reader.webpage) > 0
@@ -72,6 +72,14 @@ class TestQTDB:
         with pytest.raises(AssertionError, match="`sampto` should be greater than `sampfrom`"):
             reader.load_ann(0, sampfrom=2000, sampto=1000)
 
+    def test_wave_ann_cache(self):
+        ann = reader.load_ann(0, extension="pu1")
+        # a new reader loads the annotations from the cache files
+        reader_1 = QTDB(_CWD)
+        assert len(list(reader_1._wave_ann_store.cache_dir.glob("*.npz"))) > 0
+        ann_1 = reader_1.load_ann(0, extension="pu1")
+        assert [(w.name, w.offset) for w in ann] == [(w.name, w.offset) for w in ann_1]
+
     def test_load_wave_ann(self):
         # alias of `load_ann`
         assert len(reader.load_wave_ann(0)) == len(reader.load_ann(0))
@@ -0,0 +1,166 @@
+"""
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+from torch.utils.data import Dataset
+
+from torch_ecg.export import (
+    ExportedModel,
+    check_exported,
+    compare_quantized,
+    export_model,
+    fuse_conv_bn,
+    load_exported,
+    quantize_model,
+)
+from torch_ecg.model_configs import ECG_CRNN_CONFIG, RR_AF_CRF_CONFIG
+from torch_ecg.models import ECG_CRNN, RR_LSTM
+from torch_ecg.models._nets import Conv_Bn_Activation
+
+_TMP_DIR = Path(__file__).absolute().parent / "tmp" / "test_export"
+shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+class _Dataset(Dataset):
+    def __init__(self, n_samples: int, n_leads: int, siglen: int, n_classes: int) -> None:
+        rng = np.random.default_rng(0)
+        self.signals = rng.standard_normal((n_samples, n_leads, siglen)).astype(np.float32)
+        self.labels = (rng.random((n_samples, n_classes)) > 0.5).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def __getitem__(self, index: int):
+        return self.signals[index], self.labels[index]
+
+
+def _check_runtime(model, exported, inputs):
+    for input in inputs:
+        with torch.no_grad():
+            expected = model(input).numpy()
+        output = exported(input.numpy())
+        assert output.shape == expected.shape
+        assert np.allclose(output, expected, atol=1e-5)
+
+
+@torch.no_grad()
+def test_export_torchscript():
+    model = ECG_CRNN(classes=["N", "AF", "PVC"], n_leads=2, config=ECG_CRNN_CONFIG).eval()
+    path = model.export(_TMP_DIR / "crnn.pt")
+    assert path.is_file() and (_TMP_DIR / "crnn.pt.json").is_file()
+    exported = load_exported(path)
+    assert isinstance(exported, ExportedModel) and exported.format == "torchscript"
+    assert exported.classes == ["N", "AF", "PVC"]
+    assert exported.input_axes == {0: "batch_size", 2: "seq_len"}
+    # dynamic batch size and signal length
+    _check_runtime(model, exported, [torch.randn(1, 2, 3000), torch.randn(5, 2, 5000)])
+    assert str(exported) == repr(exported)
+
+    # the CRF layer with loops over the time steps
+    model = RR_LSTM(classes=["N", "AF"], config=RR_AF_CRF_CONFIG).eval()
+    path = export_model(model, _TMP_DIR / "rr_lstm.pt")
+    exported = load_exported(path)
+    assert exported.input_axes == {0: "seq_len", 1: "batch_size"}
+    _check_runtime(model, exported, [torch.randn(20, 1, 1), torch.randn(150, 4, 1)])
+    assert check_exported(model, path, [torch.randn(30, 3, 1)]) == 0
+
+    # the model is not modified
+    assert type(model.clf.crf).__name__ == "CRF"
+    # without the metadata
+    (_TMP_DIR / "rr_lstm.pt.json").unlink()
+    assert load_exported(path).format == "torchscript" and load_exported(path).classes is None
+
+    # custom example input
+    model = torch.nn.Sequential(torch.nn.Conv1d(2, 4, 3, padding=1), torch.nn.AdaptiveAvgPool1d(1), torch.nn.Flatten())
+    path = export_model(
+        model,
+        _TMP_DIR / "custom.pt",
+        example_input=np.random.randn(2, 2, 100),
+        input_axes={0: "batch_size", 2: "seq_len"},
+    )
+    metadata = json.loads((_TMP_DIR / "custom.pt.json").read_text())
+    assert metadata["input_shape"] == [2, 2, 100] and metadata["output_shape"] == [2, 4]
+    assert metadata["output_axes"] == {"0": "batch_size"}
+
+    with pytest.raises(RuntimeError, match="the outputs of the exported model are inconsistent with the model"):
+        check_exported(torch.nn.Sequential(model, torch.nn.ReLU()), path, [torch.randn(2, 2, 100)])
+    with pytest.raises(ValueError, match="`example_input` should be given for the model `Sequential`"):
+        export_model(model, _TMP_DIR / "custom.pt")
+    with pytest.raises(ValueError, match="`format` should be one of `torchscript|onnx`, but got `xxx`"):
+        export_model(model, _TMP_DIR / "custom.pt", format="xxx")
+    with pytest.raises(ValueError, match="Unknown format of the exported model `custom.xxx`"):
+        ExportedModel(_TMP_DIR / "custom.xxx")
+
+
+@torch.no_grad()
+def test_export_onnx():
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+
+    model = ECG_CRNN(classes=["N", "AF", "PVC"], n_leads=2, config=ECG_CRNN_CONFIG).eval()
+    path = model.export(_TMP_DIR / "crnn.onnx", format="onnx")
+    exported = load_exported(path)
+    assert exported.format == "onnx" and exported.classes == ["N", "AF", "PVC"]
+    _check_runtime(model, exported, [torch.randn(1, 2, 3000), torch.randn(5, 2, 5000)])
+
+    model = RR_LSTM(classes=["N", "AF"], config=RR_AF_CRF_CONFIG).eval()
+    path = model.export(_TMP_DIR / "rr_lstm.onnx", format="ONNX")
+    exported = load_exported(path, providers=["CPUExecutionProvider"])
+    _check_runtime(model, exported, [torch.randn(20, 1, 1), torch.randn(150, 4, 1)])
+
+
+@torch.no_grad()
+def test_quantize():
+    model = ECG_CRNN(classes=["N", "AF", "PVC"], n_leads=2, config=ECG_CRNN_CONFIG).eval()
+    ds = _Dataset(n_samples=24, n_leads=2, siglen=2000, n_classes=3)
+    input = torch.from_numpy(ds.signals[:8])
+
+    fused = fuse_conv_bn(model)
+    assert not any(isinstance(m, torch.nn.BatchNorm1d) for m in fused.cnn.modules())
+    assert any(isinstance(m, torch.nn.BatchNorm1d) for m in model.cnn.modules())  # not modified
+    assert torch.allclose(fused(input), model(input), atol=1e-5)
+    # the ordering other than "cb(a)" is not fused
+    block = Conv_Bn_Activation(2, 4, 3, 1, activation="relu", ordering="bac").eval()
+    assert torch.allclose(fuse_conv_bn(block)(input), block(input))
+    assert isinstance(fuse_conv_bn(block).batch_norm, torch.nn.BatchNorm1d)
+    block = Conv_Bn_Activation(2, 4, 3, 1, activation="relu").eval()
+    fuse_conv_bn(block, inplace=True)
+    assert isinstance(block.batch_norm, torch.nn.Identity)
+
+    qmodel = quantize_model(model, ds, num_batches=2, batch_size=8)
+    assert isinstance(qmodel, ECG_CRNN) and any(isinstance(m, torch.nn.BatchNorm1d) for m in model.cnn.modules())
+    qconvs = [m for m in qmodel.modules() if type(m).__module__.startswith("torch.ao.nn.quantized")]
+    assert len(qconvs) > 0
+    output = qmodel(input)
+    assert output.shape == model(input).shape
+    assert torch.allclose(output, model(input), atol=0.1)
+    # via the method of the models, calibrated on a batch of signals
+    qmodel_1 = model.quantize(input)
+    assert qmodel_1(input).shape == output.shape
+
+    report = compare_quantized(model, qmodel, ds, batch_size=8)
+    assert set(report) == {"latency", "size", "accuracy", "f1_measure", "auroc", "auprc", "max_abs_diff"}
+    assert report["size"]["quantized"] < report["size"]["float"]
+    assert report["size"]["delta"] == report["size"]["quantized"] - report["size"]["float"]
+    assert 0 <= report["max_abs_diff"] < 0.1
+    assert all(0 <= report["f1_measure"][key] <= 1 for key in ["float", "quantized"])
+    # without labels
+    report = compare_quantized(model, qmodel, [input], num_batches=1)
+    assert set(report) == {"latency", "size", "max_abs_diff"}
+
+    # the quantized models can be exported
+    path = export_model(qmodel, _TMP_DIR / "crnn_int8.pt", example_input=input, input_axes={0: "batch_size", 2: "seq_len"})
+    _check_runtime(qmodel, load_exported(path), [torch.randn(3, 2, 2500)])
+
+    with pytest.raises(ValueError, match="`backend` should be one of"):
+        quantize_model(model, ds, backend="xxx")
+    with pytest.raises(ValueError, match="No convolution to quantize in the model"):
+        quantize_model(torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(4000, 3)), input)
+    with pytest.raises(ValueError, match="No data to compare the models on"):
+        compare_quantized(model, qmodel, [])
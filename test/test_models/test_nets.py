@@ -1036,12 +1036,41 @@ def test_crf():
     ):
         CRF(num_tags=-1)
 
+    # Viterbi decoding and the normalizer against brute force
+    seq_len, num_tags = 5, 3
+    crf = CRF(num_tags=num_tags, batch_first=False).to(DEVICE)
+    emissions = torch.randn(seq_len, 2, num_tags).to(DEVICE)
+    all_tags = torch.cartesian_prod(*[torch.arange(num_tags)] * seq_len).to(DEVICE)
+    for idx in range(2):
+        sample_emissions = emissions[:, [idx]].expand(-1, len(all_tags), -1)
+        scores = crf._compute_score(sample_emissions, all_tags.T, torch.ones_like(all_tags.T))
+        assert torch.allclose(
+            crf._compute_normalizer(emissions[:, [idx]], torch.ones(seq_len, 1).to(DEVICE)),
+            scores.logsumexp(dim=0),
+        )
+        assert crf.decode(emissions)[:, idx].tolist() == all_tags[scores.argmax()].tolist()
+
+    # sequences of different lengths, padded with -1
+    mask = torch.ones(seq_len, 2, dtype=torch.bool).to(DEVICE)
+    mask[3:, 1] = False
+    best_tags = crf.decode(emissions, mask)
+    assert best_tags.shape == (seq_len, 2) and best_tags.dtype == torch.long
+    assert torch.equal(best_tags[:, 0], crf.decode(emissions[:, :1])[:, 0])
+    assert torch.equal(best_tags[:3, 1], crf.decode(emissions[:3, 1:])[:, 0])
+    assert (best_tags[3:, 1] == -1).all()
+    output = crf(emissions, mask)
+    assert (output[3:, 1] == 0).all() and (output[:3, 1].sum(dim=-1) == 1).all()
+
+    scripted_crf = torch.jit.script(crf)
+    assert torch.equal(scripted_crf(emissions, mask), output)
+
     # ExtendedCRF
     sample_input = torch.randn(BATCH_SIZE, SEQ_LEN // 20, IN_CHANNELS).to(DEVICE)
     for bias in [True, False]:
         crf = ExtendedCRF(in_channels=IN_CHANNELS, num_tags=num_tags, bias=bias).to(DEVICE)
         assert crf(sample_input).shape == crf.compute_output_shape(seq_len=SEQ_LEN // 20, batch_size=BATCH_SIZE)
     assert crf.in_channels == IN_CHANNELS
+    assert torch.equal(torch.jit.script(crf)(sample_input), crf(sample_input))
 
 
 @torch.no_grad()
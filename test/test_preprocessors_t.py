@@ -1,9 +1,11 @@
 """
 """
 
+import numpy as np
 import pytest
 import torch
 
+from torch_ecg._preprocessors import preprocess_multi_lead_signal
 from torch_ecg.cfg import CFG
 from torch_ecg.preprocessors import (
     BandPass,
@@ -104,6 +106,17 @@ def test_preproc_manager() -> None:
     with pytest.warns(RuntimeWarning, match="No preprocessors added to the manager"):
         ppm = PreprocManager.from_config({"bandpass": False})
 
+    # exported (scripted) along with the preprocessors
+    ppm = PreprocManager(BandPass(fs=500), BaselineRemove(fs=500), DummyPreProcessor())
+    scripted = torch.jit.script(ppm)
+    sig = test_sig.clone()
+    assert torch.allclose(scripted(sig), ppm(sig))
+    ppm.rearrange(new_ordering=["baseline_remove", "DummyPreProcessor", "bandpass"])
+    assert [pp.__class__.__name__ for pp in ppm.preprocessors] == ["BaselineRemove", "DummyPreProcessor", "BandPass"]
+    # the filter taps are registered (hence moved along) with the manager, but not saved in the state dict
+    assert {"_preprocessors.2.b", "_preprocessors.2.a"} <= {name for name, _ in ppm.named_buffers()}
+    assert len(ppm.state_dict()) == 0
+
     del ppm, sig
 
 
@@ -120,6 +133,29 @@ def test_bandpass() -> None:
     sig = test_sig.clone()
     sig = bp(sig)
 
+    # consistent with the preprocessing of numpy arrays
+    sig = test_sig.clone()
+    for config in [
+        dict(fs=500),
+        dict(fs=400),
+        dict(fs=500, filter_type="fir"),
+        dict(fs=500, lowcut=0, highcut=40),
+        dict(fs=500, lowcut=1.5, highcut=None, filter_type="fir"),
+    ]:
+        bp = BandPass(**config)
+        expected = preprocess_multi_lead_signal(
+            sig.numpy(), fs=bp.fs, band_fs=[bp.lowcut, bp.highcut], filter_type=bp.filter_type
+        )
+        filtered = bp(sig)
+        assert filtered.shape == sig.shape
+        assert np.allclose(filtered[..., 500:-500].numpy(), expected[..., 500:-500], atol=1e-4)
+    assert torch.equal(sig, test_sig)
+
+    with pytest.raises(ValueError, match="Unsupported filter type `xxx`"):
+        BandPass(fs=500, filter_type="xxx")
+    with pytest.raises(AssertionError, match="Invalid frequency band"):
+        BandPass(fs=500, lowcut=40, highcut=30)
+
     del bp, sig
 
 
@@ -135,6 +171,12 @@ def test_baseline_remove() -> None:
     with pytest.warns(RuntimeWarning, match="values of `window1` and `window2` are switched"):
         br = BaselineRemove(fs=500, window1=0.7, window2=0.3)
 
+    # consistent with the preprocessing of numpy arrays
+    sig = test_sig.clone()
+    expected = preprocess_multi_lead_signal(sig.numpy(), fs=500, bl_win=[0.3, 0.7])
+    assert np.allclose(br(sig).numpy(), expected, atol=1e-5)
+    assert torch.equal(sig, test_sig)
+
     del br, sig
 
 
@@ -1,15 +1,26 @@
 """
 """
 
+import functools
+import hashlib
+import http.server
+import io
+import re
 import shutil
+import tarfile
+import threading
 import urllib.parse
 from pathlib import Path
 
+import numpy as np
 import pytest
+import requests
 
+import torch_ecg.utils.download as download_module
 from torch_ecg.utils.download import (
     _download_from_aws_s3_using_boto3,
     _download_from_google_drive,
+    download_file,
     http_get,
     is_compressed_file,
     url_is_reachable,
@@ -19,6 +30,86 @@ _TMP_DIR = Path(__file__).resolve().parents[2] / "tmp" / "test_download"
 _TMP_DIR.mkdir(parents=True, exist_ok=True)
 
 
+class _RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Local stand-in of the file servers, serving (single) byte range requests.
+
+    The behaviors are controlled by the class attributes of the subclasses:
+    `accept_ranges` (whether range requests are served), `advertise_ranges`
+    (whether "Accept-Ranges" is sent), and `n_drops` (number of the responses,
+    of ranges starting from `drop_from`, whose connections are dropped halfway).
+    """
+
+    accept_ranges = True
+    advertise_ranges = True
+    n_drops = 0
+    drop_from = 0
+    bytes_sent = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head):
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            self.send_error(404)
+            return
+        content = path.read_bytes()
+        start, end, status = 0, len(content), 200
+        match = re.match("bytes=(\\d+)-(\\d*)$", self.headers.get("Range", ""))
+        if match is not None and self.accept_ranges:
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else len(content)
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("ETag", f'"{hashlib.sha1(content).hexdigest()}"')
+        if self.advertise_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(content)}")
+        self.end_headers()
+        if head:
+            return
+        body = content[start:end]
+        with self.lock:
+            if self.n_drops > 0 and start >= self.drop_from:
+                type(self).n_drops -= 1
+                body = body[: len(body) // 2]
+                self.close_connection = True
+            type(self).bytes_sent += len(body)
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # e.g. the client gave up the responses ignoring the ranges
+
+
+@pytest.fixture
+def file_server(tmp_path):
+    """Serve files in `tmp_path / "www"` with a handler class given by the test."""
+    servers = []
+
+    def _start(handler_cls=_RangeRequestHandler):
+        (tmp_path / "www").mkdir(exist_ok=True)
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), functools.partial(handler_cls, directory=str(tmp_path / "www"))
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield _start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
 def test_http_get():
     # normally, direct downloading from dropbox with `dl=0` will not download the file
     # http_get internally replaces `dl=0` with `dl=1` to force download
@@ -87,6 +178,83 @@ def test_http_get():
     _download_from_aws_s3_using_boto3("s3://physionet-open/ludb/1.0.1/", _TMP_DIR / "ludb")
 
 
+def test_download_file(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_module, "_RANGE_SIZE", 64 * 1024)
+    content = np.random.default_rng(0).bytes(1000 * 1000)
+    checksum = hashlib.sha256(content).hexdigest()
+
+    class _Handler(_RangeRequestHandler):
+        pass
+
+    url = file_server(_Handler)
+    (tmp_path / "www" / "data.bin").write_bytes(content)
+    dst_file = download_file(f"{url}/data.bin", tmp_path / "data.bin", num_workers=4, sha256=checksum, verbose=0)
+    assert dst_file.read_bytes() == content
+    assert not (tmp_path / "data.bin.part").exists()
+    assert not (tmp_path / "data.bin.part.json").exists()
+    assert _Handler.bytes_sent == len(content)
+
+    with pytest.raises(ValueError, match="SHA-256 checksum mismatch"):
+        download_file(f"{url}/data.bin", tmp_path / "data-1.bin", sha256="0" * 64, verbose=0)
+    assert not (tmp_path / "data-1.bin").exists()
+    assert not (tmp_path / "data-1.bin.part").exists()
+
+    # interrupted downloads are resumed by later calls
+    class _DroppingHandler(_RangeRequestHandler):
+        n_drops = 1
+        drop_from = len(content) // 2
+
+    url = file_server(_DroppingHandler)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download_file(f"{url}/data.bin", tmp_path / "data-2.bin", num_workers=1, max_retries=0, verbose=0)
+    assert (tmp_path / "data-2.bin.part").exists() and (tmp_path / "data-2.bin.part.json").exists()
+    # dropped connections are retried from where they stopped
+    _DroppingHandler.n_drops, _DroppingHandler.bytes_sent = 2, 0
+    download_file(f"{url}/data.bin", tmp_path / "data-2.bin", num_workers=2, max_retries=3, sha256=checksum, verbose=0)
+    assert (tmp_path / "data-2.bin").read_bytes() == content
+    assert _DroppingHandler.n_drops == 0
+    assert _DroppingHandler.bytes_sent < len(content)
+
+    # servers without (or ignoring) range requests
+    for advertise_ranges in [False, True]:
+
+        class _NoRangeHandler(_RangeRequestHandler):
+            accept_ranges = False
+
+        _NoRangeHandler.advertise_ranges = advertise_ranges
+        url = file_server(_NoRangeHandler)
+        dst_file = download_file(f"{url}/data.bin", tmp_path / f"data-{advertise_ranges}.bin", sha256=checksum, verbose=0)
+        assert dst_file.read_bytes() == content
+
+
+def test_http_get_local(file_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_module, "_RANGE_SIZE", 16 * 1024)
+    url = file_server()
+    buffer = io.BytesIO()
+    files = {f"archive/file-{idx}.bin": np.random.default_rng(idx).bytes(50 * 1024) for idx in range(5)}
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    (tmp_path / "www" / "archive.tar.gz").write_bytes(buffer.getvalue())
+
+    # extracted while downloading
+    dst_dir = http_get(f"{url}/archive.tar.gz", tmp_path / "extracted", extract=True)
+    for name, content in files.items():
+        assert (dst_dir / Path(name).name).read_bytes() == content
+    # extracted after the checksum is verified
+    dst_dir = http_get(
+        f"{url}/archive.tar.gz",
+        tmp_path / "verified",
+        extract=True,
+        sha256=hashlib.sha256(buffer.getvalue()).hexdigest(),
+    )
+    for name, content in files.items():
+        assert (dst_dir / Path(name).name).read_bytes() == content
+    assert not any(tmp_path.glob(".*.part*"))
+
+
 def test_url_is_reachable():
     assert url_is_reachable("https://www.dropbox.com/s/oz0n1j3o1m31cbh/action_test.zip?dl=1")
     assert not url_is_reachable("https://www.some-unknown-domain.com/unknown-path/unknown-file.zip")
@@ -6,7 +6,15 @@ from pathlib import Path
 import numpy as np
 
 from torch_ecg.databases import CINC2021
-from torch_ecg.utils._preproc import preprocess_multi_lead_signal, preprocess_single_lead_signal, rpeaks_detect_multi_leads
+from torch_ecg.utils._preproc import (
+    batch_preprocess_multi_lead_signal,
+    close_preproc_pool,
+    get_preproc_pool,
+    merge_rpeaks,
+    preprocess_multi_lead_signal,
+    preprocess_single_lead_signal,
+    rpeaks_detect_multi_leads,
+)
 
 _SAMPLE_DATA_DIR = Path(__file__).resolve().parents[2] / "sample-data" / "cinc2021"
 
@@ -74,3 +82,33 @@ def test_rpeaks_detect_multi_leads():
     rpeaks = rpeaks_detect_multi_leads(raw_data, fs, rpeak_fn="xqrs", verbose=2)
     assert isinstance(rpeaks, np.ndarray)
     assert rpeaks.ndim == 1
+
+
+def test_batch_preprocess_multi_lead_signal():
+    raw_data = reader.load_data(0, leads=["II", "aVR", "V1"])
+    fs = reader.get_fs(0)
+    pool = get_preproc_pool(processes=2)
+    assert get_preproc_pool(processes=2) is pool
+    batch = [raw_data, raw_data[:, : raw_data.shape[1] // 2]]
+    results = batch_preprocess_multi_lead_signal(batch, fs, bl_win=[0.2, 0.6], band_fs=[0.5, 45], rpeak_fn="xqrs")
+    assert len(results) == 2
+    for sig, data in zip(batch, results):
+        assert data.keys() == {"filtered_ecg", "rpeaks"}
+        assert data["filtered_ecg"].shape == sig.shape
+        serial = preprocess_multi_lead_signal(sig, fs, bl_win=[0.2, 0.6], band_fs=[0.5, 45], rpeak_fn="xqrs", parallel=False)
+        assert np.allclose(serial["filtered_ecg"], data["filtered_ecg"])
+        assert (serial["rpeaks"] == data["rpeaks"]).all()
+    close_preproc_pool()
+
+
+def test_merge_rpeaks():
+    fs = 500
+    sig = np.zeros((3, 5000))
+    rpeaks_candidates = [
+        np.array([1000, 2000, 3000, 4990]),
+        np.array([1002, 2000, 3010]),
+        np.array([1000, 2004, 3020]),
+    ]
+    # majority voting, mean of the candidates, and rpeaks near the boundary
+    assert merge_rpeaks(rpeaks_candidates, sig, fs).tolist() == [1000, 2000, 3010]
+    assert merge_rpeaks([np.array([], dtype=int)] * 3, sig, fs).tolist() == []
@@ -0,0 +1,133 @@
+"""
+"""
+
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from torch_ecg.utils.segment_store import SegmentStore
+
+_TMP_DIR = Path(__file__).resolve().parents[2] / "tmp" / "test_segment_store"
+shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+_FIELDS = {"data": ((2, 100), "float32"), "mask": ((100,), "int8"), "interval": ((2,), "int64")}
+_RAGGED_FIELDS = {"rpeaks": "int32"}
+
+
+def _make_items(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        dict(
+            data=rng.standard_normal((2, 100)),
+            mask=rng.integers(0, 2, 100),
+            interval=[i * 100, (i + 1) * 100],
+            rpeaks=rng.integers(0, 100, rng.integers(0, 5)),
+        )
+        for i in range(n)
+    ]
+
+
+def test_segment_store():
+    store = SegmentStore(_TMP_DIR / "store", fields=_FIELDS, ragged_fields=_RAGGED_FIELDS, max_shard_bytes=2000)
+    assert len(store) == 0
+    # 2 rows per shard
+    assert store.rows_per_shard == 2
+
+    items_1 = _make_items(5, seed=1)
+    names_1 = [f"S_1_{i:07d}" for i in range(5)]
+    store.append("1", items_1, names_1, group="subject_1")
+    items_2 = _make_items(3, seed=2)
+    names_2 = [f"S_2_{i:07d}" for i in range(3)]
+    store.append("2", items_2, names_2)
+    assert len(store) == 8
+    assert len(list(store.path.glob("data-*.bin"))) == 4
+    assert store.names(group="subject_1") == names_1
+    assert store.names(record="2") == names_2
+    assert "S_2_0000000" in store
+
+    for items, names in [(items_1, names_1), (items_2, names_2)]:
+        for item, name in zip(items, names):
+            seg = store.get(name)
+            assert set(seg) == {"data", "mask", "interval", "rpeaks"}
+            assert seg["data"].dtype == np.float32 and seg["data"].shape == (2, 100)
+            assert np.allclose(seg["data"], item["data"])
+            assert (seg["mask"] == item["mask"]).all()
+            assert seg["interval"].tolist() == item["interval"]
+            assert seg["rpeaks"].tolist() == item["rpeaks"].tolist()
+            assert not seg["data"].flags.writeable
+
+    # reopen the store
+    store = SegmentStore(_TMP_DIR / "store")
+    assert len(store) == 8
+    assert np.allclose(store.get("S_1_0000004", "data"), items_1[4]["data"])
+
+    # pickling, e.g. for DataLoader workers
+    store = pickle.loads(pickle.dumps(store))
+    assert np.allclose(store.get("S_2_0000002", "data"), items_2[2]["data"])
+
+    # removal and re-appending
+    store.remove(["1"])
+    assert len(store) == 3 and store.names(record="1") == []
+    store.append("1", items_1[:2], names_1[:2])
+    assert np.allclose(store.get("S_1_0000001", "data"), items_1[1]["data"])
+    assert np.allclose(store.get("S_2_0000000", "data"), items_2[0]["data"])
+
+    with pytest.raises(ValueError, match="segment names should be unique"):
+        store.append("2", items_2[:1], names_2[:1])
+    with pytest.raises(ValueError, match="field `data` should be of shape"):
+        store.append("3", [dict(items_2[0], data=np.zeros((1, 100)))], ["S_3_0000000"])
+    with pytest.raises(ValueError, match="inconsistent with the given fields"):
+        SegmentStore(_TMP_DIR / "store", fields={"data": ((1, 100), "float32")})
+    with pytest.raises(AssertionError, match="`fields` should be specified"):
+        SegmentStore(_TMP_DIR / "another_store")
+
+    store.clear()
+    assert len(store) == 0
+    assert len(list(store.path.glob("*.bin"))) == 0
+    assert len(SegmentStore(_TMP_DIR / "store")) == 0
+
+    assert str(store).startswith("SegmentStore")
+
+
+def test_segment_store_writers():
+    path = _TMP_DIR / "store_writers"
+    store = SegmentStore(path, fields=_FIELDS, ragged_fields=_RAGGED_FIELDS, max_shard_bytes=2000)
+    items = {rec: _make_items(3, seed=idx) for idx, rec in enumerate(["1", "2", "3"])}
+    store.append("1", items["1"], [f"S_1_{i:07d}" for i in range(3)])
+
+    with pytest.raises(AssertionError, match="`writer_id` should consist of"):
+        SegmentStore(path, writer_id="worker-0")
+    writer_0 = SegmentStore(path, writer_id="worker_0")
+    writer_1 = SegmentStore(path, writer_id="worker_1")
+    writer_0.append("2", items["2"], [f"S_2_{i:07d}" for i in range(3)])
+    writer_1.append("3", items["3"], [f"S_3_{i:07d}" for i in range(3)])
+    # records with no segments are marked as completed as well
+    writer_1.append("4", [], [])
+    assert len(list(path.glob("data-worker_0-*.bin"))) == 2
+    assert (path / "index-worker_0.npz").is_file() and (path / "index-worker_1.npz").is_file()
+
+    # the main index is not touched by the writers
+    store.refresh()
+    assert len(store) == 3 and store.completed_records == ["1"]
+
+    assert sorted(store.merge()) == ["2", "3", "4"]
+    assert len(store) == 9
+    assert sorted(store.completed_records) == ["1", "2", "3", "4"]
+    assert list(path.glob("index-*.npz")) == []
+    assert store.merge() == []
+    for rec, rec_items in items.items():
+        for i, item in enumerate(rec_items):
+            assert np.allclose(store.get(f"S_{rec}_{i:07d}", "data"), item["data"])
+    assert SegmentStore(path).completed_records == store.completed_records
+
+    store.remove(["2", "4"])
+    assert sorted(store.completed_records) == ["1", "3"]
+    with pytest.raises(AssertionError, match="`merge` should be called from the instance of the main index"):
+        writer_0.merge()
+
+    store.clear()
+    assert store.completed_records == []
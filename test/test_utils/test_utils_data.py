@@ -165,6 +165,36 @@ def test_ensure_siglen():
     assert np.allclose(new_values, values[(4629 - 3000) // 2 : (4629 - 3000) // 2 + 3000])
     new_values = ensure_siglen(values, 3000, fmt="channel_last", tolerance=0.1)
     assert new_values.shape == (math.ceil((4629 - 3000) / (0.1 * 3000)), 3000, 12)
+    assert np.allclose(new_values[1], values[300:3300])
+
+    # strided views without copying
+    values = DEFAULTS.RNG.normal(size=(num_leads, 50000))
+    for fmt, _values in [("lead_first", values), ("lead_last", values.T)]:
+        new_values = ensure_siglen(_values, 5000, fmt=fmt, tolerance=0.8, copy=False)
+        assert new_values.shape[0] == 12 and np.shares_memory(new_values, values)
+        assert not new_values.flags.writeable
+        assert np.array_equal(new_values, ensure_siglen(_values, 5000, fmt=fmt, tolerance=0.8))
+        new_values = ensure_siglen(_values, 5000, fmt=fmt, copy=False)
+        assert np.shares_memory(new_values, values) and not new_values.flags.writeable
+        new_values = ensure_siglen(_values, 5000, fmt=fmt, tolerance=0.8)
+        assert not np.shares_memory(new_values, values) and new_values.flags.c_contiguous
+    # padding is materialized
+    new_values = ensure_siglen(values, 60000, copy=False)
+    assert new_values.shape == (num_leads, 60000) and not np.shares_memory(new_values, values)
+
+    # tensors
+    tensor_values = torch.from_numpy(values)
+    for tolerance in [None, 0.1, 0.8]:
+        for siglen in [5000, 60000]:
+            new_values = ensure_siglen(tensor_values, siglen, tolerance=tolerance, copy=False)
+            assert isinstance(new_values, torch.Tensor)
+            assert np.array_equal(new_values.numpy(), ensure_siglen(values, siglen, tolerance=tolerance))
+    new_values = ensure_siglen(tensor_values.T, 5000, fmt="lead_last", tolerance=0.8, copy=False)
+    assert new_values.shape == (12, 5000, num_leads)
+    assert new_values.untyped_storage().data_ptr() == tensor_values.untyped_storage().data_ptr()
+    new_values = ensure_siglen(tensor_values.T, 5000, fmt="lead_last", tolerance=0.8)
+    assert new_values.is_contiguous()
+    assert new_values.untyped_storage().data_ptr() != tensor_values.untyped_storage().data_ptr()
 
 
 def test_masks_to_waveforms():
@@ -23,6 +23,7 @@ from torch_ecg.utils.utils_nn import (
     compute_sequential_output_shape,
     default_collate_fn,
     extend_predictions,
+    sliding_window_inference,
 )
 
 
@@ -504,6 +505,58 @@ def test_adjust_cnn_filter_lengths():
     )
 
 
+def test_sliding_window_inference():
+    sig = torch.randn(2, 10007)
+    batch_sizes = []
+
+    def model(x):
+        batch_sizes.append(x.shape[0])
+        # downsample by 4, output of shape (batch_size, out_len, n_classes)
+        return torch.nn.functional.avg_pool1d(x, 4).permute(0, 2, 1)
+
+    # the overlaps of the consistent outputs are merged to the outputs on the whole signal
+    expected = torch.nn.functional.avg_pool1d(sig.unsqueeze(0), 4)[0].T
+    for reduction, step in itertools.product(["mean", "max", "center"], [400, 1000, 2000]):
+        batch_sizes.clear()
+        output = sliding_window_inference(model, sig, window=2000, step=step, reduction=reduction, batch_size=3)
+        assert output.shape == expected.shape
+        # the last window ending at the end of the signal is not aligned with the others
+        assert torch.allclose(output[:-500], expected[:-500])
+        n_windows = len(range(0, 10007 - 2000 + 1, step)) + 1
+        assert sum(batch_sizes) == n_windows and max(batch_sizes) == 3
+
+    identity = lambda x: x.permute(0, 2, 1)  # noqa: E731
+    for reduction in ["mean", "max", "center"]:
+        output = sliding_window_inference(identity, sig.numpy(), window=2000, step=700, reduction=reduction)
+        assert isinstance(output, np.ndarray) and np.allclose(output, sig.numpy().T)
+    # signals shorter than the window
+    assert torch.equal(sliding_window_inference(identity, sig[:, :500], window=2000), sig[:, :500].T)
+
+    # the memory budget limits the size of the batches
+    batch_sizes.clear()
+    sliding_window_inference(model, sig, window=2000, memory_budget=2 * 2000 * 4 * 3)
+    assert max(batch_sizes) == 3
+
+    # outputs that are not time-resolved
+    output = sliding_window_inference(lambda x: x.mean(dim=-1), sig, window=2000, step=1000)
+    assert output.shape == (10, 2)
+    assert torch.allclose(output[-1], sig[:, -2000:].mean(dim=-1))
+
+    # models
+    model = torch.nn.Conv1d(2, 3, kernel_size=5, stride=2, padding=2, dtype=torch.float64).eval()
+    output = sliding_window_inference(lambda x: model(x).permute(0, 2, 1), sig, window=2000, step=1000, dtype=torch.float64)
+    assert output.shape == (10007 // 2, 3) and output.dtype == torch.float64
+
+    with pytest.raises(ValueError, match="`reduction` should be one of `mean|max|center`, but got `xxx`"):
+        sliding_window_inference(identity, sig, window=2000, reduction="xxx")
+    with pytest.raises(AssertionError, match="`sig` should be of shape `\\(n_leads, siglen\\)`"):
+        sliding_window_inference(identity, sig[0], window=2000)
+    with pytest.raises(AssertionError, match="`step` should be positive and not greater than `window`"):
+        sliding_window_inference(identity, sig, window=2000, step=3000)
+    with pytest.raises(AssertionError, match="should be divisible by the length of the outputs"):
+        sliding_window_inference(lambda x: x[..., :3].permute(0, 2, 1), sig, window=2000)
+
+
 def test_mixin_classes():
     model_1d = Model1D(12, CFG(out_channels=128))
     assert isinstance(model_1d.module_size, int)
@@ -6,12 +6,15 @@ from pathlib import Path
 import numpy as np
 import pytest
 import wfdb
+from scipy.signal import butter, firwin
 
 from torch_ecg.cfg import DEFAULTS
 from torch_ecg.utils.utils_signal import (
+    butter_bandpass,
     butter_bandpass_filter,
     detect_peaks,
     get_ampl,
+    get_filter,
     normalize,
     remove_spikes_naive,
     resample_irregular_timeseries,
@@ -233,6 +236,26 @@ def test_butter_bandpass_filter():
         butter_bandpass_filter(data, lowcut=0.5, highcut=40, fs=fs, order=5, btype="lolo")
 
 
+def test_filter_cache():
+    b, a = butter_bandpass(0.5, 40, 500, order=5)
+    b_expected, a_expected = butter(5, [0.5 / 250, 40 / 250], btype="band")
+    assert np.array_equal(b, b_expected) and np.array_equal(a, a_expected)
+    # the designs are cached and shared, hence read-only
+    assert butter_bandpass(0.5, 40, 500, order=5)[0] is b
+    assert not b.flags.writeable
+    with pytest.raises(ValueError, match="read-only"):
+        b[0] = 0
+
+    b, a = get_filter("FIR", "bandpass", 150, [0.5, 45], 500)
+    assert np.array_equal(b, firwin(151, [0.5 / 250, 45 / 250], pass_zero=False)) and a.tolist() == [1]
+    # equivalent arguments hit the same cache entry
+    assert get_filter("FIR", "bandpass", 150.0, (0.5, 45.0), 500.0)[0] is b
+    assert get_filter("FIR", "lowpass", 150, 40, 500)[0] is not b
+    assert not b.flags.writeable and not a.flags.writeable
+    b, a = get_filter("butter", "highpass", 4, 1, 500)
+    assert np.allclose(b, butter(4, 1 / 250, btype="high")[0])
+
+
 def test_get_ampl():
     data = sample_rec.p_signal.T  # (n_channels, n_samples)
     fs = sample_rec.fs
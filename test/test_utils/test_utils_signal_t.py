@@ -1,10 +1,17 @@
 """
 """
 
+import numpy as np
 import pytest
 import torch
+from scipy.ndimage import median_filter as median_filter_np
+from scipy.signal import butter
+from scipy.signal import filtfilt as filtfilt_np
+from scipy.signal import lfilter_zi
+from scipy.signal import resample as resample_fft_np
+from scipy.signal import resample_poly as resample_poly_np
 
-from torch_ecg.utils.utils_signal_t import Spectrogram, normalize, resample
+from torch_ecg.utils.utils_signal_t import Spectrogram, filtfilt, median_filter, normalize, resample, resample_poly
 
 
 def test_normalize():
@@ -72,12 +79,89 @@ def test_resample():
     assert resample(sig, fs=500, dst_fs=250).shape == (2, 12, 1000)
     assert resample(sig, siglen=5000, inplace=True).shape == (2, 12, 5000)
     assert resample(sig[0], siglen=500).shape == (12, 500)
+    # linear interpolation by default, with the output length floored
+    assert resample(torch.randn(2, 12, 1001), fs=500, dst_fs=300).shape == (2, 12, 600)
 
     with pytest.raises(AssertionError, match="one and only one of `dst_fs` and `siglen` should be set"):
         resample(sig, dst_fs=500, siglen=1000)
     with pytest.raises(AssertionError, match="if `dst_fs` is set, `fs` should also be set"):
         resample(sig, dst_fs=500)
 
+    # anti-aliased resampling, consistent with scipy
+    sig = torch.randn(2, 12, 1999, dtype=torch.float64)
+    for fs, dst_fs in [(500, 250), (257, 500), (360, 500), (500, 360), (100, 300), (500, 500)]:
+        expected = resample_poly_np(sig.numpy(), dst_fs, fs, axis=-1)
+        assert np.allclose(resample(sig, fs=fs, dst_fs=dst_fs, method="poly").numpy(), expected, atol=1e-10)
+        assert np.allclose(resample_poly(sig, dst_fs, fs).numpy(), expected, atol=1e-10)
+    for siglen in [1000, 1998, 2000, 5000]:
+        expected = resample_fft_np(sig.numpy(), siglen, axis=-1)
+        assert np.allclose(resample(sig, siglen=siglen, method="fft").numpy(), expected, atol=1e-10)
+    assert resample(sig, fs=500.5, dst_fs=250, method="fft").shape == (2, 12, 999)
+    assert resample(sig.float(), fs=500, dst_fs=250, method="poly").dtype == torch.float32
+    assert torch.allclose(
+        resample(sig, fs=500, dst_fs=250),
+        torch.nn.functional.interpolate(sig, scale_factor=0.5, mode="linear", align_corners=True),
+    )
+    # no aliasing of frequencies above the new Nyquist frequency
+    t = torch.arange(5000) / 500
+    aliased = torch.sin(2 * torch.pi * 200 * t).reshape(1, 1, -1)
+    assert resample(aliased, fs=500, dst_fs=250, method="poly")[..., 100:-100].abs().max() < 1e-2
+    assert resample(aliased, fs=500, dst_fs=250).abs().max() > 0.5
+    with pytest.raises(AssertionError, match="Unsupported resampling method `xxx`"):
+        resample(sig, fs=500, dst_fs=250, method="xxx")
+    with pytest.raises(AssertionError, match="the polyphase method requires integer `fs` and `dst_fs`"):
+        resample(sig, fs=500.5, dst_fs=250, method="poly")
+    with pytest.warns(RuntimeWarning, match="`inplace` is not supported by the `poly` method"):
+        resample(sig, fs=500, dst_fs=250, inplace=True, method="poly")
+
+
+def test_filtfilt():
+    sig = torch.randn(2, 12, 3000, dtype=torch.float64)
+    # FIR filter, coincides with scipy
+    b = torch.ones(11, dtype=torch.float64) / 11
+    a = torch.ones(1, dtype=torch.float64)
+    expected = filtfilt_np(b.numpy(), a.numpy(), sig.numpy())
+    assert np.allclose(filtfilt(sig, b, a).numpy(), expected, atol=1e-10)
+    # IIR filter, coincides with scipy
+    b, a = map(torch.from_numpy, butter(4, 0.2))
+    expected = filtfilt_np(b.numpy(), a.numpy(), sig.numpy(), padlen=500)
+    filtered = filtfilt(sig, b, a, padlen=500)
+    assert filtered.shape == sig.shape
+    assert np.allclose(filtered.numpy(), expected, atol=1e-10)
+    assert np.allclose(filtfilt(sig, b, a).numpy(), filtfilt_np(b.numpy(), a.numpy(), sig.numpy()), atol=1e-10)
+    assert filtfilt(sig.float(), b, a).dtype == torch.float32
+    assert filtfilt(sig[..., :5], b, a, padlen=100).shape == (2, 12, 5)
+
+    scripted = torch.jit.script(filtfilt)
+    assert torch.allclose(scripted(sig, b, a, 500), filtered)
+
+    # IIR filter with a narrow low cutoff (impulse response much longer than the signal),
+    # with the initial conditions (sensitive to rounding errors) solved by scipy
+    b, a = butter(5, [0.5 / 250, 45 / 250], "band")
+    zi = torch.from_numpy(lfilter_zi(b, a))
+    b, a = torch.from_numpy(b), torch.from_numpy(a)
+    sig_long = torch.randn(2, 12, 5000, dtype=torch.float64)
+    expected = filtfilt_np(b.numpy(), a.numpy(), sig_long.numpy())
+    assert np.allclose(filtfilt(sig_long, b, a, zi=zi).numpy(), expected, atol=1e-10)
+    expected = filtfilt_np(b.numpy(), a.numpy(), sig_long.float().numpy())
+    assert np.allclose(filtfilt(sig_long.float(), b, a, zi=zi).numpy(), expected, atol=1e-6)
+    assert np.allclose(scripted(sig_long.float(), b, a, None, zi).numpy(), expected, atol=1e-6)
+
+
+def test_median_filter():
+    sig = torch.randn(2, 12, 1000)
+    for window in [1, 5, 51]:
+        expected = median_filter_np(sig.numpy(), size=(1, 1, window), mode="nearest")
+        assert (median_filter(sig, window).numpy() == expected).all()
+        # chunked computation
+        assert (median_filter(sig, window, chunk_numel=1000).numpy() == expected).all()
+    assert median_filter(sig[0, 0], 5).shape == (1000,)
+    with pytest.raises(AssertionError, match="window size should be odd"):
+        median_filter(sig, 4)
+
+    scripted = torch.jit.script(median_filter)
+    assert torch.equal(scripted(sig, 51), median_filter(sig, 51))
+
 
 def test_spectrogram():
     waveform = torch.randn(32, 2000)  # (batch, length)
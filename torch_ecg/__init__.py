@@ -1,7 +1,7 @@
 """
 """
 
-from . import _preprocessors, augmenters, components, databases, model_configs, models, preprocessors, utils
+from . import _preprocessors, augmenters, components, databases, export, model_configs, models, preprocessors, utils
 from .version import __version__
 
 __all__ = [
@@ -13,5 +13,6 @@ __all__ = [
     "components",
     "models",
     "model_configs",
+    "export",
     "__version__",
 ]
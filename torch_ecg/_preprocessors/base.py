@@ -6,12 +6,12 @@ from numbers import Real
 from typing import List, Literal, Optional, Tuple
 
 import numpy as np
-from biosppy.signals.tools import filter_signal
 from scipy.ndimage import median_filter
+from scipy.signal import filtfilt
 
 from ..cfg import DEFAULTS
 from ..utils.misc import ReprMixin, add_docstring
-from ..utils.utils_signal import butter_bandpass_filter
+from ..utils.utils_signal import butter_bandpass_filter, get_filter
 
 # from scipy.signal import medfilt
 # https://github.com/scipy/scipy/issues/9680
@@ -159,15 +159,9 @@ def preprocess_multi_lead_signal(
         else:
             raise AssertionError("Invalid frequency band")
         if filter_type.lower() == "fir":
-            filtered_ecg = filter_signal(
-                signal=filtered_ecg,
-                ftype="FIR",
-                # ftype="butter",
-                band=band,
-                order=filter_order or int(0.2 * fs),
-                sampling_rate=fs,
-                frequency=frequency,
-            )["signal"]
+            # the filter design is cached, and all the leads are filtered at once
+            b, a = get_filter(ftype="FIR", band=band, order=filter_order or int(0.2 * fs), frequency=frequency, fs=fs)
+            filtered_ecg = filtfilt(b, a, filtered_ecg, axis=-1)
         elif filter_type.lower() == "butter":
             filtered_ecg = butter_bandpass_filter(
                 data=filtered_ecg,
@@ -257,15 +251,9 @@ def preprocess_single_lead_signal(
         else:
             raise AssertionError("Invalid frequency band")
         if filter_type.lower() == "fir":
-            filtered_ecg = filter_signal(
-                signal=filtered_ecg,
-                ftype="FIR",
-                # ftype="butter",
-                band=band,
-                order=int(0.3 * fs),
-                sampling_rate=fs,
-                frequency=frequency,
-            )["signal"]
+            # the filter design is cached, and all the leads are filtered at once
+            b, a = get_filter(ftype="FIR", band=band, order=int(0.3 * fs), frequency=frequency, fs=fs)
+            filtered_ecg = filtfilt(b, a, filtered_ecg, axis=-1)
         elif filter_type.lower() == "butter":
             filtered_ecg = butter_bandpass_filter(
                 data=filtered_ecg,
@@ -1,9 +1,7 @@
 """Add baseline wander composed of sinusoidal and Gaussian noise to the ECGs."""
 
-import multiprocessing as mp
 from itertools import repeat
 from numbers import Real
-from random import randint
 from typing import Any, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
@@ -11,7 +9,6 @@ import torch
 from torch import Tensor
 
 from ..cfg import DEFAULTS
-from ..utils.utils_signal import get_ampl
 from .base import Augmenter
 
 __all__ = [
@@ -66,12 +63,22 @@ class BaselineWanderAugmenter(Augmenter):
             )
 
     prob : float, default 0.5
-        Probability of performing the augmentation.
+        Probability of performing the augmentation on each sample.
     inplace : bool, default True
         If True, ECG signal tensors will be modified inplace.
+    seed : int, optional
+        Seed of the (per-device) random number generators of the augmenter.
+        If not specified, the global random number generator of PyTorch is used.
     kwargs : dict, optional
         Additional keyword arguments.
 
+    NOTE
+    ----
+    The baseline wanders are generated as one batched tensor computation
+    on the device of the ECGs. The amplitudes of the sinusoidal noises and the
+    mean and std of the Gaussian noises are ratios of the amplitudes of the ECGs,
+    and the candidates are chosen independently for each lead.
+
     Examples
     --------
     .. code-block:: python
@@ -93,6 +100,7 @@ class BaselineWanderAugmenter(Augmenter):
         gaussian: Optional[np.ndarray] = None,
         prob: float = 0.5,
         inplace: bool = True,
+        seed: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__()
@@ -115,18 +123,6 @@ class BaselineWanderAugmenter(Augmenter):
                 ]
             )
         )
-        if self.prob > 0:
-            self.ampl_ratio = np.concatenate(
-                (
-                    np.zeros(
-                        (
-                            int((1 - self.prob) * self.ampl_ratio.shape[0] / self.prob),
-                            self.ampl_ratio.shape[1],
-                        )
-                    ),
-                    self.ampl_ratio,
-                )
-            )
         self.gaussian = (
             gaussian
             if gaussian is not None
@@ -138,24 +134,22 @@ class BaselineWanderAugmenter(Augmenter):
                 ]
             )
         )
-        if self.prob > 0:
-            self.gaussian = np.concatenate(
-                (
-                    np.zeros(
-                        (
-                            int((1 - self.prob) * self.gaussian.shape[0] / self.prob),
-                            self.gaussian.shape[1],
-                        )
-                    ),
-                    self.gaussian,
-                )
-            )
         assert self.bw_fs.ndim == 1 and self.ampl_ratio.ndim == 2 and self.bw_fs.shape[0] == self.ampl_ratio.shape[1]
         self.inplace = inplace
+        self.seed = seed
+        self._generators = {}
 
         self._n_bw_choices = len(self.ampl_ratio)
         self._n_gn_choices = len(self.gaussian)
 
+    def _get_generator(self, device: torch.device) -> Optional[torch.Generator]:
+        """Get the random number generator on `device`, None for the global one."""
+        if self.seed is None:
+            return None
+        if str(device) not in self._generators:
+            self._generators[str(device)] = torch.Generator(device=device).manual_seed(self.seed)
+        return self._generators[str(device)]
+
     def forward(
         self, sig: Tensor, label: Optional[Tensor], *extra_tensors: Sequence[Tensor], **kwargs: Any
     ) -> Tuple[Tensor, ...]:
@@ -186,7 +180,17 @@ class BaselineWanderAugmenter(Augmenter):
         if not self.inplace:
             sig = sig.clone()
         if self.prob > 0:
-            sig.add_(gen_baseline_wander(sig, self.fs, self.bw_fs, self.ampl_ratio, self.gaussian))
+            sig.add_(
+                gen_baseline_wander(
+                    sig,
+                    self.fs,
+                    self.bw_fs,
+                    self.ampl_ratio,
+                    self.gaussian,
+                    prob=self.prob,
+                    generator=self._get_generator(sig.device),
+                )
+            )
         return (sig, label, *extra_tensors)
 
     def extra_repr_keys(self) -> List[str]:
@@ -198,15 +202,20 @@ class BaselineWanderAugmenter(Augmenter):
         ] + super().extra_repr_keys()
 
 
-def _get_ampl(sig: Tensor, fs: int) -> Tensor:
+def _get_ampl(sig: Tensor, fs: int, window: Real = 0.2) -> Tensor:
     """Get the amplitude of each lead.
 
+    The torch version of :func:`~torch_ecg.utils.utils_signal.get_ampl`,
+    computed on the device of `sig`.
+
     Parameters
     ----------
     sig : torch.Tensor
         Batched ECG signal tensor, of shape ``(batch, lead, siglen)``.
     fs : int
         Sampling frequency of the ECGs.
+    window : numbers.Real, default 0.2
+        Window length of a window for computing amplitude, with units in seconds.
 
     Returns
     -------
@@ -214,12 +223,10 @@ def _get_ampl(sig: Tensor, fs: int) -> Tensor:
         Amplitude of each lead, of shape ``(batch, lead, 1)``.
 
     """
-    with mp.Pool(processes=max(1, mp.cpu_count() - 2)) as pool:
-        ampl = pool.starmap(
-            get_ampl,
-            iterable=[(sig[i].cpu().numpy(), fs) for i in range(sig.shape[0])],
-        )
-    ampl = torch.as_tensor(np.array(ampl), dtype=sig.dtype, device=sig.device).unsqueeze(-1)
+    half_window = int(round(window * fs)) // 2
+    # windows of length ``2 * half_window``, with hop length `half_window`
+    s = sig.unfold(-1, 2 * half_window, half_window)
+    ampl = (s.amax(dim=-1) - s.amin(dim=-1)).amax(dim=-1, keepdim=True)
     return ampl
 
 
@@ -342,9 +349,11 @@ def gen_baseline_wander(
     bw_fs: Union[Real, Sequence[Real]],
     ampl_ratio: np.ndarray,
     gaussian: np.ndarray,
-) -> np.ndarray:
-    """Generate 1d baseline wander of given
-    length, amplitude, and frequency.
+    prob: float = 1.0,
+    generator: Optional[torch.Generator] = None,
+) -> Tensor:
+    """Generate baseline wander for batched ECGs,
+    as one batched tensor computation on the device of `sig`.
 
     Parameters
     ----------
@@ -360,33 +369,47 @@ def gen_baseline_wander(
     gaussian : numpy.ndarray, optional
         Candidate mean and std of the Gaussian noises,
         of shape ``(k, 2)``.
+    prob : float, default 1.0
+        Probability of generating baseline wander for each sample,
+        the baseline wander of the other samples are zeros.
+    generator : torch.Generator, optional
+        Random number generator on the device of `sig`.
+        If not specified, the global random number generator is used.
 
     Returns
     -------
-    bw : numpy.ndarray
+    bw : torch.Tensor
         Baseline wander of given length, amplitude, frequency,
         of shape ``(batch, lead, siglen)``.
 
     """
     batch, lead, siglen = sig.shape
-    sig_ampl = _get_ampl(sig, fs)
-    _n_bw_choices = len(ampl_ratio)
-    _n_gn_choices = len(gaussian)
-
-    with mp.Pool(processes=max(1, mp.cpu_count() - 2)) as pool:
-        bw = pool.starmap(
-            _gen_baseline_wander,
-            iterable=[
-                (
-                    siglen,
-                    fs,
-                    bw_fs,
-                    ampl_ratio[randint(0, _n_bw_choices - 1)],
-                    gaussian[randint(0, _n_gn_choices - 1)],
-                )
-                for i in range(sig.shape[0])
-                for j in range(sig.shape[1])
-            ],
-        )
-    bw = torch.as_tensor(np.array(bw), dtype=sig.dtype, device=sig.device).reshape(batch, lead, siglen)
+    device = sig.device
+    bw = torch.zeros_like(sig)
+    indices = torch.nonzero(torch.rand(batch, generator=generator, device=device) < prob).flatten()
+    n_samples = len(indices)
+    if n_samples == 0:
+        return bw
+    _bw_fs = torch.as_tensor(np.atleast_1d(bw_fs), dtype=sig.dtype, device=device)
+    _ampl_ratio = torch.as_tensor(ampl_ratio, dtype=sig.dtype, device=device).reshape(len(ampl_ratio), -1)
+    _gaussian = torch.as_tensor(gaussian, dtype=sig.dtype, device=device)
+    assert _ampl_ratio.shape[1] == _bw_fs.shape[0]
+
+    # candidates for each lead of each selected sample
+    ampl = _ampl_ratio[torch.randint(0, len(_ampl_ratio), (n_samples, lead), generator=generator, device=device)]
+    mean, std = _gaussian[torch.randint(0, len(_gaussian), (n_samples, lead), generator=generator, device=device)].unbind(-1)
+    # sinusoidal noises, of shape ``(n_samples, lead, n_bw_fs, siglen)``
+    start_phase = torch.randint(0, 361, (n_samples, lead, len(_bw_fs)), generator=generator, device=device).to(sig.dtype)
+    end_phase = siglen / fs * _bw_fs * 360 + start_phase
+    phase = torch.lerp(
+        start_phase.unsqueeze(-1),
+        end_phase.unsqueeze(-1),
+        torch.linspace(0, 1, siglen, dtype=sig.dtype, device=device),
+    )
+    noise = torch.einsum("slf,slfn->sln", ampl, torch.sin(torch.pi * phase / 180))
+    # Gaussian noises
+    noise += mean.unsqueeze(-1) + std.unsqueeze(-1) * torch.randn(
+        (n_samples, lead, siglen), generator=generator, dtype=sig.dtype, device=device
+    )
+    bw[indices] = noise * _get_ampl(sig[indices], fs)
     return bw
@@ -2,13 +2,13 @@
 """
 
 from numbers import Real
-from random import randint
 from typing import Any, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
 from torch import Tensor
 
+from ..cfg import DEFAULTS
 from .base import Augmenter
 
 __all__ = [
@@ -111,26 +111,39 @@ class RandomMasking(Augmenter):
             sig = sig.clone()
         if self.prob[0] == 0:
             return (sig, label, *extra_tensors)
-        sig_mask_prob = self.prob[1] / self.mask_width[1]
-        sig_mask_scale_ratio = min(self.prob[1] / 4, 0.1) / self.mask_width[1]
-        mask = torch.full_like(sig, 1, dtype=sig.dtype, device=sig.device)
-        for batch_idx in self.get_indices(prob=self.prob[0], pop_size=batch):
-            if critical_points is not None:
-                indices = self.get_indices(prob=self.prob[1], pop_size=len(critical_points[batch_idx]))
-                indices = np.arange(siglen)[indices]
-            else:
-                indices = np.array(
-                    self.get_indices(
-                        prob=sig_mask_prob,
-                        pop_size=siglen - self.mask_width[1],
-                        scale_ratio=sig_mask_scale_ratio,
-                    )
-                )
-                indices += self.mask_width[1] // 2
-            for j in indices:
-                masked_radius = randint(self.mask_width[0], self.mask_width[1]) // 2
-                mask[batch_idx, :, j - masked_radius : j + masked_radius] = self.mask_value
-            # print(f"batch_idx = {batch_idx}, len(indices) = {len(indices)}")
+        batch_indices = self.get_indices(prob=self.prob[0], pop_size=batch)
+        if len(batch_indices) == 0:
+            return (sig, label, *extra_tensors)
+        if critical_points is not None:
+            # windows are centered at the critical points
+            centers = [np.asarray(critical_points[batch_idx], dtype=int).reshape(-1) for batch_idx in batch_indices]
+            pop_sizes = np.array([len(c) for c in centers], dtype=int)
+            rows, cols = _sample_indices(pop_sizes, prob=self.prob[1])
+            padded_centers = np.zeros((len(centers), pop_sizes.max(initial=0)), dtype=int)
+            padded_centers[np.arange(padded_centers.shape[1]) < pop_sizes[:, np.newaxis]] = np.concatenate(
+                [np.zeros(0, dtype=int)] + centers
+            )
+            centers = padded_centers[rows, cols]
+        else:
+            pop_sizes = np.full(len(batch_indices), max(0, siglen - self.mask_width[1]), dtype=int)
+            rows, cols = _sample_indices(
+                pop_sizes,
+                prob=self.prob[1] / self.mask_width[1],
+                scale_ratio=min(self.prob[1] / 4, 0.1) / self.mask_width[1],
+            )
+            centers = cols + self.mask_width[1] // 2
+        masked_radii = DEFAULTS.RNG.integers(self.mask_width[0], self.mask_width[1], size=len(centers), endpoint=True) // 2
+        # the masks of all the windows are built at once via a difference array
+        diff = np.zeros((len(batch_indices), siglen + 1), dtype=int)
+        np.add.at(diff, (rows, np.clip(centers - masked_radii, 0, siglen)), 1)
+        np.add.at(diff, (rows, np.clip(centers + masked_radii, 0, siglen)), -1)
+        masked = torch.from_numpy(np.cumsum(diff[:, :siglen], axis=1) > 0).to(sig.device)
+        mask = torch.ones((batch, 1, siglen), dtype=sig.dtype, device=sig.device)
+        mask[torch.as_tensor(batch_indices, dtype=torch.long, device=sig.device), 0] = torch.where(
+            masked,
+            torch.tensor(self.mask_value, dtype=sig.dtype, device=sig.device),
+            torch.tensor(1, dtype=sig.dtype, device=sig.device),
+        )
         sig = sig.mul_(mask)
         return (sig, label, *extra_tensors)
 
@@ -142,3 +155,38 @@ class RandomMasking(Augmenter):
             "prob",
             "inplace",
         ] + super().extra_repr_keys()
+
+
+def _sample_indices(pop_sizes: np.ndarray, prob: float, scale_ratio: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched version of :meth:`Augmenter.get_indices`.
+
+    Indices are sampled without replacement from each of the populations
+    ``range(pop_sizes[i])`` at once, with the number of indices
+    sampled in the same way as :meth:`Augmenter.get_indices`.
+
+    Parameters
+    ----------
+    pop_sizes : numpy.ndarray
+        Sizes of the populations, of shape ``(n,)``.
+    prob : float
+        The probability of each index to be selected.
+    scale_ratio : float, default 0.1
+        Scale ratio of std of the normal distribution to the population size.
+
+    Returns
+    -------
+    rows : numpy.ndarray
+        Population (row) indices of the sampled indices.
+    cols : numpy.ndarray
+        The sampled indices in the populations.
+
+    """
+    pop_sizes = np.asarray(pop_sizes, dtype=int)
+    k = DEFAULTS.RNG.normal(pop_sizes * prob, scale_ratio * pop_sizes)
+    k = np.clip(np.round(k), 0, pop_sizes).astype(int)
+    # random keys, the smallest k keys of each row are selected
+    keys = DEFAULTS.RNG.random((len(pop_sizes), pop_sizes.max(initial=0)))
+    keys[np.arange(keys.shape[1]) >= pop_sizes[:, np.newaxis]] = np.inf
+    order = np.argsort(keys, axis=1)[:, : k.max(initial=0)]
+    rows, ranks = np.nonzero(np.arange(order.shape[1]) < k[:, np.newaxis])
+    return rows, order[rows, ranks]
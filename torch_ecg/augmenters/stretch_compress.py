@@ -96,77 +96,36 @@ class StretchCompress(Augmenter):
         labels = [label.clone() for label in labels]
         if self.prob == 0:
             return (sig, *labels)
-        label_len = []
-        n_labels = len(labels)
-        for idx in range(n_labels):
+        indices = self.get_indices(prob=self.prob, pop_size=batch)
+        if len(indices) == 0:
+            return (sig, *labels)
+        # all the selected batch elements are processed at once
+        signs = DEFAULTS.RNG.choice([-1, 1], size=len(indices))
+        new_lens = np.round((1 + signs * self._sample_ratio(size=len(indices))) * siglen).astype(int)
+        half_diff_lens = np.abs(new_lens - siglen) // 2
+        # stretch and cut, or compress and pad
+        offsets = np.where(signs > 0, half_diff_lens, -half_diff_lens)
+        grid = _stretch_compress_grid(siglen, new_lens, offsets, sig.device)
+        indices = torch.as_tensor(indices, dtype=torch.long, device=sig.device)
+        sig[indices] = _apply_grid(sig[indices], grid).to(sig.dtype)
+        for idx in range(len(labels)):
             if labels[idx].ndim < 3:
-                label_len.append(None)
                 continue
-            labels[idx] = labels[idx].permute(0, 2, 1)  # (batch, label_len, n_classes) -> (batch, n_classes, label_len)
-            ll = labels[idx].shape[-1]
+            # (batch, label_len, n_classes) -> (batch, n_classes, label_len)
+            label = labels[idx][indices].permute(0, 2, 1)
+            ll = label.shape[-1]
             if ll != siglen:
-                labels[idx] = F.interpolate(labels[idx], size=(siglen,), mode="linear", align_corners=True)
-            label_len.append(ll)
-        for batch_idx in self.get_indices(prob=self.prob, pop_size=batch):
-            sign = choice([-1, 1])
-            ratio = self._sample_ratio()
-            # print(f"batch_idx = {batch_idx}, sign = {sign}, ratio = {ratio}")
-            new_len = int(round((1 + sign * ratio) * siglen))
-            diff_len = abs(new_len - siglen)
-            half_diff_len = diff_len // 2
-            if sign > 0:  # stretch and cut
-                sig[batch_idx, ...] = F.interpolate(
-                    sig[batch_idx, ...].unsqueeze(0),
-                    size=new_len,
-                    mode="linear",
-                    align_corners=True,
-                )[..., half_diff_len : siglen + half_diff_len].squeeze(0)
-                for idx in range(n_labels):
-                    if labels[idx].ndim < 3:
-                        continue
-                    labels[idx][batch_idx, ...] = F.interpolate(
-                        labels[idx][batch_idx, ...].unsqueeze(0),
-                        size=new_len,
-                        mode="linear",
-                        align_corners=True,
-                    )[..., half_diff_len : siglen + half_diff_len].squeeze(0)
-            else:  # compress and pad
-                sig[batch_idx, ...] = F.pad(
-                    F.interpolate(
-                        sig[batch_idx, ...].unsqueeze(0),
-                        size=new_len,
-                        mode="linear",
-                        align_corners=True,
-                    ),
-                    pad=(half_diff_len, diff_len - half_diff_len),
-                    mode="constant",
-                    value=0.0,
-                ).squeeze(0)
-                for idx in range(n_labels):
-                    if labels[idx].ndim < 3:
-                        continue
-                    labels[idx][batch_idx, ...] = F.pad(
-                        F.interpolate(
-                            labels[idx][batch_idx, ...].unsqueeze(0),
-                            size=new_len,
-                            mode="linear",
-                            align_corners=True,
-                        ),
-                        pad=(half_diff_len, diff_len - half_diff_len),
-                        mode="constant",
-                        value=0.0,
-                    ).squeeze(0)
-        for idx, (label, ll) in enumerate(zip(labels, label_len)):
-            if labels[idx].ndim < 3:
-                continue
+                label = F.interpolate(label.float(), size=(siglen,), mode="linear", align_corners=True)
+            label = _apply_grid(label, grid)
             if ll != siglen:
-                labels[idx] = F.interpolate(label, size=(ll,), mode="linear", align_corners=True)
-            labels[idx] = labels[idx].permute(0, 2, 1)  # (batch, n_classes, label_len) -> (batch, label_len, n_classes)
+                label = F.interpolate(label, size=(ll,), mode="linear", align_corners=True)
+            # (batch, n_classes, label_len) -> (batch, label_len, n_classes)
+            labels[idx][indices] = label.permute(0, 2, 1).to(labels[idx].dtype)
         return (sig, *labels)
 
-    def _sample_ratio(self) -> float:
-        """Sample the ratio of stretching or compressing."""
-        return np.clip(DEFAULTS.RNG.normal(self.ratio, 0.382 * self.ratio), 0, 2 * self.ratio)
+    def _sample_ratio(self, size: Optional[int] = None) -> Union[float, np.ndarray]:
+        """Sample the ratio(s) of stretching or compressing."""
+        return np.clip(DEFAULTS.RNG.normal(self.ratio, 0.382 * self.ratio, size=size), 0, 2 * self.ratio)
 
     def _generate(self, sig: Tensor, *labels: Optional[Sequence[Tensor]]) -> Union[Tuple[Tensor, ...], Tensor]:
         """NOT finished, NOT checked,
@@ -224,6 +183,59 @@ class StretchCompress(Augmenter):
         ] + super().extra_repr_keys()
 
 
+def _stretch_compress_grid(siglen: int, new_lens: np.ndarray, offsets: np.ndarray, device: torch.device) -> Tensor:
+    """Sampling grid of stretching or compressing batch elements.
+
+    Each batch element is (linearly, with aligned corners) interpolated to
+    length ``new_lens[i]``, and then cut (positive `offsets`) or
+    zero-padded (negative `offsets`) symmetrically to length `siglen`.
+
+    Parameters
+    ----------
+    siglen : int
+        Length of the signals.
+    new_lens : numpy.ndarray
+        Lengths of the interpolated signals, of shape ``(n,)``.
+    offsets : numpy.ndarray
+        Offsets of the interpolated signals, of shape ``(n,)``.
+    device : torch.device
+        Device of the grid.
+
+    Returns
+    -------
+    grid : torch.Tensor
+        The sampling grid for :func:`torch.nn.functional.grid_sample`,
+        of shape ``(n, 1, siglen, 2)``, with normalized coordinates.
+
+    """
+    n = len(new_lens)
+    new_lens = np.asarray(new_lens, dtype=np.float64)
+    # scale from positions in the interpolated signals to normalized positions in the original signals
+    scale = torch.as_tensor(2 / np.maximum(new_lens - 1, 1), dtype=torch.float32, device=device).unsqueeze(-1)
+    new_lens = torch.as_tensor(new_lens, dtype=torch.float32, device=device).unsqueeze(-1)
+    pos = torch.arange(siglen, dtype=torch.float32, device=device) + torch.as_tensor(
+        offsets, dtype=torch.float32, device=device
+    ).unsqueeze(-1)
+    grid = torch.zeros((n, 1, siglen, 2), dtype=torch.float32, device=device)
+    # out of range (hence zeros) for the padded positions
+    grid[:, 0, :, 0] = torch.where((pos >= 0) & (pos < new_lens), pos * scale - 1, -3.0)
+    return grid
+
+
+def _apply_grid(x: Tensor, grid: Tensor) -> Tensor:
+    """Linearly interpolate `x` of shape ``(n, channels, siglen)``
+    at the sampling grid from :func:`_stretch_compress_grid`.
+    """
+    x = x if x.is_floating_point() else x.float()
+    return F.grid_sample(
+        x.unsqueeze(2),
+        grid.to(x.dtype),
+        mode="bilinear",
+        padding_mode="zeros",
+        align_corners=True,
+    ).squeeze(2)
+
+
 def _stretch_compress_one_batch_element(
     ratio: Real, sig: Tensor, *labels: Sequence[Tensor]
 ) -> Union[Tensor, Tuple[Tensor, ...]]:
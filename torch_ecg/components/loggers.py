@@ -15,6 +15,7 @@ from numbers import Real
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 import tensorboardX
 import torch
@@ -273,12 +274,17 @@ class TxtLogger(BaseLogger):
 class CSVLogger(BaseLogger):
     """Logger that logs to a CSV file.
 
+    The logged rows are buffered, and appended to the log file
+    when flushed, so that the cost of logging is constant per step.
+
     Parameters
     ----------
     log_dir : `path-like`, optional
         The directory to save the log file.
     log_suffix : str, optional
         The suffix of the log file.
+    buffer_size : int, default 100
+        Maximum number of rows buffered before being flushed to the log file.
 
     """
 
@@ -288,6 +294,7 @@ class CSVLogger(BaseLogger):
         self,
         log_dir: Optional[Union[str, bytes, os.PathLike]] = None,
         log_suffix: Optional[str] = None,
+        buffer_size: int = 100,
     ) -> None:
         self._log_dir = Path(log_dir or DEFAULTS.log_dir)
         try:
@@ -302,8 +309,12 @@ class CSVLogger(BaseLogger):
         else:
             log_suffix = f"_{log_suffix}"
         self.log_file = f"{DEFAULTS.prefix}_{get_date_str()}{log_suffix}.csv"
-        self.logger = pd.DataFrame()
+        self.buffer_size = buffer_size
         self.step = -1
+        self._rows = []  # rows not yet written to the log file
+        self._columns = []  # columns of the log file
+        self._file = None
+        self._written = False  # whether the log file has been written by this logger
         self._flushed = True
 
     @add_docstring(_log_metrics_doc)
@@ -323,32 +334,82 @@ class CSVLogger(BaseLogger):
         row = {"step": self.step, "time": datetime.now(), "part": part}
         if epoch is not None:
             row.update({"epoch": epoch})
-        row.update({k: v.item() if isinstance(v, torch.Tensor) else v for k, v in metrics.items()})
-        # self.logger = self.logger.append(row, ignore_index=True)
-        self.logger = pd.concat([self.logger, pd.DataFrame(row, index=[0])], ignore_index=True)
+        row.update({k: v.item() if isinstance(v, (torch.Tensor, np.generic)) else v for k, v in metrics.items()})
+        self._rows.append(row)
 
         self._flushed = False
+        if len(self._rows) >= self.buffer_size:
+            self.flush()
 
     def log_message(self, msg: str, level: int = logging.INFO) -> None:
         pass
 
+    @add_docstring(_epoch_end_doc)
+    def epoch_end(self, epoch: int) -> None:
+        self.flush()
+
+    def _extend_columns(self, new_columns: List[str]) -> None:
+        """Extend the columns of the log file, with empty values for the logged rows."""
+        self._columns.extend(new_columns)
+        if not self._written:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(self.filename, "r", newline="") as f:
+            lines = f.read().splitlines()
+        padding = ',""' * len(new_columns)
+        tmp_filename = f"{self.filename}.tmp"
+        with open(tmp_filename, "w", newline="") as f:
+            csv.writer(f, quoting=csv.QUOTE_NONNUMERIC).writerow(self._columns)
+            f.writelines(f"{line}{padding}\r\n" for line in lines[1:])
+        os.replace(tmp_filename, self.filename)
+
     def flush(self) -> None:
         """Flush the log file."""
         if not self._W_OK:
             self._flushed = True
             return
-        if not self._flushed:
-            self.logger.to_csv(self.filename, quoting=csv.QUOTE_NONNUMERIC, index=False)
-            self._flushed = True
+        if self._flushed:
+            return
+        new_columns = []
+        for row in self._rows:
+            new_columns.extend(k for k in row if k not in self._columns and k not in new_columns)
+        if new_columns:
+            self._extend_columns(new_columns)
+        if self._file is None:
+            # existing file of the same name is overwritten
+            self._file = open(self.filename, "a" if self._written else "w", newline="")
+            if not self._written:
+                csv.writer(self._file, quoting=csv.QUOTE_NONNUMERIC).writerow(self._columns)
+                self._written = True
+        writer = csv.DictWriter(self._file, fieldnames=self._columns, restval="", quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerows(self._rows)
+        self._file.flush()
+        self._rows = []
+        self._flushed = True
 
     def close(self) -> None:
         """Close the log file."""
         self.flush()
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
 
     def __del__(self):
-        self.flush()
+        self.close()
         del self
 
+    @property
+    def logger(self) -> pd.DataFrame:
+        """The logged rows, as a :class:`~pandas.DataFrame`, read from the log file."""
+        if not self._W_OK:
+            return pd.DataFrame()
+        self.flush()
+        if not Path(self.filename).exists():
+            return pd.DataFrame()
+        return pd.read_csv(self.filename, parse_dates=["time"])
+
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> "CSVLogger":
         """Create a logger from a config.
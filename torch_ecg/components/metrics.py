@@ -12,6 +12,11 @@ from ..utils.misc import ReprMixin, add_docstring
 from ..utils.utils_data import ECGWaveFormNames
 from ..utils.utils_metrics import (
     QRS_score,
+    _auc_from_counts,
+    _binarize,
+    _metrics_from_ovr_cm,
+    _one_hot_pair_t,
+    _score_histograms,
     compute_wave_delineation_metrics,
     confusion_matrix,
     metrics_from_confusion_matrix,
@@ -62,6 +67,19 @@ class ClassificationMetrics(Metrics):
                 weights : Optional[np.ndarray]=None
             ) -> dict
 
+    auc_bins : int, default 1000
+        Number of equal-width bins of ``[0, 1]`` of the probability outputs,
+        used to compute AUROC and AUPRC from the batches accumulated via :meth:`update`.
+
+    NOTE
+    ----
+    Instead of passing all the labels and outputs to :meth:`compute`,
+    batches can be accumulated via :meth:`update`, and the metrics are
+    computed from the accumulated confusion matrices by calling
+    :meth:`compute` without `labels` and `outputs`. In this case,
+    the outputs should be probabilities, AUROC and AUPRC are computed
+    from the histograms of the outputs, and the extra metrics are not computed.
+
     """
 
     __name__ = "ClassificationMetrics"
@@ -71,9 +89,12 @@ class ClassificationMetrics(Metrics):
         multi_label: bool = True,
         macro: bool = True,
         extra_metrics: Optional[Callable] = None,
+        auc_bins: int = 1000,
     ) -> None:
         self.multi_label = multi_label
         self.set_macro(macro)
+        self.auc_bins = auc_bins
+        self._state = None
         self._extra_metrics = extra_metrics
         self._em = {}
         self._metrics = {
@@ -141,22 +162,27 @@ class ClassificationMetrics(Metrics):
     )
     def compute(
         self,
-        labels: Union[np.ndarray, Tensor],
-        outputs: Union[np.ndarray, Tensor],
+        labels: Optional[Union[np.ndarray, Tensor]] = None,
+        outputs: Optional[Union[np.ndarray, Tensor]] = None,
         num_classes: Optional[int] = None,
         weights: Optional[np.ndarray] = None,
         thr: float = 0.5,
     ) -> "ClassificationMetrics":
-        labels, outputs = one_hot_pair(labels, outputs, num_classes)
-        num_samples, num_classes = np.shape(labels)
+        if labels is None and outputs is None:
+            return self._compute_accumulated(weights)
+        if isinstance(labels, Tensor) or isinstance(outputs, Tensor):
+            labels, outputs = _one_hot_pair_t(labels, outputs, num_classes)
+        else:
+            labels, outputs = one_hot_pair(labels, outputs, num_classes)
+        num_samples, num_classes = labels.shape
         # probability outputs to binary outputs
-        bin_outputs = np.zeros_like(outputs, dtype=int)
-        bin_outputs[outputs >= thr] = 1
-        bin_outputs[outputs < thr] = 0
+        bin_outputs = _binarize(outputs, thr)
         self._cm = confusion_matrix(labels, bin_outputs, num_classes)
         self._cm_ovr = ovr_confusion_matrix(labels, bin_outputs, num_classes)
-        self._metrics = metrics_from_confusion_matrix(labels, outputs, num_classes, weights)
+        self._metrics = metrics_from_confusion_matrix(labels, outputs, num_classes, weights, thr)
         if self._extra_metrics is not None:
+            if isinstance(labels, Tensor):
+                labels, outputs = labels.cpu().numpy(), outputs.cpu().numpy()
             self._em = self._extra_metrics(labels, outputs, num_classes, weights)
             self._metrics.update(self._em)
 
@@ -164,14 +190,97 @@ class ClassificationMetrics(Metrics):
 
     @add_docstring(compute.__doc__)
     def __call__(
+        self,
+        labels: Optional[Union[np.ndarray, Tensor]] = None,
+        outputs: Optional[Union[np.ndarray, Tensor]] = None,
+        num_classes: Optional[int] = None,
+        weights: Optional[np.ndarray] = None,
+        thr: float = 0.5,
+    ) -> "ClassificationMetrics":
+        return self.compute(labels, outputs, num_classes, weights, thr)
+
+    def update(
         self,
         labels: Union[np.ndarray, Tensor],
         outputs: Union[np.ndarray, Tensor],
         num_classes: Optional[int] = None,
-        weights: Optional[np.ndarray] = None,
         thr: float = 0.5,
     ) -> "ClassificationMetrics":
-        return self.compute(labels, outputs, num_classes, weights)
+        """Accumulate the confusion matrices of a batch of labels and outputs.
+
+        Tensors are reduced on their device, and only the
+        (small) confusion matrices and histograms are copied to the host.
+
+        Parameters
+        ----------
+        labels : numpy.ndarray or torch.Tensor
+            Binary labels, of shape ``(n_samples, n_classes)``,
+            or indices of each label class, of shape ``(n_samples,)``.
+        outputs : numpy.ndarray or torch.Tensor
+            Probability outputs, of shape ``(n_samples, n_classes)``,
+            or binary outputs, of shape ``(n_samples, n_classes)``,
+            or indices of each class predicted, of shape ``(n_samples,)``.
+        num_classes : int, optional
+            Number of classes.
+            If `labels` and `outputs` are both of shape ``(n_samples,)``,
+            then `num_classes` must be specified.
+        thr : float, default: 0.5
+            Threshold for binary classification,
+            should be the same for all batches.
+
+        Returns
+        -------
+        self : ClassificationMetrics
+            The metrics object itself.
+
+        """
+        outputs_ndim = np.ndim(outputs)
+        if isinstance(labels, Tensor) or isinstance(outputs, Tensor):
+            labels, outputs = _one_hot_pair_t(labels, outputs, num_classes)
+        else:
+            labels, outputs = one_hot_pair(labels, outputs, num_classes)
+        num_samples, num_classes = labels.shape
+        if self._state is None:
+            self._state = dict(
+                num_samples=0,
+                thr=thr,
+                auc=True,
+                cm=np.zeros((num_classes, num_classes)),
+                cm_ovr=np.zeros((num_classes, 2, 2)),
+                pos_hist=np.zeros((num_classes, self.auc_bins), dtype=np.int64),
+                neg_hist=np.zeros((num_classes, self.auc_bins), dtype=np.int64),
+            )
+        assert self._state["thr"] == thr, "`thr` should be the same for all batches"
+        assert self._state["cm"].shape[0] == num_classes, "number of classes should be the same for all batches"
+        bin_outputs = _binarize(outputs, thr)
+        self._state["num_samples"] += num_samples
+        self._state["auc"] = self._state["auc"] and outputs_ndim == 2
+        self._state["cm"] += confusion_matrix(labels, bin_outputs, num_classes)
+        self._state["cm_ovr"] += ovr_confusion_matrix(labels, bin_outputs, num_classes)
+        pos_hist, neg_hist = _score_histograms(labels, outputs, self.auc_bins)
+        self._state["pos_hist"] += pos_hist
+        self._state["neg_hist"] += neg_hist
+        return self
+
+    def reset(self) -> None:
+        """Reset the state accumulated via :meth:`update`."""
+        self._state = None
+
+    def _compute_accumulated(self, weights: Optional[np.ndarray] = None) -> "ClassificationMetrics":
+        """Compute the metrics from the state accumulated via :meth:`update`."""
+        assert self._state is not None, "no batch has been accumulated via `update`"
+        self._cm = self._state["cm"].copy()
+        self._cm_ovr = self._state["cm_ovr"].copy()
+        num_classes = self._cm.shape[0]
+        if self._state["auc"]:
+            # bins in descending order, each non-empty bin is a threshold
+            pos, neg = self._state["pos_hist"][:, ::-1], self._state["neg_hist"][:, ::-1]
+            auroc, auprc = _auc_from_counts(pos, neg, (pos + neg) > 0)
+        else:
+            auroc, auprc = np.full(num_classes, np.nan), np.full(num_classes, np.nan)
+        self._metrics = _metrics_from_ovr_cm(self._cm_ovr, self._state["num_samples"], auroc, auprc, weights)
+        self._em = {}
+        return self
 
     @property
     def sensitivity(self) -> Union[float, np.ndarray]:
@@ -2,7 +2,8 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Sequence, Set, Union
+from itertools import chain
+from typing import Any, Dict, List, Sequence, Set, Union
 
 import numpy as np
 import pandas as pd
@@ -23,6 +24,10 @@ __all__ = [
 ]
 
 
+# fields that should be identical for outputs to be appended or concatenated
+_IDENTICAL_FIELDS = ["classes", "thr"]
+
+
 _KNOWN_ISSUES = """
     NOTE
     ----
@@ -133,6 +138,10 @@ class BaseOutput(CFG, ABC):
     def append(self, values: Union["BaseOutput", Sequence["BaseOutput"]]) -> None:
         """Append other :class:`Output` to `self`
 
+        Array fields are kept in buffers whose capacities are doubled when full,
+        so that appending batch by batch has amortized linear copy volume.
+        The fields of `self` are views of the buffers.
+
         Parameters
         ----------
         values : Output or Sequence[Output]
@@ -145,21 +154,105 @@ class BaseOutput(CFG, ABC):
         """
         if not isinstance(values, Sequence):
             values = [values]
+        self._check_consistency(values)
+        for k in list(self.keys()):
+            if k in _IDENTICAL_FIELDS:
+                continue
+            chunks = [v[k] for v in values]
+            if len(chunks) == 0:
+                continue
+            if all([isinstance(c, np.ndarray) for c in chunks]):
+                self._extend_array(k, chunks)
+            elif all([isinstance(c, pd.DataFrame) for c in chunks]):
+                self[k] = pd.concat([self[k]] + chunks, axis=0, ignore_index=True)
+            elif all([isinstance(c, Sequence) for c in chunks]):  # list, tuple, etc.
+                if isinstance(self[k], list):
+                    for c in chunks:
+                        self[k].extend(c)
+                else:
+                    for c in chunks:
+                        self[k] += c
+            else:
+                raise ValueError(f"field `{k}` of type `{type(chunks[0])}` is not supported")
+
+    @classmethod
+    def concat(cls, outputs: Sequence["BaseOutput"]) -> "BaseOutput":
+        """Concatenate multiple :class:`Output` into one, in a single pass.
+
+        Parameters
+        ----------
+        outputs : Sequence[Output]
+            The outputs to be concatenated, of the same type and fields.
+
+        Returns
+        -------
+        Output
+            The concatenated output, of the same type as the elements of `outputs`.
+
+        """
+        assert len(outputs) > 0, "`outputs` should not be empty"
+        first = outputs[0]
+        assert isinstance(first, cls), f"`outputs` must be of type `{cls.__name__}`"
+        first._check_consistency(outputs[1:])
+        fields = {}
+        for k, v in first.items():
+            chunks = [o[k] for o in outputs]
+            if k in _IDENTICAL_FIELDS:
+                fields[k] = v
+            elif isinstance(v, np.ndarray):
+                fields[k] = np.concatenate(chunks)
+            elif isinstance(v, pd.DataFrame):
+                fields[k] = pd.concat(chunks, axis=0, ignore_index=True)
+            elif isinstance(v, (list, tuple)):
+                fields[k] = list(chain.from_iterable(chunks))
+            elif isinstance(v, Sequence):
+                fields[k] = v
+                for c in chunks[1:]:
+                    fields[k] += c
+            else:
+                raise ValueError(f"field `{k}` of type `{type(v)}` is not supported")
+        return first.__class__(**fields)
+
+    def _check_consistency(self, values: Sequence["BaseOutput"]) -> None:
+        """Check that `values` can be appended to `self`."""
         for v in values:
             assert v.__class__ == self.__class__, "`values` must be of the same type as `self`"
             assert set(v.keys()) == set(self.keys()), "`values` must have the same fields as `self`"
-            for k, v_ in v.items():
-                if k in ["classes"]:
-                    assert v_ == self[k], f"the field of ordered sequence `{k}` must be the identical"
-                    continue
-                if isinstance(v_, np.ndarray):
-                    self[k] = np.concatenate((self[k], v_))
-                elif isinstance(v_, pd.DataFrame):
-                    self[k] = pd.concat([self[k], v_], axis=0, ignore_index=True)
-                elif isinstance(v_, Sequence):  # list, tuple, etc.
-                    self[k] += v_
-                else:
-                    raise ValueError(f"field `{k}` of type `{type(v_)}` is not supported")
+            for k in _IDENTICAL_FIELDS:
+                if k in v:
+                    assert v[k] == self[k], f"the field of ordered sequence `{k}` must be the identical"
+
+    def _extend_array(self, key: str, chunks: List[np.ndarray]) -> None:
+        """Extend the array field `key` with `chunks` along the first axis, via its buffer."""
+        # the buffers are not fields of the output, hence stored in `__dict__` only
+        buffers = self.__dict__.setdefault("_BaseOutput__buffers", {})
+        current = self[key]
+        if any([c.ndim == 0 or c.shape[1:] != current.shape[1:] for c in [current] + chunks]):
+            # let numpy raise or handle the inconsistent shapes
+            buffers.pop(key, None)
+            self[key] = np.concatenate([current] + chunks)
+            return
+        n_rows = len(current)
+        n_new = sum([len(c) for c in chunks])
+        dtype = np.result_type(current, *chunks)
+        buf, view = buffers.get(key, (None, None))
+        if buf is None or current is not view or view.base is not buf or buf.dtype != dtype or len(buf) < n_rows + n_new:
+            # capacity doubled
+            buf = np.empty((max(n_rows + n_new, 2 * n_rows),) + current.shape[1:], dtype=dtype)
+            buf[:n_rows] = current
+        start = n_rows
+        for c in chunks:
+            buf[start : start + len(c)] = c
+            start += len(c)
+        view = buf[:start]
+        buffers[key] = (buf, view)
+        self[key] = view
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the buffers are not pickled, the (views of) fields are
+        state = self.__dict__.copy()
+        state.pop("_BaseOutput__buffers", None)
+        return state
 
 
 @add_docstring(_KNOWN_ISSUES.format(_ClassificationOutput_ISSUE_EXAMPLE), "append")
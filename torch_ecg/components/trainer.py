@@ -14,8 +14,10 @@ from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
+import torch.distributed as dist
 from torch import nn, optim
-from torch.utils.data import DataLoader, Dataset
+from torch.nn.parallel import DistributedDataParallel as DDP
+from torch.utils.data import DataLoader, Dataset, DistributedSampler, RandomSampler
 from tqdm.auto import tqdm
 
 from ..augmenters import AugmenterManager
@@ -65,6 +67,32 @@ class BaseTrainer(ReprMixin, ABC):
             - "optimizer": str
                 - "decay": float, optional, depending on the optimizer
                 - "momentum": float, optional, depending on the optimizer
+
+        Optional keys for the optimization steps:
+
+            - "amp": bool, default False,
+              whether to use automatic mixed precision.
+            - "amp_dtype": str, optional,
+              "float16" or "bfloat16", defaults to "float16" on CUDA devices,
+              and "bfloat16" otherwise.
+            - "grad_accumulation_steps": int, default 1,
+              number of (micro-)batches to accumulate gradients over
+              for each optimization step.
+            - "max_grad_norm": float, optional,
+              maximum norm of the gradients for clipping.
+
+        Optional keys for distributed data-parallel (DDP) training:
+
+            - "ddp": bool, default False,
+              whether to train in the DDP mode, typically launched via ``torchrun``.
+              The process group is initialized from the environment variables
+              if not initialized yet. Enabled automatically if `model` is
+              an instance of :class:`~torch.nn.parallel.DistributedDataParallel`.
+              The training data are sharded across the processes, while the
+              evaluation is done on the whole validation data by the main process.
+            - "ddp_backend": str, optional,
+              backend of the process group, defaults to "nccl" on CUDA devices,
+              and "gloo" otherwise.
     collate_fn : callable, optional
         The collate function for the data loader,
         defaults to :meth:`default_collate_fn`.
@@ -72,6 +100,7 @@ class BaseTrainer(ReprMixin, ABC):
         .. versionadded:: 0.0.23
     device : torch.device, optional
         The device to be used for training.
+        In the DDP mode, defaults to the CUDA device of the local rank if available.
     lazy : bool, default False
         Whether to initialize the data loader lazily.
 
@@ -84,6 +113,12 @@ class BaseTrainer(ReprMixin, ABC):
         "log_step": 10,
         "flooding_level": 0,
         "early_stopping": {},
+        "amp": False,
+        "amp_dtype": None,
+        "grad_accumulation_steps": 1,
+        "max_grad_norm": None,
+        "ddp": False,
+        "ddp_backend": None,
     }
     __DEFATULT_CONFIGS__.update(deepcopy(DEFAULTS))
 
@@ -100,8 +135,8 @@ class BaseTrainer(ReprMixin, ABC):
         self.model = model
         if type(self.model).__name__ in [
             "DataParallel",
+            "DistributedDataParallel",
         ]:
-            # TODO: further consider "DistributedDataParallel"
             self._model = self.model.module
         else:
             self._model = self.model
@@ -109,9 +144,18 @@ class BaseTrainer(ReprMixin, ABC):
         self.model_config = CFG(deepcopy(model_config))
         self._train_config = CFG(deepcopy(train_config))
         self._train_config.checkpoints = Path(self._train_config.checkpoints)
+        self._setup_distributed()
+        if device is None and self.distributed and torch.cuda.is_available():
+            device = torch.device("cuda", int(os.environ.get("LOCAL_RANK", 0)))
+            torch.cuda.set_device(device)
         self.device = device or next(self._model.parameters()).device
         self.dtype = next(self._model.parameters()).dtype
         self.model.to(self.device)
+        if self.distributed and not isinstance(self.model, DDP):
+            self.model = DDP(
+                self._model,
+                device_ids=[self.device.index] if self.device.type == "cuda" else None,
+            )
         self.lazy = lazy
         self.collate_fn = collate_fn or default_collate_fn
 
@@ -134,6 +178,9 @@ class BaseTrainer(ReprMixin, ABC):
         self.global_step = 0
         self.epoch = 0
         self.epoch_loss = 0
+        # states of the optimizer, etc. to be loaded when training starts,
+        # set by `resume_from_checkpoint`
+        self._resumed_states = {}
 
     def train(self) -> OrderedDict:
         """Train the model.
@@ -144,12 +191,17 @@ class BaseTrainer(ReprMixin, ABC):
             The state dict of the best model.
 
         """
+        if self.distributed:
+            self._distribute_dataloaders()
+
         self._setup_optimizer()
 
         self._setup_scheduler()
 
         self._setup_criterion()
 
+        self._load_resumed_states()
+
         if self.train_config.monitor is not None:
             # if monitor is set but val_loader is None, use train_loader for validation
             # and choose the best model based on the metrics on the train set
@@ -186,12 +238,15 @@ class BaseTrainer(ReprMixin, ABC):
             # train one epoch
             self.model.train()
             self.epoch_loss = 0
+            if isinstance(self.train_loader.sampler, DistributedSampler):
+                self.train_loader.sampler.set_epoch(self.epoch)
             with tqdm(
-                total=self.n_train,
+                total=len(self.train_loader.sampler) if self.distributed else self.n_train,
                 desc=f"Epoch {self.epoch}/{self.n_epochs}",
                 unit="signals",
                 dynamic_ncols=True,
                 mininterval=1.0,
+                disable=not self.is_main_process,
             ) as pbar:
                 self.log_manager.epoch_start(self.epoch)
                 # train one epoch
@@ -199,7 +254,7 @@ class BaseTrainer(ReprMixin, ABC):
 
                 # evaluate on train set, if debug is True
                 if self.val_train_loader is not None:
-                    eval_train_res = self.evaluate(self.val_train_loader)
+                    eval_train_res = self._evaluate(self.val_train_loader)
                     self.log_manager.log_metrics(
                         metrics=eval_train_res,
                         step=self.global_step,
@@ -210,7 +265,7 @@ class BaseTrainer(ReprMixin, ABC):
                     eval_train_res = {}
                 # evaluate on val set
                 if self.val_loader is not None:
-                    eval_res = self.evaluate(self.val_loader)
+                    eval_res = self._evaluate(self.val_loader)
                     self.log_manager.log_metrics(
                         metrics=eval_res,
                         step=self.global_step,
@@ -253,7 +308,7 @@ class BaseTrainer(ReprMixin, ABC):
                     save_suffix = f"epochloss_{self.epoch_loss:.5f}"
                 save_filename = f"{self.save_prefix}_epoch{self.epoch}_{get_date_str()}_{save_suffix}.pth.tar"
                 save_path = self.train_config.checkpoints / save_filename
-                if self.train_config.keep_checkpoint_max != 0:
+                if self.train_config.keep_checkpoint_max != 0 and self.is_main_process:
                     self.save_checkpoint(str(save_path))
                     self.saved_models.append(save_path)
                 # remove outdated models
@@ -281,7 +336,8 @@ class BaseTrainer(ReprMixin, ABC):
                 save_filename = f"BestModel_{self.save_prefix}{self.best_epoch}_{get_date_str()}_{save_suffix}.pth.tar"
             save_path = self.train_config.model_dir / save_filename
             # self.save_checkpoint(path=str(save_path))
-            self._model.save(path=str(save_path), train_config=self.train_config)
+            if self.is_main_process:
+                self._model.save(path=str(save_path), train_config=self.train_config)
             self.log_manager.log_message(f"best model is saved at {save_path}")
         elif self.train_config.monitor is None:
             self.log_manager.log_message("no monitor is set, the last model is selected and saved as the best model")
@@ -289,7 +345,8 @@ class BaseTrainer(ReprMixin, ABC):
             save_filename = f"BestModel_{self.save_prefix}{self.epoch}_{get_date_str()}.pth.tar"
             save_path = self.train_config.model_dir / save_filename
             # self.save_checkpoint(path=str(save_path))
-            self._model.save(path=str(save_path), train_config=self.train_config)
+            if self.is_main_process:
+                self._model.save(path=str(save_path), train_config=self.train_config)
         else:
             raise ValueError("No best model found!")
 
@@ -311,24 +368,47 @@ class BaseTrainer(ReprMixin, ABC):
             The progress bar for training.
 
         """
+        accumulation_steps = self.grad_accumulation_steps
+        try:
+            n_batches = len(self.train_loader)
+        except TypeError:  # iterable-style datasets
+            n_batches = -1
+        # accumulated on the device, to avoid host syncs on every batch
+        epoch_loss = torch.zeros((), device=self.device)
+        self.optimizer.zero_grad()
         for epoch_step, data in enumerate(self.train_loader):
-            self.global_step += 1
             # data is assumed to be a tuple of tensors, of the following order:
             # signals, labels, *extra_tensors
             data = self.augmenter_manager(*data)
-            out_tensors = self.run_one_step(*data)
-
-            loss = self.criterion(*out_tensors).to(self.dtype)
+            if self.device.type == "cuda":
+                data = tuple(t.to(self.device, non_blocking=True) if isinstance(t, torch.Tensor) else t for t in data)
+            with torch.autocast(device_type=self.device.type, dtype=self.amp_dtype, enabled=self.train_config.amp):
+                out_tensors = self.run_one_step(*data)
+                loss = self.criterion(*out_tensors).to(self.dtype)
+            epoch_loss += loss.detach()
             if self.train_config.flooding_level > 0:
                 flood = (loss - self.train_config.flooding_level).abs() + self.train_config.flooding_level
-                self.epoch_loss += loss.item()
-                self.optimizer.zero_grad()
-                flood.backward()
+                backward_loss = flood
             else:
-                self.epoch_loss += loss.item()
-                self.optimizer.zero_grad()
-                loss.backward()
-            self.optimizer.step()
+                backward_loss = loss
+            is_update_step = (epoch_step + 1) % accumulation_steps == 0 or epoch_step + 1 == n_batches
+            if isinstance(self.model, DDP) and not is_update_step:
+                # gradients are synchronized across processes only at update steps
+                with self.model.no_sync():
+                    self.grad_scaler.scale(backward_loss / accumulation_steps).backward()
+            else:
+                self.grad_scaler.scale(backward_loss / accumulation_steps).backward()
+            pbar.update(data[0].shape[self.batch_dim])
+
+            if not is_update_step:
+                continue
+            self.global_step += 1
+            if self.train_config.max_grad_norm:
+                self.grad_scaler.unscale_(self.optimizer)
+                nn.utils.clip_grad_norm_(self.model.parameters(), self.train_config.max_grad_norm)
+            self.grad_scaler.step(self.optimizer)
+            self.grad_scaler.update()
+            self.optimizer.zero_grad()
             self._update_lr()
 
             if self.global_step % self.train_config.log_step == 0:
@@ -337,14 +417,14 @@ class BaseTrainer(ReprMixin, ABC):
                     train_step_metrics.update({"lr": self.scheduler.get_last_lr()[0]})
                     pbar.set_postfix(
                         **{
-                            "loss (batch)": loss.item(),
+                            "loss (batch)": train_step_metrics["loss"],
                             "lr": self.scheduler.get_last_lr()[0],
                         }
                     )
                 else:
                     pbar.set_postfix(
                         **{
-                            "loss (batch)": loss.item(),
+                            "loss (batch)": train_step_metrics["loss"],
                         }
                     )
                 if self.train_config.flooding_level > 0:
@@ -355,7 +435,99 @@ class BaseTrainer(ReprMixin, ABC):
                     epoch=self.epoch,
                     part="train",
                 )
-            pbar.update(data[0].shape[self.batch_dim])
+        self.epoch_loss += epoch_loss.item()
+
+    def _setup_distributed(self) -> None:
+        """Setup the distributed data-parallel (DDP) mode,
+        initializing the process group if necessary.
+        """
+        self.distributed = bool(self._train_config.get("ddp", False)) or type(self.model).__name__ == "DistributedDataParallel"
+        if self.distributed and not dist.is_initialized():
+            backend = self._train_config.get("ddp_backend", None) or ("nccl" if torch.cuda.is_available() else "gloo")
+            dist.init_process_group(backend=backend, init_method="env://")
+        self.rank = dist.get_rank() if self.distributed else 0
+        self.world_size = dist.get_world_size() if self.distributed else 1
+
+    @property
+    def is_main_process(self) -> bool:
+        """Whether the current process is the main process (of rank 0),
+        which is responsible for logging and checkpointing.
+        """
+        return self.rank == 0
+
+    def _distribute_dataloaders(self) -> None:
+        """Rebuild the training data loader with :class:`~torch.utils.data.DistributedSampler`,
+        so that each process works on a distinct shard of the training dataset.
+        The data loaders for evaluation are kept as they are, see :meth:`_evaluate`.
+        """
+        for attr in ["train_loader"]:
+            loader = getattr(self, attr)
+            if loader is None or isinstance(loader.sampler, DistributedSampler):
+                continue
+            if loader.batch_size is None:
+                self.log_manager.log_message(
+                    f"`{attr}` uses a custom batch sampler, hence is not distributed",
+                    level=logging.WARNING,
+                )
+                continue
+            sampler = DistributedSampler(
+                loader.dataset,
+                num_replicas=self.world_size,
+                rank=self.rank,
+                shuffle=isinstance(loader.sampler, RandomSampler),
+                seed=self.train_config.get("SEED", DEFAULTS.SEED),
+                drop_last=loader.drop_last,
+            )
+            setattr(
+                self,
+                attr,
+                DataLoader(
+                    dataset=loader.dataset,
+                    batch_size=loader.batch_size,
+                    sampler=sampler,
+                    num_workers=loader.num_workers,
+                    collate_fn=loader.collate_fn,
+                    pin_memory=loader.pin_memory,
+                    drop_last=loader.drop_last,
+                    timeout=loader.timeout,
+                    worker_init_fn=loader.worker_init_fn,
+                    prefetch_factor=loader.prefetch_factor if loader.num_workers > 0 else None,
+                    persistent_workers=loader.persistent_workers,
+                ),
+            )
+
+    def _evaluate(self, data_loader: DataLoader) -> Dict[str, float]:
+        """Do evaluation on the given data loader via :meth:`evaluate`.
+
+        In the DDP mode, the evaluation is done by the main process on the unwrapped
+        model over the whole (non-distributed) data loader, and the results are broadcast
+        to the other processes. Hence the metrics, including those not decomposable over
+        shards of the data (e.g. AUROC, F1, challenge scores), are the same as those
+        of a single-process run, without the samples padded by the distributed samplers.
+
+        Parameters
+        ----------
+        data_loader : torch.utils.data.DataLoader
+            The data loader to evaluate on.
+
+        Returns
+        -------
+        dict
+            The evaluation results (metrics).
+
+        """
+        if not self.distributed:
+            return self.evaluate(data_loader)
+        eval_res = [None]
+        if self.is_main_process:
+            # the forward passes on the main process only should not involve the DDP wrapper
+            ddp_model, self.model = self.model, self._model
+            try:
+                eval_res[0] = self.evaluate(data_loader)
+            finally:
+                self.model = ddp_model
+        dist.broadcast_object_list(eval_res, src=0)
+        return eval_res[0]
 
     @property
     @abstractmethod
@@ -495,6 +667,17 @@ class BaseTrainer(ReprMixin, ABC):
         self.n_epochs = self.train_config.n_epochs
         self.batch_size = self.train_config.batch_size
         self.lr = self.train_config.learning_rate
+        self.grad_accumulation_steps = max(1, int(self.train_config.grad_accumulation_steps))
+        if self.train_config.amp_dtype is None:
+            self.amp_dtype = torch.float16 if self.device.type == "cuda" else torch.bfloat16
+        else:
+            self.amp_dtype = getattr(torch, str(self.train_config.amp_dtype).replace("torch.", ""))
+        # loss scaling is only needed for float16
+        enable_grad_scaler = bool(self.train_config.amp) and self.amp_dtype == torch.float16
+        if hasattr(torch.amp, "GradScaler"):
+            self.grad_scaler = torch.amp.GradScaler(self.device.type, enabled=enable_grad_scaler)
+        else:  # older versions of torch
+            self.grad_scaler = torch.cuda.amp.GradScaler(enabled=enable_grad_scaler)
 
         # setup log manager first
         self._setup_log_manager()
@@ -523,7 +706,11 @@ class BaseTrainer(ReprMixin, ABC):
         """Setup the log manager."""
         config = {"log_suffix": self.extra_log_suffix()}
         config.update(self.train_config)
-        self.log_manager = LoggerManager.from_config(config=config)
+        if self.is_main_process:
+            self.log_manager = LoggerManager.from_config(config=config)
+        else:
+            # no loggers for the non-main processes in the DDP mode
+            self.log_manager = LoggerManager(config.get("log_dir", None), config["log_suffix"])
 
     def _setup_directories(self) -> None:
         """Setup the directories for saving checkpoints and logs."""
@@ -680,7 +867,7 @@ class BaseTrainer(ReprMixin, ABC):
                 optimizer=self.optimizer,
                 max_lr=self.train_config.max_lr,
                 epochs=self.n_epochs,
-                steps_per_epoch=len(self.train_loader),
+                steps_per_epoch=-(-len(self.train_loader) // self.grad_accumulation_steps),
                 # verbose=False,
             )
         else:  # TODO: add linear and linear with warmup schedulers
@@ -728,14 +915,14 @@ class BaseTrainer(ReprMixin, ABC):
             "model_state_dict", "optimizer_state_dict",
             "model_config", "train_config", "epoch"
             to resume a training process.
-
-        .. note::
-
-            NOT finished, NOT tested.
+            The states of the optimizer, the lr scheduler and
+            the gradient scaler are loaded when :meth:`train` starts,
+            which resumes from the epoch next to that of the checkpoint.
 
         """
         if isinstance(checkpoint, str):
-            ckpt = torch.load(checkpoint, map_location=self.device)
+            # checkpoints saved by `save_checkpoint` contain `CFG` objects
+            ckpt = torch.load(checkpoint, map_location=self.device, weights_only=False)
         else:
             ckpt = checkpoint
         insufficient_msg = "this checkpoint has no sufficient data to resume training"
@@ -752,9 +939,28 @@ class BaseTrainer(ReprMixin, ABC):
         if not self._check_model_config_compatability(ckpt["model_config"]):
             raise ValueError("model config of the checkpoint is not compatible with the config of the current model")
         self._model.load_state_dict(ckpt["model_state_dict"])
-        self.epoch = ckpt["epoch"]
-        self._setup_from_config(ckpt["train_config"])
-        # TODO: resume optimizer, etc.
+        # checkpoints are saved at the end of the epochs
+        self.epoch = ckpt["epoch"] + 1
+        self.global_step = ckpt.get("global_step", self.global_step)
+        # paths are removed from the `train_config` of the checkpoint
+        train_config = deepcopy(self.train_config)
+        train_config.update(ckpt["train_config"])
+        self._setup_from_config(train_config)
+        self._resumed_states = {
+            k: ckpt[k]
+            for k in ["optimizer_state_dict", "scheduler_state_dict", "grad_scaler_state_dict"]
+            if ckpt.get(k, None) is not None
+        }
+
+    def _load_resumed_states(self) -> None:
+        """Load the states of the optimizer, etc. set by :meth:`resume_from_checkpoint`."""
+        if "optimizer_state_dict" in self._resumed_states:
+            self.optimizer.load_state_dict(self._resumed_states["optimizer_state_dict"])
+        if "scheduler_state_dict" in self._resumed_states and self.scheduler is not None:
+            self.scheduler.load_state_dict(self._resumed_states["scheduler_state_dict"])
+        if "grad_scaler_state_dict" in self._resumed_states:
+            self.grad_scaler.load_state_dict(self._resumed_states["grad_scaler_state_dict"])
+        self._resumed_states = {}
 
     def save_checkpoint(self, path: str) -> None:
         """Save the current state of the trainer to a checkpoint.
@@ -769,9 +975,12 @@ class BaseTrainer(ReprMixin, ABC):
             {
                 "model_state_dict": self._model.state_dict(),
                 "optimizer_state_dict": self.optimizer.state_dict(),
+                "scheduler_state_dict": self.scheduler.state_dict() if self.scheduler is not None else None,
+                "grad_scaler_state_dict": self.grad_scaler.state_dict(),
                 "model_config": make_safe_globals(self.model_config),
                 "train_config": make_safe_globals(self.train_config),
                 "epoch": self.epoch,
+                "global_step": self.global_step,
             },
             path,
         )
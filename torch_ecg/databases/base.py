@@ -24,6 +24,7 @@ import textwrap
 import time
 import warnings
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from copy import deepcopy
 from dataclasses import dataclass
 from numbers import Real
@@ -948,6 +949,92 @@ class PhysioNetDataBase(_DataBase):
         self.df_all_db_info = get_physionet_dbs(local=False)
 
 
+class _EdfReaderPool(object):
+    """LRU pool of opened :class:`~pyedflib.EdfReader` handles, keyed by file path.
+
+    Handles are re-opened if the underlying file has been modified.
+    The pool is bound to the process that created it: after forking
+    (e.g. in the workers of a :class:`~torch.utils.data.DataLoader`),
+    or after pickling, the inherited handles are dropped, so that
+    each worker maintains its own handles, and no file positions
+    are shared across processes.
+
+    Parameters
+    ----------
+    maxsize : int, default 8
+        Maximum number of opened handles.
+
+    """
+
+    def __init__(self, maxsize: int = 8) -> None:
+        assert maxsize >= 1, "`maxsize` should be a positive integer"
+        self.maxsize = maxsize
+        self._readers = OrderedDict()
+        self._pid = os.getpid()
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._readers = OrderedDict()
+            self._pid = os.getpid()
+
+    def get(self, path: Union[str, bytes, os.PathLike]) -> EdfReader:
+        """Get an opened handle of the edf file.
+
+        Parameters
+        ----------
+        path : `path-like`
+            Path of the edf file.
+
+        Returns
+        -------
+        pyedflib.EdfReader
+            The opened handle, which should NOT be closed by the caller.
+
+        """
+        self._check_pid()
+        path = str(Path(path).resolve())
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if path in self._readers:
+            reader, reader_stamp = self._readers[path]
+            if reader_stamp == stamp:
+                self._readers.move_to_end(path)
+                return reader
+            self.close(path)
+        reader = EdfReader(path)
+        self._readers[path] = (reader, stamp)
+        while len(self._readers) > self.maxsize:
+            _, (evicted, _) = self._readers.popitem(last=False)
+            evicted._close()
+        return reader
+
+    def close(self, path: Optional[Union[str, bytes, os.PathLike]] = None) -> None:
+        """Close the handle of the edf file, or all handles if `path` is None."""
+        self._check_pid()
+        if path is None:
+            paths = list(self._readers)
+        else:
+            paths = [str(Path(path).resolve())]
+        for p in paths:
+            if p in self._readers:
+                reader, _ = self._readers.pop(p)
+                reader._close()
+
+    def __len__(self) -> int:
+        self._check_pid()
+        return len(self._readers)
+
+    def __contains__(self, path: Union[str, bytes, os.PathLike]) -> bool:
+        self._check_pid()
+        return str(Path(path).resolve()) in self._readers
+
+    def __getstate__(self) -> dict:
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+
 class NSRRDataBase(_DataBase):
     """Base class for readers for the NSRR database.
 
@@ -965,7 +1052,9 @@ class NSRRDataBase(_DataBase):
     verbose : int, default 1
         Verbosity level for logging.
     kwargs : dict, optional
-        Auxilliary key word arguments.
+        Auxilliary key word arguments,
+        e.g. ``edf_pool_size`` (default 8), the maximum number
+        of edf files kept opened by the reader.
 
     References
     ----------
@@ -991,6 +1080,7 @@ class NSRRDataBase(_DataBase):
         self.fs = kwargs.get("fs", None)
         self._all_records = None
         self.file_opened = None
+        self._edf_pool = _EdfReaderPool(maxsize=kwargs.get("edf_pool_size", 8))
 
         all_dbs = [
             [
@@ -1025,6 +1115,11 @@ class NSRRDataBase(_DataBase):
     ) -> None:
         """Safe IO operation for edf file.
 
+        The handles are taken from an LRU pool of opened edf files,
+        hence "close" only releases :attr:`file_opened`,
+        while the handle is kept opened for later reuse.
+        Use :meth:`close_edf_files` to actually close the files.
+
         Parameters
         ----------
         operation : {"open", "close"}, default "close"
@@ -1044,16 +1139,34 @@ class NSRRDataBase(_DataBase):
 
         """
         if operation == "open":
-            if self.file_opened is not None:
-                self.file_opened._close()
-            self.file_opened = EdfReader(str(full_file_path))
+            self.file_opened = self.get_edf_reader(full_file_path)
         elif operation == "close":
-            if self.file_opened is not None:
-                self.file_opened._close()
-                self.file_opened = None
+            self.file_opened = None
         else:
             raise ValueError("Illegal operation")
 
+    def get_edf_reader(self, full_file_path: Union[str, bytes, os.PathLike]) -> EdfReader:
+        """Get an opened handle of the edf file from the LRU pool.
+
+        Parameters
+        ----------
+        full_file_path : `path-like`
+            Path of the edf file.
+
+        Returns
+        -------
+        pyedflib.EdfReader
+            The opened handle, which is owned by the pool,
+            hence should NOT be closed by the caller.
+
+        """
+        return self._edf_pool.get(full_file_path)
+
+    def close_edf_files(self) -> None:
+        """Close all the edf files kept opened by the reader."""
+        self.file_opened = None
+        self._edf_pool.close()
+
     def get_subject_id(self, rec: Union[str, int]) -> int:
         """Attach a unique subject ID for the record.
 
@@ -0,0 +1,158 @@
+"""
+Parallel preloading of the records of the datasets,
+with memory-mapped caches of the preloaded data.
+
+The per-record pipeline (loading, preprocessing, slicing) of a fast data reader
+(e.g. ``_FastDataReader`` of :class:`~torch_ecg.databases.datasets.CINC2021Dataset`)
+is run over a pool of worker processes, and the resulting rows are written into
+a raw binary file, which is opened as a read-only :class:`numpy.memmap`.
+The cache is keyed by a hash of the preprocessing configurations and the records,
+so that later runs with the same configurations open the cache instantly,
+and the pages of the cache are shared by the (forked) data loader workers
+instead of each holding a private copy.
+
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+from torch.utils.data.dataset import Dataset
+from tqdm.auto import tqdm
+
+from ...utils.misc import make_serializable
+
+__all__ = [
+    "config_hash",
+    "preload",
+]
+
+
+def config_hash(*items: Any) -> str:
+    """Hash (hex digest of length 16) of the JSON-serializable items,
+    used as the key of the caches of the preloaded data.
+    """
+    content = json.dumps(make_serializable(list(items)), sort_keys=True, default=str)
+    return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+
+_WORKER_READER = None
+
+
+def _init_preload_worker(reader: Dataset) -> None:
+    """Initializer of the worker processes of :func:`preload`."""
+    global _WORKER_READER
+    _WORKER_READER = reader
+
+
+def _preload_worker(index: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Load the item of the given index in a worker process."""
+    return _WORKER_READER[index]
+
+
+def _iter_items(reader: Dataset, num_workers: int, desc: str):
+    """Iterate over the items of the reader in order,
+    serially or over a pool of worker processes.
+    """
+    with tqdm(desc=desc, total=len(reader), unit="record", dynamic_ncols=True, mininterval=1.0) as pbar:
+        if num_workers <= 1 or len(reader) <= 1:
+            for idx in range(len(reader)):
+                yield reader[idx]
+                pbar.update(1)
+            return
+        with mp.Pool(
+            processes=min(num_workers, len(reader)),
+            initializer=_init_preload_worker,
+            initargs=(reader,),
+        ) as pool:
+            chunksize = max(1, min(16, len(reader) // (4 * num_workers)))
+            for item in pool.imap(_preload_worker, range(len(reader)), chunksize=chunksize):
+                yield item
+                pbar.update(1)
+
+
+def preload(
+    reader: Dataset,
+    shape: Tuple[int, ...],
+    n_classes: int,
+    dtype: Union[str, np.dtype],
+    num_workers: int = 0,
+    cache_dir: Optional[Union[str, bytes, os.PathLike]] = None,
+    key: Optional[str] = None,
+    desc: str = "Loading data",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Preload all the items of a fast data reader.
+
+    Parameters
+    ----------
+    reader : torch.utils.data.Dataset
+        The fast data reader, whose item of index ``i`` is the tuple
+        ``(signals, labels)`` of the ``i``-th record, of shapes
+        ``(n_rows, *shape)`` and ``(n_rows, n_classes)`` respectively.
+    shape : Tuple[int, ...]
+        Shape of the rows of the signals, e.g. ``(n_leads, siglen)``.
+    n_classes : int
+        Number of classes, i.e. the length of the rows of the labels.
+    dtype : str or numpy.dtype
+        Data type of the signals and the labels.
+    num_workers : int, default 0
+        Number of worker processes.
+        If is 0 or 1, the records are loaded in the current process.
+    cache_dir : `path-like`, optional
+        Directory of the caches. If is None, the data are loaded into memory.
+        Otherwise, the data are read from (or written into, if not existing)
+        the cache ``<cache_dir>/<key>``.
+    key : str, optional
+        Key of the cache, e.g. computed via :func:`config_hash`,
+        required if `cache_dir` is specified.
+    desc : str, default "Loading data"
+        Description shown in the progress bar.
+
+    Returns
+    -------
+    signals : numpy.ndarray
+        The signals, of shape ``(n_rows, *shape)``,
+        a read-only :class:`numpy.memmap` if `cache_dir` is specified.
+    labels : numpy.ndarray
+        The labels, of shape ``(n_rows, n_classes)``.
+
+    """
+    dtype = np.dtype(dtype)
+    if cache_dir is None:
+        signals, labels = [], []
+        for sig, lb in _iter_items(reader, num_workers, desc):
+            signals.append(sig)
+            labels.append(lb)
+        if len(signals) == 0:
+            return np.empty((0, *shape), dtype=dtype), np.empty((0, n_classes), dtype=dtype)
+        return np.concatenate(signals, axis=0).astype(dtype, copy=False), np.concatenate(labels, axis=0)
+
+    assert key is not None, "`key` should be specified along with `cache_dir`"
+    cache_path = Path(cache_dir).expanduser().resolve() / key
+    meta_fp = cache_path / "meta.json"
+    if not meta_fp.is_file():
+        cache_path.mkdir(parents=True, exist_ok=True)
+        # written to temporary files first, so that interrupted runs leave no (incomplete) cache
+        tmp_fp = cache_path / f"signals.bin.{os.getpid()}.tmp"
+        labels, n_rows = [], 0
+        with open(tmp_fp, "wb") as f:
+            for sig, lb in _iter_items(reader, num_workers, desc):
+                np.ascontiguousarray(sig, dtype=dtype).tofile(f)
+                labels.append(np.asarray(lb, dtype=dtype))
+                n_rows += len(sig)
+        labels = np.concatenate(labels, axis=0) if len(labels) > 0 else np.empty((0, n_classes), dtype=dtype)
+        np.save(cache_path / "labels.npy", labels)
+        os.replace(tmp_fp, cache_path / "signals.bin")
+        meta = {"shape": [n_rows, *shape], "dtype": dtype.str, "n_records": len(reader)}
+        meta_fp.write_text(json.dumps(meta, ensure_ascii=False))
+
+    meta = json.loads(meta_fp.read_text())
+    if meta["shape"][0] == 0:  # empty files can not be memory-mapped
+        return np.empty(meta["shape"], dtype=meta["dtype"]), np.load(cache_path / "labels.npy")
+    labels = np.load(cache_path / "labels.npy", mmap_mode="r")
+    signals = np.memmap(cache_path / "signals.bin", dtype=meta["dtype"], mode="r", shape=tuple(meta["shape"]))
+    return signals, labels
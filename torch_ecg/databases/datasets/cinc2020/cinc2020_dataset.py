@@ -1,4 +1,5 @@
 import json
+import os
 import time
 import warnings
 from copy import deepcopy
@@ -17,6 +18,7 @@ from ....utils.misc import ReprMixin, list_sum
 from ....utils.utils_data import ensure_siglen
 from ....utils.utils_nn import default_collate_fn as collate_fn
 from ....utils.utils_signal import remove_spikes_naive
+from .._preload import config_hash, preload
 
 __all__ = [
     "CINC2020Dataset",
@@ -46,6 +48,16 @@ class CINC2020Dataset(ReprMixin, Dataset):
     lazy : bool, default True
         If True, the data will not be loaded immediately,
         instead, it will be loaded on demand.
+    num_workers : int, default 0
+        Number of worker processes to preload the records.
+        If is 0 or 1, the records are preloaded in the current process.
+    cache_dir : `path-like`, optional
+        Directory of the caches of the preloaded data.
+        If specified, the preloaded data are written into a cache
+        keyed by a hash of the preprocessing configurations and the records,
+        and are read from the cache as read-only memory maps
+        (shared by the data loader workers) by later runs
+        with the same configurations.
     **reader_kwargs : dict, optional
         Keyword arguments for the database reader class.
 
@@ -59,6 +71,8 @@ class CINC2020Dataset(ReprMixin, Dataset):
         config: CFG,
         training: bool = True,
         lazy: bool = True,
+        num_workers: int = 0,
+        cache_dir: Optional[Union[str, bytes, os.PathLike]] = None,
         **reader_kwargs: Any,
     ) -> None:
         super().__init__()
@@ -90,6 +104,8 @@ class CINC2020Dataset(ReprMixin, Dataset):
         # validation also goes in batches, hence length has to be fixed
         self.siglen = self.config.input_len
         self.lazy = lazy
+        self.num_workers = num_workers
+        self.cache_dir = cache_dir
 
         self.records = self._train_test_split(self.config.train_ratio, force_recompute=False)
         # TODO: consider using `remove_spikes_naive` to treat these exceptional records
@@ -108,22 +124,36 @@ class CINC2020Dataset(ReprMixin, Dataset):
             self._load_all_data()
 
     def _load_all_data(self) -> None:
-        """Load all data into memory."""
+        """Load all data into memory,
+        or memory-map the cached data if `cache_dir` is specified.
+        """
         fdr = _FastDataReader(self.reader, self.records, self.config, self.ppm)
-        self._signals, self._labels = [], []
-        with tqdm(
-            range(len(fdr)),
-            desc="Loading data",
-            unit="record",
-            dynamic_ncols=True,
-            mininterval=1.0,
-        ) as pbar:
-            for idx in pbar:
-                sig, lb = fdr[idx]
-                self._signals.append(sig)
-                self._labels.append(lb)
-        self._signals = np.concatenate(self._signals, axis=0).astype(self.dtype)
-        self._labels = np.concatenate(self._labels, axis=0)
+        self._signals, self._labels = preload(
+            fdr,
+            shape=(len(self.config.leads), self.siglen),
+            n_classes=self.n_classes,
+            dtype=self.dtype,
+            num_workers=self.num_workers,
+            cache_dir=self.cache_dir,
+            key=None if self.cache_dir is None else f"{self.__name__}_{self._preload_key()}",
+        )
+
+    def _preload_key(self) -> str:
+        """Hash of the configurations of the preprocessing pipeline and the records,
+        used as the key of the cache of the preloaded data.
+        """
+        return config_hash(
+            str(self.reader.db_dir),
+            self.config.fs,
+            self.records,
+            self.config.leads,
+            self.config.data_format,
+            self.config.input_len,
+            self.config.sig_slice_tol,
+            np.dtype(self.dtype).str,
+            self.all_classes,
+            repr(self.ppm),
+        )
 
     def _load_one_record(self, rec: str) -> Tuple[np.ndarray, np.ndarray]:
         """Load a record from the database using database reader.
@@ -155,6 +185,7 @@ class CINC2020Dataset(ReprMixin, Dataset):
             siglen=self.siglen,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
@@ -229,6 +260,8 @@ class CINC2020Dataset(ReprMixin, Dataset):
         test_file = self.reader.db_dir_base / f"{self.reader.db_name}_test_ratio_{_test_ratio}{file_suffix}"
 
         if force_recompute or not all([train_file.is_file(), test_file.is_file()]):
+            # labels of the records are read from the annotation index instead of the header files
+            self.reader.build_ann_index(num_workers=self.num_workers)
             tranche_records = {t: [] for t in _TRANCHES}
             train_set = {t: [] for t in _TRANCHES}
             test_set = {t: [] for t in _TRANCHES}
@@ -410,6 +443,7 @@ class _FastDataReader(ReprMixin, Dataset):
             siglen=self.config.input_len,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
@@ -1,4 +1,5 @@
 import json
+import os
 import textwrap
 import time
 import warnings
@@ -19,6 +20,7 @@ from ....utils.misc import ReprMixin, list_sum
 from ....utils.utils_data import ensure_siglen
 from ....utils.utils_nn import default_collate_fn as collate_fn
 from ....utils.utils_signal import remove_spikes_naive
+from .._preload import config_hash, preload
 
 __all__ = [
     "CINC2021Dataset",
@@ -48,6 +50,16 @@ class CINC2021Dataset(ReprMixin, Dataset):
     lazy : bool, default True
         If True, the data will not be loaded immediately,
         instead, it will be loaded on demand.
+    num_workers : int, default 0
+        Number of worker processes to preload the records.
+        If is 0 or 1, the records are preloaded in the current process.
+    cache_dir : `path-like`, optional
+        Directory of the caches of the preloaded data.
+        If specified, the preloaded data are written into a cache
+        keyed by a hash of the preprocessing configurations and the records,
+        and are read from the cache as read-only memory maps
+        (shared by the data loader workers) by later runs
+        with the same configurations.
     **reader_kwargs : dict, optional
         Keyword arguments for the database reader class.
 
@@ -61,6 +73,8 @@ class CINC2021Dataset(ReprMixin, Dataset):
         config: Optional[CFG] = None,
         training: bool = True,
         lazy: bool = True,
+        num_workers: int = 0,
+        cache_dir: Optional[Union[str, bytes, os.PathLike]] = None,
         **reader_kwargs: Any,
     ) -> None:
         super().__init__()
@@ -94,6 +108,8 @@ class CINC2021Dataset(ReprMixin, Dataset):
         # validation also goes in batches, hence length has to be fixed
         self.siglen = self.config.input_len
         self.lazy = lazy
+        self.num_workers = num_workers
+        self.cache_dir = cache_dir
 
         self._indices = [Standard12Leads.index(ld) for ld in self.config.leads]
 
@@ -116,30 +132,36 @@ class CINC2021Dataset(ReprMixin, Dataset):
             self._load_all_data()
 
     def _load_all_data(self) -> None:
-        """Load all data into memory."""
+        """Load all data into memory,
+        or memory-map the cached data if `cache_dir` is specified.
+        """
         fdr = _FastDataReader(self.reader, self.records, self.config, self.ppm)
+        self._signals, self._labels = preload(
+            fdr,
+            shape=(len(self.config.leads), self.siglen),
+            n_classes=self.n_classes,
+            dtype=self.dtype,
+            num_workers=self.num_workers,
+            cache_dir=self.cache_dir,
+            key=None if self.cache_dir is None else f"{self.__name__}_{self._preload_key()}",
+        )
 
-        # with tqdm(self.records, desc="Loading data", unit="record") as pbar:
-        #     for rec in pbar:
-        # s, l = self._load_one_record(rec)  # self._load_one_record is much slower than _FastDataReader
-        self._signals, self._labels = [], []
-        with tqdm(
-            desc="Loading data",
-            total=len(fdr),
-            unit="record",
-            dynamic_ncols=True,
-            mininterval=1.0,
-        ) as pbar:
-            for idx in range(len(fdr)):
-                sig, lb = fdr[idx]
-                # np.concatenate slows down the process severely
-                # self._signals = np.concatenate((self._signals, s), axis=0)
-                # self._labels = np.concatenate((self._labels, l), axis=0)
-                self._signals.append(sig)
-                self._labels.append(lb)
-                pbar.update(1)
-        self._signals = np.concatenate(self._signals, axis=0).astype(self.dtype)
-        self._labels = np.concatenate(self._labels, axis=0)
+    def _preload_key(self) -> str:
+        """Hash of the configurations of the preprocessing pipeline and the records,
+        used as the key of the cache of the preloaded data.
+        """
+        return config_hash(
+            str(self.reader.db_dir),
+            self.config.fs,
+            self.records,
+            self.config.leads,
+            self.config.data_format,
+            self.config.input_len,
+            self.config.sig_slice_tol,
+            np.dtype(self.dtype).str,
+            self.all_classes,
+            repr(self.ppm),
+        )
 
     def _load_one_record(self, rec: str) -> Tuple[np.ndarray, np.ndarray]:
         """Load one record from the database using data reader.
@@ -177,6 +199,7 @@ class CINC2021Dataset(ReprMixin, Dataset):
             siglen=self.siglen,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
@@ -343,9 +366,9 @@ class CINC2021Dataset(ReprMixin, Dataset):
         if len(self.reader) == 0:
             return []
 
-        # TODO: use self.reader.df_stats (precomputed and stored in utils/stats.csv)
-        # to accelerate the validity examinations
         if force_recompute or not all([train_file.is_file(), test_file.is_file()]):
+            # labels of the records are read from the annotation index instead of the header files
+            self.reader.build_ann_index(num_workers=self.num_workers)
             tranche_records = {t: [] for t in _TRANCHES}
             train_set = {t: [] for t in _TRANCHES}
             test_set = {t: [] for t in _TRANCHES}
@@ -554,6 +577,7 @@ class _FastDataReader(ReprMixin, Dataset):
             siglen=self.config.input_len,
             fmt=self.config.data_format,
             tolerance=self.config.sig_slice_tol,
+            copy=False,
         ).astype(self.dtype)
         if values.ndim == 2:
             values = values[np.newaxis, ...]
@@ -25,24 +25,20 @@ one can check using the following code
             print("\n"+f"segment {seg} has sig.shape = {sig.shape}, lb.shape = {lb.shape}"+"\n")
             err_list.append(seg)
         print(f"{idx+1}/{len(ds_val)}", end="\r")
-    for idx, seg in enumerate(err_list):
-        path = ds_train._get_seg_data_path(seg)
-        os.remove(path)
-        path = ds_train._get_seg_ann_path(seg)
-        os.remove(path)
-        print(f"{idx+1}/{len(err_list)}", end="\r")
+    ds_train._clear_cached_segments(recs=set([ds_train._get_rec_name(seg) for seg in err_list]))
 
 and similarly for the task of `rr_lstm`
 
 """
 
 import json
+import multiprocessing as mp
 import os
 import re
 import time
 import warnings
 from copy import deepcopy
-from pathlib import Path
+from functools import partial
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
@@ -54,7 +50,8 @@ from tqdm.auto import tqdm
 from ...._preprocessors import PreprocManager
 from ....cfg import CFG, DEFAULTS
 from ....databases import CPSC2021 as CR
-from ....utils.misc import ReprMixin, add_docstring, get_record_list_recursive3, list_sum, nildent
+from ....utils.misc import ReprMixin, list_sum, nildent
+from ....utils.segment_store import SegmentStore
 from ....utils.utils_data import generate_weight_mask, mask_to_intervals
 from ....utils.utils_nn import default_collate_fn as collate_fn
 from ....utils.utils_signal import remove_spikes_naive
@@ -73,8 +70,9 @@ class CPSC2021Dataset(ReprMixin, Dataset):
     1. ECGs are preprocessed and stored in one folder
     2. preprocessed ECGs are sliced with overlap to generate data and label for different tasks:
 
-       - the data files stores segments of fixed length of preprocessed ECGs,
-       - the annotation files contain "qrs_mask", and "af_mask"
+       - the segments of fixed length of preprocessed ECGs,
+         together with "rpeaks", "qrs_mask", and "af_mask",
+         are stored in a packed :class:`~torch_ecg.utils.SegmentStore`
 
     The returned values (tuple) of :meth:`__getitem__` depends on the task:
 
@@ -169,12 +167,11 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self.segments_base_dir = self.config.db_dir / "segments"
         self.segments_base_dir.mkdir(parents=True, exist_ok=True)
         self.segment_name_pattern = "S_[\\d]{1,3}_[\\d]{1,2}_[\\d]{7}"
-        self.segment_ext = "mat"
+        self.segment_ext = "mat"  # extension of the preprocessed records
         # rr_dir for sequence of rr intervals of fix length
         self.rr_seq_base_dir = self.config.db_dir / "rr_seq"
         self.rr_seq_base_dir.mkdir(parents=True, exist_ok=True)
         self.rr_seq_name_pattern = "R_[\\d]{1,3}_[\\d]{1,2}_[\\d]{7}"
-        self.rr_seq_ext = "mat"
 
         self._all_data = None
         self._all_labels = None
@@ -224,9 +221,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             "main",
         ]:
             # for qrs detection, or for the main task
-            self.segments_dirs = CFG()
             self.__all_segments = CFG()
-            self.segments_json = self.segments_base_dir / "segments.json"
             self._ls_segments()
             self.segments = list_sum([self.__all_segments[subject] for subject in self.subjects])
             if self.__DEBUG__:
@@ -238,9 +233,8 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 self.config,
                 self.task,
                 self.seg_ppm,
-                self.segments_dirs,
+                self.seg_store,
                 self.segments,
-                self.segment_ext,
             )
             if self.lazy:
                 return
@@ -266,9 +260,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         elif self.task in [
             "rr_lstm",
         ]:
-            self.rr_seq_dirs = CFG()
             self.__all_rr_seq = CFG()
-            self.rr_seq_json = self.rr_seq_base_dir / "rr_seq.json"
             self._ls_rr_seq()
             self.rr_seq = list_sum([self.__all_rr_seq[subject] for subject in self.subjects])
             if self.__DEBUG__:
@@ -280,9 +272,8 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 self.config,
                 self.task,
                 self.seg_ppm,
-                self.rr_seq_dirs,
+                self.rr_seq_store,
                 self.rr_seq,
-                self.rr_seq_ext,
             )
             if self.lazy:
                 return
@@ -324,45 +315,34 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self.__set_task(task, lazy)
 
     def _ls_segments(self) -> None:
-        """Find all segments in the segments directory,
-        and store them in some private attributes.
+        """Open the store of the segments,
+        and collect the segments into some private attributes.
         """
-        for item in ["data", "ann"]:
-            self.segments_dirs[item] = CFG()
-            for s in self.reader.all_subjects:
-                self.segments_dirs[item][s] = self.segments_base_dir / item / s
-                self.segments_dirs[item][s].mkdir(parents=True, exist_ok=True)
-        if self.segments_json.is_file():
-            self.__all_segments = json.loads(self.segments_json.read_text())
-            # return
-        print(f"please allow the reader a few minutes to collect the segments from {self.segments_base_dir}...")
-        seg_filename_pattern = f"{self.segment_name_pattern}\\.{self.segment_ext}"
-        self.__all_segments = CFG(
-            {
-                s: get_record_list_recursive3(str(self.segments_dirs.data[s]), seg_filename_pattern)
-                for s in self.reader.all_subjects
-            }
+        self.seg_store = SegmentStore(
+            self.segments_base_dir / "store",
+            fields={
+                "data": ((self.config.n_leads, self.seglen), "float32"),
+                "qrs_mask": ((self.seglen,), "int8"),
+                "af_mask": ((self.seglen,), "int8"),
+                "interval": ((2,), "int64"),
+            },
+            ragged_fields={"rpeaks": "int32"},
         )
-        if all([len(self.__all_segments[s]) > 0 for s in self.reader.all_subjects]):
-            self.segments_json.write_text(json.dumps(self.__all_segments, ensure_ascii=False))
+        self.__all_segments = CFG({s: self.seg_store.names(group=s) for s in self.reader.all_subjects})
 
     def _ls_rr_seq(self) -> None:
-        """Find all rr sequences in the rr sequences directory,
-        and store them in some private attributes.
+        """Open the store of the rr sequences,
+        and collect the rr sequences into some private attributes.
         """
-        for s in self.reader.all_subjects:
-            self.rr_seq_dirs[s] = self.rr_seq_base_dir / s
-            self.rr_seq_dirs[s].mkdir(parents=True, exist_ok=True)
-        if self.rr_seq_json.is_file():
-            self.__all_rr_seq = json.loads(self.rr_seq_json.read_text())
-            # return
-        print(f"please allow the reader a few minutes to collect the rr sequences from {self.rr_seq_base_dir}...")
-        rr_seq_filename_pattern = f"{self.rr_seq_name_pattern}\\.{self.rr_seq_ext}"
-        self.__all_rr_seq = CFG(
-            {s: get_record_list_recursive3(self.rr_seq_dirs[s], rr_seq_filename_pattern) for s in self.reader.all_subjects}
+        self.rr_seq_store = SegmentStore(
+            self.rr_seq_base_dir / "store",
+            fields={
+                "rr": ((self.seglen,), "float32"),
+                "label": ((self.seglen,), "int8"),
+                "interval": ((2,), "int64"),
+            },
         )
-        if all([len(self.__all_rr_seq[s]) > 0 for s in self.reader.all_subjects]):
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+        self.__all_rr_seq = CFG({s: self.rr_seq_store.names(group=s) for s in self.reader.all_subjects})
 
     @property
     def all_segments(self) -> CFG:
@@ -402,30 +382,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                     self._all_masks[index],
                 )
 
-    def _get_seg_data_path(self, seg: str) -> Path:
-        """Get the path of the data file of segment.
-
-        Parameters
-        ----------
-        seg : str
-            Name of the segment, of pattern like "S_1_1_0000193".
-
-        Returns
-        -------
-        pathlib.Path
-            Absolute path of the data file of the segment.
-
-        """
-        subject = seg.split("_")[1]
-        fp = self.segments_dirs.data[subject] / f"{seg}.{self.segment_ext}"
-        return fp
-
-    @add_docstring(_get_seg_data_path.__doc__.replace("data file", "annotation file"))
-    def _get_seg_ann_path(self, seg: str) -> Path:
-        subject = seg.split("_")[1]
-        fp = self.segments_dirs.ann[subject] / f"{seg}.{self.segment_ext}"
-        return fp
-
     def _load_seg_data(self, seg: str) -> np.ndarray:
         """Load the data of the segment.
 
@@ -438,10 +394,10 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         -------
         numpy.ndarray
             Loaded data of the segment, of shape ``(2, self.seglen)``.
+            It is a read-only view into the segment store.
 
         """
-        seg_data_fp = self._get_seg_data_path(seg)
-        seg_data = loadmat(str(seg_data_fp))["ecg"]
+        seg_data = self.seg_store.get(seg, "data")
         return seg_data
 
     def _load_seg_ann(self, seg: str) -> dict:
@@ -464,8 +420,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                   the original ECG record of the segment
 
         """
-        seg_ann_fp = self._get_seg_ann_path(seg)
-        seg_ann = {k: v.flatten() for k, v in loadmat(str(seg_ann_fp)).items() if not k.startswith("__")}
+        seg_ann = {k: v for k, v in self.seg_store.get(seg).items() if k != "data"}
         return seg_ann
 
     def _load_seg_mask(self, seg: str, task: Optional[str] = None) -> Union[np.ndarray, Dict[str, np.ndarray]]:
@@ -543,24 +498,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         ).squeeze(axis=1)
         return seq_lab
 
-    def _get_rr_seq_path(self, seq_name: str) -> Path:
-        """Get the path of the annotation file of the rr_seq.
-
-        Parameters
-        ----------
-        seq_name : str
-            Name of the rr_seq, of pattern like "R_1_1_0000193".
-
-        Returns
-        -------
-        pathlib.Path
-            absolute path of the annotation file of the rr_seq.
-
-        """
-        subject = seq_name.split("_")[1]
-        fp = self.rr_seq_dirs[subject] / f"{seq_name}.{self.rr_seq_ext}"
-        return fp
-
     def _load_rr_seq(self, seq_name: str) -> Dict[str, np.ndarray]:
         """Load the metadata of the rr_seq.
 
@@ -582,22 +519,26 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                   rr sequence in the original record
 
         """
-        rr_seq_path = self._get_rr_seq_path(seq_name)
-        rr_seq = {k: v for k, v in loadmat(str(rr_seq_path)).items() if not k.startswith("__")}
+        rr_seq = self.rr_seq_store.get(seq_name)
         rr_seq["rr"] = rr_seq["rr"].reshape((self.seglen, 1))
         rr_seq["label"] = rr_seq["label"].reshape((self.seglen, self.n_classes))
-        rr_seq["interval"] = rr_seq["interval"].flatten()
         return rr_seq
 
-    def persistence(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def persistence(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Save the preprocessed data to disk.
 
+        Records that are already processed are skipped,
+        hence an interrupted run can be resumed by calling this method again.
+
         Parameters
         ----------
         force_recompute : bool, default False
             Whether to force recompute the preprocessed data.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to process the records.
+            If is 0 or 1, the records are processed in the current process.
 
         Returns
         -------
@@ -609,6 +550,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self._preprocess_data(
             force_recompute=force_recompute,
             verbose=verbose,
+            num_workers=num_workers,
         )
 
         original_task = self.task
@@ -619,6 +561,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self._slice_data(
             force_recompute=force_recompute,
             verbose=verbose,
+            num_workers=num_workers,
         )
 
         self.__set_task("rr_lstm", lazy=True)
@@ -627,11 +570,79 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self._slice_rr_seq(
             force_recompute=force_recompute,
             verbose=verbose,
+            num_workers=num_workers,
         )
 
         self.__set_task(original_task, lazy=original_lazy)
 
-    def _preprocess_data(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def _run_per_record(
+        self,
+        method: str,
+        records: Sequence[str],
+        desc: str,
+        verbose: int = 0,
+        num_workers: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        """Run a per-record method on the records,
+        serially or over a pool of worker processes.
+
+        Parameters
+        ----------
+        method : str
+            Name of the per-record method, e.g. "_slice_one_record".
+        records : Sequence[str]
+            Names of the records to process.
+        desc : str
+            Description shown in the progress bar.
+        verbose : int, default 0
+            Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes.
+            If is 0 or 1, the records are processed in the current process.
+        kwargs : dict, optional
+            Other keyword arguments passed to the method.
+
+        Returns
+        -------
+        None
+
+        """
+        with tqdm(
+            total=len(records),
+            desc=desc,
+            unit="record",
+            dynamic_ncols=True,
+            mininterval=1.0,
+            disable=verbose < 1,
+        ) as pbar:
+            # each record is processed with its own seed, so that the results
+            # depend neither on the number nor on the scheduling of the workers
+            rec_seeds = {rec: DEFAULTS.SEED + idx for idx, rec in enumerate(self.reader.all_records)}
+            if num_workers <= 1 or len(records) <= 1:
+                for rec in records:
+                    _run_seeded(self, method, rec, rec_seeds[rec], dict(kwargs, verbose=verbose))
+                    pbar.update(1)
+                return
+            tasks = [(method, rec, rec_seeds[rec], kwargs) for rec in records]
+            with mp.Pool(
+                processes=min(num_workers, len(records)),
+                initializer=_init_persistence_worker,
+                initargs=(self,),
+            ) as pool:
+                for _ in pool.imap_unordered(_persistence_worker, tasks):
+                    pbar.update(1)
+
+    def _use_writer_store(self, writer_id: str) -> None:
+        """Let the store of the current task write to its own shard and index files,
+        used in worker processes of :meth:`persistence`.
+        """
+        if self.task in ["qrs_detection", "main"]:
+            self.seg_store = SegmentStore(self.seg_store.path, writer_id=writer_id)
+        elif self.task in ["rr_lstm"]:
+            self.rr_seq_store = SegmentStore(self.rr_seq_store.path, writer_id=writer_id)
+
+    def _preprocess_data(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Preprocesses the ECG data in advance for further use.
 
         Parameters
@@ -640,20 +651,28 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Whether to force recompute the preprocessed data.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to preprocess the records.
 
         Returns
         -------
         None
 
         """
-        for idx, rec in enumerate(self.reader.all_records):
-            self._preprocess_one_record(
-                rec=rec,
-                force_recompute=force_recompute,
-                verbose=verbose,
-            )
-            if verbose >= 1:
-                print(f"{idx+1}/{len(self.reader.all_records)} records", end="\r")
+        suffix = self._get_rec_suffix(self.allowed_preproc)
+        records = [
+            rec
+            for rec in self.reader.all_records
+            if force_recompute or not (self.preprocess_dir / f"{rec}-{suffix}.{self.segment_ext}").is_file()
+        ]
+        self._run_per_record(
+            "_preprocess_one_record",
+            records,
+            desc="Preprocessing data",
+            verbose=verbose,
+            num_workers=num_workers,
+            force_recompute=force_recompute,
+        )
 
     def _preprocess_one_record(self, rec: str, force_recompute: bool = False, verbose: int = 0) -> None:
         """Preprocesses one ECG record in advance for further use.
@@ -678,7 +697,11 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             return
         # perform pre-process
         pps, _ = self.ppm(self.reader.load_data(rec), self.config.fs)
-        savemat(save_fp, {"ecg": pps}, format="5")
+        # write to a temporary file first, so that an existing file is always complete
+        tmp_fp = save_fp.with_name(f".{save_fp.name}.{os.getpid()}.tmp")
+        with open(tmp_fp, "wb") as f:
+            savemat(f, {"ecg": pps}, format="5")
+        os.replace(tmp_fp, save_fp)
 
     def load_preprocessed_data(self, rec: str) -> np.ndarray:
         """Load the preprocessed data of the record.
@@ -722,11 +745,12 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         suffix = "-".join(sorted([item.lower() for item in operations]))
         return suffix
 
-    def _slice_data(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def _slice_data(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Slice the preprocessed data into segments.
 
         Slice all records into segments of length `self.seglen`,
         and perform data augmentations specified in `self.config`.
+        Records already completed in the segment store are skipped.
 
         Parameters
         ----------
@@ -734,6 +758,8 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Whether to force recompute the preprocessed data.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to slice the records.
 
         Returns
         -------
@@ -748,29 +774,31 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         )
         if force_recompute:
             self._clear_cached_segments()
-        for idx, rec in enumerate(self.reader.all_records):
-            self._slice_one_record(
-                rec=rec,
-                force_recompute=False,
-                update_segments_json=False,
-                verbose=verbose,
-            )
-            if verbose >= 1:
-                print(f"{idx+1}/{len(self.reader.all_records)} records", end="\r")
-        if force_recompute:
-            self.segments_json.write_text(json.dump(self.__all_segments, ensure_ascii=False))
+        # collect segments written by workers of a previous (interrupted) run
+        self.seg_store.merge()
+        completed = set(self.seg_store.completed_records)
+        self._run_per_record(
+            "_slice_one_record",
+            [rec for rec in self.reader.all_records if rec not in completed],
+            desc="Slicing data",
+            verbose=verbose,
+            num_workers=num_workers,
+        )
+        self.seg_store.merge()
+        self.__all_segments = CFG({s: self.seg_store.names(group=s) for s in self.reader.all_subjects})
+        self.segments = list_sum([self.__all_segments[subject] for subject in self.subjects])
 
     def _slice_one_record(
         self,
         rec: str,
         force_recompute: bool = False,
-        update_segments_json: bool = False,
         verbose: int = 0,
     ) -> None:
         """Slice one preprocessed record into segments.
 
         slice one record into segments of length `self.seglen`,
         and perform data augmentations specified in `self.config`.
+        The segments are appended to the segment store.
 
         Parameters
         ----------
@@ -778,10 +806,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Name of the record.
         force_recompute : bool, default False
             Whether to force recompute the preprocessed data.
-        update_segments_json : bool, default False
-            If both `force_recompute` and `update_segments_json` are True,
-            the file `self.segments_json` will be updated.
-            Useful when slicing not all records.
         verbose : int, default 0
             Verbosity level for printing the progress.
 
@@ -796,9 +820,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 "main",
             ]
         )
-        subject = self.reader.get_subject_id(rec)
-        rec_segs = [item for item in self.__all_segments[subject] if item.startswith(rec.replace("data", "S"))]
-        if (not force_recompute) and len(rec_segs) > 0:
+        if (not force_recompute) and rec in self.seg_store.completed_records:
             return
         elif force_recompute:
             self._clear_cached_segments([rec])
@@ -814,6 +836,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
 
         # skip those records that are too short
         if siglen < self.seglen:
+            self.__save_segments(rec, [])
             return
 
         # find critical points
@@ -855,7 +878,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 start_idx += DEFAULTS.RNG_randint(critical_forward_len[0], critical_forward_len[1])
 
         # return segments
-        self.__save_segments(rec, segments, update_segments_json)
+        self.__save_segments(rec, segments)
 
     def __generate_segment(
         self,
@@ -979,8 +1002,8 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         )
         return new_seg
 
-    def __save_segments(self, rec: str, segments: List[CFG], update_segments_json: bool = False) -> None:
-        """Save the segments to the disk.
+    def __save_segments(self, rec: str, segments: List[CFG]) -> None:
+        """Save the segments to the segment store.
 
         Parameters
         ----------
@@ -988,8 +1011,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Name of the record.
         segments : List[dict]
             List of the segments (meta-)data to be saved.
-        update_segments_json : bool, default False
-            Whether to update the segments.json file.
 
         Returns
         -------
@@ -999,26 +1020,9 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         subject = self.reader.get_subject_id(rec)
         ordering = list(range(len(segments)))
         DEFAULTS.RNG.shuffle(ordering)
-        for i, idx in enumerate(ordering):
-            seg = segments[idx]
-            filename = f"{rec}_{i:07d}.{self.segment_ext}".replace("data", "S")
-            data_path = self.segments_dirs.data[subject] / filename
-            savemat(str(data_path), {"ecg": seg.data})
-            self.__all_segments[subject].append(Path(filename).with_suffix("").name)
-            ann_path = self.segments_dirs.ann[subject] / filename
-            savemat(
-                str(ann_path),
-                {
-                    k: v
-                    for k, v in seg.items()
-                    if k
-                    not in [
-                        "data",
-                    ]
-                },
-            )
-        if update_segments_json:
-            self.segments_json.write_text(json.dumps(self.__all_segments, ensure_ascii=False))
+        names = [f"{rec}_{i:07d}".replace("data", "S") for i in range(len(segments))]
+        self.seg_store.append(rec, [segments[idx] for idx in ordering], names, group=subject)
+        self.__all_segments[subject].extend(names)
 
     def _clear_cached_segments(self, recs: Optional[Sequence[str]] = None) -> None:
         """Clear the cached segments.
@@ -1040,41 +1044,23 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 "main",
             ]
         )
-        if recs is not None:
-            for rec in recs:
-                subject = self.reader.get_subject_id(rec)
-                for item in [
-                    "data",
-                    "ann",
-                ]:
-                    path = str(self.segments_dirs[item][subject])
-                    for f in [n for n in os.listdir(path) if n.endswith(self.segment_ext)]:
-                        if self._get_rec_name(f) == rec:
-                            os.remove(os.path.join(path, f))
-                            if os.path.splitext(f)[0] in self.__all_segments[subject]:
-                                self.__all_segments[subject].remove(os.path.splitext(f)[0])
-        else:
-            for subject in self.reader.all_subjects:
-                for item in [
-                    "data",
-                    "ann",
-                ]:
-                    path = str(self.segments_dirs[item][subject])
-                    for f in [n for n in os.listdir(path) if n.endswith(self.segment_ext)]:
-                        os.remove(os.path.join(path, f))
-                        if os.path.splitext(f)[0] in self.__all_segments[subject]:
-                            self.__all_segments[subject].remove(os.path.splitext(f)[0])
+        self.seg_store.remove(recs)
+        self.__all_segments = CFG({s: self.seg_store.names(group=s) for s in self.reader.all_subjects})
         self.segments = list_sum([self.__all_segments[subject] for subject in self.subjects])
 
-    def _slice_rr_seq(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def _slice_rr_seq(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Slice sequences of rr intervals into fixed length (sub)sequences.
 
+        Records already completed in the rr sequence store are skipped.
+
         Parameters
         ----------
         force_recompute : bool, default False
             Whether to force recompute the rr sequences.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to slice the records.
 
         Returns
         -------
@@ -1084,23 +1070,24 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         self.__assert_task(["rr_lstm"])
         if force_recompute:
             self._clear_cached_rr_seq()
-        for idx, rec in enumerate(self.reader.all_records):
-            self._slice_rr_seq_one_record(
-                rec=rec,
-                force_recompute=False,
-                update_rr_seq_json=False,
-                verbose=verbose,
-            )
-            if verbose >= 1:
-                print(f"{idx+1}/{len(self.reader.all_records)} records", end="\r")
-        if force_recompute:
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+        # collect rr sequences written by workers of a previous (interrupted) run
+        self.rr_seq_store.merge()
+        completed = set(self.rr_seq_store.completed_records)
+        self._run_per_record(
+            "_slice_rr_seq_one_record",
+            [rec for rec in self.reader.all_records if rec not in completed],
+            desc="Slicing rr_seq",
+            verbose=verbose,
+            num_workers=num_workers,
+        )
+        self.rr_seq_store.merge()
+        self.__all_rr_seq = CFG({s: self.rr_seq_store.names(group=s) for s in self.reader.all_subjects})
+        self.rr_seq = list_sum([self.__all_rr_seq[subject] for subject in self.subjects])
 
     def _slice_rr_seq_one_record(
         self,
         rec: str,
         force_recompute: bool = False,
-        update_rr_seq_json: bool = False,
         verbose: int = 0,
     ) -> None:
         """Slice sequences of rr intervals from one record
@@ -1112,8 +1099,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Name of the record.
         force_recompute : bool, default False
             Whether to force recompute the rr sequences.
-        update_rr_seq_json : bool, default False
-            Whether to update the rr_seq.json file.
         verbose : int, default 0
             Verbosity level for printing the progress.
 
@@ -1123,9 +1108,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
 
         """
         self.__assert_task(["rr_lstm"])
-        subject = self.reader.get_subject_id(rec)
-        rec_rr_seq = [item for item in self.__all_rr_seq[subject] if item.startswith(rec.replace("data", "R"))]
-        if (not force_recompute) and len(rec_rr_seq) > 0:
+        if (not force_recompute) and rec in self.rr_seq_store.completed_records:
             return
         elif force_recompute:
             self._clear_cached_rr_seq([rec])
@@ -1137,6 +1120,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         rpeaks = self.reader.load_rpeaks(rec)
         rr = np.diff(rpeaks) / self.config.fs
         if len(rr) < self.seglen:
+            self.__save_rr_seq(rec, [])
             return
         af_mask = self.reader.load_af_episodes(rec, fmt="mask")
         label_seq = af_mask[rpeaks][:-1]
@@ -1184,10 +1168,10 @@ class CPSC2021Dataset(ReprMixin, Dataset):
                 rr_seq.append(new_rr_seq)
                 start_idx += DEFAULTS.RNG_randint(critical_forward_len[0], critical_forward_len[1])
         # save rr sequences
-        self.__save_rr_seq(rec, rr_seq, update_rr_seq_json)
+        self.__save_rr_seq(rec, rr_seq)
 
-    def __save_rr_seq(self, rec: str, rr_seq: List[CFG], update_rr_seq_json: bool = False) -> None:
-        """Save the sliced rr sequences to disk.
+    def __save_rr_seq(self, rec: str, rr_seq: List[CFG]) -> None:
+        """Save the sliced rr sequences to the rr sequence store.
 
         Parameters
         ----------
@@ -1195,8 +1179,6 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             Name of the record.
         rr_seq : List[dict],
             List of the rr_seq (meta-)data.
-        update_rr_seq_json : bool, default False
-            Whether to update the rr_seq.json file.
 
         Returns
         -------
@@ -1206,14 +1188,9 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         subject = self.reader.get_subject_id(rec)
         ordering = list(range(len(rr_seq)))
         DEFAULTS.RNG.shuffle(ordering)
-        for i, idx in enumerate(ordering):
-            item = rr_seq[idx]
-            filename = f"{rec}_{i:07d}.{self.rr_seq_ext}".replace("data", "R")
-            data_path = self.rr_seq_dirs[subject] / filename
-            savemat(str(data_path), item)
-            self.__all_rr_seq[subject].append(Path(filename).with_suffix("").name)
-        if update_rr_seq_json:
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+        names = [f"{rec}_{i:07d}".replace("data", "R") for i in range(len(rr_seq))]
+        self.rr_seq_store.append(rec, [rr_seq[idx] for idx in ordering], names, group=subject)
+        self.__all_rr_seq[subject].extend(names)
 
     def _clear_cached_rr_seq(self, recs: Optional[Sequence[str]] = None) -> None:
         """Clear the cached rr sequences.
@@ -1230,22 +1207,8 @@ class CPSC2021Dataset(ReprMixin, Dataset):
 
         """
         self.__assert_task(["rr_lstm"])
-        if recs is not None:
-            for rec in recs:
-                subject = self.reader.get_subject_id(rec)
-                path = str(self.rr_seq_dirs[subject])
-                for f in [n for n in os.listdir(path) if n.endswith(self.rr_seq_ext)]:
-                    if self._get_rec_name(f) == rec:
-                        os.remove(os.path.join(path, f))
-                        if os.path.splitext(f)[0] in self.__all_rr_seq[subject]:
-                            self.__all_rr_seq[subject].remove(os.path.splitext(f)[0])
-        else:
-            for subject in self.reader.all_subjects:
-                path = str(self.rr_seq_dirs[subject])
-                for f in [n for n in os.listdir(path) if n.endswith(self.rr_seq_ext)]:
-                    os.remove(os.path.join(path, f))
-                    if os.path.splitext(f)[0] in self.__all_rr_seq[subject]:
-                        self.__all_rr_seq[subject].remove(os.path.splitext(f)[0])
+        self.rr_seq_store.remove(recs)
+        self.__all_rr_seq = CFG({s: self.rr_seq_store.names(group=s) for s in self.reader.all_subjects})
         self.rr_seq = list_sum([self.__all_rr_seq[subject] for subject in self.subjects])
 
     def _get_rec_name(self, seg_or_rr: str) -> str:
@@ -1264,7 +1227,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
             that the segment or rr_seq was generated from.
 
         """
-        rec = re.sub("[RS]", "data", os.path.splitext(seg_or_rr)[0])[:-8]
+        rec = re.sub("[RS]", "data", seg_or_rr)[:-8]
         return rec
 
     def _train_test_split(self, train_ratio: float = 0.8, force_recompute: bool = False) -> Dict[str, List[str]]:
@@ -1378,7 +1341,7 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         None
 
         """
-        seg_data = self._load_seg_data(seg)
+        seg_data = np.array(self._load_seg_data(seg))
         print(f"seg_data.shape = {seg_data.shape}")
         seg_ann = self._load_seg_ann(seg)
         seg_ann["af_episodes"] = mask_to_intervals(seg_ann["af_mask"], vals=1)
@@ -1399,19 +1362,52 @@ class CPSC2021Dataset(ReprMixin, Dataset):
         ]
 
 
+_WORKER_DATASET = None
+
+
+def _init_persistence_worker(dataset: CPSC2021Dataset) -> None:
+    """Initializer of the worker processes of :meth:`CPSC2021Dataset.persistence`."""
+    global _WORKER_DATASET
+    dataset._use_writer_store(f"worker_{os.getpid()}")
+    _WORKER_DATASET = dataset
+
+
+def _run_seeded(dataset: CPSC2021Dataset, method: str, rec: str, seed: int, kwargs: dict) -> None:
+    """Run the per-record method with the random number generators of `DEFAULTS`
+    seeded by the seed of the record, restoring the generators afterwards.
+    """
+    rngs = (DEFAULTS.RNG, DEFAULTS.RNG_sample, DEFAULTS.RNG_randint)
+    DEFAULTS.RNG = np.random.default_rng(seed=seed)
+    DEFAULTS.RNG_sample = partial(DEFAULTS.RNG.choice, replace=False, shuffle=False)
+    DEFAULTS.RNG_randint = partial(DEFAULTS.RNG.integers, endpoint=True)
+    try:
+        getattr(dataset, method)(rec=rec, **kwargs)
+    finally:
+        DEFAULTS.RNG, DEFAULTS.RNG_sample, DEFAULTS.RNG_randint = rngs
+
+
+def _persistence_worker(task: Tuple[str, str, int, dict]) -> str:
+    """Run the per-record method (name, record, seed, kwargs) in a worker process."""
+    method, rec, seed, kwargs = task
+    _run_seeded(_WORKER_DATASET, method, rec, seed, kwargs)
+    return rec
+
+
 class _FastDataReader(ReprMixin, Dataset):
     """Fast data reader.
 
     Parameters
     ----------
-    reader : CR
-        The reader to read the data.
-    records : Sequence[str]
-        The list of records to read.
     config : CFG
         The configuration.
-    ppm : PreprocManager, optional
-        The preprocessor manager.
+    task : str
+        The task of the data.
+    seg_ppm : PreprocManager
+        The preprocessor manager for the segments.
+    store : SegmentStore
+        The store of the segments (or rr sequences).
+    files : List[str]
+        Names of the segments (or rr sequences) to read.
 
     """
 
@@ -1420,16 +1416,14 @@ class _FastDataReader(ReprMixin, Dataset):
         config: CFG,
         task: str,
         seg_ppm: PreprocManager,
-        file_dirs: dict,
+        store: SegmentStore,
         files: List[str],
-        file_ext: str,
     ) -> None:
         self.config = config
         self.task = task
         self.seg_ppm = seg_ppm
-        self.file_dirs = file_dirs
+        self.store = store
         self.files = files
-        self.file_ext = file_ext
 
         self.seglen = self.config[self.task].input_len
         self.n_classes = len(self.config[task].classes)
@@ -1447,13 +1441,9 @@ class _FastDataReader(ReprMixin, Dataset):
             "main",
         ]:
             seg_name = self.files[index]
-            subject = seg_name.split("_")[1]
-            seg_data_fp = self.file_dirs.data[subject] / f"{seg_name}.{self.file_ext}"
-            seg_data = loadmat(str(seg_data_fp))["ecg"]
-            for idx in range(seg_data.shape[0]):
-                seg_data[idx] = remove_spikes_naive(seg_data[idx])
-            seg_ann_fp = self.file_dirs.ann[subject] / f"{seg_name}.{self.file_ext}"
-            seg_label = loadmat(str(seg_ann_fp))[self._seg_keys[self.task]].reshape((self.seglen, -1))
+            seg_data = self.store.get(seg_name, "data")
+            seg_data = np.stack([remove_spikes_naive(lead) for lead in seg_data])
+            seg_label = self.store.get(seg_name, self._seg_keys[self.task]).reshape((self.seglen, -1))
             if self.config[self.task].reduction > 1:
                 reduction = self.config[self.task].reduction
                 seg_len, n_classes = seg_label.shape
@@ -1484,9 +1474,7 @@ class _FastDataReader(ReprMixin, Dataset):
             "rr_lstm",
         ]:
             seq_name = self.files[index]
-            subject = seq_name.split("_")[1]
-            rr_seq_path = self.file_dirs[subject] / f"{seq_name}.{self.file_ext}"
-            rr_seq = loadmat(str(rr_seq_path))
+            rr_seq = self.store.get(seq_name)
             rr_seq["rr"] = rr_seq["rr"].reshape((self.seglen, 1))
             rr_seq["label"] = rr_seq["label"].reshape((self.seglen, self.n_classes))
             weight_mask = generate_weight_mask(
@@ -1507,8 +1495,7 @@ class _FastDataReader(ReprMixin, Dataset):
     def extra_repr_keys(self) -> List[str]:
         return [
             "task",
-            "reader",
-            "ppm",
+            "store",
         ]
 
 
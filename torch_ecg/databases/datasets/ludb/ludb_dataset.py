@@ -252,9 +252,10 @@ class _FastDataReader(ReprMixin, Dataset):
             return signals, masks
         # expand masks to have n vectors, with n = n_classes
         labels = np.ones((*masks.shape, len(self.config.mask_class_map)), dtype=self.dtype)
-        for i in range(len(self.leads)):
-            for key, val in self.config.mask_class_map.items():
-                labels[i, ..., val] = (masks[i, ...] == self.config.class_map[key]).astype(self.dtype)
+        keys = list(self.config.mask_class_map.keys())
+        labels[..., [self.config.mask_class_map[k] for k in keys]] = (
+            masks[..., np.newaxis] == np.array([self.config.class_map[k] for k in keys])
+        ).astype(self.dtype)
         return signals, labels
 
     def extra_repr_keys(self) -> List[str]:
@@ -1,23 +1,23 @@
 """
 """
 
-import json
+import multiprocessing as mp
 import os
 import warnings
 from copy import deepcopy
-from pathlib import Path
+from functools import partial
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from scipy import signal as SS
-from scipy.io import loadmat, savemat
 from torch.utils.data.dataset import Dataset
 from tqdm.auto import tqdm
 
 from ...._preprocessors import PreprocManager
 from ....cfg import CFG, DEFAULTS
 from ....databases import MITDB as DR
-from ....utils.misc import ReprMixin, add_docstring, get_record_list_recursive3, list_sum
+from ....utils.misc import ReprMixin, list_sum
+from ....utils.segment_store import SegmentStore
 from ....utils.utils_data import ensure_siglen, generate_weight_mask, mask_to_intervals, one_hot_encode
 from ....utils.utils_nn import default_collate_fn as collate_fn
 from ....utils.utils_signal import remove_spikes_naive
@@ -102,12 +102,10 @@ class MITDBDataset(ReprMixin, Dataset):
         self.segments_base_dir = self.config.db_dir / "segments"
         self.segments_base_dir.mkdir(parents=True, exist_ok=True)
         self.segment_name_pattern = "S_[\\d]{3}_[\\d]{7}"
-        self.segment_ext = "mat"
         # rr_dir for sequence of rr intervals of fix length
         self.rr_seq_base_dir = self.config.db_dir / "rr_seq"
         self.rr_seq_base_dir.mkdir(parents=True, exist_ok=True)
         self.rr_seq_name_pattern = "R_[\\d]{3}_[\\d]{7}"
-        self.rr_seq_ext = "mat"
 
         self._all_data = None
         self._all_labels = None
@@ -188,9 +186,7 @@ class MITDBDataset(ReprMixin, Dataset):
             "af_event",
         ]:
             # for qrs detection
-            self.segments_dirs = CFG()
             self.__all_segments = CFG()
-            self.segments_json = self.segments_base_dir / "segments.json"
             self._ls_segments()
             self.segments = list_sum([self.__all_segments[rec] for rec in self.records])
             # if self.__DEBUG__:
@@ -204,9 +200,8 @@ class MITDBDataset(ReprMixin, Dataset):
                 self.config,
                 self.task,
                 self.seg_ppm,
-                self.segments_dirs,
+                self.seg_store,
                 self.segments,
-                self.segment_ext,
                 self.reader.rhythm_types_map,
             )
             if self.lazy:
@@ -238,9 +233,7 @@ class MITDBDataset(ReprMixin, Dataset):
         elif self.task in [
             "rr_lstm",
         ]:
-            self.rr_seq_dirs = CFG()
             self.__all_rr_seq = CFG()
-            self.rr_seq_json = self.rr_seq_base_dir / "rr_seq.json"
             self._ls_rr_seq()
             self.rr_seq = list_sum([self.__all_rr_seq[rec] for rec in self.records])
             # if self.__DEBUG__:
@@ -254,9 +247,8 @@ class MITDBDataset(ReprMixin, Dataset):
                 self.config,
                 self.task,
                 self.seg_ppm,
-                self.rr_seq_dirs,
+                self.rr_seq_store,
                 self.rr_seq,
-                self.rr_seq_ext,
                 self.reader.rhythm_types_map,
             )
             if self.lazy:
@@ -298,42 +290,34 @@ class MITDBDataset(ReprMixin, Dataset):
         self.__set_task(task, lazy)
 
     def _ls_segments(self) -> None:
-        """Find all the segments in the segments base directory,
-        and store them in some private attributes.
+        """Open the store of the segments,
+        and collect the segments into some private attributes.
         """
-        for item in ["data", "ann"]:
-            self.segments_dirs[item] = CFG()
-            for rec in self.reader:
-                self.segments_dirs[item][rec] = self.segments_base_dir / item / rec
-                self.segments_dirs[item][rec].mkdir(parents=True, exist_ok=True)
-        if self.segments_json.is_file():
-            self.__all_segments = json.loads(self.segments_json.read_text())
-            # return
-        print("please allow the reader a few minutes to collect " f"the segments from {self.segments_base_dir}...")
-        seg_filename_pattern = f"{self.segment_name_pattern}\\.{self.segment_ext}"
-        self.__all_segments = CFG(
-            {rec: get_record_list_recursive3(str(self.segments_dirs.data[rec]), seg_filename_pattern) for rec in self.reader}
+        self.seg_store = SegmentStore(
+            self.segments_base_dir / "store",
+            fields={
+                "data": ((self.config.n_leads, self.seglen), "float32"),
+                "qrs_mask": ((self.seglen,), "int8"),
+                "rhythm_mask": ((self.seglen,), "int8"),
+                "interval": ((2,), "int64"),
+            },
+            ragged_fields={"rpeaks": "int32"},
         )
-        if all([len(self.__all_segments[rec]) > 0 for rec in self.reader]):
-            self.segments_json.write_text(json.dumps(self.__all_segments, ensure_ascii=False))
+        self.__all_segments = CFG({rec: self.seg_store.names(record=rec) for rec in self.reader})
 
     def _ls_rr_seq(self) -> None:
-        """Find all the rr sequences in the rr sequences base directory,
-        and store them in some private attributes.
+        """Open the store of the rr sequences,
+        and collect the rr sequences into some private attributes.
         """
-        for rec in self.reader:
-            self.rr_seq_dirs[rec] = self.rr_seq_base_dir / rec
-            self.rr_seq_dirs[rec].mkdir(parents=True, exist_ok=True)
-        if self.rr_seq_json.is_file():
-            self.__all_rr_seq = json.loads(self.rr_seq_json.read_text())
-            # return
-        print("please allow the reader a few minutes to collect " f"the rr sequences from {self.rr_seq_base_dir}...")
-        rr_seq_filename_pattern = f"{self.rr_seq_name_pattern}\\.{self.rr_seq_ext}"
-        self.__all_rr_seq = CFG(
-            {rec: get_record_list_recursive3(self.rr_seq_dirs[rec], rr_seq_filename_pattern) for rec in self.reader}
+        self.rr_seq_store = SegmentStore(
+            self.rr_seq_base_dir / "store",
+            fields={
+                "rr": ((self.seglen,), "float32"),
+                "label": ((self.seglen,), "int8"),
+                "interval": ((2,), "int64"),
+            },
         )
-        if all([len(self.__all_rr_seq[rec]) > 0 for rec in self.reader]):
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+        self.__all_rr_seq = CFG({rec: self.rr_seq_store.names(record=rec) for rec in self.reader})
 
     @property
     def all_segments(self) -> CFG:
@@ -378,30 +362,6 @@ class MITDBDataset(ReprMixin, Dataset):
                     self._all_masks[index],
                 )
 
-    def _get_seg_data_path(self, seg: str) -> Path:
-        """Get the path of the data file of the segment.
-
-        Parameters
-        ----------
-        seg : str
-            Name of the segment, of pattern like "S_100_0000193".
-
-        Returns
-        -------
-        pathlib.Path
-            Absolute path of the data file of the segment.
-
-        """
-        rec = self._get_rec_name(seg)
-        fp = self.segments_dirs.data[rec] / f"{seg}.{self.segment_ext}"
-        return fp
-
-    @add_docstring(_get_seg_data_path.__doc__.replace("data file", "annotation file"))
-    def _get_seg_ann_path(self, seg: str) -> Path:
-        rec = self._get_rec_name(seg)
-        fp = self.segments_dirs.ann[rec] / f"{seg}.{self.segment_ext}"
-        return fp
-
     def _load_seg_data(self, seg: str) -> np.ndarray:
         """Load data of the segment.
 
@@ -414,10 +374,10 @@ class MITDBDataset(ReprMixin, Dataset):
         -------
         numpy.ndarray
             Data of the segment, of shape ``(2, self.seglen)``.
+            It is a read-only view into the segment store.
 
         """
-        seg_data_fp = self._get_seg_data_path(seg)
-        seg_data = loadmat(str(seg_data_fp))["ecg"]
+        seg_data = self.seg_store.get(seg, "data")
         return seg_data
 
     def _load_seg_ann(self, seg: str) -> dict:
@@ -440,8 +400,7 @@ class MITDBDataset(ReprMixin, Dataset):
                   original ECG record of the segment
 
         """
-        seg_ann_fp = self._get_seg_ann_path(seg)
-        seg_ann = {k: v.flatten() for k, v in loadmat(str(seg_ann_fp)).items() if not k.startswith("__")}
+        seg_ann = {k: v for k, v in self.seg_store.get(seg).items() if k != "data"}
         return seg_ann
 
     def _load_seg_mask(self, seg: str, task: Optional[str] = None) -> Union[np.ndarray, Dict[str, np.ndarray]]:
@@ -517,24 +476,6 @@ class MITDBDataset(ReprMixin, Dataset):
         ).squeeze(axis=1)
         return seq_lab
 
-    def _get_rr_seq_path(self, seq_name: str) -> Path:
-        """Get path of the data file of the rr_seq.
-
-        Parameters
-        ----------
-        seq_name : str
-            Name of the rr_seq, of pattern like "R_100_0000193".
-
-        Returns
-        -------
-        pathlib.Path
-            Absolute path of the data file of the rr_seq.
-
-        """
-        rec = self._get_rec_name(seq_name)
-        fp = self.rr_seq_dirs[rec] / f"{seq_name}.{self.rr_seq_ext}"
-        return fp
-
     def _load_rr_seq(self, seq_name: str) -> Dict[str, np.ndarray]:
         """Load metadata of sequence of rr intervals.
 
@@ -556,22 +497,26 @@ class MITDBDataset(ReprMixin, Dataset):
                   in the whole rr sequence in the original record
 
         """
-        rr_seq_path = self._get_rr_seq_path(seq_name)
-        rr_seq = {k: v for k, v in loadmat(str(rr_seq_path)).items() if not k.startswith("__")}
+        rr_seq = self.rr_seq_store.get(seq_name)
         rr_seq["rr"] = rr_seq["rr"].reshape((self.seglen, 1))
         rr_seq["label"] = rr_seq["label"].reshape((self.seglen, self.n_classes))
-        rr_seq["interval"] = rr_seq["interval"].flatten()
         return rr_seq
 
-    def persistence(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def persistence(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Save the preprocessed data to disk.
 
+        Records that are already processed are skipped,
+        hence an interrupted run can be resumed by calling this method again.
+
         Parameters
         ----------
         force_recompute : bool, default False
             Whether to force recompute the preprocessed data.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to process the records.
+            If is 0 or 1, the records are processed in the current process.
 
         Returns
         -------
@@ -594,6 +539,7 @@ class MITDBDataset(ReprMixin, Dataset):
         self._slice_data(
             force_recompute=force_recompute,
             verbose=verbose,
+            num_workers=num_workers,
         )
 
         self.__set_task("rr_lstm", lazy=True)
@@ -602,15 +548,83 @@ class MITDBDataset(ReprMixin, Dataset):
         self._slice_rr_seq(
             force_recompute=force_recompute,
             verbose=verbose,
+            num_workers=num_workers,
         )
 
         self.__set_task(original_task, lazy=original_lazy)
 
-    def _slice_data(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def _run_per_record(
+        self,
+        method: str,
+        records: Sequence[str],
+        desc: str,
+        verbose: int = 0,
+        num_workers: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        """Run a per-record method on the records,
+        serially or over a pool of worker processes.
+
+        Parameters
+        ----------
+        method : str
+            Name of the per-record method, e.g. "_slice_one_record".
+        records : Sequence[str]
+            Names of the records to process.
+        desc : str
+            Description shown in the progress bar.
+        verbose : int, default 0
+            Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes.
+            If is 0 or 1, the records are processed in the current process.
+        kwargs : dict, optional
+            Other keyword arguments passed to the method.
+
+        Returns
+        -------
+        None
+
+        """
+        with tqdm(
+            total=len(records),
+            desc=desc,
+            unit="record",
+            dynamic_ncols=True,
+            mininterval=1.0,
+        ) as pbar:
+            # each record is processed with its own seed, so that the results
+            # depend neither on the number nor on the scheduling of the workers
+            rec_seeds = {rec: DEFAULTS.SEED + idx for idx, rec in enumerate(self.reader.all_records)}
+            if num_workers <= 1 or len(records) <= 1:
+                for rec in records:
+                    _run_seeded(self, method, rec, rec_seeds[rec], dict(kwargs, verbose=verbose))
+                    pbar.update(1)
+                return
+            tasks = [(method, rec, rec_seeds[rec], kwargs) for rec in records]
+            with mp.Pool(
+                processes=min(num_workers, len(records)),
+                initializer=_init_persistence_worker,
+                initargs=(self,),
+            ) as pool:
+                for _ in pool.imap_unordered(_persistence_worker, tasks):
+                    pbar.update(1)
+
+    def _use_writer_store(self, writer_id: str) -> None:
+        """Let the store of the current task write to its own shard and index files,
+        used in worker processes of :meth:`persistence`.
+        """
+        if self.task in ["qrs_detection", "rhythm_segmentation", "af_event"]:
+            self.seg_store = SegmentStore(self.seg_store.path, writer_id=writer_id)
+        elif self.task in ["rr_lstm"]:
+            self.rr_seq_store = SegmentStore(self.rr_seq_store.path, writer_id=writer_id)
+
+    def _slice_data(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Slice all records into segments.
 
         Slice all records into segments of length `self.seglen`,
         and perform data augmentations specified in `self.config`.
+        Records already completed in the segment store are skipped.
 
         Parameters
         ----------
@@ -618,6 +632,8 @@ class MITDBDataset(ReprMixin, Dataset):
             Whether to force recompute the preprocessed data.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to slice the records.
 
         Returns
         -------
@@ -633,37 +649,31 @@ class MITDBDataset(ReprMixin, Dataset):
         )
         if force_recompute:
             self._clear_cached_segments()
-        with tqdm(
-            enumerate(self.reader),
-            total=len(self.reader),
+        # collect segments written by workers of a previous (interrupted) run
+        self.seg_store.merge()
+        completed = set(self.seg_store.completed_records)
+        self._run_per_record(
+            "_slice_one_record",
+            [rec for rec in self.reader if rec not in completed],
             desc="Slicing data",
-            unit="record",
-            dynamic_ncols=True,
-            mininterval=1.0,
-        ) as pbar:
-            for idx, rec in pbar:
-                self._slice_one_record(
-                    rec=rec,
-                    force_recompute=False,
-                    update_segments_json=False,
-                    verbose=verbose,
-                )
-                # if verbose >= 1:
-                #     print(f"{idx+1}/{len(self.reader)} records", end="\r")
-        if force_recompute:
-            self.segments_json.write_text(json.dump(self.__all_segments, ensure_ascii=False))
+            verbose=verbose,
+            num_workers=num_workers,
+        )
+        self.seg_store.merge()
+        self.__all_segments = CFG({rec: self.seg_store.names(record=rec) for rec in self.reader})
+        self.segments = list_sum([self.__all_segments[rec] for rec in self.records])
 
     def _slice_one_record(
         self,
         rec: str,
         force_recompute: bool = False,
-        update_segments_json: bool = False,
         verbose: int = 0,
     ) -> None:
         """Slice one record into segments.
 
         Slice one record into segments of length `self.seglen`,
         and perform data augmentations specified in `self.config`.
+        The segments are appended to the segment store.
 
         Parameters
         ----------
@@ -671,10 +681,6 @@ class MITDBDataset(ReprMixin, Dataset):
             Name of the record.
         force_recompute : bool, default False
             Whether to force recompute the preprocessed data.
-        update_segments_json : bool, default False
-            If both `force_recompute` and `update_segments_json` are True,
-            the file `self.segments_json` will be updated.
-            Useful when slicing not all records.
         verbose : int, default 0
             Verbosity level for printing the progress.
 
@@ -690,8 +696,7 @@ class MITDBDataset(ReprMixin, Dataset):
                 "af_event",  # segmentation of AF events
             ]
         )
-        rec_segs = self.__all_segments[rec]
-        if (not force_recompute) and len(rec_segs) > 0:
+        if (not force_recompute) and rec in self.seg_store.completed_records:
             return
         elif force_recompute:
             self._clear_cached_segments([rec])
@@ -741,7 +746,7 @@ class MITDBDataset(ReprMixin, Dataset):
 
         if len(critical_points) == 0:
             # save segments
-            self.__save_segments(rec, segments, update_segments_json)
+            self.__save_segments(rec, segments)
             return
 
         # special segments around critical_points with random forward_len in critical_forward_len
@@ -768,7 +773,7 @@ class MITDBDataset(ReprMixin, Dataset):
                     start_idx += DEFAULTS.RNG_randint(critical_forward_len[0], critical_forward_len[1])
 
         # save segments
-        self.__save_segments(rec, segments, update_segments_json)
+        self.__save_segments(rec, segments)
 
     def __generate_segment(
         self,
@@ -897,8 +902,8 @@ class MITDBDataset(ReprMixin, Dataset):
         )
         return new_seg
 
-    def __save_segments(self, rec: str, segments: List[CFG], update_segments_json: bool = False) -> None:
-        """Save the segments to disk.
+    def __save_segments(self, rec: str, segments: List[CFG]) -> None:
+        """Save the segments to the segment store.
 
         Parameters
         ----------
@@ -906,32 +911,13 @@ class MITDBDataset(ReprMixin, Dataset):
             Name of the record
         segments : List[dict]
             List of the segments (meta-)data to be saved.
-        update_segments_json : bool, default False
-            Whether to update the segments.json file.
 
         """
         ordering = list(range(len(segments)))
         DEFAULTS.RNG.shuffle(ordering)
-        for i, idx in enumerate(ordering):
-            seg = segments[idx]
-            filename = f"S_{rec}_{i:07d}.{self.segment_ext}"
-            data_path = self.segments_dirs.data[rec] / filename
-            savemat(str(data_path), {"ecg": seg.data})
-            self.__all_segments[rec].append(Path(filename).with_suffix("").name)
-            ann_path = self.segments_dirs.ann[rec] / filename
-            savemat(
-                str(ann_path),
-                {
-                    k: v
-                    for k, v in seg.items()
-                    if k
-                    not in [
-                        "data",
-                    ]
-                },
-            )
-        if update_segments_json:
-            self.segments_json.write_text(json.dumps(self.__all_segments, ensure_ascii=False))
+        names = [f"S_{rec}_{i:07d}" for i in range(len(segments))]
+        self.seg_store.append(rec, [segments[idx] for idx in ordering], names)
+        self.__all_segments[rec].extend(names)
 
     def _clear_cached_segments(self, recs: Optional[Sequence[str]] = None) -> None:
         """Clear the cached segments of the records.
@@ -954,29 +940,23 @@ class MITDBDataset(ReprMixin, Dataset):
                 "af_event",  # segmentation of AF events
             ]
         )
-        if recs is None:
-            recs = self.reader.all_records
-        for rec in recs:
-            for item in [
-                "data",
-                "ann",
-            ]:
-                path = str(self.segments_dirs[item][rec])
-                for f in [n for n in os.listdir(path) if n.endswith(self.segment_ext)]:
-                    os.remove(os.path.join(path, f))
-                    if os.path.splitext(f)[0] in self.__all_segments[rec]:
-                        self.__all_segments[rec].remove(os.path.splitext(f)[0])
+        self.seg_store.remove(recs)
+        self.__all_segments = CFG({rec: self.seg_store.names(record=rec) for rec in self.reader})
         self.segments = list_sum([self.__all_segments[rec] for rec in self.records])
 
-    def _slice_rr_seq(self, force_recompute: bool = False, verbose: int = 0) -> None:
+    def _slice_rr_seq(self, force_recompute: bool = False, verbose: int = 0, num_workers: int = 0) -> None:
         """Slice sequences of rr intervals into fixed length (sub)sequences.
 
+        Records already completed in the rr sequence store are skipped.
+
         Parameters
         ----------
         force_recompute : bool, default False
             Whether to force recompute the rr sequences.
         verbose : int, default 0
             Verbosity level for printing the progress.
+        num_workers : int, default 0
+            Number of worker processes to slice the records.
 
         Returns
         -------
@@ -986,31 +966,24 @@ class MITDBDataset(ReprMixin, Dataset):
         self.__assert_task(["rr_lstm"])
         if force_recompute:
             self._clear_cached_rr_seq()
-        with tqdm(
-            enumerate(self.reader),
-            total=len(self.reader),
+        # collect rr sequences written by workers of a previous (interrupted) run
+        self.rr_seq_store.merge()
+        completed = set(self.rr_seq_store.completed_records)
+        self._run_per_record(
+            "_slice_rr_seq_one_record",
+            [rec for rec in self.reader if rec not in completed],
             desc="Slicing rr_seq",
-            unit="record",
-            dynamic_ncols=True,
-            mininterval=1.0,
-        ) as pbar:
-            for idx, rec in pbar:
-                self._slice_rr_seq_one_record(
-                    rec=rec,
-                    force_recompute=False,
-                    update_rr_seq_json=False,
-                    verbose=verbose,
-                )
-                # if verbose >= 1:
-                #     print(f"{idx+1}/{len(self.reader.all_records)} records", end="\r")
-        if force_recompute:
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+            verbose=verbose,
+            num_workers=num_workers,
+        )
+        self.rr_seq_store.merge()
+        self.__all_rr_seq = CFG({rec: self.rr_seq_store.names(record=rec) for rec in self.reader})
+        self.rr_seq = list_sum([self.__all_rr_seq[rec] for rec in self.records])
 
     def _slice_rr_seq_one_record(
         self,
         rec: str,
         force_recompute: bool = False,
-        update_rr_seq_json: bool = False,
         verbose: int = 0,
     ) -> None:
         """Slice sequences of rr intervals into
@@ -1023,8 +996,6 @@ class MITDBDataset(ReprMixin, Dataset):
         force_recompute : bool, default False,
             If True, the rr sequences will be recomputed regardless of
             whether they have been computed before.
-        update_rr_seq_json : bool, default False
-            Whether to update the rr_seq.json file.
         verbose : int, default 0
             Verbosity level for printing the progress.
 
@@ -1034,8 +1005,7 @@ class MITDBDataset(ReprMixin, Dataset):
 
         """
         self.__assert_task(["rr_lstm"])
-        rec_rr_seq = self.__all_rr_seq[rec]
-        if (not force_recompute) and len(rec_rr_seq) > 0:
+        if (not force_recompute) and rec in self.rr_seq_store.completed_records:
             return
         elif force_recompute:
             self._clear_cached_rr_seq([rec])
@@ -1047,6 +1017,7 @@ class MITDBDataset(ReprMixin, Dataset):
         rpeaks = self.reader.load_rpeak_indices(rec)
         rr = np.diff(rpeaks) / self.config.fs
         if len(rr) < self.seglen:
+            self.__save_rr_seq(rec, [])
             return
         rhythm_mask = self.reader.load_rhythm_ann(
             rec,
@@ -1092,7 +1063,7 @@ class MITDBDataset(ReprMixin, Dataset):
 
         if len(critical_points) == 0:
             # save rr sequences
-            self.__save_rr_seq(rec, rr_seq, update_rr_seq_json)
+            self.__save_rr_seq(rec, rr_seq)
             return
 
         # special rr_seq around critical_points with random forward_len in critical_forward_len
@@ -1119,10 +1090,10 @@ class MITDBDataset(ReprMixin, Dataset):
                     rr_seq.append(new_rr_seq)
                     start_idx += DEFAULTS.RNG_randint(critical_forward_len[0], critical_forward_len[1])
         # save rr sequences
-        self.__save_rr_seq(rec, rr_seq, update_rr_seq_json)
+        self.__save_rr_seq(rec, rr_seq)
 
-    def __save_rr_seq(self, rec: str, rr_seq: List[CFG], update_rr_seq_json: bool = False) -> None:
-        """Save rr_seq to disk.
+    def __save_rr_seq(self, rec: str, rr_seq: List[CFG]) -> None:
+        """Save rr_seq to the rr sequence store.
 
         Parameters
         ----------
@@ -1130,8 +1101,6 @@ class MITDBDataset(ReprMixin, Dataset):
             Name of the record.
         rr_seq : List[dict]
             List of the rr_seq (meta-)data to be saved.
-        update_rr_seq_json : bool, default False
-            Whether to update the rr_seq.json file.
 
         Returns
         -------
@@ -1140,14 +1109,9 @@ class MITDBDataset(ReprMixin, Dataset):
         """
         ordering = list(range(len(rr_seq)))
         DEFAULTS.RNG.shuffle(ordering)
-        for i, idx in enumerate(ordering):
-            item = rr_seq[idx]
-            filename = f"R_{rec}_{i:07d}.{self.rr_seq_ext}"
-            data_path = self.rr_seq_dirs[rec] / filename
-            savemat(str(data_path), item)
-            self.__all_rr_seq[rec].append(Path(filename).with_suffix("").name)
-        if update_rr_seq_json:
-            self.rr_seq_json.write_text(json.dumps(self.__all_rr_seq, ensure_ascii=False))
+        names = [f"R_{rec}_{i:07d}" for i in range(len(rr_seq))]
+        self.rr_seq_store.append(rec, [rr_seq[idx] for idx in ordering], names)
+        self.__all_rr_seq[rec].extend(names)
 
     def _clear_cached_rr_seq(self, recs: Optional[Sequence[str]] = None) -> None:
         """Clear the cached rr sequences.
@@ -1164,14 +1128,8 @@ class MITDBDataset(ReprMixin, Dataset):
 
         """
         self.__assert_task(["rr_lstm"])
-        if recs is None:
-            recs = self.reader.all_records
-        for rec in recs:
-            path = str(self.rr_seq_dirs[rec])
-            for f in [n for n in os.listdir(path) if n.endswith(self.rr_seq_ext)]:
-                os.remove(os.path.join(path, f))
-                if os.path.splitext(f)[0] in self.__all_rr_seq[rec]:
-                    self.__all_rr_seq[rec].remove(os.path.splitext(f)[0])
+        self.rr_seq_store.remove(recs)
+        self.__all_rr_seq = CFG({rec: self.rr_seq_store.names(record=rec) for rec in self.reader})
         self.rr_seq = list_sum([self.__all_rr_seq[rec] for rec in self.records])
 
     def _get_rec_name(self, seg_or_rr: str) -> str:
@@ -1250,7 +1208,7 @@ class MITDBDataset(ReprMixin, Dataset):
         None
 
         """
-        seg_data = self._load_seg_data(seg)
+        seg_data = np.array(self._load_seg_data(seg))
         seg_ann = self._load_seg_ann(seg)
         seg_ann["rhythm_intervals"] = mask_to_intervals(seg_ann["rhythm_mask"], vals=1)
         rec_name = self._get_rec_name(seg)
@@ -1269,19 +1227,54 @@ class MITDBDataset(ReprMixin, Dataset):
         ]
 
 
+_WORKER_DATASET = None
+
+
+def _init_persistence_worker(dataset: MITDBDataset) -> None:
+    """Initializer of the worker processes of :meth:`MITDBDataset.persistence`."""
+    global _WORKER_DATASET
+    dataset._use_writer_store(f"worker_{os.getpid()}")
+    _WORKER_DATASET = dataset
+
+
+def _run_seeded(dataset: MITDBDataset, method: str, rec: str, seed: int, kwargs: dict) -> None:
+    """Run the per-record method with the random number generators of `DEFAULTS`
+    seeded by the seed of the record, restoring the generators afterwards.
+    """
+    rngs = (DEFAULTS.RNG, DEFAULTS.RNG_sample, DEFAULTS.RNG_randint)
+    DEFAULTS.RNG = np.random.default_rng(seed=seed)
+    DEFAULTS.RNG_sample = partial(DEFAULTS.RNG.choice, replace=False, shuffle=False)
+    DEFAULTS.RNG_randint = partial(DEFAULTS.RNG.integers, endpoint=True)
+    try:
+        getattr(dataset, method)(rec=rec, **kwargs)
+    finally:
+        DEFAULTS.RNG, DEFAULTS.RNG_sample, DEFAULTS.RNG_randint = rngs
+
+
+def _persistence_worker(task: Tuple[str, str, int, dict]) -> str:
+    """Run the per-record method (name, record, seed, kwargs) in a worker process."""
+    method, rec, seed, kwargs = task
+    _run_seeded(_WORKER_DATASET, method, rec, seed, kwargs)
+    return rec
+
+
 class _FastDataReader(ReprMixin, Dataset):
     """Fast data reader.
 
     Parameters
     ----------
-    reader : CR
-        The reader to read the data.
-    records : Sequence[str]
-        The list of records to read.
     config : CFG
         The configuration.
-    ppm : PreprocManager, optional
-        The preprocessor manager.
+    task : str
+        The task of the data.
+    seg_ppm : PreprocManager
+        The preprocessor manager for the segments.
+    store : SegmentStore
+        The store of the segments (or rr sequences).
+    files : List[str]
+        Names of the segments (or rr sequences) to read.
+    rhythm_types_map : dict
+        Mapping from rhythm types to the values in the rhythm masks.
 
     """
 
@@ -1290,17 +1283,15 @@ class _FastDataReader(ReprMixin, Dataset):
         config: CFG,
         task: str,
         seg_ppm: PreprocManager,
-        file_dirs: dict,
+        store: SegmentStore,
         files: List[str],
-        file_ext: str,
         rhythm_types_map: dict,
     ) -> None:
         self.config = config
         self.task = task
         self.seg_ppm = seg_ppm
-        self.file_dirs = file_dirs
+        self.store = store
         self.files = files
-        self.file_ext = file_ext
         self.rhythm_types_map = rhythm_types_map
 
         self.seglen = self.config[self.task].input_len
@@ -1321,13 +1312,9 @@ class _FastDataReader(ReprMixin, Dataset):
             "af_event",  # segmentation of AF events
         ]:
             seg_name = self.files[index]
-            rec = seg_name.split("_")[1]
-            seg_data_fp = self.file_dirs.data[rec] / f"{seg_name}.{self.file_ext}"
-            seg_data = loadmat(str(seg_data_fp))["ecg"]
-            for idx in range(seg_data.shape[0]):
-                seg_data[idx] = remove_spikes_naive(seg_data[idx])
-            seg_ann_fp = self.file_dirs.ann[rec] / f"{seg_name}.{self.file_ext}"
-            seg_label = loadmat(str(seg_ann_fp))[self._seg_keys[self.task]].reshape((self.seglen, -1))
+            seg_data = self.store.get(seg_name, "data")
+            seg_data = np.stack([remove_spikes_naive(lead) for lead in seg_data])
+            seg_label = self.store.get(seg_name, self._seg_keys[self.task]).reshape((self.seglen, -1))
             if self.config[self.task].reduction > 1:
                 reduction = self.config[self.task].reduction
                 seg_len, n_classes = seg_label.shape
@@ -1361,11 +1348,9 @@ class _FastDataReader(ReprMixin, Dataset):
             "rr_lstm",
         ]:
             seq_name = self.files[index]
-            rec = seq_name.split("_")[1]
-            rr_seq_path = self.file_dirs[rec] / f"{seq_name}.{self.file_ext}"
-            rr_seq = loadmat(str(rr_seq_path))
+            rr_seq = self.store.get(seq_name)
             rr_seq["rr"] = rr_seq["rr"].reshape((self.seglen, 1))
-            rr_seq["label"] = rr_seq["label"].reshape((self.seglen, self.n_classes))
+            rr_seq["label"] = np.array(rr_seq["label"]).reshape((self.seglen, self.n_classes))
             # map values of `rr_seq["label"]` to 0, 1 according to `self.reader.rhythm_types_map`
             rr_seq["label"][np.where(rr_seq["label"] == self.rhythm_types_map["AFIB"])] = 1
             rr_seq["label"][np.where(rr_seq["label"] != self.rhythm_types_map["AFIB"])] = 0
@@ -1387,6 +1372,5 @@ class _FastDataReader(ReprMixin, Dataset):
     def extra_repr_keys(self) -> List[str]:
         return [
             "task",
-            "reader",
-            "ppm",
+            "store",
         ]
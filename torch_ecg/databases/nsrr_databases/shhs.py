@@ -918,41 +918,40 @@ class SHHS(NSRRDataBase, PSGDataBaseMixin):
         """
         chn = self.match_channel(channel) if channel.lower() != "all" else "all"
         frp = self.get_absolute_path(rec, rec_path, rec_type="psg")
-        self.safe_edf_file_operation("open", frp)
+        reader = self.get_edf_reader(frp)
 
         if chn == "all":
             ret_data = {
                 k: (
-                    self.file_opened.readSignal(idx, digital=not physical),
-                    self.file_opened.getSampleFrequency(idx),
+                    reader.readSignal(idx, digital=not physical),
+                    reader.getSampleFrequency(idx),
                 )
-                for idx, k in enumerate(self.file_opened.getSignalLabels())
+                for idx, k in enumerate(reader.getSignalLabels())
             }
         else:
-            all_signals = [s.lower() for s in self.file_opened.getSignalLabels()]
-            assert chn in all_signals, f"`channel` should be one of `{self.file_opened.getSignalLabels()}`, but got `{chn}`"
+            all_signals = [s.lower() for s in reader.getSignalLabels()]
+            assert chn in all_signals, f"`channel` should be one of `{reader.getSignalLabels()}`, but got `{chn}`"
             idx = all_signals.index(chn)
-            data_fs = self.file_opened.getSampleFrequency(idx)
-            data = self.file_opened.readSignal(idx, digital=not physical)
-            # the `readSignal` method of `EdfReader` does NOT treat
-            # the parameters `start` and `n` correctly
-            # so we have to do it manually
+            data_fs = reader.getSampleFrequency(idx)
             if sampfrom is not None:
                 idx_from = int(round(sampfrom * data_fs))
             else:
-                idx_from = 0
+                idx_from = None
             if sampto is not None:
                 idx_to = int(round(sampto * data_fs))
             else:
-                idx_to = len(data)
-            data = data[idx_from:idx_to]
+                idx_to = None
+            # only the data records covering the window are read;
+            # `readSignal` returns an empty array if the requested range
+            # exceeds the signal, hence the range is clipped beforehand
+            # with the same semantics as slicing
+            idx_from, idx_to, _ = slice(idx_from, idx_to).indices(reader.getNSamples()[idx])
+            data = reader.readSignal(idx, start=idx_from, n=max(0, idx_to - idx_from), digital=not physical)
             if fs is not None and fs != data_fs:
                 data = SS.resample_poly(data, fs, data_fs).astype(data.dtype)
                 data_fs = fs
             ret_data = (data, data_fs)
 
-        self.safe_edf_file_operation("close")
-
         return ret_data
 
     def load_ecg_data(
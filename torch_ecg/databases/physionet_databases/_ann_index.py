@@ -0,0 +1,293 @@
+"""
+Columnar on-disk index of the annotations parsed from the header (.hea) files
+of the header-based databases (:class:`~torch_ecg.databases.CINC2020`,
+:class:`~torch_ecg.databases.CINC2021`).
+
+The headers are parsed (via the ``load_ann`` method of the reader) once,
+over a pool of worker processes, and the sampling frequencies, signal lengths,
+demographics and diagnoses of the records are stored as columns of a
+compressed ``.npz`` file, from which the labels and the information of
+the subjects are answered without touching the headers.
+
+"""
+
+import multiprocessing as mp
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+from tqdm.auto import tqdm
+
+from ..base import PhysioNetDataBase
+
+__all__ = [
+    "AnnIndex",
+    "build_ann_index",
+]
+
+
+_INDEX_VERSION = 1
+
+
+class AnnIndex:
+    """Columnar index of the annotations of the records.
+
+    The index holds the columns
+
+        - "records": names of the records
+        - "nb_leads", "fs", "nb_samples": integer columns
+        - "age": float column, with NaN for unknown ages
+        - "sex", "medical_prescription", "history", "symptom_or_surgery": string columns
+        - "diagnosis": multi-hot matrix of shape ``(n_records, n_codes)``,
+          whose nonzero entries are the (1-based) positions of the diagnoses
+          in the parsed lists of diagnoses of the records
+        - "diagnosis_code", "diagnosis_abbr", "diagnosis_fullname":
+          SNOMED CT codes, abbreviations and full names of the columns of the multi-hot matrix
+        - "diagnosis_scored": whether the diagnoses of the columns are scored
+
+    Parameters
+    ----------
+    columns : dict, optional
+        The columns of the index. If is None, the index is empty.
+
+    """
+
+    __name__ = "AnnIndex"
+
+    scalar_items = [
+        "nb_leads",
+        "fs",
+        "nb_samples",
+        "age",
+        "sex",
+        "medical_prescription",
+        "history",
+        "symptom_or_surgery",
+    ]
+    _int_items = ["nb_leads", "fs", "nb_samples"]
+    _label_items = ["diagnosis_code", "diagnosis_abbr", "diagnosis_fullname"]
+
+    def __init__(self, columns: Optional[Dict[str, np.ndarray]] = None) -> None:
+        if columns is None:
+            columns = self._from_rows([], [])
+        self.columns = columns
+        self._rows = {rec: idx for idx, rec in enumerate(columns["records"].tolist())}
+
+    @classmethod
+    def _from_rows(cls, records: Sequence[str], rows: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Columns of the index built from the rows returned by :func:`_ann_index_row`."""
+        codes = {}  # code -> (abbr, fullname, scored)
+        for row in rows:
+            for code, abbr, fullname in zip(*[row[k] for k in cls._label_items]):
+                codes.setdefault(code, (abbr, fullname, code in row["diagnosis_scored"]))
+        code_cols = {code: idx for idx, code in enumerate(codes)}
+        max_len = max([len(row["diagnosis_code"]) for row in rows], default=0)
+        diagnosis = np.zeros((len(rows), len(codes)), dtype=np.min_scalar_type(max_len))
+        for idx, row in enumerate(rows):
+            for pos, code in enumerate(row["diagnosis_code"]):
+                if diagnosis[idx, code_cols[code]] == 0:  # duplicates keep the first position
+                    diagnosis[idx, code_cols[code]] = pos + 1
+        columns = {
+            "version": np.array(_INDEX_VERSION),
+            "records": np.array(list(records), dtype=str),
+            "diagnosis": diagnosis,
+            "diagnosis_code": np.array(list(codes), dtype=str),
+            "diagnosis_abbr": np.array([v[0] for v in codes.values()], dtype=str),
+            "diagnosis_fullname": np.array([v[1] for v in codes.values()], dtype=str),
+            "diagnosis_scored": np.array([v[2] for v in codes.values()], dtype=bool),
+        }
+        for k in cls.scalar_items:
+            if k in cls._int_items:
+                columns[k] = np.array([row[k] for row in rows], dtype=np.int64)
+            elif k == "age":
+                columns[k] = np.array([row[k] for row in rows], dtype=np.float64)
+            else:
+                columns[k] = np.array([row[k] for row in rows], dtype=str)
+        return columns
+
+    @classmethod
+    def from_rows(cls, records: Sequence[str], rows: Sequence[Dict[str, Any]]) -> "AnnIndex":
+        """Build the index from the rows returned by :func:`_ann_index_row`."""
+        return cls(cls._from_rows(records, rows))
+
+    @classmethod
+    def load(cls, path: Union[str, bytes, os.PathLike]) -> "AnnIndex":
+        """Load the index from the ``.npz`` file.
+        An empty index is returned if the file does not exist,
+        or is of an outdated version.
+        """
+        path = Path(path)
+        if not path.is_file():
+            return cls()
+        with np.load(path, allow_pickle=False) as npz:
+            if "version" not in npz.files or int(npz["version"]) != _INDEX_VERSION:
+                return cls()
+            return cls({k: npz[k] for k in npz.files})
+
+    def save(self, path: Union[str, bytes, os.PathLike]) -> None:
+        """Save the index into the ``.npz`` file."""
+        path = Path(path)
+        # written to a temporary file first, so that concurrent readers never see partial files
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **self.columns)
+        os.replace(tmp_path, path)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """The rows of the index, the inverse of :meth:`from_rows`."""
+        return [
+            {
+                **{k: self.get(rec, k) for k in self.scalar_items},
+                **self.get_diagnosis(rec, scored_only=False),
+                "diagnosis_scored": self.get_diagnosis(rec, scored_only=True)["diagnosis_code"],
+            }
+            for rec in self.records
+        ]
+
+    def merge(self, records: Sequence[str], rows: Sequence[Dict[str, Any]]) -> "AnnIndex":
+        """Merge the rows of the records into (a copy of) the index,
+        replacing the existing rows of the records.
+        """
+        new_records = set(records)
+        old_records, old_rows = [], []
+        for rec, row in zip(self.records, self.rows()):
+            if rec not in new_records:
+                old_records.append(rec)
+                old_rows.append(row)
+        return self.from_rows(old_records + list(records), old_rows + list(rows))
+
+    @property
+    def records(self) -> List[str]:
+        """Names of the records in the index."""
+        return self.columns["records"].tolist()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, rec: str) -> bool:
+        return rec in self._rows
+
+    def get(self, rec: str, item: str) -> Any:
+        """Get one item (in :attr:`scalar_items`) of the annotations of the record."""
+        value = self.columns[item][self._rows[rec]]
+        if item in self._int_items:
+            return int(value)
+        if item == "age":
+            return np.nan if np.isnan(value) else int(value)
+        return str(value)
+
+    def get_diagnosis(self, rec: str, scored_only: bool = False) -> Dict[str, List[str]]:
+        """Get the diagnoses of the record, in the same format as
+        the items "diagnosis" and "diagnosis_scored" of the annotations.
+        """
+        row = self.columns["diagnosis"][self._rows[rec]]
+        cols = np.flatnonzero(row)
+        cols = cols[np.argsort(row[cols], kind="stable")]
+        if scored_only:
+            cols = cols[self.columns["diagnosis_scored"][cols]]
+        return {k: self.columns[k][cols].tolist() for k in self._label_items}
+
+    def label_counts(self, records: Iterable[str], scored_only: bool = True) -> Dict[str, int]:
+        """Numbers of appearance of the diagnoses (abbreviations) in the records."""
+        rows = [self._rows[rec] for rec in records]
+        counts = (self.columns["diagnosis"][rows] > 0).sum(axis=0)
+        if scored_only:
+            counts = counts * self.columns["diagnosis_scored"]
+        distribution = {}
+        for abbr, num in zip(self.columns["diagnosis_abbr"].tolist(), counts.tolist()):
+            if num > 0:
+                distribution[abbr] = distribution.get(abbr, 0) + num
+        return distribution
+
+
+def _ann_index_row(reader: PhysioNetDataBase, rec: str) -> Dict[str, Any]:
+    """Parse the header of the record into a row of :class:`AnnIndex`."""
+    ann_dict = reader.load_ann(rec)
+    row = {k: ann_dict[k] for k in AnnIndex.scalar_items}
+    for k in AnnIndex._label_items:
+        row[k] = list(ann_dict["diagnosis"].get(k, []))
+    # fullnames may be missing for diagnoses in the deprecated format of abbreviations
+    row["diagnosis_fullname"] += row["diagnosis_code"][len(row["diagnosis_fullname"]) :]
+    row["diagnosis_scored"] = list(ann_dict["diagnosis_scored"].get("diagnosis_code", []))
+    return row
+
+
+_WORKER_READER = None
+
+
+def _init_ann_index_worker(reader: PhysioNetDataBase) -> None:
+    """Initializer of the worker processes of :func:`build_ann_index`."""
+    global _WORKER_READER
+    _WORKER_READER = reader
+
+
+def _ann_index_worker(rec: str) -> Dict[str, Any]:
+    """Parse the header of the record in a worker process."""
+    return _ann_index_row(_WORKER_READER, rec)
+
+
+def build_ann_index(
+    reader: PhysioNetDataBase,
+    path: Union[str, bytes, os.PathLike],
+    records: Sequence[str],
+    num_workers: int = 0,
+    force_reload: bool = False,
+    verbose: int = 0,
+) -> AnnIndex:
+    """Build (or update) the annotation index of the records.
+
+    Parameters
+    ----------
+    reader : PhysioNetDataBase
+        The reader of the database, whose ``load_ann`` method
+        parses the header of a record.
+    path : `path-like`
+        Path to the ``.npz`` file of the index.
+    records : Sequence[str]
+        Names of the records to index.
+    num_workers : int, default 0
+        Number of worker processes parsing the headers.
+        If is 0 or 1, the headers are parsed in the current process.
+    force_reload : bool, default False
+        If True, the headers of all the `records` are parsed again,
+        otherwise only the records not in the existing index are parsed.
+    verbose : int, default 0
+        Verbosity level, the progress bar is shown if positive.
+
+    Returns
+    -------
+    AnnIndex
+        The index, saved into `path` if updated.
+
+    """
+    index = AnnIndex.load(path)
+    missing = [rec for rec in records if force_reload or rec not in index]
+    if len(missing) == 0:
+        return index
+    rows = []
+    with tqdm(
+        total=len(missing),
+        desc="Indexing headers",
+        unit="record",
+        dynamic_ncols=True,
+        mininterval=1.0,
+        disable=(verbose < 1),
+    ) as pbar:
+        if num_workers <= 1 or len(missing) <= 1:
+            for rec in missing:
+                rows.append(_ann_index_row(reader, rec))
+                pbar.update(1)
+        else:
+            with mp.Pool(
+                processes=min(num_workers, len(missing)),
+                initializer=_init_ann_index_worker,
+                initargs=(reader,),
+            ) as pool:
+                chunksize = max(1, min(64, len(missing) // (4 * num_workers)))
+                for row in pool.imap(_ann_index_worker, missing, chunksize=chunksize):
+                    rows.append(row)
+                    pbar.update(1)
+    index = index.merge(missing, rows)
+    index.save(path)
+    return index
@@ -0,0 +1,279 @@
+"""
+Vectorized parsing of the wave delineation annotations
+of :class:`~torch_ecg.databases.LUDB` and :class:`~torch_ecg.databases.QTDB`,
+and construction of the masks of the waves.
+
+The symbol and sample arrays read by :func:`wfdb.rdann` are parsed into
+onset, peak and offset arrays via boolean logic over the symbols,
+and the masks are built from the onsets and offsets in one :func:`numpy.repeat` pass.
+The annotations read from the files (along with the length and the sampling
+frequency of the signal) are cached in memory and in compact ``.npz`` files,
+so that the annotation and header files are read only once.
+
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import wfdb
+
+__all__ = [
+    "WaveAnnStore",
+    "parse_peak_waves",
+    "parse_bracketed_waves",
+    "intervals_to_mask",
+]
+
+
+_STORE_VERSION = 1
+
+
+class WaveAnnStore:
+    """Cache of the annotations read by :func:`wfdb.rdann`.
+
+    Parameters
+    ----------
+    cache_dir : `path-like`, optional
+        Directory of the cache files. If is None,
+        the annotations are only cached in memory.
+    db_dir : `path-like`, optional
+        Directory of the database, whose hash is used as the name of
+        the subdirectory of `cache_dir`, so that databases (of different
+        versions) sharing the same `cache_dir` have separate caches.
+
+    """
+
+    __name__ = "WaveAnnStore"
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, bytes, os.PathLike]] = None,
+        db_dir: Optional[Union[str, bytes, os.PathLike]] = None,
+    ) -> None:
+        self.cache_dir = None
+        if cache_dir is not None:
+            self.cache_dir = Path(cache_dir)
+            if db_dir is not None:
+                self.cache_dir = self.cache_dir / hashlib.sha1(str(db_dir).encode()).hexdigest()[:16]
+        self._cache = {}
+
+    def load(self, rec_fp: Union[str, os.PathLike], extension: str) -> Dict[str, np.ndarray]:
+        """Load the annotations of the record.
+
+        Parameters
+        ----------
+        rec_fp : `path-like`
+            Path of the record, without file extension.
+        extension : str
+            Extension of the annotation file.
+
+        Returns
+        -------
+        dict
+            The annotations, with items
+
+                - "symbol": symbols of the annotations
+                - "sample": sample indices of the annotations
+                - "sig_len": length of the signal of the record
+                - "fs": sampling frequency of the record
+
+        """
+        rec_fp = str(rec_fp)
+        key = (rec_fp, extension)
+        if key in self._cache:
+            return self._cache[key]
+        # file stats of the annotation file, to invalidate outdated caches
+        stat = Path(f"{rec_fp}.{extension}").stat()
+        file_stat = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+        cache_fp = None
+        if self.cache_dir is not None:
+            cache_fp = self.cache_dir / f"{Path(rec_fp).name}.{extension}.npz"
+            ann = self._load_cache_file(cache_fp, file_stat)
+            if ann is not None:
+                self._cache[key] = ann
+                return ann
+        wfdb_ann = wfdb.rdann(rec_fp, extension=extension)
+        header = wfdb.rdheader(rec_fp)
+        ann = {
+            "symbol": np.array(wfdb_ann.symbol, dtype=str),
+            "sample": np.asarray(wfdb_ann.sample, dtype=np.int64),
+            "sig_len": int(header.sig_len),
+            "fs": header.fs,
+        }
+        if cache_fp is not None:
+            cache_fp.parent.mkdir(parents=True, exist_ok=True)
+            # written to a temporary file first, so that concurrent readers never see partial files
+            tmp_fp = cache_fp.with_name(f"{cache_fp.stem}.{os.getpid()}.tmp.npz")
+            with open(tmp_fp, "wb") as f:
+                np.savez(f, version=np.array(_STORE_VERSION), file_stat=file_stat, **ann)
+            os.replace(tmp_fp, cache_fp)
+        self._cache[key] = ann
+        return ann
+
+    @staticmethod
+    def _load_cache_file(cache_fp: Path, file_stat: np.ndarray) -> Optional[Dict[str, np.ndarray]]:
+        """Load the cache file, None if not existing or outdated."""
+        if not cache_fp.is_file():
+            return None
+        with np.load(cache_fp, allow_pickle=False) as npz:
+            if int(npz["version"]) != _STORE_VERSION or not np.array_equal(npz["file_stat"], file_stat):
+                return None
+            return {
+                "symbol": npz["symbol"],
+                "sample": npz["sample"],
+                "sig_len": int(npz["sig_len"]),
+                "fs": npz["fs"].item(),
+            }
+
+
+def parse_peak_waves(
+    symbols: Sequence[str],
+    samples: np.ndarray,
+    peak_symbols: Sequence[str] = ("p", "N", "t"),
+) -> Dict[str, np.ndarray]:
+    """Parse the waves annotated by peaks, each optionally enclosed
+    by an onset "(" right before and an offset ")" right after (LUDB).
+    The onset (resp. offset) of a wave without an enclosing "(" (resp. ")")
+    is its peak.
+
+    Parameters
+    ----------
+    symbols : Sequence[str]
+        Symbols of the annotations.
+    samples : numpy.ndarray
+        Sample indices of the annotations.
+    peak_symbols : Sequence[str], default ("p", "N", "t")
+        Symbols of the peaks of the waves.
+
+    Returns
+    -------
+    dict
+        Arrays of the "symbol", "onset", "peak" and "offset" of the waves.
+
+    """
+    symbols = np.asarray(symbols, dtype=str)
+    samples = np.asarray(samples, dtype=np.int64)
+    peak_inds = np.flatnonzero(np.isin(symbols, peak_symbols))
+    # symbols padded at both ends, so that neighbours of the first and last peaks exist
+    padded = np.concatenate([[""], symbols, [""]])
+    has_onset = padded[peak_inds] == "("
+    has_offset = padded[peak_inds + 2] == ")"
+    peak = samples[peak_inds]
+    onset = np.where(has_onset, samples[np.maximum(peak_inds - 1, 0)], peak)
+    offset = np.where(has_offset, samples[np.minimum(peak_inds + 1, len(samples) - 1)], peak)
+    return {
+        "symbol": symbols[peak_inds],
+        "onset": onset,
+        "peak": peak,
+        "offset": offset,
+    }
+
+
+def parse_bracketed_waves(
+    symbols: Sequence[str],
+    samples: np.ndarray,
+    sampfrom: int = 0,
+    sampto: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Parse the waves ended by offsets ")" (QTDB).
+
+    A wave is ended by each ")", whose onset is the last "("
+    and whose peak is the last other symbol after the previous ")".
+    Onsets and peaks missing are NaN, and symbols missing are empty strings.
+
+    Parameters
+    ----------
+    symbols : Sequence[str]
+        Symbols of the annotations, sorted by the sample indices.
+    samples : numpy.ndarray
+        Sample indices of the annotations.
+    sampfrom : int, default 0
+        Start index of the annotations to be parsed.
+    sampto : int, optional
+        End index (exclusive) of the annotations to be parsed.
+
+    Returns
+    -------
+    dict
+        Arrays of the "symbol", "onset", "peak" and "offset" of the waves.
+
+    """
+    symbols = np.asarray(symbols, dtype=str)
+    samples = np.asarray(samples, dtype=np.int64)
+    if sampto is not None:
+        stop = np.flatnonzero(samples >= sampto)
+        stop = stop[0] if len(stop) > 0 else len(samples)
+        symbols, samples = symbols[:stop], samples[:stop]
+    selection = samples >= sampfrom
+    symbols, samples = symbols[selection], samples[selection]
+
+    pos = np.arange(len(symbols))
+    is_open, is_close = symbols == "(", symbols == ")"
+    is_peak = ~(is_open | is_close)
+    # positions of the last symbols of each kind up to (inclusive) each position
+    last_open = np.maximum.accumulate(np.where(is_open, pos, -1))
+    last_peak = np.maximum.accumulate(np.where(is_peak, pos, -1))
+    last_close = np.maximum.accumulate(np.where(is_close, pos, -1))
+
+    close_inds = np.flatnonzero(is_close)
+    prev_close = np.where(close_inds > 0, last_close[np.maximum(close_inds - 1, 0)], -1)
+    open_inds, peak_inds = last_open[close_inds], last_peak[close_inds]
+    has_onset, has_peak = open_inds > prev_close, peak_inds > prev_close
+    return {
+        "symbol": np.where(has_peak, symbols[np.maximum(peak_inds, 0)], ""),
+        "onset": np.where(has_onset, samples[np.maximum(open_inds, 0)], np.nan),
+        "peak": np.where(has_peak, samples[np.maximum(peak_inds, 0)], np.nan),
+        "offset": samples[close_inds],
+    }
+
+
+def intervals_to_mask(
+    onsets: np.ndarray,
+    offsets: np.ndarray,
+    values: Union[int, np.ndarray],
+    siglen: int,
+    fill_value: int = 0,
+    dtype: Union[str, np.dtype] = int,
+) -> np.ndarray:
+    """Build the mask of the intervals ``[onset, offset)``.
+
+    Sorted non-overlapping intervals (the usual case) are painted in one
+    :func:`numpy.repeat` pass over the boundaries of the intervals;
+    otherwise the intervals are painted one by one, later ones overriding
+    earlier ones.
+
+    Parameters
+    ----------
+    onsets, offsets : numpy.ndarray
+        Onsets and (exclusive) offsets of the intervals.
+    values : int or numpy.ndarray
+        Values of the mask in the intervals.
+    siglen : int
+        Length of the mask.
+    fill_value : int, default 0
+        Value of the mask out of the intervals.
+    dtype : str or numpy.dtype, default int
+        Data type of the mask.
+
+    Returns
+    -------
+    numpy.ndarray
+        The mask, of shape ``(siglen,)``.
+
+    """
+    onsets = np.clip(np.asarray(onsets, dtype=np.int64), 0, siglen)
+    offsets = np.clip(np.asarray(offsets, dtype=np.int64), 0, siglen)
+    values = np.broadcast_to(np.asarray(values, dtype=dtype), onsets.shape)
+    if len(onsets) > 0 and np.all(offsets >= onsets) and np.all(onsets[1:] >= offsets[:-1]):
+        # lengths of the gaps and the intervals in turn: gap, interval, gap, ..., interval, gap
+        lengths = np.diff(np.stack([onsets, offsets], axis=1).ravel(), prepend=0, append=siglen)
+        seg_values = np.full(len(lengths), fill_value, dtype=dtype)
+        seg_values[1::2] = values
+        return np.repeat(seg_values, lengths)
+    mask = np.full((siglen,), fill_value, dtype=dtype)
+    for onset, offset, value in zip(onsets, offsets, values):
+        mask[onset:offset] = value
+    return mask
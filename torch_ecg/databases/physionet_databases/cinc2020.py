@@ -25,6 +25,7 @@ from ...utils.misc import add_docstring, get_record_list_recursive3, list_sum, m
 from ...utils.utils_data import ensure_siglen
 from ..aux_data.cinc2020_aux_data import df_weights_abbr, dx_mapping_all, dx_mapping_scored, equiv_class_dict, load_weights
 from ..base import DEFAULT_FIG_SIZE_PER_SEC, DataBaseInfo, PhysioNetDataBase, _PlotCfg
+from ._ann_index import AnnIndex, build_ann_index
 
 __all__ = [
     "CINC2020",
@@ -262,6 +263,8 @@ class CINC2020(PhysioNetDataBase):
         self._all_records = None
         self.__all_records = None
         self._ls_rec()  # loads file system structures into `self._all_records`
+        # the annotation index, built via `build_ann_index`
+        self._ann_index = AnnIndex.load(self._get_ann_index_filepath())
 
         self._diagnoses_records_list = None
         self._ls_diagnoses_records()
@@ -402,10 +405,10 @@ class CINC2020(PhysioNetDataBase):
             self.logger.info("Please wait several minutes patiently to let the reader list records for each diagnosis...")
             start = time.time()
             self._diagnoses_records_list = {d: [] for d in df_weights_abbr.columns.values.tolist()}
+            self.build_ann_index(force_reload=force_reload)
             for tranche, l_rec in self._all_records.items():
                 for rec in l_rec:
-                    ann = self.load_ann(rec)
-                    ld = ann["diagnosis_scored"]["diagnosis_abbr"]
+                    ld = self._ann_index.get_diagnosis(rec, scored_only=True)["diagnosis_abbr"]
                     for d in ld:
                         self._diagnoses_records_list[d].append(rec)
             self.logger.info(f"Done in {time.time() - start:.5f} seconds!")
@@ -420,6 +423,44 @@ class CINC2020(PhysioNetDataBase):
             self._ls_diagnoses_records()
         return self._diagnoses_records_list
 
+    def _get_ann_index_filepath(self) -> Path:
+        """Path to the file of the annotation index."""
+        return self.db_dir / f"{self.db_name}-ann_index.npz"
+
+    def build_ann_index(self, num_workers: int = 0, force_reload: bool = False) -> None:
+        """Build the annotation index of the records.
+
+        The header files of the records not yet in the index are parsed
+        (over a pool of worker processes if `num_workers` > 1), and the
+        sampling frequencies, signal lengths, demographics and diagnoses
+        are saved into a compressed columnar file in the database directory.
+        Afterwards, :meth:`get_labels` and :meth:`get_subject_info` are answered
+        from the index, without reading the header files, and
+        :meth:`get_tranche_class_distribution` can count over the index via `from_index`.
+
+        Parameters
+        ----------
+        num_workers : int, default 0
+            Number of worker processes parsing the header files.
+            If is 0 or 1, the header files are parsed in the current process.
+        force_reload : bool, default False
+            If True, the header files of all the records are parsed again,
+            e.g. after the header files are modified.
+
+        Returns
+        -------
+        None
+
+        """
+        self._ann_index = build_ann_index(
+            self,
+            self._get_ann_index_filepath(),
+            records=list_sum(self.all_records.values()),
+            num_workers=num_workers,
+            force_reload=force_reload,
+            verbose=self.verbose,
+        )
+
     def _get_tranche(self, rec: Union[str, int]) -> str:
         """Get the tranche"s symbol of a record via its name.
 
@@ -873,11 +914,14 @@ class CINC2020(PhysioNetDataBase):
             The list of labels of the record.
 
         """
-        ann_dict = self.load_ann(rec)
-        if scored_only:
-            labels = ann_dict["diagnosis_scored"]
+        if isinstance(rec, int):
+            rec = self[rec]
+        if rec in self._ann_index:
+            labels = self._ann_index.get_diagnosis(rec, scored_only=scored_only)
+        elif scored_only:
+            labels = self.load_ann(rec)["diagnosis_scored"]
         else:
-            labels = ann_dict["diagnosis"]
+            labels = self.load_ann(rec)["diagnosis"]
         if fmt.lower() == "a":
             labels = labels["diagnosis_abbr"]
         elif fmt.lower() == "f":
@@ -937,8 +981,13 @@ class CINC2020(PhysioNetDataBase):
             ]
         else:
             info_items = items
-        ann_dict = self.load_ann(rec)
-        subject_info = {item: ann_dict[item] for item in info_items}
+        if isinstance(rec, int):
+            rec = self[rec]
+        if rec in self._ann_index and set(info_items) <= set(AnnIndex.scalar_items):
+            subject_info = {item: self._ann_index.get(rec, item) for item in info_items}
+        else:
+            ann_dict = self.load_ann(rec)
+            subject_info = {item: ann_dict[item] for item in info_items}
 
         return subject_info
 
@@ -1160,7 +1209,9 @@ class CINC2020(PhysioNetDataBase):
         else:
             plt.show()
 
-    def get_tranche_class_distribution(self, tranches: Sequence[str], scored_only: bool = True) -> Dict[str, int]:
+    def get_tranche_class_distribution(
+        self, tranches: Sequence[str], scored_only: bool = True, from_index: bool = False
+    ) -> Dict[str, int]:
         """Compute class distribution in the tranches.
 
         Parameters
@@ -1170,6 +1221,12 @@ class CINC2020(PhysioNetDataBase):
         scored_only : bool, default True
             If True, only classes that are scored in the CINC2020 official phase
             are considered for computing the distribution.
+        from_index : bool, default False
+            If True, the distribution is counted over the records of the tranches
+            in the annotation index (ref. :meth:`build_ann_index`),
+            which should contain all these records;
+            otherwise, the official statistics of the training data
+            of the tranches are used.
 
         Returns
         -------
@@ -1179,6 +1236,12 @@ class CINC2020(PhysioNetDataBase):
             values are appearance of corr. classes in the tranche.
 
         """
+        if from_index:
+            records = list_sum([self.all_records[t] for t in tranches])
+            assert all(
+                rec in self._ann_index for rec in records
+            ), "the annotation index does not contain all the records of the tranches, call `build_ann_index` first"
+            return CFG(self._ann_index.label_counts(records, scored_only=scored_only))
         tranche_names = [self.tranche_names[t] for t in tranches]
         df = dx_mapping_scored if scored_only else dx_mapping_all
         distribution = CFG()
@@ -1237,7 +1300,9 @@ class CINC2020(PhysioNetDataBase):
                 # slice_start = (data.shape[1] - siglen)//2
                 # slice_end = slice_start + siglen
                 # data = data[..., slice_start:slice_end]
-                data = ensure_siglen(data, siglen=siglen, fmt="channel_first", tolerance=0.2).astype(DEFAULTS.DTYPE.NP)
+                data = ensure_siglen(data, siglen=siglen, fmt="channel_first", tolerance=0.2, copy=False).astype(
+                    DEFAULTS.DTYPE.NP
+                )
                 np.save(rec_fp, data)
             elif siglen is None:
                 np.save(rec_fp, data)
@@ -2,6 +2,7 @@
 
 import io
 import json
+import multiprocessing as mp
 import os
 import posixpath
 import re
@@ -34,6 +35,7 @@ from ..aux_data.cinc2021_aux_data import (
     load_weights,
 )
 from ..base import DEFAULT_FIG_SIZE_PER_SEC, DataBaseInfo, PhysioNetDataBase, _PlotCfg
+from ._ann_index import AnnIndex, build_ann_index
 
 __all__ = [
     "CINC2021",
@@ -337,6 +339,8 @@ class CINC2021(PhysioNetDataBase):
             "diagnosis_scored",  # in the form of abbreviations
         }
         self._ls_rec()  # loads file system structures into `self._all_records`
+        # the annotation index, built via `build_ann_index`
+        self._ann_index = AnnIndex.load(self._get_ann_index_filepath())
         self._aggregate_stats(fast=True)
 
         self._diagnoses_records_list = None
@@ -464,7 +468,7 @@ class CINC2021(PhysioNetDataBase):
 
         # TODO: perhaps we can load labels and metadata of all records into `self._df_records` here
 
-    def _aggregate_stats(self, fast: bool = False, force_reload: bool = False) -> None:
+    def _aggregate_stats(self, fast: bool = False, force_reload: bool = False, num_workers: int = 0) -> None:
         """Aggregate stats on the whole dataset.
 
         Parameters
@@ -475,6 +479,9 @@ class CINC2021(PhysioNetDataBase):
             Ignored if `force_reload` is True.
         force_reload : bool, default False
             If True, the stats will be aggregated from scratch.
+        num_workers : int, default 0
+            Number of worker processes parsing the header files
+            when building the annotation index, ref. :meth:`build_ann_index`.
 
         Returns
         -------
@@ -489,45 +496,26 @@ class CINC2021(PhysioNetDataBase):
         if force_reload or (not fast and (self._stats.empty or self._stats_columns != set(self._stats.columns))):
             self.logger.info("Please wait patiently to let the reader collect statistics on the whole dataset...")
             start = time.time()
+            self.build_ann_index(num_workers=num_workers, force_reload=force_reload)
             self._stats = self._df_records.copy(deep=True)
             self._stats["record"] = self._stats.index
             self._stats = self._stats.reset_index(drop=True)
             self._stats.drop(columns="path", inplace=True)
             self._stats["tranche_name"] = self._stats["tranche"].apply(lambda t: self.tranche_names[t])
+            records = self._stats["record"].tolist()
             for k in [
                 "diagnosis",
                 "diagnosis_scored",
             ]:
-                self._stats[k] = ""  # otherwise cells in the first row would be str instead of list
-            with tqdm(
-                self._stats.iterrows(),
-                total=len(self._stats),
-                desc="Aggregating stats",
-                unit="record",
-                dynamic_ncols=True,
-                mininterval=1.0,
-                disable=(self.verbose < 1),
-            ) as pbar:
-                for idx, row in pbar:
-                    ann_dict = self.load_ann(row["record"])
-                    for k in [
-                        "nb_leads",
-                        "fs",
-                        "nb_samples",
-                        "age",
-                        "sex",
-                        "medical_prescription",
-                        "history",
-                        "symptom_or_surgery",
-                    ]:
-                        self._stats.at[idx, k] = ann_dict[k]
-                    for k in [
-                        "diagnosis",
-                        "diagnosis_scored",
-                    ]:
-                        self._stats.at[idx, k] = ann_dict[k]["diagnosis_abbr"]
+                self._stats[k] = [
+                    self._ann_index.get_diagnosis(rec, scored_only=(k == "diagnosis_scored"))["diagnosis_abbr"]
+                    for rec in records
+                ]
+            for k in AnnIndex.scalar_items:
+                self._stats[k] = [self._ann_index.get(rec, k) for rec in records]
             for k in ["nb_leads", "fs", "nb_samples"]:
                 self._stats[k] = self._stats[k].astype(int)
+            self._stats["age"] = self._stats["age"].astype(float)
             _stats_to_save = self._stats.copy()
             for k in [
                 "diagnosis",
@@ -536,14 +524,51 @@ class CINC2021(PhysioNetDataBase):
                 _stats_to_save[k] = _stats_to_save[k].apply(lambda lst: list_sep.join(lst))
             _stats_to_save.to_csv(stats_file_fp, index=False)
             self.logger.info(f"Done in {time.time() - start:.5f} seconds!")
-        else:
+        elif not self._stats.empty:
             self.logger.info("converting dtypes of columns `diagnosis` and `diagnosis_scored`...")
             for k in [
                 "diagnosis",
                 "diagnosis_scored",
             ]:
-                for idx, row in self._stats.iterrows():
-                    self._stats.at[idx, k] = list(filter(lambda v: len(v) > 0, row[k].split(list_sep)))
+                self._stats[k] = self._stats[k].apply(lambda v: [d for d in str(v).split(list_sep) if len(d) > 0])
+
+    def _get_ann_index_filepath(self) -> Path:
+        """Path to the file of the annotation index."""
+        return self.db_dir_base / f"{self.db_name}-ann_index.npz"
+
+    def build_ann_index(self, num_workers: int = 0, force_reload: bool = False) -> None:
+        """Build the annotation index of the records.
+
+        The header files of the records not yet in the index are parsed
+        (over a pool of worker processes if `num_workers` > 1), and the
+        sampling frequencies, signal lengths, demographics and diagnoses
+        are saved into a compressed columnar file in the database directory.
+        Afterwards, :meth:`get_labels`, :meth:`get_fs` and :meth:`get_subject_info`
+        are answered from the index, without reading the header files, and
+        :meth:`get_tranche_class_distribution` can count over the index via `from_index`.
+
+        Parameters
+        ----------
+        num_workers : int, default 0
+            Number of worker processes parsing the header files.
+            If is 0 or 1, the header files are parsed in the current process.
+        force_reload : bool, default False
+            If True, the header files of all the records are parsed again,
+            e.g. after the header files are modified.
+
+        Returns
+        -------
+        None
+
+        """
+        self._ann_index = build_ann_index(
+            self,
+            self._get_ann_index_filepath(),
+            records=list_sum(self.all_records.values()),
+            num_workers=num_workers,
+            force_reload=force_reload,
+            verbose=self.verbose,
+        )
 
     @property
     def all_records(self) -> Dict[str, List[str]]:
@@ -1066,11 +1091,12 @@ class CINC2021(PhysioNetDataBase):
         """
         if isinstance(rec, int):
             rec = self[rec]
-        ann_dict = self.load_ann(rec)
-        if scored_only:
-            _labels = ann_dict["diagnosis_scored"]
+        if rec in self._ann_index:
+            _labels = self._ann_index.get_diagnosis(rec, scored_only=scored_only)
+        elif scored_only:
+            _labels = self.load_ann(rec)["diagnosis_scored"]
         else:
-            _labels = ann_dict["diagnosis"]
+            _labels = self.load_ann(rec)["diagnosis"]
         if fmt.lower() == "a":
             _labels = _labels["diagnosis_abbr"]
         elif fmt.lower() == "f":
@@ -1100,7 +1126,8 @@ class CINC2021(PhysioNetDataBase):
             Record name or index of the record in :attr:`all_records`.
         from_hea : bool, default True
             If True, sampling frequency is read from
-            corresponding header file of the record;
+            corresponding header file of the record
+            (or from the annotation index if built);
             otherwise, `self.fs` is used.
 
         Returns
@@ -1109,7 +1136,11 @@ class CINC2021(PhysioNetDataBase):
             Sampling frequency of the record.
 
         """
-        if from_hea:
+        if isinstance(rec, int):
+            rec = self[rec]
+        if from_hea and rec in self._ann_index:
+            fs = self._ann_index.get(rec, "fs")
+        elif from_hea:
             fs = self.load_ann(rec)["fs"]
         else:
             tranche = self._get_tranche(rec)
@@ -1145,8 +1176,13 @@ class CINC2021(PhysioNetDataBase):
             ]
         else:
             info_items = items
-        ann_dict = self.load_ann(rec)
-        subject_info = {item: ann_dict[item] for item in info_items}
+        if isinstance(rec, int):
+            rec = self[rec]
+        if rec in self._ann_index and set(info_items) <= set(AnnIndex.scalar_items):
+            subject_info = {item: self._ann_index.get(rec, item) for item in info_items}
+        else:
+            ann_dict = self.load_ann(rec)
+            subject_info = {item: ann_dict[item] for item in info_items}
 
         return subject_info
 
@@ -1368,7 +1404,9 @@ class CINC2021(PhysioNetDataBase):
         else:
             plt.show()
 
-    def get_tranche_class_distribution(self, tranches: Sequence[str], scored_only: bool = True) -> Dict[str, int]:
+    def get_tranche_class_distribution(
+        self, tranches: Sequence[str], scored_only: bool = True, from_index: bool = False
+    ) -> Dict[str, int]:
         """Compute class distribution in the tranches.
 
         Parameters
@@ -1378,6 +1416,12 @@ class CINC2021(PhysioNetDataBase):
         scored_only : bool, default True
             If True, only classes that are scored in the CINC2021 official phase
             are considered for computing the distribution.
+        from_index : bool, default False
+            If True, the distribution is counted over the records of the tranches
+            in the annotation index (ref. :meth:`build_ann_index`),
+            which should contain all these records;
+            otherwise, the official statistics of the training data
+            of the tranches are used.
 
         Returns
         -------
@@ -1387,6 +1431,12 @@ class CINC2021(PhysioNetDataBase):
             values are appearance of corr. classes in the tranche.
 
         """
+        if from_index:
+            records = list_sum([self.all_records[t] for t in tranches])
+            assert all(
+                rec in self._ann_index for rec in records
+            ), "the annotation index does not contain all the records of the tranches, call `build_ann_index` first"
+            return CFG(self._ann_index.label_counts(records, scored_only=scored_only))
         tranche_names = [self.tranche_names[t] for t in tranches]
         df = dx_mapping_scored if scored_only else dx_mapping_all
         distribution = CFG()
@@ -1434,44 +1484,114 @@ class CINC2021(PhysioNetDataBase):
 
         _leads = self._normalize_leads(leads, numeric=True)
 
-        tranche = self._get_tranche(rec)
-        if siglen is None:
-            rec_fp = self.db_dir / f"{self.db_name}-rsmp-500Hz" / self.tranche_names[tranche] / f"{rec}_500Hz.npy"
+        rec_fp = self._get_resampled_data_filepath(rec, siglen)
+        if rec_fp.is_file():
+            # memory-mapped, so that only the chosen leads (rows of the lead-first layout)
+            # are read from disk, and converted (if necessary) after the leads are chosen
+            data = np.load(rec_fp, mmap_mode="r")
         else:
-            rec_fp = (
-                self.db_dir / f"{self.db_name}-rsmp-500Hz" / self.tranche_names[tranche] / f"{rec}_500Hz_siglen_{siglen}.npy"
-            )
-        rec_fp.parent.mkdir(parents=True, exist_ok=True)
-        if not rec_fp.is_file():
-            # self.logger.info(f"corresponding file {rec_fp.name} does not exist")
             # NOTE: if not exists, create the data file,
             # so that the ordering of leads keeps in accordance with `EAK.Standard12Leads`
-            data = self.load_data(rec, leads="all", data_format="channel_first", units="mV", fs=None)
-            rec_fs = self.get_fs(rec, from_hea=True)
-            if rec_fs != 500:
-                data = SS.resample_poly(data, 500, rec_fs, axis=1).astype(DEFAULTS.DTYPE.NP)
-            # if self.fs[tranche] != 500:
-            #     data = SS.resample_poly(data, 500, self.fs[tranche], axis=1)
-            if siglen is not None and data.shape[1] >= siglen:
-                # slice_start = (data.shape[1] - siglen)//2
-                # slice_end = slice_start + siglen
-                # data = data[..., slice_start:slice_end]
-                data = ensure_siglen(data, siglen=siglen, fmt="channel_first", tolerance=0.2).astype(DEFAULTS.DTYPE.NP)
-                np.save(rec_fp, data)
-            elif siglen is None:
-                np.save(rec_fp, data)
-        else:
-            # self.logger.info(f"loading from local file...")
-            data = np.load(rec_fp).astype(DEFAULTS.DTYPE.NP)
+            data = self._resample_data(rec, siglen)
         # choose data of specific leads
         if siglen is None:
             data = data[_leads, ...]
         else:
             data = data[:, _leads, :]
+        data = np.asarray(data).astype(DEFAULTS.DTYPE.NP, copy=False)
         if data_format.lower() in ["channel_last", "lead_last"]:
             data = np.moveaxis(data, -1, -2)
         return data
 
+    def _get_resampled_data_filepath(self, rec: str, siglen: Optional[int] = None) -> Path:
+        """Path of the file of the resampled (500Hz) data of the record,
+        used by :meth:`load_resampled_data`.
+        """
+        tranche = self._get_tranche(rec)
+        suffix = "" if siglen is None else f"_siglen_{siglen}"
+        return self.db_dir / f"{self.db_name}-rsmp-500Hz" / self.tranche_names[tranche] / f"{rec}_500Hz{suffix}.npy"
+
+    def _resample_data(self, rec: str, siglen: Optional[int] = None) -> np.ndarray:
+        """Resample the data of the record to 500Hz, (and slice to `siglen`,)
+        and save the resampled data, in the lead-first layout, to the file of
+        :meth:`_get_resampled_data_filepath`. Records shorter than `siglen` are not saved.
+        """
+        data = self.load_data(rec, leads="all", data_format="channel_first", units="mV", fs=None)
+        rec_fs = self.get_fs(rec, from_hea=True)
+        if rec_fs != 500:
+            data = SS.resample_poly(data, 500, rec_fs, axis=1)
+        data = np.asarray(data, dtype=DEFAULTS.DTYPE.NP)
+        if siglen is not None:
+            if data.shape[1] < siglen:
+                return data
+            data = ensure_siglen(data, siglen=siglen, fmt="channel_first", tolerance=0.2, copy=False).astype(DEFAULTS.DTYPE.NP)
+        rec_fp = self._get_resampled_data_filepath(rec, siglen)
+        rec_fp.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file first, so that concurrent readers
+        # (e.g. worker processes) never see partially written files
+        tmp_fp = rec_fp.with_name(f"{rec_fp.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_fp, data)
+        os.replace(tmp_fp, rec_fp)
+        return data
+
+    def build_resampled_cache(
+        self,
+        records: Optional[Sequence[Union[str, int]]] = None,
+        siglen: Optional[int] = None,
+        num_workers: int = 0,
+        verbose: int = 0,
+    ) -> List[str]:
+        """Build the files of the resampled (500Hz) data read by
+        :meth:`load_resampled_data` for the records missing them.
+
+        Parameters
+        ----------
+        records : Sequence[str or int], optional
+            Names or indices of the records,
+            defaults to all the records in the database.
+        siglen : int, optional
+            Signal length, with units in number of samples,
+            the same as in :meth:`load_resampled_data`.
+        num_workers : int, default 0
+            Number of worker processes.
+            If is 0 or 1, the records are resampled in the current process.
+        verbose : int, default 0
+            Verbosity level for printing the progress.
+
+        Returns
+        -------
+        List[str]
+            Names of the records that were missing the files of the resampled data.
+            The records shorter than `siglen` (if specified) are resampled but not saved,
+            the same as in :meth:`load_resampled_data`.
+
+        """
+        if records is None:
+            records = list_sum(self.all_records.values())
+        records = [self[rec] if isinstance(rec, int) else rec for rec in records]
+        missing = [rec for rec in records if not self._get_resampled_data_filepath(rec, siglen).is_file()]
+        with tqdm(
+            total=len(missing),
+            desc="Resampling",
+            unit="record",
+            dynamic_ncols=True,
+            mininterval=1.0,
+            disable=verbose < 1,
+        ) as pbar:
+            if num_workers <= 1 or len(missing) <= 1:
+                for rec in missing:
+                    self._resample_data(rec, siglen)
+                    pbar.update(1)
+            else:
+                with mp.Pool(
+                    processes=min(num_workers, len(missing)),
+                    initializer=_init_resample_worker,
+                    initargs=(self,),
+                ) as pool:
+                    for _ in pool.imap_unordered(_resample_worker, [(rec, siglen) for rec in missing]):
+                        pbar.update(1)
+        return missing
+
     def load_raw_data(self, rec: Union[str, int], backend: Literal["wfdb", "scipy"] = "scipy") -> np.ndarray:
         """Load raw data from corresponding files with no further processing.
 
@@ -1672,6 +1792,22 @@ class CINC2021(PhysioNetDataBase):
         return _CINC2021_INFO
 
 
+_WORKER_READER = None
+
+
+def _init_resample_worker(reader: CINC2021) -> None:
+    """Initializer of the worker processes of :meth:`CINC2021.build_resampled_cache`."""
+    global _WORKER_READER
+    _WORKER_READER = reader
+
+
+def _resample_worker(task: Tuple[str, Optional[int]]) -> str:
+    """Resample the data of the record (name, siglen) in a worker process."""
+    rec, siglen = task
+    _WORKER_READER._resample_data(rec, siglen)
+    return rec
+
+
 # fmt: off
 _exceptional_records = [  # with nan values (p_signal) read by wfdb
     "I0002", "I0069",
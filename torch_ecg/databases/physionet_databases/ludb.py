@@ -15,6 +15,7 @@ from ...utils import EAK
 from ...utils.misc import add_docstring
 from ...utils.utils_data import ECGWaveForm, masks_to_waveforms
 from ..base import DataBaseInfo, PhysioNetDataBase
+from ._wave_ann import WaveAnnStore, intervals_to_mask, parse_peak_waves
 
 __all__ = [
     "LUDB",
@@ -317,6 +318,9 @@ class LUDB(PhysioNetDataBase):
         self._wavename_to_symbol = CFG({v: k for k, v in self._symbol_to_wavename.items()})
         self.class_map = CFG(p=1, N=2, t=3, i=0)  # an extra isoelectric
 
+        # cache of the annotation files, in memory and in the working directory
+        self._wave_ann_store = WaveAnnStore(self.working_dir / "wave_ann", db_dir=self.db_dir)
+
         self._df_subject_info = None
         self._ls_rec()
 
@@ -422,55 +426,25 @@ class LUDB(PhysioNetDataBase):
         _ann_ext = [f"{ld.lower()}" for ld in _leads]  # for Version 1.0.0, it is f"{ld.lower()}"
         ann_dict["waves"] = CFG({ld: [] for ld in _leads})
         for ld, ext in zip(_leads, _ann_ext):
-            ann = wfdb.rdann(rec_fp, extension=ext)
-            df_lead_ann = pd.DataFrame()
-            symbols = np.array(ann.symbol)
-            peak_inds = np.where(np.isin(symbols, ["p", "N", "t"]))[0]
-            df_lead_ann["peak"] = ann.sample[peak_inds]
-            df_lead_ann["onset"] = np.nan
-            df_lead_ann["offset"] = np.nan
-            for i, row in df_lead_ann.iterrows():
-                peak_idx = peak_inds[i]
-                if peak_idx == 0:
-                    df_lead_ann.loc[i, "onset"] = row["peak"]
-                    if symbols[peak_idx + 1] == ")":
-                        df_lead_ann.loc[i, "offset"] = ann.sample[peak_idx + 1]
-                    else:
-                        df_lead_ann.loc[i, "offset"] = row["peak"]
-                elif peak_idx == len(symbols) - 1:
-                    df_lead_ann.loc[i, "offset"] = row["peak"]
-                    if symbols[peak_idx - 1] == "(":
-                        df_lead_ann.loc[i, "onset"] = ann.sample[peak_idx - 1]
-                    else:
-                        df_lead_ann.loc[i, "onset"] = row["peak"]
-                else:
-                    if symbols[peak_idx - 1] == "(":
-                        df_lead_ann.loc[i, "onset"] = ann.sample[peak_idx - 1]
-                    else:
-                        df_lead_ann.loc[i, "onset"] = row["peak"]
-                    if symbols[peak_idx + 1] == ")":
-                        df_lead_ann.loc[i, "offset"] = ann.sample[peak_idx + 1]
-                    else:
-                        df_lead_ann.loc[i, "offset"] = row["peak"]
-            # df_lead_ann["onset"] = ann.sample[np.where(symbols=="(")[0]]
-            # df_lead_ann["offset"] = ann.sample[np.where(symbols==")")[0]]
-
-            df_lead_ann["duration"] = (df_lead_ann["offset"] - df_lead_ann["onset"]) * self.spacing
-
-            df_lead_ann.index = symbols[peak_inds]
-
-            for c in ["peak", "onset", "offset"]:
-                df_lead_ann[c] = df_lead_ann[c].values.astype(int)
-
-            for _, row in df_lead_ann.iterrows():
-                w = ECGWaveForm(
-                    name=self._symbol_to_wavename[row.name],
-                    onset=int(row.onset),
-                    offset=int(row.offset),
-                    peak=int(row.peak),
-                    duration=row.duration,
+            ann = self._wave_ann_store.load(rec_fp, ext)
+            waves = parse_peak_waves(ann["symbol"], ann["sample"], peak_symbols=["p", "N", "t"])
+            durations = (waves["offset"] - waves["onset"]) * self.spacing
+            ann_dict["waves"][ld] = [
+                ECGWaveForm(
+                    name=self._symbol_to_wavename[symbol],
+                    onset=onset,
+                    offset=offset,
+                    peak=peak,
+                    duration=duration,
+                )
+                for symbol, onset, offset, peak, duration in zip(
+                    waves["symbol"].tolist(),
+                    waves["onset"].tolist(),
+                    waves["offset"].tolist(),
+                    waves["peak"].tolist(),
+                    durations.tolist(),
                 )
-                ann_dict["waves"][ld].append(w)
+            ]
 
         if metadata:
             header_dict = self._load_header(rec)
@@ -528,12 +502,17 @@ class LUDB(PhysioNetDataBase):
         if isinstance(rec, int):
             rec = self[rec]
         _class_map = CFG(class_map) if class_map is not None else self.class_map
-        data = self.load_data(rec, leads=leads, data_format="channel_first")
-        masks = np.full_like(data, fill_value=_class_map.i, dtype=int)
-        waves = self.load_ann(rec, leads=leads, metadata=False)["waves"]
-        for idx, (l, l_w) in enumerate(waves.items()):
-            for w in l_w:
-                masks[idx, w.onset : w.offset] = _class_map[self._wavename_to_symbol[w.name]]
+        rec_fp = str(self.get_absolute_path(rec))
+        _leads = self._normalize_leads(leads)
+        masks = []
+        for ld in _leads:
+            ann = self._wave_ann_store.load(rec_fp, ld.lower())
+            waves = parse_peak_waves(ann["symbol"], ann["sample"], peak_symbols=["p", "N", "t"])
+            values = np.array([_class_map[symbol] for symbol in waves["symbol"].tolist()], dtype=int)
+            masks.append(
+                intervals_to_mask(waves["onset"], waves["offset"], values, ann["sig_len"], fill_value=_class_map.i, dtype=int)
+            )
+        masks = np.stack(masks, axis=0)
         if mask_format.lower() not in [
             "channel_first",
             "lead_first",
@@ -10,6 +10,7 @@ from ...cfg import CFG
 from ...utils.misc import add_docstring
 from ...utils.utils_data import ECGWaveForm
 from ..base import BeatAnn, DataBaseInfo, PhysioNetDataBase, WFDB_Beat_Annotations, WFDB_Non_Beat_Annotations
+from ._wave_ann import WaveAnnStore, parse_bracketed_waves
 
 __all__ = [
     "QTDB",
@@ -153,6 +154,9 @@ class QTDB(PhysioNetDataBase):
 
         self.class_map = CFG(p=1, N=2, t=3, i=0)  # an extra isoelectric
 
+        # cache of the annotation files, in memory and in the working directory
+        self._wave_ann_store = WaveAnnStore(self.working_dir / "wave_ann", db_dir=self.db_dir)
+
         self._ls_rec()
 
     def get_subject_id(self, rec: Union[str, int]) -> int:
@@ -230,44 +234,27 @@ class QTDB(PhysioNetDataBase):
             "pu2",
         ], "extension should be one of `q1c`, `q2c`, `pu1`, `pu2`"
         fp = str(self.get_absolute_path(rec))
-        wfdb_ann = wfdb.rdann(fp, extension=extension)
-        header = wfdb.rdheader(fp)
-        sig_len = header.sig_len
+        ann = self._wave_ann_store.load(fp, extension)
         sf = sampfrom or 0
-        st = sampto or sig_len
+        st = sampto or ann["sig_len"]
         assert st > sf, "`sampto` should be greater than `sampfrom`!"
 
         subtraction = 0 if keep_original else sf
 
+        waves = parse_bracketed_waves(ann["symbol"], ann["sample"], sampfrom=sf, sampto=st)
         wave_list = []
-        current_onset = None
-        current_wave_name = None
-        current_wave_peak = None
-        for idx, symbol in zip(wfdb_ann.sample, wfdb_ann.symbol):
-            if idx < sf:
-                continue
-            if idx >= st:
-                break
-            if symbol == "(":
-                current_onset = idx
-            elif symbol == ")":
-                wave_list.append(
-                    ECGWaveForm(
-                        onset=(current_onset or np.nan) - subtraction,
-                        offset=idx - subtraction,
-                        name=current_wave_name,
-                        peak=current_wave_peak,
-                        duration=(idx - current_onset) / header.fs if current_onset is not None else np.nan,
-                    )
+        for symbol, onset, peak, offset in zip(*[waves[k].tolist() for k in ["symbol", "onset", "peak", "offset"]]):
+            if ignore_beat_types and symbol not in ["", "p", "t", "u"]:
+                symbol = "N"
+            wave_list.append(
+                ECGWaveForm(
+                    onset=int(onset) - subtraction if not np.isnan(onset) else np.nan,
+                    offset=offset - subtraction,
+                    name=symbol or None,
+                    peak=int(peak) if not np.isnan(peak) else None,
+                    duration=(offset - onset) / ann["fs"],
                 )
-                current_onset = None
-                current_wave_name = None
-                current_wave_peak = None
-            else:
-                if ignore_beat_types and symbol not in ["p", "t", "u"]:
-                    symbol = "N"
-                current_wave_name = symbol
-                current_wave_peak = idx
+            )
 
         return wave_list
 
@@ -0,0 +1,43 @@
+"""
+torch_ecg.export
+================
+
+This module contains utilities for exporting the models
+to TorchScript and ONNX artifacts for deployment,
+for running the artifacts on CPU,
+and for the post-training int8 quantization of the models.
+
+.. contents::
+    :depth: 2
+    :local:
+    :backlinks: top
+
+.. currentmodule:: torch_ecg.export
+
+.. autosummary::
+    :toctree: generated/
+    :recursive:
+
+    export_model
+    check_exported
+    ExportedModel
+    load_exported
+    fuse_conv_bn
+    quantize_model
+    compare_quantized
+
+"""
+
+from .exporter import check_exported, export_model
+from .quantization import compare_quantized, fuse_conv_bn, quantize_model
+from .runtime import ExportedModel, load_exported
+
+__all__ = [
+    "export_model",
+    "check_exported",
+    "ExportedModel",
+    "load_exported",
+    "fuse_conv_bn",
+    "quantize_model",
+    "compare_quantized",
+]
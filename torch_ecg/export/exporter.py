@@ -0,0 +1,238 @@
+"""
+Export of the models to TorchScript and ONNX artifacts.
+"""
+
+import inspect
+import json
+import warnings
+from copy import deepcopy
+from pathlib import Path
+from typing import Dict, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from torch import Tensor, nn
+
+from ..models._nets import CRF, ExtendedCRF
+from ..version import __version__
+from .runtime import ExportedModel, _metadata_path
+
+__all__ = [
+    "export_model",
+    "check_exported",
+]
+
+
+# modules with loops over the time steps, which are scripted instead of traced,
+# so that the exported models accept inputs of arbitrary lengths
+_SCRIPTED_MODULES = (CRF, ExtendedCRF)
+
+
+def _script_submodules(module: nn.Module) -> None:
+    """Script (in-place) the submodules in `_SCRIPTED_MODULES`."""
+    for name, child in module.named_children():
+        if isinstance(child, _SCRIPTED_MODULES):
+            setattr(module, name, torch.jit.script(child))
+        else:
+            _script_submodules(child)
+
+
+def _default_example_input(model: nn.Module) -> Tuple[Tensor, Dict[int, str]]:
+    """Example input and its dynamic axes for the models in `torch_ecg.models`."""
+    if hasattr(model, "n_leads"):  # CNN-based models, e.g. ECG_CRNN, ECG_SEQ_LAB_NET, ECG_UNET
+        return torch.randn(2, model.n_leads, 4000), {0: "batch_size", 2: "seq_len"}
+    config = getattr(model, "config", None) or {}
+    if "batch_first" in config:  # RR_LSTM
+        if config["batch_first"]:
+            return torch.randn(2, 1, 100), {0: "batch_size", 2: "seq_len"}
+        return torch.randn(100, 2, 1), {0: "seq_len", 1: "batch_size"}
+    raise ValueError(f"`example_input` should be given for the model `{type(model).__name__}`")
+
+
+def _perturb_input(example_input: Tensor, input_axes: Dict[int, str]) -> Tensor:
+    """An input of sizes of the dynamic axes different from `example_input`."""
+    shape = list(example_input.shape)
+    for axis, name in input_axes.items():
+        shape[axis] = shape[axis] + 1 if name == "batch_size" else shape[axis] + shape[axis] // 2
+    return torch.randn(*shape, dtype=example_input.dtype)
+
+
+def export_model(
+    model: nn.Module,
+    path: Union[str, Path],
+    format: Literal["torchscript", "onnx"] = "torchscript",
+    example_input: Optional[Union[np.ndarray, Tensor]] = None,
+    input_axes: Optional[Dict[int, str]] = None,
+    opset_version: Optional[int] = None,
+    check: bool = True,
+    rtol: float = 1e-3,
+    atol: float = 1e-5,
+) -> Path:
+    """Export a model to a TorchScript or ONNX artifact, running on CPU.
+
+    The model is traced (with the layers having loops over the time steps,
+    e.g. :class:`~torch_ecg.models._nets.CRF`, scripted), with the batch size
+    and the length of the input as dynamic axes. The metadata of the artifact
+    (format, classes, input and output axes, etc.) is saved in a JSON file
+    named ``<artifact name>.json`` next to it, which is read by
+    :class:`~torch_ecg.export.ExportedModel`.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        The model to export, e.g. :class:`~torch_ecg.models.ECG_CRNN`,
+        :class:`~torch_ecg.models.ECG_SEQ_LAB_NET`, :class:`~torch_ecg.models.ECG_UNET`,
+        :class:`~torch_ecg.models.RR_LSTM`. The model is NOT modified.
+    path : `path-like`
+        Path to save the artifact.
+    format : {"torchscript", "onnx"}, default "torchscript"
+        Format of the artifact, case insensitive.
+    example_input : numpy.ndarray or torch.Tensor, optional
+        Example input of the model used for tracing. Can be omitted for
+        the models in :mod:`torch_ecg.models`, for which the example input is of shape
+        ``(2, n_leads, 4000)``, or ``(100, 2, 1)`` for :class:`~torch_ecg.models.RR_LSTM`
+        (``(2, 1, 100)`` if ``batch_first``).
+    input_axes : dict, optional
+        Names of the dynamic axes of the input, e.g. ``{0: "batch_size", 2: "seq_len"}``.
+        Can be omitted along with `example_input`.
+    opset_version : int, optional
+        Version of the ONNX opset, defaults to the one of :func:`torch.onnx.export`.
+    check : bool, default True
+        Whether to check the consistency of the outputs of the artifact
+        with the outputs of the (eager) model, via :func:`check_exported`,
+        on the example input and an input of different batch size and length.
+    rtol, atol : float
+        Relative and absolute tolerances of the consistency check.
+
+    Returns
+    -------
+    pathlib.Path
+        Path to the artifact.
+
+    """
+    _format = format.lower()
+    if _format not in ["torchscript", "onnx"]:
+        raise ValueError(f"`format` should be one of `torchscript|onnx`, but got `{format}`")
+    if example_input is None:
+        example_input, default_axes = _default_example_input(model)
+        input_axes = input_axes or default_axes
+    example_input = torch.as_tensor(example_input, dtype=torch.float32)
+    assert input_axes is not None, "`input_axes` should be given along with `example_input`"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    model = deepcopy(model).cpu().float().eval()
+    eager_model = deepcopy(model)
+    _script_submodules(model)
+    with torch.no_grad(), warnings.catch_warnings():
+        # shape-dependent branches are checked by `check_exported` instead
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        traced = torch.jit.trace(model, example_input, check_trace=False)
+        example_output = traced(example_input)
+    output_axes = {0: "batch_size"}
+    if example_output.ndim == 3:  # time-resolved outputs
+        output_axes[1] = "out_seq_len"
+
+    if _format == "torchscript":
+        traced.save(str(path))
+    else:
+        kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # the TorchScript-based exporter, which keeps the scripted loops
+            kwargs["dynamo"] = False
+        if opset_version is not None:
+            kwargs["opset_version"] = opset_version
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            torch.onnx.export(
+                traced,
+                (example_input,),
+                str(path),
+                input_names=["input"],
+                output_names=["output"],
+                dynamic_axes={"input": input_axes, "output": output_axes},
+                **kwargs,
+            )
+
+    metadata = {
+        "format": _format,
+        "model": getattr(eager_model, "__name__", type(eager_model).__name__),
+        "torch_ecg_version": __version__,
+        "input_shape": list(example_input.shape),
+        "input_axes": input_axes,
+        "output_shape": list(example_output.shape),
+        "output_axes": output_axes,
+        "classes": getattr(eager_model, "classes", None),
+        "n_leads": getattr(eager_model, "n_leads", None),
+    }
+    _metadata_path(path).write_text(json.dumps(metadata, indent=4))
+
+    if check:
+        if _format == "onnx":
+            try:
+                import onnxruntime  # noqa: F401
+            except (ImportError, ModuleNotFoundError):
+                warnings.warn("onnxruntime is not installed, the consistency check is skipped.", RuntimeWarning)
+                return path
+        check_exported(
+            eager_model,
+            path,
+            [example_input, _perturb_input(example_input, input_axes)],
+            rtol=rtol,
+            atol=atol,
+        )
+    return path
+
+
+def check_exported(
+    model: nn.Module,
+    path: Union[str, Path],
+    inputs: Sequence[Union[np.ndarray, Tensor]],
+    rtol: float = 1e-3,
+    atol: float = 1e-5,
+) -> float:
+    """Check the consistency of the outputs of an exported model
+    with the outputs of the (eager) model.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        The (eager) model, in evaluation mode.
+    path : `path-like`
+        Path to the artifact exported by :func:`export_model`.
+    inputs : Sequence[numpy.ndarray or torch.Tensor]
+        Inputs to check the outputs on.
+    rtol, atol : float
+        Relative and absolute tolerances of the consistency check.
+
+    Returns
+    -------
+    float
+        The maximum absolute difference of the outputs.
+
+    Raises
+    ------
+    RuntimeError
+        If the outputs are inconsistent.
+
+    """
+    exported = ExportedModel(path)
+    device = next(model.parameters()).device
+    max_diff = 0.0
+    for input in inputs:
+        input = torch.as_tensor(input, dtype=torch.float32)
+        with torch.no_grad():
+            expected = model(input.to(device)).float().cpu().numpy()
+        output = exported(input.numpy())
+        if output.shape != expected.shape:
+            raise RuntimeError(
+                f"the output of the exported model is of shape `{output.shape}` for the input of shape "
+                f"`{tuple(input.shape)}`, but the output of the model is of shape `{expected.shape}`"
+            )
+        max_diff = max(max_diff, float(np.abs(output - expected).max(initial=0.0)))
+        if not np.allclose(output, expected, rtol=rtol, atol=atol):
+            raise RuntimeError(
+                f"the outputs of the exported model are inconsistent with the model for the input of shape "
+                f"`{tuple(input.shape)}`, with maximum absolute difference `{max_diff}`"
+            )
+    return max_diff
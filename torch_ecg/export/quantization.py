@@ -0,0 +1,324 @@
+"""
+Post-training static int8 quantization of the convolutional (CNN) backbones.
+
+The models are quantized in the eager mode, since the residual blocks of
+several backbones (e.g. :class:`~torch_ecg.models.cnn.ResNet`) have branches
+depending on the shapes of the tensors, which can not be symbolically traced.
+The batch normalization (and ReLU) following the convolutions are fused into the
+convolutions, which are then wrapped with quantization and dequantization stubs,
+calibrated on (a few batches of) the data, and converted to int8 convolutions.
+The other layers (e.g. the activations other than ReLU, the recurrent layers,
+the attention layers) are kept in float.
+
+"""
+
+import io
+import time
+import warnings
+from copy import deepcopy
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from torch import Tensor, nn
+from torch.ao.nn import intrinsic as nni
+from torch.ao.quantization import QuantWrapper, convert, fuse_modules, get_default_qconfig, prepare
+from torch.utils.data import DataLoader, Dataset
+
+from ..components.metrics import ClassificationMetrics
+from ..utils.utils_nn import default_collate_fn
+
+__all__ = [
+    "fuse_conv_bn",
+    "quantize_model",
+    "compare_quantized",
+]
+
+
+# the (fused) convolutions replaced with their int8 counterparts
+_QUANTIZABLE_MODULES = (nn.Conv1d, nni.ConvReLU1d)
+
+
+def _is_quantizable(module: nn.Module) -> bool:
+    """Whether the module is a quantizable convolution.
+
+    The grouped (including the depthwise) convolutions are kept in float,
+    since their int8 kernels of the quantized engines are much slower
+    than the float ones, e.g. the depthwise convolutions of
+    :class:`~torch_ecg.models.cnn.MobileNetV1` and :class:`~torch_ecg.models.cnn.Xception`.
+    """
+    if type(module) not in _QUANTIZABLE_MODULES:
+        return False
+    conv = module[0] if isinstance(module, nni.ConvReLU1d) else module
+    return conv.groups == 1 and conv.padding_mode == "zeros"
+
+
+def _fusion_groups(module: nn.Sequential) -> List[List[str]]:
+    """Names of the groups of consecutive children ``conv1d -> batch_norm (-> relu)``
+    of a sequential module, e.g. :class:`~torch_ecg.models._nets.Conv_Bn_Activation`
+    of the ordering "cba" or "cb".
+    """
+    names = [name for name, _ in module.named_children()]
+    children = [child for _, child in module.named_children()]
+    groups, idx = [], 0
+    while idx < len(children) - 1:
+        if type(children[idx]) is nn.Conv1d and type(children[idx + 1]) is nn.BatchNorm1d:
+            group = names[idx : idx + 2]
+            if idx + 2 < len(children) and type(children[idx + 2]) is nn.ReLU:
+                group.append(names[idx + 2])
+            groups.append(group)
+            idx += len(group)
+        else:
+            idx += 1
+    return groups
+
+
+def _fuse_conv_bn(module: nn.Module) -> None:
+    """Fuse (in-place) the groups of :func:`_fusion_groups` recursively."""
+    for child in module.children():
+        _fuse_conv_bn(child)
+    if isinstance(module, nn.Sequential):
+        groups = _fusion_groups(module)
+        if len(groups) > 0:
+            fuse_modules(module, groups, inplace=True)
+
+
+def fuse_conv_bn(model: nn.Module, inplace: bool = False) -> nn.Module:
+    """Fuse the batch normalization (and ReLU) into the preceding convolution.
+
+    The fused modules are the consecutive ``Conv1d -> BatchNorm1d (-> ReLU)``
+    in the sequential modules, e.g. :class:`~torch_ecg.models._nets.Conv_Bn_Activation`
+    (of the ordering "cba" or "cb") and :class:`~torch_ecg.models._nets.MultiConv`.
+    The batch normalization layers are folded into the weights and biases
+    of the convolutions and replaced with :class:`~torch.nn.Identity`,
+    so that the fused model, which is in evaluation mode, computes the same outputs
+    with fewer operations.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        The model to fuse.
+    inplace : bool, default False
+        Whether to fuse the model in-place.
+
+    Returns
+    -------
+    torch.nn.Module
+        The fused model, in evaluation mode.
+
+    """
+    if not inplace:
+        model = deepcopy(model)
+    model.eval()
+    _fuse_conv_bn(model)
+    return model
+
+
+def _wrap_quantizable(module: nn.Module, qconfig: Any) -> int:
+    """Wrap (in-place) the quantizable convolutions with quantization and
+    dequantization stubs, and return the number of the wrapped convolutions.
+    """
+    num_wrapped = 0
+    for name, child in module.named_children():
+        if _is_quantizable(child):
+            wrapped = QuantWrapper(child)
+            wrapped.qconfig = qconfig
+            setattr(module, name, wrapped)
+            num_wrapped += 1
+        else:
+            num_wrapped += _wrap_quantizable(child, qconfig)
+    return num_wrapped
+
+
+def _iter_batches(
+    data: Union[Dataset, DataLoader, Iterable, np.ndarray, Tensor],
+    batch_size: int,
+    num_batches: Optional[int] = None,
+) -> Iterator[Tuple[Tensor, Optional[Tensor]]]:
+    """Iterate over the batches ``(signals, labels)`` of the data."""
+    if isinstance(data, (np.ndarray, Tensor)):
+        data = [torch.as_tensor(data)]
+    elif isinstance(data, Dataset):
+        data = DataLoader(data, batch_size=batch_size, shuffle=False, collate_fn=default_collate_fn)
+    for idx, batch in enumerate(data):
+        if num_batches is not None and idx >= num_batches:
+            break
+        if isinstance(batch, (tuple, list)):
+            signals, labels = batch[0], (batch[1] if len(batch) > 1 else None)
+        else:
+            signals, labels = batch, None
+        yield torch.as_tensor(signals, dtype=torch.float32), labels
+
+
+def quantize_model(
+    model: nn.Module,
+    calibration_data: Union[Dataset, DataLoader, Iterable, np.ndarray, Tensor],
+    num_batches: Optional[int] = 10,
+    batch_size: int = 32,
+    backend: Optional[str] = None,
+    inplace: bool = False,
+) -> nn.Module:
+    """Post-training static int8 quantization of the convolutions of a model.
+
+    The batch normalization (and ReLU) are fused into the convolutions via
+    :func:`fuse_conv_bn`, the quantization parameters of the inputs and outputs of
+    the convolutions are calibrated on the data, and the convolutions are converted
+    to int8 convolutions, each wrapped with a quantization and a dequantization stub.
+    The other layers, as well as the grouped (including the depthwise) convolutions,
+    are kept in float.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        The (float) model to quantize,
+        e.g. :class:`~torch_ecg.models.ECG_CRNN`, :class:`~torch_ecg.models.ECG_SEQ_LAB_NET`.
+    calibration_data : torch.utils.data.Dataset or torch.utils.data.DataLoader or Iterable or numpy.ndarray or torch.Tensor
+        Data to calibrate the quantization parameters, which can be
+        a dataset (e.g. the datasets in :mod:`torch_ecg.databases.datasets`)
+        generating ``signals, labels, ...``, an iterable (e.g. a data loader)
+        of batches ``signals, labels, ...`` or of signals, or a batch of signals.
+    num_batches : int, optional
+        Number of batches used for calibration, defaults to 10.
+        If is None, all the batches are used.
+    batch_size : int, default 32
+        Batch size, used only if `calibration_data` is a dataset.
+    backend : {"x86", "fbgemm", "qnnpack", "onednn"}, optional
+        The quantized engine, defaults to the current one
+        (:attr:`torch.backends.quantized.engine`).
+        NOTE that the engine is set globally, and the quantized model
+        should be run with the same engine.
+    inplace : bool, default False
+        Whether to quantize the model in-place.
+
+    Returns
+    -------
+    torch.nn.Module
+        The quantized model, in evaluation mode, running on CPU.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from torch_ecg.databases.datasets import CINC2021Dataset, CINC2021TrainCfg
+
+        ds_val = CINC2021Dataset(CINC2021TrainCfg, training=False)
+        qmodel = quantize_model(model, ds_val, num_batches=20)
+        report = compare_quantized(model, qmodel, ds_val)
+
+    """
+    backend = backend or torch.backends.quantized.engine
+    if backend not in torch.backends.quantized.supported_engines:
+        raise ValueError(
+            f"`backend` should be one of `{'|'.join(torch.backends.quantized.supported_engines)}`, but got `{backend}`"
+        )
+    torch.backends.quantized.engine = backend
+    if not inplace:
+        model = deepcopy(model)
+    model = fuse_conv_bn(model.cpu().float(), inplace=True)
+
+    with warnings.catch_warnings():
+        # deprecation warnings of `torch.ao.quantization`, and of the observers
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.simplefilter("ignore", UserWarning)
+        if _wrap_quantizable(model, get_default_qconfig(backend)) == 0:
+            raise ValueError("No convolution to quantize in the model")
+        prepare(model, inplace=True)
+        with torch.no_grad():
+            for signals, _ in _iter_batches(calibration_data, batch_size, num_batches):
+                model(signals)
+        convert(model, inplace=True)
+    return model
+
+
+def _serialized_size(model: nn.Module) -> int:
+    """Size (in bytes) of the serialized state dict of the model."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def compare_quantized(
+    model: nn.Module,
+    quantized_model: nn.Module,
+    data: Union[Dataset, DataLoader, Iterable, np.ndarray, Tensor],
+    num_batches: Optional[int] = None,
+    batch_size: int = 32,
+    multi_label: bool = True,
+    thr: float = 0.5,
+) -> Dict[str, Dict[str, float]]:
+    """Compare the latency, the size and the classification metrics
+    of a quantized model with the float model.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        The float model.
+    quantized_model : torch.nn.Module
+        The quantized model, e.g. returned by :func:`quantize_model`.
+    data : torch.utils.data.Dataset or torch.utils.data.DataLoader or Iterable or numpy.ndarray or torch.Tensor
+        Data to compare the models on, of the same types as `calibration_data`
+        of :func:`quantize_model`. The classification metrics are computed
+        only if the batches have labels.
+    num_batches : int, optional
+        Number of batches to compare the models on.
+        If is None (default), all the batches are used.
+    batch_size : int, default 32
+        Batch size, used only if `data` is a dataset.
+    multi_label : bool, default True
+        Whether the models are multi-label classifiers,
+        whose (logit) outputs are turned into probabilities via sigmoid,
+        otherwise via softmax.
+    thr : float, default 0.5
+        Threshold of the probabilities for the classification metrics.
+
+    Returns
+    -------
+    dict
+        Dict of items "latency" (mean time, in seconds, per batch on CPU),
+        "size" (size, in bytes, of the serialized state dict),
+        and the classification metrics "accuracy", "f1_measure", "auroc", "auprc"
+        (macro-averaged, if the batches have labels), each a dict of keys
+        "float", "quantized" and "delta" (quantized minus float);
+        and the item "max_abs_diff", the maximum absolute difference
+        of the outputs of the models.
+
+    """
+    model = deepcopy(model).cpu().float().eval()
+    quantized_model.eval()
+    metrics = {key: ClassificationMetrics(multi_label=multi_label) for key in ["float", "quantized"]}
+    elapsed = {"float": 0.0, "quantized": 0.0}
+    max_abs_diff, n_batches, has_labels = 0.0, 0, True
+    with torch.no_grad():
+        for idx, (signals, labels) in enumerate(_iter_batches(data, batch_size, num_batches)):
+            if idx == 0:  # warm-up
+                model(signals)
+                quantized_model(signals)
+            outputs = {}
+            for key, _model in zip(["float", "quantized"], [model, quantized_model]):
+                start = time.perf_counter()
+                outputs[key] = _model(signals)
+                elapsed[key] += time.perf_counter() - start
+            max_abs_diff = max(max_abs_diff, (outputs["float"] - outputs["quantized"]).abs().max().item())
+            n_batches += 1
+            has_labels = has_labels and labels is not None
+            if has_labels:
+                for key, output in outputs.items():
+                    prob = torch.sigmoid(output) if multi_label else torch.softmax(output, dim=-1)
+                    metrics[key].update(torch.as_tensor(labels), prob, thr=thr)
+    if n_batches == 0:
+        raise ValueError("No data to compare the models on")
+
+    values = {
+        "latency": {"float": elapsed["float"] / n_batches, "quantized": elapsed["quantized"] / n_batches},
+        "size": {"float": _serialized_size(model), "quantized": _serialized_size(quantized_model)},
+    }
+    if has_labels:
+        for key in metrics:
+            metrics[key].compute()
+        for name in ["accuracy", "f1_measure", "auroc", "auprc"]:
+            values[name] = {key: float(getattr(metrics[key], name)) for key in metrics}
+    report = {}
+    for name, value in values.items():
+        report[name] = {**value, "delta": value["quantized"] - value["float"]}
+    report["max_abs_diff"] = max_abs_diff
+    return report
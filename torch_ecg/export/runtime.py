@@ -0,0 +1,139 @@
+"""
+Runtime of the exported models.
+
+This module depends only on NumPy, and PyTorch (for TorchScript artifacts)
+or ONNX Runtime (for ONNX artifacts), but NOT on the other parts of `torch_ecg`,
+so that it can be copied alone into the (serving) environments
+without the training stack.
+
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+__all__ = [
+    "ExportedModel",
+    "load_exported",
+]
+
+
+_FORMATS = {
+    ".pt": "torchscript",
+    ".pth": "torchscript",
+    ".onnx": "onnx",
+}
+
+
+def _metadata_path(path: Union[str, Path]) -> Path:
+    """Path of the metadata file of the artifact at `path`."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.json")
+
+
+class ExportedModel(object):
+    """Exported (TorchScript or ONNX) model running on CPU.
+
+    Parameters
+    ----------
+    path : `path-like`
+        Path to the artifact exported by :func:`~torch_ecg.export.export_model`.
+        The metadata file (of name ``<artifact name>.json``),
+        if exists, is read as well.
+    providers : Sequence[str], optional
+        Execution providers of ONNX Runtime,
+        defaults to ``["CPUExecutionProvider"]``.
+        Not used for TorchScript artifacts.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        model = ExportedModel("ecg_crnn.onnx")
+        prob = 1 / (1 + np.exp(-model(sig[np.newaxis, ...])))
+        print(dict(zip(model.classes, prob[0])))
+
+    """
+
+    __name__ = "ExportedModel"
+
+    def __init__(self, path: Union[str, Path], providers: Optional[Sequence[str]] = None) -> None:
+        self.path = Path(path)
+        if _metadata_path(self.path).is_file():
+            self.metadata = json.loads(_metadata_path(self.path).read_text())
+        else:
+            self.metadata = {}
+        self.format = self.metadata.get("format", _FORMATS.get(self.path.suffix.lower()))
+        if self.format == "torchscript":
+            import torch
+
+            self._model = torch.jit.load(str(self.path), map_location="cpu").eval()
+        elif self.format == "onnx":
+            try:
+                import onnxruntime as ort
+            except (ImportError, ModuleNotFoundError):
+                raise ImportError("onnxruntime is required to run ONNX models.")
+            self._session = ort.InferenceSession(str(self.path), providers=list(providers or ["CPUExecutionProvider"]))
+            self._input_name = self._session.get_inputs()[0].name
+        else:
+            raise ValueError(f"Unknown format of the exported model `{self.path.name}`")
+
+    @property
+    def classes(self) -> Optional[List[str]]:
+        """Classes of the outputs of the model, if recorded."""
+        return self.metadata.get("classes", None)
+
+    @property
+    def input_axes(self) -> Dict[int, str]:
+        """Names of the dynamic axes of the input, if recorded."""
+        return {int(k): v for k, v in self.metadata.get("input_axes", {}).items()}
+
+    def __call__(self, input: np.ndarray) -> np.ndarray:
+        """Run the model.
+
+        Parameters
+        ----------
+        input : numpy.ndarray
+            The input of the model, of the same layout as
+            the input used for exporting the model,
+            e.g. ``(batch_size, n_leads, seq_len)`` for CNN-based models.
+
+        Returns
+        -------
+        numpy.ndarray
+            The output of the model.
+
+        """
+        input = np.ascontiguousarray(input, dtype=np.float32)
+        if self.format == "torchscript":
+            import torch
+
+            with torch.no_grad():
+                return self._model(torch.from_numpy(input)).numpy()
+        return self._session.run(None, {self._input_name: input})[0]
+
+    def __repr__(self) -> str:
+        return f"{self.__name__}(path={str(self.path)!r}, format={self.format!r})"
+
+    __str__ = __repr__
+
+
+def load_exported(path: Union[str, Path], **kwargs: Any) -> ExportedModel:
+    """Load an exported model to run on CPU.
+
+    Parameters
+    ----------
+    path : `path-like`
+        Path to the artifact exported by :func:`~torch_ecg.export.export_model`.
+    kwargs : dict, optional
+        Other keyword arguments passed to :class:`ExportedModel`.
+
+    Returns
+    -------
+    ExportedModel
+        The loaded model.
+
+    """
+    return ExportedModel(path, **kwargs)
@@ -3635,8 +3635,6 @@ class CRF(nn.Module, SizeMixin):
         self.end_transitions = nn.Parameter(torch.empty(num_tags))
         self.transitions = nn.Parameter(torch.empty(num_tags, num_tags))
         self.reset_parameters()
-        # self.__device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.__permute_tuple = (0, 1, 2) if self.batch_first else (1, 0, 2)
 
     def reset_parameters(self) -> None:
         """
@@ -3720,7 +3718,7 @@ class CRF(nn.Module, SizeMixin):
             nll = nll.sum() / mask.float().sum()
         return nll
 
-    def forward(self, emissions: Tensor, mask: Optional[torch.ByteTensor] = None) -> Tensor:
+    def forward(self, emissions: Tensor, mask: Optional[Tensor] = None) -> Tensor:
         """
         Find the most likely tag sequence using Viterbi algorithm.
 
@@ -3740,24 +3738,54 @@ class CRF(nn.Module, SizeMixin):
             one hot encoding Tensor of the most likely tag sequence,
             of shape (seq_len, batch_size, num_tags) if batch_first is False,
             of shape (batch_size, seq_len, num_tags) if batch_first is True.
+            Time steps beyond the end of the sequences (indicated by `mask`)
+            are all zeros.
+
+        """
+        best_tags = self.decode(emissions, mask)
+        output = F.one_hot(best_tags.clamp(min=0), num_classes=self.num_tags)
+        output = output * (best_tags >= 0).unsqueeze(-1).to(output.dtype)
+        return output
+
+    def decode(self, emissions: Tensor, mask: Optional[Tensor] = None) -> Tensor:
+        """
+        Find the most likely tag sequence using Viterbi algorithm.
+
+        Parameters
+        ----------
+        emissions: Tensor,
+            emission score tensor,
+            of shape (seq_len, batch_size, num_tags) if batch_first is False,
+            of shape (batch_size, seq_len, num_tags) if batch_first is True.
+        mask: torch.ByteTensor
+            mask tensor of shape (seq_len, batch_size) if batch_first is False,
+            of shape (batch_size, seq_len) if batch_first is True.
+
+        Returns
+        -------
+        best_tags: torch.LongTensor,
+            indices of the most likely tags,
+            of shape (seq_len, batch_size) if batch_first is False,
+            of shape (batch_size, seq_len) if batch_first is True,
+            padded with -1 beyond the end of the sequences.
 
         """
         self._validate(emissions, mask=mask)
-        _device = next(self.parameters()).device
         if mask is None:
-            mask = emissions.new_ones(emissions.shape[:2], dtype=torch.uint8, device=_device)
+            mask = torch.ones(emissions.shape[:2], dtype=torch.uint8, device=emissions.device)
         if self.batch_first:
             emissions = emissions.transpose(0, 1)
             mask = mask.transpose(0, 1)
-        best_tags = Tensor(self._viterbi_decode(emissions, mask)).to(torch.int64)
-        output = F.one_hot(best_tags.to(_device), num_classes=self.num_tags).permute(*self.__permute_tuple)
-        return output
+        best_tags = self._viterbi_decode(emissions, mask)
+        if self.batch_first:
+            best_tags = best_tags.transpose(0, 1)
+        return best_tags
 
     def _validate(
         self,
         emissions: Tensor,
-        tags: Optional[torch.LongTensor] = None,
-        mask: Optional[torch.ByteTensor] = None,
+        tags: Optional[Tensor] = None,
+        mask: Optional[Tensor] = None,
     ) -> None:
         """Check validity of input :class:`~torch.Tensor`."""
         if emissions.dim() != 3:
@@ -3769,21 +3797,20 @@ class CRF(nn.Module, SizeMixin):
             if emissions.shape[:2] != tags.shape:
                 raise ValueError(
                     "the first two dimensions of `emissions` and `tags` must match, "
-                    f"but got `{tuple(emissions.shape[:2])}` and `{tuple(tags.shape)}`"
+                    f"but got `{emissions.shape[:2]}` and `{tags.shape}`"
                 )
 
         if mask is not None:
             if emissions.shape[:2] != mask.shape:
                 raise ValueError(
                     "the first two dimensions of `emissions` and `mask` must match, "
-                    f"but got `{tuple(emissions.shape[:2])}` and `{tuple(mask.shape)}`"
+                    f"but got `{emissions.shape[:2]}` and `{mask.shape}`"
                 )
-            no_empty_seq = not self.batch_first and mask[0].all()
-            no_empty_seq_bf = self.batch_first and mask[:, 0].all()
-            if not no_empty_seq and not no_empty_seq_bf:
+            first_step = mask[:, 0] if self.batch_first else mask[0]
+            if not bool(first_step.all()):
                 raise ValueError("mask of the first timestep must all be on")
 
-    def _compute_score(self, emissions: Tensor, tags: torch.LongTensor, mask: torch.ByteTensor) -> Tensor:
+    def _compute_score(self, emissions: Tensor, tags: Tensor, mask: Tensor) -> Tensor:
         """
         # emissions: (seq_len, batch_size, num_tags)
         # tags: (seq_len, batch_size)
@@ -3792,42 +3819,39 @@ class CRF(nn.Module, SizeMixin):
         assert (
             emissions.dim() == 3 and tags.dim() == 2
         ), "`emissions` must have dimension of 3, and `tags` must have dimension of 2"
-        seq_len, batch_size, num_tags = emissions.shape
         assert emissions.shape[:2] == tags.shape, "the first two dimensions of `emissions` and `tags` must match"
         assert (
             emissions.shape[2] == self.num_tags
         ), f"expected last dimension of `emissions` is `{self.num_tags}`, but got `{emissions.shape[2]}`"
         assert mask.shape == tags.shape, "shapes of `tags` and `mask` must match"
-        assert mask[0].all(), "mask of the first timestep must all be on"
-
-        seq_len, batch_size = tags.shape
-        mask = mask.float()
+        assert bool(mask[0].all()), "mask of the first timestep must all be on"
 
-        # Start transition score and first emission
-        # shape: (batch_size,)
-        score = self.start_transitions[tags[0]]
-        score += emissions[0, torch.arange(batch_size), tags[0]]
+        mask = mask.to(emissions.dtype)
 
-        for i in range(1, seq_len):
-            # Transition score to next tag, only added if next timestep is valid (mask == 1)
-            # shape: (batch_size,)
-            score += self.transitions[tags[i - 1], tags[i]] * mask[i]
+        # Emission scores of the tags at all time steps
+        # shape: (seq_len, batch_size)
+        emission_scores = emissions.gather(2, tags.unsqueeze(2)).squeeze(2)
+        # Transition scores between consecutive tags
+        # shape: (seq_len - 1, batch_size)
+        transition_scores = self.transitions[tags[:-1], tags[1:]]
 
-            # Emission score for next tag, only added if next timestep is valid (mask == 1)
-            # shape: (batch_size,)
-            score += emissions[i, torch.arange(batch_size), tags[i]] * mask[i]
+        # Start transition score and first emission, plus the transition and emission
+        # scores of the following time steps, only added if the timestep is valid (mask == 1)
+        # shape: (batch_size,)
+        score = self.start_transitions[tags[0]] + emission_scores[0]
+        score = score + ((transition_scores + emission_scores[1:]) * mask[1:]).sum(dim=0)
 
         # End transition score
         # shape: (batch_size,)
         seq_ends = mask.long().sum(dim=0) - 1
         # shape: (batch_size,)
-        last_tags = tags[seq_ends, torch.arange(batch_size)]
+        last_tags = tags.gather(0, seq_ends.unsqueeze(0)).squeeze(0)
         # shape: (batch_size,)
-        score += self.end_transitions[last_tags]
+        score = score + self.end_transitions[last_tags]
 
         return score
 
-    def _compute_normalizer(self, emissions: torch.Tensor, mask: torch.ByteTensor) -> Tensor:
+    def _compute_normalizer(self, emissions: Tensor, mask: Tensor) -> Tensor:
         """
         # emissions: (seq_len, batch_size, num_tags)
         # mask: (seq_len, batch_size)
@@ -3839,9 +3863,10 @@ class CRF(nn.Module, SizeMixin):
         assert (
             emissions.shape[2] == self.num_tags
         ), f"expected last dimension of `emissions` is `{self.num_tags}`, but got `{emissions.shape[2]}`"
-        assert mask[0].all(), "mask of the first timestep must all be on"
+        assert bool(mask[0].all()), "mask of the first timestep must all be on"
 
-        seq_len, batch_size, num_tags = emissions.shape
+        seq_len = emissions.shape[0]
+        mask = mask.to(torch.bool).unsqueeze(2)
 
         # Start transition score and first emission; score has size of
         # (batch_size, num_tags) where for each batch, the j-th column stores
@@ -3849,45 +3874,30 @@ class CRF(nn.Module, SizeMixin):
         # shape: (batch_size, num_tags)
         score = self.start_transitions + emissions[0]
 
+        # The recursion over time steps is inherently sequential; each step is
+        # a single log-sum-exp over the (batch_size, num_tags, num_tags) scores
+        # of transitioning from tag i to tag j, with the emission score of tag j,
+        # which does not depend on i, added afterwards
         for i in range(1, seq_len):
-            # Broadcast score for every possible next tag
-            # shape: (batch_size, num_tags, 1)
-            broadcast_score = score.unsqueeze(2)
-
-            # Broadcast emission score for every possible current tag
-            # shape: (batch_size, 1, num_tags)
-            broadcast_emissions = emissions[i].unsqueeze(1)
-
-            # Compute the score tensor of size (batch_size, num_tags, num_tags) where
-            # for each sample, entry at row i and column j stores the sum of scores of all
-            # possible tag sequences so far that end with transitioning from tag i to tag j
-            # and emitting
-            # shape: (batch_size, num_tags, num_tags)
-            next_score = broadcast_score + self.transitions + broadcast_emissions
-
-            # Sum over all possible current tags, but we're in score space, so a sum
-            # becomes a log-sum-exp: for each sample, entry i stores the sum of scores of
-            # all possible tag sequences so far, that end in tag i
             # shape: (batch_size, num_tags)
-            next_score = torch.logsumexp(next_score, dim=1)
-
+            next_score = torch.logsumexp(score.unsqueeze(2) + self.transitions, dim=1) + emissions[i]
             # Set score to the next score if this timestep is valid (mask == 1)
             # shape: (batch_size, num_tags)
-            # score = torch.where(mask[i].unsqueeze(1), next_score, score)
-            score = torch.where(mask[i].unsqueeze(1).bool(), next_score, score)
+            score = torch.where(mask[i], next_score, score)
 
         # End transition score
         # shape: (batch_size, num_tags)
-        score += self.end_transitions
+        score = score + self.end_transitions
 
         # Sum (log-sum-exp) over all possible tags
         # shape: (batch_size,)
         return torch.logsumexp(score, dim=1)
 
-    def _viterbi_decode(self, emissions: torch.FloatTensor, mask: torch.ByteTensor) -> List[List[int]]:
+    def _viterbi_decode(self, emissions: Tensor, mask: Tensor) -> Tensor:
         """
         # emissions: (seq_len, batch_size, num_tags)
         # mask: (seq_len, batch_size)
+        # returns: (seq_len, batch_size), padded with -1
         """
         assert (
             emissions.dim() == 3 and mask.dim() == 2
@@ -3896,76 +3906,58 @@ class CRF(nn.Module, SizeMixin):
         assert (
             emissions.shape[2] == self.num_tags
         ), f"expected last dimension of `emissions` is `{self.num_tags}`, but got `{emissions.shape[2]}`"
-        assert mask[0].all(), "mask of the first timestep must all be on"
+        assert bool(mask[0].all()), "mask of the first timestep must all be on"
 
         seq_len, batch_size = mask.shape
+        # shape: (batch_size,)
+        seq_ends = mask.long().sum(dim=0) - 1
+        mask = mask.to(torch.bool).unsqueeze(2)
 
         # Start transition and first emission
         # shape: (batch_size, num_tags)
         score = self.start_transitions + emissions[0]
-        history = []
 
         # score is a tensor of size (batch_size, num_tags) where for every batch,
         # value at column j stores the score of the best tag sequence so far that ends
         # with tag j
         # history saves where the best tags candidate transitioned from; this is used
         # when we trace back the best tag sequence
+        # shape: (seq_len, batch_size, num_tags), history[0] is not used
+        history = torch.zeros((seq_len, batch_size, self.num_tags), dtype=torch.long, device=emissions.device)
 
         # Viterbi algorithm recursive case: we compute the score of the best tag sequence
         # for every possible next tag
         for i in range(1, seq_len):
-            # Broadcast viterbi score for every possible next tag
-            # shape: (batch_size, num_tags, 1)
-            broadcast_score = score.unsqueeze(2)
-
-            # Broadcast emission score for every possible current tag
-            # shape: (batch_size, 1, num_tags)
-            broadcast_emission = emissions[i].unsqueeze(1)
-
-            # Compute the score tensor of size (batch_size, num_tags, num_tags) where
-            # for each sample, entry at row i and column j stores the score of the best
-            # tag sequence so far that ends with transitioning from tag i to tag j and emitting
-            # shape: (batch_size, num_tags, num_tags)
-            next_score = broadcast_score + self.transitions + broadcast_emission
-
-            # Find the maximum score over all possible current tag
+            # Find the maximum score over all possible current tags of transitioning
+            # from tag i to tag j, and add the emission score of tag j
             # shape: (batch_size, num_tags)
-            next_score, indices = next_score.max(dim=1)
+            next_score, indices = (score.unsqueeze(2) + self.transitions).max(dim=1)
+            next_score = next_score + emissions[i]
 
             # Set score to the next score if this timestep is valid (mask == 1)
             # and save the index that produces the next score
             # shape: (batch_size, num_tags)
-            # score = torch.where(mask[i].unsqueeze(1), next_score, score)
-            score = torch.where(mask[i].unsqueeze(1).bool(), next_score, score)
-            history.append(indices)
+            score = torch.where(mask[i], next_score, score)
+            history[i] = indices
 
         # End transition score
         # shape: (batch_size, num_tags)
-        score += self.end_transitions
-
-        # Now, compute the best path for each sample
+        score = score + self.end_transitions
 
+        # Now, compute the best paths for all samples at once, starting from the tags
+        # which maximize the score at the last (valid) timesteps, and tracing back
+        # where the best tags come from
         # shape: (batch_size,)
-        seq_ends = mask.long().sum(dim=0) - 1
-        best_tags_list = []
-
-        for idx in range(batch_size):
-            # Find the tag which maximizes the score at the last timestep; this is our best tag
-            # for the last timestep
-            _, best_last_tag = score[idx].max(dim=0)
-            best_tags = [best_last_tag.item()]
-
-            # We trace back where the best last tag comes from, append that to our best tag
-            # sequence, and trace it back again, and so on
-            for hist in reversed(history[: seq_ends[idx]]):
-                best_last_tag = hist[idx][best_tags[-1]]
-                best_tags.append(best_last_tag.item())
-
-            # Reverse the order because we start from the last timestep
-            best_tags.reverse()
-            best_tags_list.append(best_tags)
+        best_last_tags = score.argmax(dim=1)
+        best_tags = torch.full((seq_len, batch_size), -1, dtype=torch.long, device=emissions.device)
+        cur_tags = best_last_tags
+        for i in range(seq_len - 1, -1, -1):
+            if i < seq_len - 1:
+                prev_tags = history[i + 1].gather(1, cur_tags.unsqueeze(1)).squeeze(1)
+                cur_tags = torch.where(seq_ends > i, prev_tags, cur_tags)
+            best_tags[i] = torch.where(seq_ends >= i, cur_tags, best_tags[i])
 
-        return best_tags_list
+        return best_tags
 
     def compute_output_shape(
         self, seq_len: Optional[int] = None, batch_size: Optional[int] = None
@@ -4007,6 +3999,7 @@ class ExtendedCRF(nn.Sequential, SizeMixin):
     """
 
     __name__ = "ExtendedCRF"
+    __jit_unused_properties__ = SizeMixin.__jit_unused_properties__ + ["in_channels"]
 
     def __init__(self, in_channels: int, num_tags: int, bias: bool = True) -> None:
         """
@@ -4054,11 +4047,10 @@ class ExtendedCRF(nn.Sequential, SizeMixin):
             of shape (batch_size, seq_len, n_channels)
 
         """
-        if self.__in_channels != self.__num_tags:
-            output = self.proj(input)
-        else:
-            output = input
-        output = self.crf(output)
+        # the (optional) projection layer and the CRF layer
+        output = input
+        for module in self:
+            output = module(output)
         return output
 
     def compute_output_shape(
@@ -505,6 +505,7 @@ class ECG_SUBTRACT_UNET(nn.Module, CkptMixin, SizeMixin):
         super().__init__()
         self.classes = list(classes)
         self.n_classes = len(classes)
+        self.n_leads = n_leads
         self.__out_channels = len(classes)
         self.__in_channels = n_leads
         self.config = deepcopy(ECG_SUBTRACT_UNET_CONFIG)
@@ -417,6 +417,7 @@ class ECG_UNET(nn.Module, CkptMixin, SizeMixin, CitationMixin):
         super().__init__()
         self.classes = list(classes)
         self.n_classes = len(classes)  # final out_channels
+        self.n_leads = n_leads
         self.__out_channels = self.n_classes
         self.__in_channels = n_leads
         self.config = deepcopy(ECG_UNET_VANILLA_CONFIG)
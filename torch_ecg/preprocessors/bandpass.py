@@ -2,11 +2,14 @@
 """
 
 from numbers import Real
-from typing import Any, Optional
+from typing import Any, Literal, Optional, Tuple
 
+import numpy as np
 import torch
+from scipy.signal import lfilter_zi
 
-from .._preprocessors.base import preprocess_multi_lead_signal
+from ..utils.utils_signal import butter_bandpass, get_filter
+from ..utils.utils_signal_t import filtfilt as filtfilt_t
 
 __all__ = [
     "BandPass",
@@ -16,6 +19,12 @@ __all__ = [
 class BandPass(torch.nn.Module):
     """Bandpass filtering preprocessor.
 
+    The filter is designed and applied forward and backward (zero-phase)
+    in the same way as :func:`~torch_ecg._preprocessors.preprocess_multi_lead_signal`,
+    on the device of the signal tensors, ref. :func:`torch_ecg.utils.filtfilt_t`.
+    The Butterworth filters are applied sample by sample,
+    hence are much slower than the FIR filters for long signals.
+
     Parameters
     ----------
     fs : numbers.Real
@@ -24,6 +33,10 @@ class BandPass(torch.nn.Module):
         Low cutoff frequency.
     highcut : numbers.Real, optional
         High cutoff frequency.
+    filter_type : {"butter", "fir"}, default "butter"
+        Type of the bandpass filter.
+    filter_order : int, optional
+        Order of the bandpass filter.
     inplace : bool, default True
         Whether to perform the filtering in-place.
     kwargs : dict, optional
@@ -34,7 +47,14 @@ class BandPass(torch.nn.Module):
     __name__ = "BandPass"
 
     def __init__(
-        self, fs: Real, lowcut: Optional[Real] = 0.5, highcut: Optional[Real] = 45, inplace: bool = True, **kwargs: Any
+        self,
+        fs: Real,
+        lowcut: Optional[Real] = 0.5,
+        highcut: Optional[Real] = 45,
+        filter_type: Literal["butter", "fir"] = "butter",
+        filter_order: Optional[int] = None,
+        inplace: bool = True,
+        **kwargs: Any,
     ) -> None:
         super().__init__()
         self.fs = fs
@@ -45,7 +65,49 @@ class BandPass(torch.nn.Module):
             self.lowcut = 0
         if not self.highcut:
             self.highcut = float("inf")
+        self.filter_type = filter_type
+        self.filter_order = filter_order
         self.inplace = inplace
+        b, a = self._design_filter()
+        # the filter taps and the initial conditions are cached as (non-persistent) buffers,
+        # the latter solved by scipy, since they are sensitive to rounding errors
+        # for Butterworth filters of high orders with low cutoff frequencies
+        self.register_buffer("b", torch.tensor(b, dtype=torch.float64), persistent=False)
+        self.register_buffer("a", torch.tensor(a, dtype=torch.float64), persistent=False)
+        self.register_buffer("zi", torch.tensor(lfilter_zi(b, a), dtype=torch.float64), persistent=False)
+
+    def _design_filter(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Design the filter, the same as
+        :func:`~torch_ecg._preprocessors.preprocess_multi_lead_signal`.
+        """
+        assert self.lowcut < self.highcut, "Invalid frequency band"
+        nyq = 0.5 * self.fs
+        if self.filter_type.lower() == "butter":
+            b, a = butter_bandpass(
+                self.lowcut,
+                self.highcut,
+                self.fs,
+                order=self.filter_order or round(0.01 * self.fs),
+            )
+        elif self.filter_type.lower() == "fir":
+            if self.lowcut <= 0 and self.highcut < nyq:
+                band, frequency = "lowpass", self.highcut
+            elif self.highcut >= nyq and self.lowcut > 0:
+                band, frequency = "highpass", self.lowcut
+            elif self.lowcut > 0 and self.highcut < nyq:
+                band, frequency = "bandpass", [self.lowcut, self.highcut]
+            else:
+                raise AssertionError("Invalid frequency band")
+            b, a = get_filter(
+                ftype="FIR",
+                band=band,
+                order=self.filter_order or int(0.2 * self.fs),
+                frequency=frequency,
+                fs=self.fs,
+            )
+        else:
+            raise ValueError(f"Unsupported filter type `{self.filter_type}`")
+        return b, a
 
     def forward(self, sig: torch.Tensor) -> torch.Tensor:
         """Apply the preprocessor to the signal tensor.
@@ -63,15 +125,4 @@ class BandPass(torch.nn.Module):
             of shape ``(batch, lead, siglen)``.
 
         """
-        if not self.inplace:
-            sig = sig.clone()
-        sig = torch.as_tensor(
-            preprocess_multi_lead_signal(
-                raw_sig=sig.cpu().numpy(),
-                fs=self.fs,
-                band_fs=[self.lowcut, self.highcut],
-            ).copy(),
-            dtype=sig.dtype,
-            device=sig.device,
-        )
-        return sig
+        return filtfilt_t(sig, self.b, self.a, None, self.zi)
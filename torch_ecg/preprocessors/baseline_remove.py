@@ -7,7 +7,7 @@ from typing import Any
 
 import torch
 
-from .._preprocessors.base import preprocess_multi_lead_signal
+from ..utils.utils_signal_t import median_filter as median_filter_t
 
 __all__ = [
     "BaselineRemove",
@@ -17,6 +17,10 @@ __all__ = [
 class BaselineRemove(torch.nn.Module):
     """Baseline removal using median filtering.
 
+    The baseline is estimated by two successive median filters,
+    the same as :func:`~torch_ecg._preprocessors.preprocess_multi_lead_signal`,
+    computed on the device of the signal tensors.
+
     Parameters
     ----------
     fs : numbers.Real
@@ -45,6 +49,9 @@ class BaselineRemove(torch.nn.Module):
             self.window1, self.window2 = self.window2, self.window1
             warnings.warn("values of `window1` and `window2` are switched", RuntimeWarning)
         self.inplace = inplace
+        # window sizes (in number of samples) must be odd
+        self._window1 = 2 * (int(self.window1 * self.fs) // 2) + 1
+        self._window2 = 2 * (int(self.window2 * self.fs) // 2) + 1
 
     def forward(self, sig: torch.Tensor) -> torch.Tensor:
         """Apply the preprocessor to the signal tensor.
@@ -62,15 +69,5 @@ class BaselineRemove(torch.nn.Module):
             of shape ``(batch, lead, siglen)``.
 
         """
-        if not self.inplace:
-            sig = sig.clone()
-        sig = torch.as_tensor(
-            preprocess_multi_lead_signal(
-                raw_sig=sig.cpu().numpy(),
-                fs=self.fs,
-                bl_win=[self.window1, self.window2],
-            ).copy(),
-            dtype=sig.dtype,
-            device=sig.device,
-        )
-        return sig
+        baseline = median_filter_t(median_filter_t(sig, self._window1), self._window2)
+        return sig - baseline
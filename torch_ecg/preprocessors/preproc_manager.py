@@ -51,6 +51,7 @@ class PreprocManager(ReprMixin, nn.Module):
     """
 
     __name__ = "PreprocManager"
+    __jit_unused_properties__ = ["preprocessors", "empty"]
 
     def __init__(
         self,
@@ -60,7 +61,7 @@ class PreprocManager(ReprMixin, nn.Module):
     ) -> None:
         super().__init__()
         self.random = random
-        self._preprocessors = list(pps)
+        self._preprocessors = nn.ModuleList(pps)
 
     def _add_bandpass(self, **config: dict) -> None:
         """Add a bandpass filter to the manager.
@@ -136,13 +137,19 @@ class PreprocManager(ReprMixin, nn.Module):
             The preprocessed signal tensor.
 
         """
-        if len(self.preprocessors) == 0:
-            # raise ValueError("No preprocessors added to the manager.")
-            # allow dummy (empty) preprocessors
-            return sig
-        ordering = list(range(len(self.preprocessors)))
         if self.random:
-            ordering = sample(ordering, len(ordering))
+            return self._forward_random(sig)
+        # an empty manager is a dummy preprocessor
+        for pp in self._preprocessors:
+            sig = pp(sig)
+        return sig
+
+    @torch.jit.unused
+    def _forward_random(self, sig: torch.Tensor) -> torch.Tensor:
+        """Apply the preprocessors in random order,
+        not supported by TorchScript.
+        """
+        ordering = sample(range(len(self.preprocessors)), len(self.preprocessors))
         for idx in ordering:
             sig = self.preprocessors[idx](sig)
         return sig
@@ -221,7 +228,9 @@ class PreprocManager(ReprMixin, nn.Module):
                 _mapping.update({k: k})
         assert len(new_ordering) == len(set(new_ordering)), "Duplicate preprocessor names."
         assert len(new_ordering) == len(self._preprocessors), "Number of preprocessors mismatch."
-        self._preprocessors.sort(key=lambda item: new_ordering.index(_mapping[item.__class__.__name__]))
+        self._preprocessors = nn.ModuleList(
+            sorted(self._preprocessors, key=lambda item: new_ordering.index(_mapping[item.__class__.__name__]))
+        )
 
     def add_(self, pp: nn.Module, pos: int = -1) -> None:
         """Add a (custom) preprocessor to the manager.
@@ -250,7 +259,7 @@ class PreprocManager(ReprMixin, nn.Module):
             self._preprocessors.insert(pos, pp)
 
     @property
-    def preprocessors(self) -> List[nn.Module]:
+    def preprocessors(self) -> nn.ModuleList:
         return self._preprocessors
 
     @property
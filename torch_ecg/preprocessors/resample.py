@@ -1,7 +1,7 @@
 """
 """
 
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 import torch
 
@@ -25,17 +25,16 @@ class Resample(torch.nn.Module):
         Number of samples in the resampled ECG.
     inplace : bool, default False
         Whether to perform the resampling in-place.
+    method : {"linear", "poly", "fft"}, default "linear"
+        Resampling method, ref. :func:`torch_ecg.utils.resample_t`.
+        "poly" (anti-aliased polyphase filtering) and "fft" (Fourier method)
+        are consistent with :class:`torch_ecg._preprocessors.Resample`.
 
     NOTE
     ----
     One and only one of `fs` and `siglen` should be set.
     If `fs` is set, `src_fs` should also be set.
 
-
-    TODO
-    ----
-    Consider vectorized :func:`scipy.signal.resample`?
-
     """
 
     __name__ = "Resample"
@@ -46,6 +45,7 @@ class Resample(torch.nn.Module):
         dst_fs: Optional[int] = None,
         siglen: Optional[int] = None,
         inplace: bool = False,
+        method: Literal["linear", "poly", "fft"] = "linear",
         **kwargs: Any,
     ) -> None:
         super().__init__()
@@ -53,6 +53,7 @@ class Resample(torch.nn.Module):
         self.fs = fs
         self.siglen = siglen
         self.inplace = inplace
+        self.method = method
         assert sum([bool(self.fs), bool(self.siglen)]) == 1, "one and only one of `fs` and `siglen` should be set"
         if self.dst_fs is not None:
             assert self.fs is not None, "if `dst_fs` is set, `fs` should also be set"
@@ -80,5 +81,6 @@ class Resample(torch.nn.Module):
             dst_fs=self.dst_fs,
             siglen=self.siglen,
             inplace=self.inplace,
+            method=self.method,
         )
         return sig
@@ -29,6 +29,7 @@ Neural network auxiliary functions and classes
     default_collate_fn
     compute_receptive_field
     adjust_cnn_filter_lengths
+    sliding_window_inference
     SizeMixin
     CkptMixin
 
@@ -43,10 +44,14 @@ Signal processing functions
     detect_peaks
     remove_spikes_naive
     butter_bandpass_filter
+    get_filter
     get_ampl
     normalize
     normalize_t
     resample_t
+    resample_poly_t
+    filtfilt_t
+    median_filter_t
 
 Data operations
 ---------------
@@ -64,6 +69,7 @@ Data operations
     stratified_train_test_split
     one_hot_encode
     generate_weight_mask
+    SegmentStore
 
 Interval operations
 -------------------
@@ -161,7 +167,7 @@ Miscellaneous
 
 from . import ecg_arrhythmia_knowledge as EAK
 from ._ecg_plot import ecg_plot
-from .download import http_get
+from .download import download_file, http_get
 from .misc import (
     CitationMixin,
     MovingAverage,
@@ -186,6 +192,7 @@ from .misc import (
     str2bool,
     timeout,
 )
+from .segment_store import SegmentStore
 from .utils_data import (
     ECGWaveForm,
     ECGWaveFormNames,
@@ -239,22 +246,28 @@ from .utils_nn import (
     compute_sequential_output_shape,
     default_collate_fn,
     extend_predictions,
+    sliding_window_inference,
 )
 from .utils_signal import (
     butter_bandpass_filter,
     detect_peaks,
     get_ampl,
+    get_filter,
     normalize,
     remove_spikes_naive,
     resample_irregular_timeseries,
     smooth,
 )
+from .utils_signal_t import filtfilt as filtfilt_t
+from .utils_signal_t import median_filter as median_filter_t
 from .utils_signal_t import normalize as normalize_t
 from .utils_signal_t import resample as resample_t
+from .utils_signal_t import resample_poly as resample_poly_t
 
 __all__ = [
     "EAK",
     "http_get",
+    "download_file",
     "get_record_list_recursive3",
     "dict_to_str",
     "str2bool",
@@ -289,6 +302,7 @@ __all__ = [
     "stratified_train_test_split",
     "one_hot_encode",
     "generate_weight_mask",
+    "SegmentStore",
     "overlaps",
     "validate_interval",
     "in_interval",
@@ -321,6 +335,7 @@ __all__ = [
     "default_collate_fn",
     "compute_receptive_field",
     "adjust_cnn_filter_lengths",
+    "sliding_window_inference",
     "SizeMixin",
     "CkptMixin",
     "smooth",
@@ -328,9 +343,13 @@ __all__ = [
     "detect_peaks",
     "remove_spikes_naive",
     "butter_bandpass_filter",
+    "get_filter",
     "get_ampl",
     "normalize",
     "normalize_t",
     "resample_t",
+    "resample_poly_t",
+    "filtfilt_t",
+    "median_filter_t",
     "ecg_plot",
 ]
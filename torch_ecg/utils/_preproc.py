@@ -18,24 +18,30 @@ References:
 
 """
 
+import atexit
 import multiprocessing as mp
-from collections import Counter
+import os
+from multiprocessing.pool import Pool
 from numbers import Real
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 
 import numpy as np
 
 # from scipy.signal import medfilt
 # https://github.com/scipy/scipy/issues/9680
-from biosppy.signals.tools import filter_signal
 from scipy.ndimage.filters import median_filter
+from scipy.signal import filtfilt
 
 from ..cfg import CFG
-from .misc import list_sum, ms2samples
+from .misc import ms2samples
 from .rpeaks import christov_detect, engzee_detect, gamboa_detect, gqrs_detect, hamilton_detect, ssf_detect, xqrs_detect
+from .utils_signal import get_filter
 
 __all__ = [
     "preprocess_multi_lead_signal",
+    "batch_preprocess_multi_lead_signal",
+    "get_preproc_pool",
+    "close_preproc_pool",
     "preprocess_single_lead_signal",
     "rpeaks_detect_multi_leads",
     "merge_rpeaks",
@@ -61,6 +67,59 @@ PreprocCfg.beat_winL = 250
 PreprocCfg.beat_winR = 250
 
 
+_PREPROC_POOL = None
+_PREPROC_POOL_PID = None
+
+
+def get_preproc_pool(processes: Optional[int] = None) -> Optional[Pool]:
+    """
+    get the module-wide process pool for preprocessing the leads of ECG signals,
+    which is created on the first call and reused by the subsequent calls
+
+    Parameters
+    ----------
+    processes: int, optional,
+        number of worker processes of the pool,
+        defaults to `cpu_count() - 3` (at least 1),
+        if differs from that of the existing pool, the pool will be re-created
+
+    Returns
+    -------
+    pool: Pool or None,
+        the module-wide process pool,
+        None if called from a daemonic process (e.g. workers of `DataLoader`),
+        which is not allowed to have child processes
+
+    """
+    global _PREPROC_POOL, _PREPROC_POOL_PID
+    if mp.current_process().daemon:
+        return None
+    if _PREPROC_POOL_PID != os.getpid():
+        # pool inherited from the parent process is not usable
+        _PREPROC_POOL, _PREPROC_POOL_PID = None, None
+    processes = processes or max(1, mp.cpu_count() - 3)
+    if _PREPROC_POOL is not None and _PREPROC_POOL._processes != processes:
+        close_preproc_pool()
+    if _PREPROC_POOL is None:
+        _PREPROC_POOL = mp.Pool(processes=processes)
+        _PREPROC_POOL_PID = os.getpid()
+    return _PREPROC_POOL
+
+
+def close_preproc_pool() -> None:
+    """
+    close the module-wide process pool created by `get_preproc_pool`, if any
+    """
+    global _PREPROC_POOL, _PREPROC_POOL_PID
+    if _PREPROC_POOL is not None and _PREPROC_POOL_PID == os.getpid():
+        _PREPROC_POOL.close()
+        _PREPROC_POOL.join()
+    _PREPROC_POOL, _PREPROC_POOL_PID = None, None
+
+
+atexit.register(close_preproc_pool)
+
+
 def preprocess_multi_lead_signal(
     raw_sig: np.ndarray,
     fs: Real,
@@ -69,6 +128,8 @@ def preprocess_multi_lead_signal(
     band_fs: Optional[List[Real]] = None,
     rpeak_fn: Optional[str] = None,
     verbose: int = 0,
+    pool: Optional[Pool] = None,
+    parallel: bool = True,
 ) -> Dict[str, np.ndarray]:
     """
     perform preprocessing for multi-lead ECG signal (with units in mV),
@@ -99,6 +160,12 @@ def preprocess_multi_lead_signal(
         can be one of keys of `QRS_DETECTORS`, case insensitive
     verbose: int, default 0,
         print verbosity
+    pool: Pool, optional,
+        the process pool to process the leads,
+        defaults to the module-wide pool (ref. `get_preproc_pool`)
+    parallel: bool, default True,
+        if False, or if called from a daemonic process (e.g. workers of `DataLoader`),
+        the leads will be processed in the current process
 
     Returns
     -------
@@ -107,6 +174,50 @@ def preprocess_multi_lead_signal(
         - "filtered_ecg": the array of the processed ECG signal
         - "rpeaks": the array of indices of rpeaks; empty if `rpeak_fn` is not given
 
+    """
+    return batch_preprocess_multi_lead_signal(
+        [raw_sig],
+        fs,
+        sig_fmt=sig_fmt,
+        bl_win=bl_win,
+        band_fs=band_fs,
+        rpeak_fn=rpeak_fn,
+        verbose=verbose,
+        pool=pool,
+        parallel=parallel,
+    )[0]
+
+
+def batch_preprocess_multi_lead_signal(
+    raw_sigs: Sequence[np.ndarray],
+    fs: Real,
+    sig_fmt: str = "channel_first",
+    bl_win: Optional[List[Real]] = None,
+    band_fs: Optional[List[Real]] = None,
+    rpeak_fn: Optional[str] = None,
+    verbose: int = 0,
+    pool: Optional[Pool] = None,
+    parallel: bool = True,
+) -> List[Dict[str, np.ndarray]]:
+    """
+    perform preprocessing for a batch of multi-lead ECG signals (with units in mV),
+    the leads of all the signals are submitted to the process pool at once
+
+    Parameters
+    ----------
+    raw_sigs: sequence of ndarray,
+        the raw ECG signals, with units in mV, of possibly different lengths
+    fs: numbers.Real,
+        sampling frequency of `raw_sigs`
+    sig_fmt, bl_win, band_fs, rpeak_fn, verbose, pool, parallel:
+        ref. `preprocess_multi_lead_signal`
+
+    Returns
+    -------
+    retval: list of dict,
+        the preprocessing results of each signal,
+        ref. `preprocess_multi_lead_signal`
+
     """
     assert sig_fmt.lower() in [
         "channel_first",
@@ -115,33 +226,43 @@ def preprocess_multi_lead_signal(
         "lead_last",
     ]
     if sig_fmt.lower() in ["channel_last", "lead_last"]:
-        filtered_ecg = raw_sig.T
-    else:
-        filtered_ecg = raw_sig.copy()
-    rpeaks_candidates = []
-    cpu_num = max(1, mp.cpu_count() - 3)
-    with mp.Pool(processes=cpu_num) as pool:
-        results = pool.starmap(
-            func=preprocess_single_lead_signal,
-            iterable=[(filtered_ecg[lead, ...], fs, bl_win, band_fs, rpeak_fn) for lead in range(filtered_ecg.shape[0])],
-        )
-    for lead in range(filtered_ecg.shape[0]):
-        filtered_metadata = results[lead]
-        filtered_ecg[lead, ...] = filtered_metadata["filtered_ecg"]
-        rpeaks_candidates.append(filtered_metadata["rpeaks"])
-        if verbose >= 1:
-            print(f"for the {lead}-th lead, rpeaks_candidates = {filtered_metadata['rpeaks']}")
-
-    if sig_fmt.lower() in ["channel_last", "lead_last"]:
-        rpeaks = merge_rpeaks(rpeaks_candidates, raw_sig.T, fs, verbose)
+        raw_sigs = [raw_sig.T for raw_sig in raw_sigs]
+    filtered_ecgs = [raw_sig.copy() for raw_sig in raw_sigs]
+    if parallel and pool is None:
+        pool = get_preproc_pool()
+    if parallel and pool is not None:
+        tasks = [
+            (filtered_ecg[lead, ...], fs, bl_win, band_fs, rpeak_fn)
+            for filtered_ecg in filtered_ecgs
+            for lead in range(filtered_ecg.shape[0])
+        ]
+        results = pool.starmap(func=preprocess_single_lead_signal, iterable=tasks)
     else:
+        # all the leads of each signal are filtered at once
+        results = []
+        for filtered_ecg in filtered_ecgs:
+            filtered_ecg = _filter_signal(filtered_ecg, fs, bl_win, band_fs)
+            results.extend(_detect_rpeaks(filtered_ecg[lead, ...], fs, rpeak_fn) for lead in range(filtered_ecg.shape[0]))
+
+    retval = []
+    results = iter(results)
+    for raw_sig, filtered_ecg in zip(raw_sigs, filtered_ecgs):
+        rpeaks_candidates = []
+        for lead in range(filtered_ecg.shape[0]):
+            filtered_metadata = next(results)
+            filtered_ecg[lead, ...] = filtered_metadata["filtered_ecg"]
+            rpeaks_candidates.append(filtered_metadata["rpeaks"])
+            if verbose >= 1:
+                print(f"for the {lead}-th lead, rpeaks_candidates = {filtered_metadata['rpeaks']}")
         rpeaks = merge_rpeaks(rpeaks_candidates, raw_sig, fs, verbose)
-    retval = CFG(
-        {
-            "filtered_ecg": filtered_ecg,
-            "rpeaks": rpeaks,
-        }
-    )
+        retval.append(
+            CFG(
+                {
+                    "filtered_ecg": filtered_ecg,
+                    "rpeaks": rpeaks,
+                }
+            )
+        )
     return retval
 
 
@@ -187,28 +308,44 @@ def preprocess_single_lead_signal(
         - "rpeaks": the array of indices of rpeaks; empty if `rpeak_fn` is not given
 
     """
-    filtered_ecg = raw_sig.copy()
+    filtered_ecg = _filter_signal(raw_sig.copy(), fs, bl_win, band_fs)
+    return _detect_rpeaks(filtered_ecg, fs, rpeak_fn)
+
+
+def _filter_signal(
+    sig: np.ndarray,
+    fs: Real,
+    bl_win: Optional[List[Real]] = None,
+    band_fs: Optional[List[Real]] = None,
+) -> np.ndarray:
+    """
+    remove baseline and bandpass filter the signal along the last axis,
+    ref. `preprocess_single_lead_signal`
+    """
+    filtered_ecg = sig
 
     # remove baseline
     if bl_win:
-        window1 = 2 * (int(bl_win[0] * fs) // 2) + 1  # window size must be odd
-        window2 = 2 * (int(bl_win[1] * fs) // 2) + 1
+        size = [1] * (filtered_ecg.ndim - 1)
+        window1 = size + [2 * (int(bl_win[0] * fs) // 2) + 1]  # window size must be odd
+        window2 = size + [2 * (int(bl_win[1] * fs) // 2) + 1]
         baseline = median_filter(filtered_ecg, size=window1, mode="nearest")
         baseline = median_filter(baseline, size=window2, mode="nearest")
         filtered_ecg = filtered_ecg - baseline
 
     # filter signal
     if band_fs:
-        filtered_ecg = filter_signal(
-            signal=filtered_ecg,
-            ftype="FIR",
-            # ftype="butter",
-            band="bandpass",
-            order=int(0.3 * fs),
-            sampling_rate=fs,
-            frequency=band_fs,
-        )["signal"]
+        b, a = get_filter(ftype="FIR", band="bandpass", order=int(0.3 * fs), frequency=band_fs, fs=fs)
+        filtered_ecg = filtfilt(b, a, filtered_ecg, axis=-1)
+
+    return filtered_ecg
 
+
+def _detect_rpeaks(filtered_ecg: np.ndarray, fs: Real, rpeak_fn: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    detect rpeaks from the filtered single lead ECG signal,
+    ref. `preprocess_single_lead_signal`
+    """
     if rpeak_fn:
         rpeaks = QRS_DETECTORS[rpeak_fn.lower()](filtered_ecg, fs).astype(int)
     else:
@@ -295,15 +432,27 @@ def merge_rpeaks(rpeaks_candidates: List[np.ndarray], sig: np.ndarray, fs: Real,
         the final rpeaks obtained by merging the rpeaks from all the leads
 
     """
-    rpeak_masks = np.zeros_like(sig, dtype=int)
-    sig_len = sig.shape[1]
+    n_leads, sig_len = sig.shape
     radius = ms2samples(PreprocCfg.rpeak_mask_radius, fs)
     if verbose >= 1:
         print(f"sig_len = {sig_len}, radius = {radius}")
-    for lead in range(sig.shape[0]):
-        for r in rpeaks_candidates[lead]:
-            rpeak_masks[lead, max(0, r - radius) : min(sig_len - 1, r + radius)] = 1
-    rpeak_masks = (rpeak_masks.sum(axis=0) >= int(PreprocCfg.rpeak_lead_num_thr * sig.shape[0])).astype(int)
+    # the qrs mask of each lead is the union of the intervals
+    # [r - radius, r + radius) around its rpeaks (clipped to [0, sig_len - 1)),
+    # computed via the difference arrays of the interval boundaries
+    lead_indices = np.concatenate(
+        [np.full(len(rpeaks_candidates[lead]), lead, dtype=int) for lead in range(n_leads)] + [np.array([], dtype=int)]
+    )
+    all_rpeaks = np.concatenate(
+        [np.asarray(rpeaks_candidates[lead], dtype=int).reshape(-1) for lead in range(n_leads)] + [np.array([], dtype=int)]
+    )
+    starts = np.clip(all_rpeaks - radius, 0, sig_len)
+    ends = np.clip(all_rpeaks + radius, 0, sig_len - 1)
+    valid = ends > starts
+    diff = np.zeros((n_leads, sig_len + 1), dtype=int)
+    np.add.at(diff, (lead_indices[valid], starts[valid]), 1)
+    np.add.at(diff, (lead_indices[valid], ends[valid]), -1)
+    rpeak_masks = (np.cumsum(diff[:, :-1], axis=1) > 0).sum(axis=0)
+    rpeak_masks = (rpeak_masks >= int(PreprocCfg.rpeak_lead_num_thr * n_leads)).astype(int)
     rpeak_masks[0], rpeak_masks[-1] = 0, 0
     split_indices = np.where(np.diff(rpeak_masks) != 0)[0]
     if verbose >= 1:
@@ -313,22 +462,28 @@ def merge_rpeaks(rpeaks_candidates: List[np.ndarray], sig: np.ndarray, fs: Real,
                 f"the corresponding intervals are {[[split_indices[2*idx], split_indices[2*idx+1]] for idx in range(len(split_indices)//2)]}"
             )
 
-    final_rpeaks = []
-    for idx in range(len(split_indices) // 2):
-        start_idx = split_indices[2 * idx]
-        end_idx = split_indices[2 * idx + 1]
-        rc = list_sum(  # `lr`: list of rpeaks
-            [lr[np.where((lr >= start_idx) & (lr <= end_idx))].tolist() for lr in rpeaks_candidates]
-        )
-        if verbose >= 2:
-            print(f"at the {idx}-th interval, start_idx = {start_idx}, end_idx = {end_idx}")
-            print(f"rpeak candidates = {rc}")
-        counter = Counter(rc).most_common()
-        if len(counter) > 0 and counter[0][1] >= len(rc) // 2 + 1:
-            # might have the case where
-            # rc is empty
-            final_rpeaks.append(counter[0][0])
-        elif len(counter) > 0:
-            final_rpeaks.append(int(np.mean(rc)))
-    final_rpeaks = np.array(final_rpeaks)
+    # assign the rpeak candidates to the (closed) intervals
+    interval_starts, interval_ends = split_indices[0::2], split_indices[1::2]
+    interval_indices = np.searchsorted(interval_starts, all_rpeaks, side="right") - 1
+    in_interval = interval_indices >= 0
+    in_interval[in_interval] = all_rpeaks[in_interval] <= interval_ends[interval_indices[in_interval]]
+    interval_indices, all_rpeaks = interval_indices[in_interval], all_rpeaks[in_interval]
+    n_intervals = len(interval_ends)
+    n_candidates = np.bincount(interval_indices, minlength=n_intervals)
+    if verbose >= 2:
+        for idx in range(n_intervals):
+            print(f"at the {idx}-th interval, start_idx = {interval_starts[idx]}, end_idx = {interval_ends[idx]}")
+            print(f"rpeak candidates = {all_rpeaks[interval_indices == idx].tolist()}")
+
+    # the rpeak detected by the majority of the candidates, if exists,
+    # otherwise the mean of the candidates
+    final_rpeaks = np.zeros(n_intervals, dtype=int)
+    has_candidates = n_candidates > 0
+    final_rpeaks[has_candidates] = (
+        np.bincount(interval_indices, weights=all_rpeaks, minlength=n_intervals)[has_candidates] / n_candidates[has_candidates]
+    ).astype(int)
+    pairs, counts = np.unique(np.stack([interval_indices, all_rpeaks]), axis=1, return_counts=True)
+    majority = counts >= n_candidates[pairs[0]] // 2 + 1
+    final_rpeaks[pairs[0, majority]] = pairs[1, majority]
+    final_rpeaks = final_rpeaks[has_candidates]
     return final_rpeaks
@@ -7,6 +7,9 @@ for downloading the data files.
 """
 
 import collections
+import hashlib
+import io
+import json
 import os
 import re
 import shlex
@@ -14,12 +17,14 @@ import shutil
 import subprocess
 import tarfile
 import tempfile
+import threading
 import time
 import urllib.parse
 import warnings
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, Literal, Optional, Union
+from typing import Any, Iterable, Literal, Optional, Tuple, Union
 
 import boto3
 import requests
@@ -29,6 +34,7 @@ from tqdm.auto import tqdm
 
 __all__ = [
     "http_get",
+    "download_file",
 ]
 
 
@@ -41,6 +47,8 @@ def http_get(
     proxies: Optional[dict] = None,
     extract: Literal[True, False, "auto"] = "auto",
     filename: Optional[str] = None,
+    num_workers: int = 4,
+    sha256: Optional[str] = None,
 ) -> Path:
     """Download contents of a URL and save to a file.
 
@@ -66,6 +74,17 @@ def http_get(
         which is set to `dst_dir`, and `filename` is only the downloaded file name.
 
         .. versionadded:: 0.0.20
+    num_workers : int, default 4
+        Number of parallel connections downloading (HTTP Range requests)
+        the file from HTTP(S) URLs, see :func:`download_file`.
+        Interrupted downloads are resumed by later calls with the same URL.
+
+        .. versionadded:: 0.0.32
+    sha256 : str, optional
+        Expected SHA-256 checksum (hex digest) of the file downloaded from
+        HTTP(S) URLs. If is None, the checksum is not verified.
+
+        .. versionadded:: 0.0.32
 
     Returns
     -------
@@ -123,6 +142,8 @@ def http_get(
         _download_from_google_drive(url, downloaded_file.name)
         df_suffix = _suffix(filename)
         downloaded_file.close()
+        downloaded_file = Path(downloaded_file.name)
+        stream_extract = False
     else:
         print(f"Downloading {url}.")
         if not is_compressed_file(url_parsed.path) and extract:
@@ -146,36 +167,34 @@ def http_get(
                 extract = False
         parent_dir = Path(dst_dir).parent
         df_suffix = _suffix(pure_url) if filename is None else _suffix(filename)
-        downloaded_file = tempfile.NamedTemporaryFile(
-            dir=parent_dir,
-            suffix=df_suffix,
-            delete=False,
+        # named after the URL, so that interrupted downloads are resumed by later calls
+        downloaded_file = parent_dir / f".{hashlib.sha1(url.encode()).hexdigest()[:16]}{df_suffix}"
+        # tar archives (without checksums to verify beforehand) are extracted while downloading
+        stream_extract = extract and sha256 is None and _is_tar_suffix(df_suffix)
+        download_file(
+            url,
+            downloaded_file,
+            proxies=proxies,
+            num_workers=num_workers,
+            sha256=sha256,
+            extract_dir=dst_dir if stream_extract else None,
         )
-        req = requests.get(url, stream=True, proxies=proxies)
-        content_length = req.headers.get("Content-Length")
-        total = int(content_length) if content_length is not None else None
-        if req.status_code in [403, 404]:
-            raise Exception(f"Could not reach {url}.")
-        progress = tqdm(unit="B", unit_scale=True, total=total, dynamic_ncols=True, mininterval=1.0)
-        for chunk in req.iter_content(chunk_size=1024):
-            if chunk:  # filter out keep-alive new chunks
-                progress.update(len(chunk))
-                downloaded_file.write(chunk)
-        progress.close()
-        downloaded_file.close()
 
     # add a delay to avoid the error "process cannot access the file because it is being used by another process"
     time.sleep(0.1)
 
     if extract:
-        if ".zip" in df_suffix:
-            _unzip_file(str(downloaded_file.name), str(dst_dir))
+        if stream_extract:
+            pass  # already extracted while downloading
+        elif ".zip" in df_suffix:
+            _unzip_file(str(downloaded_file), str(dst_dir))
         # elif ".tar" in df_suffix:  # tar files
-        elif re.search("\\.(tar(\\.(gz|bz2|lz|xz|tz|zst))?|tgz|tbz2|tlz|txz|tzst)$", df_suffix) is not None:
-            _untar_file(str(downloaded_file.name), str(dst_dir))
+        elif _is_tar_suffix(df_suffix):
+            _untar_file(str(downloaded_file), str(dst_dir))
         else:
-            os.remove(downloaded_file.name)
+            os.remove(downloaded_file)
             raise Exception(f"Unsupported (compressed) archived file type {df_suffix}")
+        os.remove(downloaded_file)
         # avoid the case the compressed file is a folder with the same name
         # DO NOT use _stem(Path(pure_url))
         if filename is None:
@@ -196,11 +215,386 @@ def http_get(
             final_dst = Path(dst_dir) / Path(pure_url).name
         else:
             final_dst = Path(dst_dir) / filename
-        shutil.copyfile(downloaded_file.name, final_dst)
-    os.remove(downloaded_file.name)
+        shutil.move(downloaded_file, final_dst)
     return final_dst
 
 
+_RANGE_SIZE = 8 * 1024 * 1024  # size of the chunks of the range requests
+_BLOCK_SIZE = 256 * 1024  # size of the blocks read from the responses
+_HTTP_TIMEOUT = 60  # seconds
+_HTTP_HEADERS = {"Accept-Encoding": "identity"}  # byte ranges refer to the raw (non-encoded) content
+
+
+class _RangeNotSupported(Exception):
+    """The server ignored the range request."""
+
+
+class _DownloadState:
+    """Progress of the chunks of a download into a ``.part`` file,
+    persisted into a sidecar JSON file, so that interrupted downloads can be resumed.
+
+    Parameters
+    ----------
+    part_file : pathlib.Path
+        The ``.part`` file the contents are written into.
+    url : str
+        URL of the file.
+    size : int, optional
+        Size of the file, None if unknown.
+    validator : str, optional
+        ETag or Last-Modified of the file, to invalidate outdated ``.part`` files.
+    range_size : int, optional
+        Size of the chunks of the range requests.
+        If is None, the file is downloaded in one chunk and can not be resumed.
+
+    """
+
+    def __init__(
+        self,
+        part_file: Path,
+        url: str,
+        size: Optional[int],
+        validator: Optional[str],
+        range_size: Optional[int],
+    ) -> None:
+        self.part_file = part_file
+        self.state_file = part_file.with_name(f"{part_file.name}.json")
+        self.meta = {"url": url, "size": size, "validator": validator, "range_size": range_size}
+        if range_size is None:
+            self.chunks = [(0, size)]
+        else:
+            self.chunks = [(start, min(start + range_size, size)) for start in range(0, size, range_size)]
+        self.done = [0] * len(self.chunks)
+        self.finished = [False] * len(self.chunks)
+        self.error = None
+        self.aborted = False
+        self.cond = threading.Condition()
+        if (
+            range_size is not None
+            and self.state_file.is_file()
+            and self.part_file.is_file()
+            and self.part_file.stat().st_size == size
+        ):
+            state = json.loads(self.state_file.read_text())
+            if state["meta"] == self.meta and len(state["done"]) == len(self.chunks):
+                self.done = state["done"]
+                self.finished = [start + done >= end for (start, end), done in zip(self.chunks, self.done)]
+                return
+        # a new download
+        with open(self.part_file, "wb") as f:
+            if size is not None and range_size is not None:
+                f.truncate(size)
+        if self.resumable:
+            self.save()
+
+    @property
+    def resumable(self) -> bool:
+        return self.meta["range_size"] is not None
+
+    @property
+    def downloaded(self) -> int:
+        return sum(self.done)
+
+    def add(self, idx: int, nbytes: int) -> None:
+        """Record `nbytes` more bytes (already written into the ``.part`` file) of the chunk."""
+        with self.cond:
+            self.done[idx] += nbytes
+            self.cond.notify_all()
+
+    def finish(self, idx: int) -> None:
+        """Mark the chunk as finished."""
+        with self.cond:
+            self.finished[idx] = True
+            self.cond.notify_all()
+        if self.resumable:
+            self.save()
+
+    def fail(self, error: BaseException) -> None:
+        """Record the error of a chunk, stopping the other chunks."""
+        with self.cond:
+            if self.error is None:
+                self.error = error
+            self.aborted = True
+            self.cond.notify_all()
+
+    def available(self) -> Tuple[int, bool]:
+        """Length of the downloaded (contiguous) prefix of the file,
+        and whether the download is finished. Called with `cond` held.
+        """
+        for (start, end), done, finished in zip(self.chunks, self.done, self.finished):
+            if not finished:
+                return start + done, False
+        return self.chunks[-1][0] + self.done[-1], True
+
+    def save(self) -> None:
+        """Save the progress into the sidecar JSON file."""
+        with self.cond:
+            content = json.dumps({"meta": self.meta, "done": list(self.done)})
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_text(content)
+        os.replace(tmp_file, self.state_file)
+
+
+class _DownloadFailed(Exception):
+    """Raised in the consumer of the downloaded prefix when the download failed."""
+
+
+class _PrefixReader(io.RawIOBase):
+    """Read-only file object over the downloaded prefix of a ``.part`` file,
+    blocking until the contents are downloaded,
+    so that the file can be consumed (hashed, extracted) while downloading.
+    The bytes read are fed into the hasher, if given.
+    """
+
+    def __init__(self, state: _DownloadState, hasher: Optional[Any] = None) -> None:
+        super().__init__()
+        self._state = state
+        self._hasher = hasher
+        self._file = open(state.part_file, "rb")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        with self._state.cond:
+            while True:
+                if self._state.error is not None:
+                    raise _DownloadFailed() from self._state.error
+                available, finished = self._state.available()
+                if available > self._pos or finished:
+                    break
+                self._state.cond.wait(timeout=1.0)
+        nbytes = min(len(buffer), available - self._pos)
+        if nbytes <= 0:
+            return 0
+        self._file.seek(self._pos)
+        view = memoryview(buffer)[:nbytes]
+        nbytes = self._file.readinto(view)
+        if self._hasher is not None:
+            self._hasher.update(view[:nbytes])
+        self._pos += nbytes
+        return nbytes
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _probe_url(url: str, proxies: Optional[dict] = None) -> Tuple[str, Optional[int], Optional[str], bool]:
+    """Get the final URL (after redirection), the size, the validator (ETag or Last-Modified)
+    of the file, and whether the server accepts range requests.
+    """
+    try:
+        resp = requests.head(url, allow_redirects=True, proxies=proxies, headers=_HTTP_HEADERS, timeout=_HTTP_TIMEOUT)
+    except requests.RequestException:
+        return url, None, None, False
+    if resp.status_code in [403, 404]:
+        raise Exception(f"Could not reach {url}.")
+    if resp.status_code >= 400:  # e.g. HEAD not allowed
+        return url, None, None, False
+    content_length = resp.headers.get("Content-Length")
+    size = int(content_length) if content_length is not None else None
+    validator = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    accept_ranges = resp.headers.get("Accept-Ranges", "").lower() == "bytes" and size is not None and size > 0
+    return resp.url, size, validator, accept_ranges
+
+
+def _download_chunk(
+    url: str,
+    state: _DownloadState,
+    idx: int,
+    proxies: Optional[dict] = None,
+    max_retries: int = 3,
+    pbar: Optional[tqdm] = None,
+) -> None:
+    """Download one chunk of the file into the ``.part`` file,
+    retrying (from where it stopped) on dropped connections.
+    """
+    start, end = state.chunks[idx]
+    for attempt in range(max_retries + 1):
+        offset = start + state.done[idx]
+        if state.resumable and offset >= end:
+            break
+        headers = dict(_HTTP_HEADERS)
+        if state.resumable:
+            headers["Range"] = f"bytes={offset}-{end - 1}"
+        try:
+            with requests.get(url, headers=headers, stream=True, proxies=proxies, timeout=_HTTP_TIMEOUT) as resp:
+                if resp.status_code in [403, 404]:
+                    raise Exception(f"Could not reach {url}.")
+                resp.raise_for_status()
+                if state.resumable and resp.status_code != 206:
+                    raise _RangeNotSupported(url)
+                with open(state.part_file, "r+b") as f:
+                    f.seek(offset)
+                    for block in resp.iter_content(chunk_size=_BLOCK_SIZE):
+                        if state.aborted:
+                            return
+                        if state.resumable:
+                            block = block[: end - start - state.done[idx]]
+                        f.write(block)
+                        f.flush()  # visible to the readers of the downloaded prefix
+                        state.add(idx, len(block))
+                        if pbar is not None:
+                            pbar.update(len(block))
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+            # non-resumable downloads are not retried, since they would restart from zero
+            if attempt == max_retries or not state.resumable:
+                raise
+            continue
+        if not state.resumable:
+            break
+    expected = end - start if end is not None else state.done[idx]
+    if state.done[idx] != expected:
+        raise requests.ConnectionError(f"Incomplete download of {url}")
+    state.finish(idx)
+
+
+def _run_download(
+    url: str,
+    state: _DownloadState,
+    num_workers: int,
+    proxies: Optional[dict],
+    max_retries: int,
+    consumer: Optional[Any],
+    hasher: Optional[Any],
+    verbose: int,
+) -> None:
+    """Download the unfinished chunks of the state over a pool of threads,
+    while the consumer (if any) is called on the downloaded prefix in the current thread.
+    """
+    pending = [idx for idx, finished in enumerate(state.finished) if not finished]
+    pbar = tqdm(
+        total=state.meta["size"],
+        initial=state.downloaded,
+        unit="B",
+        unit_scale=True,
+        dynamic_ncols=True,
+        mininterval=1.0,
+        disable=(verbose < 1),
+    )
+    with pbar, ThreadPoolExecutor(max_workers=max(1, min(num_workers, len(pending)))) as executor:
+
+        def _task(idx: int) -> None:
+            try:
+                _download_chunk(url, state, idx, proxies=proxies, max_retries=max_retries, pbar=pbar)
+            except BaseException as e:
+                state.fail(e)
+                raise
+
+        futures = [executor.submit(_task, idx) for idx in pending]
+        try:
+            if consumer is not None:
+                with io.BufferedReader(_PrefixReader(state, hasher), buffer_size=_BLOCK_SIZE) as reader:
+                    consumer(reader)
+            for future in futures:
+                future.result()
+        except _DownloadFailed:
+            pass  # the error of the chunk is raised below
+        except BaseException as e:
+            state.fail(e)  # stop the unfinished chunks
+            raise
+        finally:
+            if state.resumable:
+                state.save()
+    if state.error is not None:
+        raise state.error
+
+
+def download_file(
+    url: str,
+    dst_file: Union[str, bytes, os.PathLike],
+    proxies: Optional[dict] = None,
+    num_workers: int = 4,
+    sha256: Optional[str] = None,
+    extract_dir: Optional[Union[str, bytes, os.PathLike]] = None,
+    max_retries: int = 3,
+    verbose: int = 1,
+) -> Path:
+    """Download a file from an HTTP(S) URL, over parallel range requests,
+    resuming interrupted downloads.
+
+    The contents are written into ``<dst_file>.part``, whose progress is recorded in
+    ``<dst_file>.part.json``. If the server accepts range requests, the file is split
+    into chunks of 8 MB downloaded by `num_workers` threads, dropped connections are
+    retried from where they stopped, and later calls resume the ``.part`` file,
+    as long as the size and the ETag (or Last-Modified) of the file are unchanged.
+    Otherwise, the file is downloaded over one connection, restarting from zero.
+    The checksum is computed and the archive is extracted on the downloaded (contiguous)
+    prefix of the file while downloading, instead of in passes after the download.
+
+    .. versionadded:: 0.0.32
+
+    Parameters
+    ----------
+    url : str
+        The HTTP(S) URL of the file.
+    dst_file : `path-like`
+        Path to the downloaded file.
+    proxies : dict, optional
+        Dictionary of proxy settings.
+    num_workers : int, default 4
+        Number of parallel connections.
+        If is 0 or 1, the chunks are downloaded one by one.
+    sha256 : str, optional
+        Expected SHA-256 checksum (hex digest) of the file.
+        If the checksum does not match, the ``.part`` file is removed and
+        a :class:`ValueError` is raised. If is None, the checksum is not verified.
+    extract_dir : `path-like`, optional
+        Directory into which the file, which should be a (compressed) tar archive,
+        is extracted while downloading. NOTE that the checksum (if `sha256` is specified)
+        is verified after the extraction.
+    max_retries : int, default 3
+        Maximum number of retries of each chunk on dropped connections.
+    verbose : int, default 1
+        Verbosity level, the progress bar is shown if positive.
+
+    Returns
+    -------
+    pathlib.Path
+        Path to the downloaded file.
+
+    """
+    dst_file = Path(dst_file)
+    dst_file.parent.mkdir(parents=True, exist_ok=True)
+    part_file = dst_file.with_name(f"{dst_file.name}.part")
+    if extract_dir is not None:
+        assert _is_tar_suffix(_suffix(dst_file.name)), "only tar archives can be extracted while downloading"
+        Path(extract_dir).mkdir(parents=True, exist_ok=True)
+
+    def _consume(reader: io.BufferedReader) -> None:
+        if extract_dir is not None:
+            print(f"Extracting {url} to {extract_dir} while downloading.")
+            _safe_tar_stream_extract(reader, str(extract_dir))
+        # the rest (e.g. padding of tar archives) of the file, read through the hasher
+        while reader.read(_BLOCK_SIZE):
+            pass
+
+    consumer = _consume if extract_dir is not None or sha256 is not None else None
+    hasher = hashlib.sha256() if sha256 is not None else None
+
+    url, size, validator, accept_ranges = _probe_url(url, proxies)
+    state = _DownloadState(part_file, url, size, validator, _RANGE_SIZE if accept_ranges else None)
+    if state.downloaded > 0:
+        print(f"Resuming the download of {url} from {state.downloaded} bytes.")
+    try:
+        _run_download(url, state, num_workers, proxies, max_retries, consumer, hasher, verbose)
+    except _RangeNotSupported:
+        # the server ignored the range requests, restart over one connection
+        state = _DownloadState(part_file, url, size, validator, None)
+        hasher = hashlib.sha256() if sha256 is not None else None
+        _run_download(url, state, 1, proxies, max_retries, consumer, hasher, verbose)
+
+    if hasher is not None and hasher.hexdigest() != sha256.lower():
+        part_file.unlink()
+        state.state_file.unlink(missing_ok=True)
+        raise ValueError(f"SHA-256 checksum mismatch of {url}: expected {sha256}, got {hasher.hexdigest()}")
+    os.replace(part_file, dst_file)
+    state.state_file.unlink(missing_ok=True)
+    return dst_file
+
+
 def _stem(path: Union[str, bytes, os.PathLike]) -> str:
     """Get filename without extension, especially for .tar.xx files.
 
@@ -263,6 +657,11 @@ def is_compressed_file(path: Union[str, bytes, os.PathLike]) -> bool:
     return re.search(compressed_file_pattern, _suffix(path)) is not None
 
 
+def _is_tar_suffix(suffix: str) -> bool:
+    """Check if the file extension is that of a (compressed) tar archive."""
+    return re.search("\\.(tar(\\.(gz|bz2|lz|xz|tz|zst))?|tgz|tbz2|tlz|txz|tzst)$", suffix) is not None
+
+
 def _unzip_file(path_to_zip_file: Union[str, bytes, os.PathLike], dst_dir: Union[str, bytes, os.PathLike]) -> None:
     """Unzips a .zip file to folder path.
 
@@ -373,6 +772,30 @@ def _safe_tar_extract(
     tar.extractall(dst_dir, members, numeric_owner=numeric_owner)
 
 
+def _safe_tar_stream_extract(fileobj: io.BufferedIOBase, dst_dir: Union[str, bytes, os.PathLike]) -> None:
+    """Extract a (compressed) tar archive from a stream **safely** to a destination directory,
+    member by member, so that the archive is extracted while being read (e.g. downloaded).
+
+    Parameters
+    ----------
+    fileobj : io.BufferedIOBase
+        The (non-seekable) stream of the archive.
+    dst_dir : `path-like`
+        The destination directory.
+
+    Returns
+    -------
+    None
+
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            member_path = os.path.join(dst_dir, member.name)
+            if not _is_within_directory(dst_dir, member_path):
+                raise Exception("Attempted Path Traversal in Tar File")
+            tar.extract(member, dst_dir)
+
+
 def url_is_reachable(url: str, **kwargs: Any) -> bool:
     """Check if a URL is reachable.
 
@@ -0,0 +1,467 @@
+"""
+Packed, memory-mapped storage of fixed-length segments sliced from ECG records.
+
+Instead of writing every sliced segment into its own file,
+segments are appended row by row to a small number of large binary shard files
+(one file per field per shard), which are read back zero-copy
+via :class:`numpy.memmap`. The mapping from segment names to
+(shard, row) positions is kept in a compact index file,
+which also serves as the completion ledger of the records.
+
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .misc import ReprMixin
+
+__all__ = [
+    "SegmentStore",
+]
+
+
+class SegmentStore(ReprMixin):
+    """Packed segment store backed by memory-mapped shard files.
+
+    The store consists of a directory containing
+
+        - ``meta.json``: the schema of the store, i.e. the shapes and
+          dtypes of the fixed-shape fields, the dtypes of the ragged
+          (variable-length, 1D) fields, and the number of rows per shard;
+        - ``index.npz``: the index of the stored segments, containing
+          the names, groups, records, shard keys and row numbers of the
+          segments, offsets and lengths of the ragged fields,
+          as well as the list of completed records;
+        - ``<field>-<shard>.bin``: raw (C-ordered) binary shard files.
+          For fixed-shape fields, row ``i`` of the shard holds one segment;
+          for ragged fields, the values of all segments of the shard
+          are concatenated.
+
+    Segments are appended per record, hence the store can be filled
+    incrementally. A record is marked as completed once its segments
+    (possibly none) are appended. Removing segments only drops them
+    from the index, the space occupied in the shard files is
+    reclaimed by :meth:`clear`.
+
+    Several processes can append to the same store concurrently,
+    if each of them uses an instance with a distinct `writer_id`.
+    Such an instance writes to its own shard files and its own index file
+    ``index-<writer_id>.npz``, which are merged into the main index
+    via :meth:`merge` (called from an instance without `writer_id`).
+
+    Parameters
+    ----------
+    path : `path-like`
+        Directory of the store, created if not existing.
+    fields : dict, optional
+        Fixed-shape fields of the segments, of the form
+        ``{name: (shape, dtype)}``. Required when the store is created,
+        and should be consistent with the existing schema otherwise.
+    ragged_fields : dict, optional
+        1D fields of variable lengths, of the form ``{name: dtype}``.
+    max_shard_bytes : int, default 256 MiB
+        Approximate maximum size (summed over all fixed-shape fields)
+        of one shard, used to determine the number of rows per shard
+        when the store is created.
+    writer_id : str, optional
+        Identifier of the writer, consisting of
+        alphanumeric characters and underscores.
+        If is None, the instance operates on the main index.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        store = SegmentStore(
+            "/path/to/store",
+            fields={"data": ((2, 6000), "float32"), "interval": ((2,), "int32")},
+            ragged_fields={"rpeaks": "int32"},
+        )
+        store.append("rec_1", [dict(data=data, interval=[0, 6000], rpeaks=rpeaks)], names=["S_rec_1_0000000"])
+        data = store.get("S_rec_1_0000000", "data")  # read-only view into the shard file
+
+    """
+
+    __name__ = "SegmentStore"
+
+    META_FILE = "meta.json"
+    INDEX_FILE = "index.npz"
+    SHARD_EXT = "bin"
+
+    def __init__(
+        self,
+        path: Union[str, bytes, os.PathLike],
+        fields: Optional[Dict[str, Tuple[Sequence[int], str]]] = None,
+        ragged_fields: Optional[Dict[str, str]] = None,
+        max_shard_bytes: int = 256 * 2**20,
+        writer_id: Optional[str] = None,
+    ) -> None:
+        self.path = Path(path).expanduser().resolve()
+        self.path.mkdir(parents=True, exist_ok=True)
+        if writer_id is not None:
+            assert re.match("^\\w+$", writer_id), "`writer_id` should consist of alphanumeric characters and underscores"
+        self.writer_id = writer_id
+        meta_fp = self.path / self.META_FILE
+        if meta_fp.is_file():
+            meta = json.loads(meta_fp.read_text())
+        else:
+            assert fields, "`fields` should be specified when creating a new store"
+            ragged_fields = ragged_fields or {}
+            row_bytes = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for shape, dtype in fields.values())
+            meta = {
+                "fields": {k: {"shape": list(shape), "dtype": np.dtype(dtype).str} for k, (shape, dtype) in fields.items()},
+                "ragged_fields": {k: np.dtype(dtype).str for k, dtype in ragged_fields.items()},
+                "rows_per_shard": max(1, int(max_shard_bytes // max(1, row_bytes))),
+            }
+            self._atomic_write(meta_fp, json.dumps(meta, ensure_ascii=False).encode())
+        self.fields = {k: (tuple(v["shape"]), np.dtype(v["dtype"])) for k, v in meta["fields"].items()}
+        self.ragged_fields = {k: np.dtype(v) for k, v in meta["ragged_fields"].items()}
+        self.rows_per_shard = meta["rows_per_shard"]
+        if fields is not None:
+            expected = {k: (tuple(shape), np.dtype(dtype)) for k, (shape, dtype) in fields.items()}
+            expected_ragged = {k: np.dtype(dtype) for k, dtype in (ragged_fields or {}).items()}
+            if expected != self.fields or expected_ragged != self.ragged_fields:
+                raise ValueError(
+                    f"schema of the existing store at {self.path} is inconsistent with the given fields, "
+                    "clear the store (or remove the directory) first"
+                )
+
+        self._mmaps = {}
+        self._shard = None  # (shard key, number of rows) of the shard being appended to
+        self._load_index()
+
+    @property
+    def index_fp(self) -> Path:
+        if self.writer_id is None:
+            return self.path / self.INDEX_FILE
+        return self.path / f"{Path(self.INDEX_FILE).stem}-{self.writer_id}{Path(self.INDEX_FILE).suffix}"
+
+    @property
+    def completed_records(self) -> List[str]:
+        """Records whose segments have been appended to the store."""
+        return list(self._completed)
+
+    def _shard_fp(self, field: str, shard: str) -> Path:
+        return self.path / f"{field}-{shard}.{self.SHARD_EXT}"
+
+    def _row_bytes(self, field: str) -> int:
+        shape, dtype = self.fields[field]
+        return int(np.prod(shape)) * dtype.itemsize
+
+    @staticmethod
+    def _atomic_write(fp: Path, content: bytes) -> None:
+        tmp_fp = fp.with_name(f".{fp.name}.{os.getpid()}.tmp")
+        tmp_fp.write_bytes(content)
+        os.replace(tmp_fp, fp)
+
+    def _empty_index(self) -> Dict[str, list]:
+        index = {"name": [], "group": [], "record": [], "shard": [], "row": []}
+        for field in self.ragged_fields:
+            index[f"{field}_offset"] = []
+            index[f"{field}_length"] = []
+        return index
+
+    def _read_index(self, fp: Path) -> Tuple[Dict[str, list], List[str]]:
+        """Read an index file, returns the index and the completed records."""
+        index = self._empty_index()
+        completed = []
+        if fp.is_file():
+            with np.load(fp) as npz:
+                for k in index:
+                    index[k] = npz[k].tolist()
+                if "completed" in npz.files:
+                    completed = npz["completed"].tolist()
+                else:  # index written without the ledger
+                    completed = list(dict.fromkeys(index["record"]))
+        return index, completed
+
+    def _load_index(self) -> None:
+        """Load the index from disk."""
+        self._index, completed = self._read_index(self.index_fp)
+        self._completed = dict.fromkeys(completed)  # ordered set
+        self._positions = {name: pos for pos, name in enumerate(self._index["name"])}
+
+    def refresh(self) -> None:
+        """Reload the index, e.g. after other processes have appended to the store."""
+        self._load_index()
+        self._mmaps = {}
+
+    def flush(self) -> None:
+        """Write the index to disk atomically."""
+        arrays = {}
+        for k, v in self._index.items():
+            if k in ["name", "group", "record", "shard"]:
+                arrays[k] = np.array(v, dtype=str)
+            else:
+                arrays[k] = np.array(v, dtype=np.int64)
+        arrays["completed"] = np.array(list(self._completed), dtype=str)
+        tmp_fp = self.index_fp.with_name(f".{self.index_fp.name}.{os.getpid()}.tmp")
+        with open(tmp_fp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_fp, self.index_fp)
+
+    def merge(self) -> List[str]:
+        """Merge the indices of the writers into the main index.
+
+        The main index is written to disk atomically
+        before the index files of the writers are removed,
+        so that an interrupted merge can be safely repeated.
+
+        Returns
+        -------
+        List[str]
+            Records merged from the writers.
+
+        """
+        assert self.writer_id is None, "`merge` should be called from the instance of the main index"
+        pattern = f"{Path(self.INDEX_FILE).stem}-*{Path(self.INDEX_FILE).suffix}"
+        writer_fps = sorted(self.path.glob(pattern))
+        merged = []
+        for fp in writer_fps:
+            index, completed = self._read_index(fp)
+            for pos, name in enumerate(index["name"]):
+                if name in self._positions:
+                    continue
+                self._positions[name] = len(self._index["name"])
+                for k, v in index.items():
+                    self._index[k].append(v[pos])
+            merged.extend(completed)
+            self._completed.update(dict.fromkeys(completed))
+        if len(writer_fps) > 0:
+            self.flush()
+            for fp in writer_fps:
+                fp.unlink()
+            self._mmaps = {}
+        return merged
+
+    def _shards(self) -> List[str]:
+        """Sorted keys of the existing shards that belong to the writer of this instance."""
+        prefix = f"{self.writer_id}-" if self.writer_id else ""
+        field = next(iter(self.fields))
+        pattern = re.compile(f"^{re.escape(field)}-{re.escape(prefix)}(\\d+)\\.{self.SHARD_EXT}$")
+        shards = [m.group(1) for m in map(pattern.match, os.listdir(self.path)) if m]
+        return [f"{prefix}{s}" for s in sorted(shards, key=int)]
+
+    def _open_shard(self, shard: str) -> int:
+        """Prepare the shard for appending, returns the number of complete rows in it.
+
+        Trailing incomplete rows (e.g. left by an interrupted writer) are truncated,
+        so that all fields of the shard stay aligned.
+        """
+        n_rows = min(
+            (
+                self._shard_fp(field, shard).stat().st_size // self._row_bytes(field)
+                if self._shard_fp(field, shard).is_file()
+                else 0
+            )
+            for field in self.fields
+        )
+        for field in self.fields:
+            fp = self._shard_fp(field, shard)
+            with open(fp, "ab") as f:
+                f.truncate(n_rows * self._row_bytes(field))
+        for field, dtype in self.ragged_fields.items():
+            fp = self._shard_fp(field, shard)
+            with open(fp, "ab") as f:
+                f.truncate(fp.stat().st_size // dtype.itemsize * dtype.itemsize)
+        return n_rows
+
+    def _next_shard(self) -> Tuple[str, int]:
+        prefix = f"{self.writer_id}-" if self.writer_id else ""
+        shards = self._shards()
+        shard = f"{prefix}{0 if len(shards) == 0 else int(shards[-1][len(prefix):]) + 1:05d}"
+        return shard, self._open_shard(shard)
+
+    def append(
+        self,
+        record: str,
+        items: Sequence[Dict[str, np.ndarray]],
+        names: Sequence[str],
+        group: Optional[str] = None,
+        flush: bool = True,
+    ) -> None:
+        """Append segments of one record to the store,
+        and mark the record as completed.
+
+        Parameters
+        ----------
+        record : str
+            Name of the record that the segments are sliced from.
+        items : Sequence[dict]
+            The segments, each of which is a dict containing values
+            of all the (fixed-shape and ragged) fields of the store.
+            Can be empty, in which case the record is only marked as completed.
+        names : Sequence[str]
+            Names of the segments, should be unique in the store.
+        group : str, optional
+            Group (e.g. subject) of the segments, defaults to `record`.
+        flush : bool, default True
+            Whether to write the index to disk after appending.
+
+        Returns
+        -------
+        None
+
+        """
+        assert len(items) == len(names), "`items` and `names` should have the same length"
+        duplicates = [name for name in names if name in self._positions]
+        if len(duplicates) > 0 or len(set(names)) < len(names):
+            raise ValueError(f"segment names should be unique, but got duplicates, e.g. `{(duplicates or names)[0]}`")
+        group = group or record
+        if self._shard is None:
+            shards = self._shards()
+            if len(shards) == 0:
+                self._shard = self._next_shard()
+            else:
+                self._shard = (shards[-1], self._open_shard(shards[-1]))
+
+        start = 0
+        while start < len(items):
+            shard, n_rows = self._shard
+            if n_rows >= self.rows_per_shard:
+                self._shard = self._next_shard()
+                continue
+            stop = min(len(items), start + self.rows_per_shard - n_rows)
+            chunk = items[start:stop]
+            for field, (shape, dtype) in self.fields.items():
+                values = [np.asarray(item[field], dtype=dtype) for item in chunk]
+                for v in values:
+                    if v.shape != shape:
+                        raise ValueError(f"field `{field}` should be of shape {shape}, but got {v.shape}")
+                with open(self._shard_fp(field, shard), "ab") as f:
+                    np.ascontiguousarray(np.stack(values)).tofile(f)
+            for field, dtype in self.ragged_fields.items():
+                fp = self._shard_fp(field, shard)
+                offset = fp.stat().st_size // dtype.itemsize if fp.is_file() else 0
+                values = [np.asarray(item[field], dtype=dtype).ravel() for item in chunk]
+                with open(fp, "ab") as f:
+                    np.concatenate(values).tofile(f)
+                lengths = [len(v) for v in values]
+                self._index[f"{field}_offset"].extend((offset + np.cumsum([0] + lengths[:-1])).tolist())
+                self._index[f"{field}_length"].extend(lengths)
+            for i, name in enumerate(names[start:stop]):
+                self._positions[name] = len(self._index["name"])
+                self._index["name"].append(name)
+                self._index["group"].append(group)
+                self._index["record"].append(record)
+                self._index["shard"].append(shard)
+                self._index["row"].append(n_rows + i)
+            self._shard = (shard, n_rows + len(chunk))
+            self._mmaps = {k: v for k, v in self._mmaps.items() if k[1] != shard}
+            start = stop
+        self._completed[record] = None
+        if flush:
+            self.flush()
+
+    def _memmap(self, field: str, shard: str, min_size: int) -> np.memmap:
+        """Get the (cached) memory map of a shard file, containing at least `min_size` rows (or items)."""
+        mm = self._mmaps.get((field, shard), None)
+        if mm is None or len(mm) < min_size:
+            fp = self._shard_fp(field, shard)
+            if field in self.fields:
+                shape, dtype = self.fields[field]
+                mm = np.memmap(fp, dtype=dtype, mode="r", shape=(fp.stat().st_size // self._row_bytes(field),) + shape)
+            else:
+                dtype = self.ragged_fields[field]
+                mm = np.memmap(fp, dtype=dtype, mode="r", shape=(fp.stat().st_size // dtype.itemsize,))
+            self._mmaps[(field, shard)] = mm
+        return mm
+
+    def get(self, name: str, field: Optional[str] = None) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """Get (field(s) of) a segment.
+
+        Parameters
+        ----------
+        name : str
+            Name of the segment.
+        field : str, optional
+            Name of the field to get, if is None,
+            all fields of the segment will be returned.
+
+        Returns
+        -------
+        numpy.ndarray or dict
+            Read-only view(s) into the shard file(s).
+
+        """
+        if field is None:
+            return {f: self.get(name, f) for f in list(self.fields) + list(self.ragged_fields)}
+        pos = self._positions[name]
+        shard = self._index["shard"][pos]
+        if field in self.fields:
+            row = self._index["row"][pos]
+            return self._memmap(field, shard, row + 1)[row]
+        offset = self._index[f"{field}_offset"][pos]
+        length = self._index[f"{field}_length"][pos]
+        if length == 0:
+            return np.empty((0,), dtype=self.ragged_fields[field])
+        return self._memmap(field, shard, offset + length)[offset : offset + length]
+
+    def names(self, group: Optional[str] = None, record: Optional[str] = None) -> List[str]:
+        """Names of the stored segments, optionally filtered by `group` and/or `record`."""
+        return [
+            name
+            for name, g, r in zip(self._index["name"], self._index["group"], self._index["record"])
+            if (group is None or g == group) and (record is None or r == record)
+        ]
+
+    def remove(self, records: Optional[Sequence[str]] = None, flush: bool = True) -> None:
+        """Remove segments of the given records (all segments if is None) from the index,
+        and unmark the records as completed.
+
+        Parameters
+        ----------
+        records : Sequence[str], optional
+            Records whose segments are to be removed.
+            If is None, the store will be cleared via :meth:`clear`.
+        flush : bool, default True
+            Whether to write the index to disk after removal.
+
+        Returns
+        -------
+        None
+
+        """
+        if records is None:
+            self.clear()
+            return
+        records = set(records)
+        keep = [pos for pos, r in enumerate(self._index["record"]) if r not in records]
+        self._index = {k: [v[pos] for pos in keep] for k, v in self._index.items()}
+        self._completed = {r: None for r in self._completed if r not in records}
+        self._positions = {name: pos for pos, name in enumerate(self._index["name"])}
+        if flush:
+            self.flush()
+
+    def clear(self) -> None:
+        """Remove all segments, all shard files and all index files of the writers of the store."""
+        self._mmaps = {}
+        self._shard = None
+        for fp in self.path.glob(f"*.{self.SHARD_EXT}"):
+            fp.unlink()
+        for fp in self.path.glob(f"{Path(self.INDEX_FILE).stem}-*{Path(self.INDEX_FILE).suffix}"):
+            fp.unlink()
+        self._index = self._empty_index()
+        self._completed = {}
+        self._positions = {}
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._index["name"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def __getstate__(self) -> dict:
+        # memory maps are re-opened lazily in the unpickled (e.g. DataLoader worker) instance
+        state = self.__dict__.copy()
+        state["_mmaps"] = {}
+        return state
+
+    def extra_repr_keys(self) -> List[str]:
+        return ["path", "fields", "ragged_fields", "rows_per_shard", "writer_id"]
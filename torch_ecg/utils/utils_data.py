@@ -13,9 +13,10 @@ from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.utils import compute_class_weight
-from torch import Tensor, from_numpy
-from torch.nn.functional import interpolate
+from torch import Tensor, contiguous_format, from_numpy
+from torch.nn.functional import interpolate, pad
 from wfdb import MultiRecord, Record
 from wfdb.io import _header
 
@@ -299,11 +300,12 @@ def ensure_lead_fmt(values: np.ndarray, n_leads: int = 12, fmt: str = "lead_firs
 
 
 def ensure_siglen(
-    values: np.ndarray,
+    values: Union[np.ndarray, Tensor],
     siglen: int,
     fmt: str = "lead_first",
     tolerance: Optional[float] = None,
-) -> np.ndarray:
+    copy: bool = True,
+) -> Union[np.ndarray, Tensor]:
     """Ensure the (ECG) signal to be of specified length.
 
     Strategy:
@@ -318,7 +320,7 @@ def ensure_siglen(
 
     Parameters
     ----------
-    values : numpy.ndarray
+    values : numpy.ndarray or torch.Tensor
         Values of the `n_leads`-lead (ECG) signal.
     siglen : int
         Length of the signal supposed to have.
@@ -329,10 +331,19 @@ def ensure_siglen(
     tolerance : float, optional
         Tolerance of the length of `values` to be
         longer than `siglen` in percentage.
+    copy : bool, default True
+        If True, the returned values own their memory.
+        Otherwise, the returned values are (strided) views of `values`
+        whenever possible, i.e. unless zero padding is needed,
+        so that the (overlapping) slices are not materialized.
+        The views are read-only for :class:`~numpy.ndarray`,
+        and share memory with `values` for :class:`~torch.Tensor`.
+
+        .. versionadded:: 0.0.32
 
     Returns
     -------
-    numpy.ndarray
+    numpy.ndarray or torch.Tensor
         ECG signal in the format of `fmt` and of fixed length `siglen`,
         of ``ndim=3`` if `tolerence` is given, otherwise ``ndim=2``.
 
@@ -348,16 +359,19 @@ def ensure_siglen(
     >>> new_values = ensure_siglen(values, 4000, tolerance=0.2, fmt="lead_first")
     >>> new_values.shape
     (1, 12, 4000)
+    >>> values = np.random.randn(12, 24 * 3600 * 500)
+    >>> new_values = ensure_siglen(values, 5000, tolerance=0.8, fmt="lead_first", copy=False)
+    >>> new_values.shape, np.shares_memory(new_values, values)
+    ((21599, 12, 5000), True)
 
     """
-    dtype = values.dtype
-    if fmt.lower() in ["channel_last", "lead_last"]:
-        # to lead_first
-        _values = np.array(values, dtype=dtype).T
-    else:
-        _values = np.array(values, dtype=dtype).copy()
+    is_tensor = isinstance(values, Tensor)
+    if not is_tensor:
+        values = np.asarray(values)
+    lead_last = fmt.lower() in ["channel_last", "lead_last"]
+    # to lead_first, as views
+    _values = values.transpose(1, 0) if lead_last else values
     original_siglen = _values.shape[1]
-    n_leads = _values.shape[0]
 
     if tolerance is None or original_siglen <= siglen * (1 + tolerance):
         if original_siglen >= siglen:
@@ -368,26 +382,34 @@ def ensure_siglen(
             pad_len = siglen - original_siglen
             pad_left = pad_len // 2
             pad_right = pad_len - pad_left
-            out_values = np.pad(_values, ((0, 0), (pad_left, pad_right)), "constant", constant_values=0).astype(dtype)
+            if is_tensor:
+                out_values = pad(_values, (pad_left, pad_right), "constant", 0)
+            else:
+                out_values = np.pad(_values, ((0, 0), (pad_left, pad_right)), "constant", constant_values=0)
 
-        if fmt.lower() in ["channel_last", "lead_last"]:
-            out_values = out_values.T
+        out_values = out_values.transpose(1, 0) if lead_last else out_values
         if tolerance is not None:
             out_values = out_values[np.newaxis, ...]
-
-        return out_values
-
-    forward_len = int(round(siglen * tolerance))
-    out_values = np.array(
-        [
-            _values[..., idx * forward_len : idx * forward_len + siglen]
-            for idx in range((original_siglen - siglen) // forward_len + 1)
-        ],
-        dtype=dtype,
-    )
-    if fmt.lower() in ["channel_last", "lead_last"]:
-        out_values = np.moveaxis(out_values, 1, -1)
-    return out_values.astype(dtype)
+    else:
+        forward_len = int(round(siglen * tolerance))
+        n_slices = (original_siglen - siglen) // forward_len + 1
+        # strided views of shape (n_slices, n_leads, siglen)
+        if is_tensor:
+            out_values = _values.unfold(-1, siglen, forward_len)[:, :n_slices].permute(1, 0, 2)
+        else:
+            out_values = np.moveaxis(sliding_window_view(_values, siglen, axis=-1)[:, ::forward_len][:, :n_slices], 1, 0)
+        if lead_last:
+            out_values = out_values.transpose(1, 2) if is_tensor else np.moveaxis(out_values, 1, -1)
+
+    if is_tensor:
+        if copy:
+            out_values = out_values.clone(memory_format=contiguous_format)
+    elif copy:
+        out_values = np.array(out_values, order="C")
+    else:
+        out_values = out_values.view()
+        out_values.flags.writeable = False
+    return out_values
 
 
 @dataclass
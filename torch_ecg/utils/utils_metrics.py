@@ -112,20 +112,22 @@ def confusion_matrix(
         Confusion matrix, of shape ``(n_classes, n_classes)``.
 
     """
+    if isinstance(labels, Tensor) or isinstance(outputs, Tensor):
+        # computed on the device of the tensors, only the confusion matrix is copied to the host
+        labels, outputs = _one_hot_pair_t(labels, outputs, num_classes)
+        _check_binary_pair(labels, outputs, check_outputs=True)
+        num_classes = labels.shape[1]
+        cm = torch.bincount(outputs.argmax(dim=1) * num_classes + labels.argmax(dim=1), minlength=num_classes**2)
+        return cm.reshape(num_classes, num_classes).cpu().numpy().astype(float)
+
     labels, outputs = one_hot_pair(labels, outputs, num_classes)
-    assert np.shape(labels) == np.shape(outputs), "labels and outputs must have the same shape"
-    assert all([value in (0, 1) for value in np.unique(labels)]), "labels must be binary"
-    assert all([value in (0, 1) for value in np.unique(outputs)]), "outputs must be binary"
+    _check_binary_pair(labels, outputs, check_outputs=True)
 
-    num_samples, num_classes = np.shape(labels)
+    num_classes = np.shape(labels)[1]
 
-    cm = np.zeros((num_classes, num_classes))
-    for k in range(num_samples):
-        i = np.argmax(outputs[k, :])
-        j = np.argmax(labels[k, :])
-        cm[i, j] += 1
+    cm = np.bincount(np.argmax(outputs, axis=1) * num_classes + np.argmax(labels, axis=1), minlength=num_classes**2)
 
-    return cm
+    return cm.reshape(num_classes, num_classes).astype(float)
 
 
 def one_vs_rest_confusion_matrix(
@@ -156,26 +158,13 @@ def one_vs_rest_confusion_matrix(
         One-vs-rest confusion matrix, of shape ``(n_classes, 2, 2)``.
 
     """
-    labels, outputs = one_hot_pair(labels, outputs, num_classes)
-    assert np.shape(labels) == np.shape(outputs), "labels and outputs must have the same shape"
-    assert all([value in (0, 1) for value in np.unique(labels)]), "labels must be binary"
-    assert all([value in (0, 1) for value in np.unique(outputs)]), "outputs must be binary"
-
-    num_samples, num_classes = np.shape(labels)
-
-    ovr_cm = np.zeros((num_classes, 2, 2))
-    for i in range(num_samples):
-        for j in range(num_classes):
-            if labels[i, j] == 1 and outputs[i, j] == 1:  # TP
-                ovr_cm[j, 0, 0] += 1
-            elif labels[i, j] == 0 and outputs[i, j] == 1:  # FP
-                ovr_cm[j, 0, 1] += 1
-            elif labels[i, j] == 1 and outputs[i, j] == 0:  # FN
-                ovr_cm[j, 1, 0] += 1
-            elif labels[i, j] == 0 and outputs[i, j] == 0:  # TN
-                ovr_cm[j, 1, 1] += 1
+    if isinstance(labels, Tensor) or isinstance(outputs, Tensor):
+        labels, outputs = _one_hot_pair_t(labels, outputs, num_classes)
+    else:
+        labels, outputs = one_hot_pair(labels, outputs, num_classes)
+    _check_binary_pair(labels, outputs, check_outputs=True)
 
-    return ovr_cm
+    return _ovr_confusion_matrix(labels, outputs)
 
 
 # alias
@@ -250,17 +239,62 @@ def metrics_from_confusion_matrix(
 
     """
     outputs_ndim = np.ndim(outputs)
-    labels, outputs = one_hot_pair(labels, outputs, num_classes)
-    num_samples, num_classes = np.shape(labels)
+    if isinstance(labels, Tensor) or isinstance(outputs, Tensor):
+        # the confusion matrices and the AUCs are computed on the device of the tensors
+        labels, outputs = _one_hot_pair_t(labels, outputs, num_classes)
+    else:
+        labels, outputs = one_hot_pair(labels, outputs, num_classes)
+    _check_binary_pair(labels, outputs)
+    num_samples, num_classes = labels.shape
 
     # probability outputs to binary outputs
-    bin_outputs = np.zeros_like(outputs, dtype=int)
-    bin_outputs[outputs >= thr] = 1
-    bin_outputs[outputs < thr] = 0
-    if np.unique(outputs).size == 2:
+    bin_outputs = _binarize(outputs, thr)
+    if _has_two_values(outputs):
         warnings.warn("`outputs` is probably binary or categorical, AUC may be incorrect", RuntimeWarning)
 
-    ovr_cm = ovr_confusion_matrix(labels, bin_outputs)
+    ovr_cm = _ovr_confusion_matrix(labels, bin_outputs)
+
+    if outputs_ndim == 1:
+        auroc, auprc = np.full(num_classes, np.nan), np.full(num_classes, np.nan)
+    elif isinstance(outputs, Tensor):
+        auroc, auprc = _auc_t(labels, outputs)
+    else:
+        auroc, auprc = _auc(labels, outputs)
+
+    return _metrics_from_ovr_cm(ovr_cm, num_samples, auroc, auprc, weights, fillna)
+
+
+def _metrics_from_ovr_cm(
+    ovr_cm: np.ndarray,
+    num_samples: int,
+    auroc: np.ndarray,
+    auprc: np.ndarray,
+    weights: Optional[Union[np.ndarray, Tensor]] = None,
+    fillna: Union[bool, float] = 0.0,
+) -> Dict[str, Union[float, np.ndarray]]:
+    """Compute the metrics from the one-vs-rest confusion matrix and the AUCs.
+
+    Parameters
+    ----------
+    ovr_cm : numpy.ndarray
+        One-vs-rest confusion matrix, of shape ``(n_classes, 2, 2)``.
+    num_samples : int
+        Number of samples.
+    auroc, auprc : numpy.ndarray
+        AUROCs and AUPRCs for each class, of shape ``(n_classes,)``.
+    weights : numpy.ndarray or torch.Tensor, optional
+        Weights for each class, of shape ``(n_classes,)``.
+    fillna : bool or float, default: 0.0
+        Value to fill NaN with, see :func:`metrics_from_confusion_matrix`.
+
+    Returns
+    -------
+    metrics : dict
+        Metrics computed from the one-vs-rest confusion matrix.
+
+    """
+    num_classes = ovr_cm.shape[0]
+    tp, fp, fn, tn = ovr_cm[:, 0, 0], ovr_cm[:, 0, 1], ovr_cm[:, 1, 0], ovr_cm[:, 1, 1]
 
     # sens: sensitivity, recall, hit rate, or true positive rate
     # spec: specificity, selectivity or true negative rate
@@ -269,105 +303,14 @@ def metrics_from_confusion_matrix(
     # jac: jaccard index, threat score, or critical success index
     # acc: accuracy
     # phi: phi coefficient, or matthews correlation coefficient
-    # NOTE: never use repeat here, because it will cause bugs
-    # sens, spec, prec, npv, jac, acc, phi = list(repeat(np.zeros(num_classes), 7))
-    sens, spec, prec, npv, jac, acc, phi = [np.zeros(num_classes) for _ in range(7)]
-    auroc = np.zeros(num_classes)  # area under the receiver-operater characteristic curve (ROC AUC)
-    auprc = np.zeros(num_classes)  # area under the precision-recall curve
-    for k in range(num_classes):
-        tp, fp, fn, tn = (
-            ovr_cm[k, 0, 0],
-            ovr_cm[k, 0, 1],
-            ovr_cm[k, 1, 0],
-            ovr_cm[k, 1, 1],
-        )
-        if tp + fn > 0:
-            sens[k] = tp / (tp + fn)
-        else:
-            sens[k] = float("nan")
-        if tp + fp > 0:
-            prec[k] = tp / (tp + fp)
-        else:
-            prec[k] = float("nan")
-        if tn + fp > 0:
-            spec[k] = tn / (tn + fp)
-        else:
-            spec[k] = float("nan")
-        if tn + fn > 0:
-            npv[k] = tn / (tn + fn)
-        else:
-            npv[k] = float("nan")
-        if tp + fn + fp > 0:
-            jac[k] = tp / (tp + fn + fp)
-        else:
-            jac[k] = float("nan")
-        acc[k] = (tp + tn) / num_samples
-        phi[k] = (tp * tn - fp * fn) / np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
-
-        if outputs_ndim == 1:
-            auroc[k] = np.nan
-            auprc[k] = np.nan
-            continue
-        thresholds = np.unique(outputs[:, k])
-        thresholds = np.append(thresholds, thresholds[-1] + 1)
-        thresholds = thresholds[::-1]
-        num_thresholds = len(thresholds)
-
-        # Initialize the TPs, FPs, FNs, and TNs.
-        tp = np.zeros(num_thresholds)
-        fp = np.zeros(num_thresholds)
-        fn = np.zeros(num_thresholds)
-        tn = np.zeros(num_thresholds)
-        fn[0] = np.sum(labels[:, k] == 1)
-        tn[0] = np.sum(labels[:, k] == 0)
-
-        # Find the indices that result in sorted output values.
-        idx = np.argsort(outputs[:, k])[::-1]
-
-        # Compute the TPs, FPs, FNs, and TNs for class k across thresholds.
-        i = 0
-        for j in range(1, num_thresholds):
-            # Initialize TPs, FPs, FNs, and TNs using values at previous threshold.
-            tp[j] = tp[j - 1]
-            fp[j] = fp[j - 1]
-            fn[j] = fn[j - 1]
-            tn[j] = tn[j - 1]
-
-            # Update the TPs, FPs, FNs, and TNs at i-th output value.
-            while i < num_samples and outputs[idx[i], k] >= thresholds[j]:
-                if labels[idx[i], k]:
-                    tp[j] += 1
-                    fn[j] -= 1
-                else:
-                    fp[j] += 1
-                    tn[j] -= 1
-                i += 1
-
-        # Summarize the TPs, FPs, FNs, and TNs for class k.
-        tpr_ = np.zeros(num_thresholds)
-        tnr_ = np.zeros(num_thresholds)
-        ppv_ = np.zeros(num_thresholds)
-        for j in range(num_thresholds):
-            if tp[j] + fn[j]:
-                tpr_[j] = float(tp[j]) / float(tp[j] + fn[j])
-            else:
-                tpr_[j] = float("nan")
-            if fp[j] + tn[j]:
-                tnr_[j] = float(tn[j]) / float(fp[j] + tn[j])
-            else:
-                tnr_[j] = float("nan")
-            if tp[j] + fp[j]:
-                ppv_[j] = float(tp[j]) / float(tp[j] + fp[j])
-            else:
-                ppv_[j] = float("nan")
-
-        # Compute AUROC as the area under a piecewise linear function with TPR/
-        # sensitivity (x-axis) and TNR/specificity (y-axis) and AUPRC as the area
-        # under a piecewise constant with TPR/recall (x-axis) and PPV/precision
-        # (y-axis) for class k.
-        for j in range(num_thresholds - 1):
-            auroc[k] += 0.5 * (tpr_[j + 1] - tpr_[j]) * (tnr_[j + 1] + tnr_[j])
-            auprc[k] += (tpr_[j + 1] - tpr_[j]) * ppv_[j + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sens = np.where(tp + fn > 0, tp / (tp + fn), np.nan)
+        prec = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+        spec = np.where(tn + fp > 0, tn / (tn + fp), np.nan)
+        npv = np.where(tn + fn > 0, tn / (tn + fn), np.nan)
+        jac = np.where(tp + fn + fp > 0, tp / (tp + fn + fp), np.nan)
+    acc = (tp + tn) / num_samples
+    phi = (tp * tn - fp * fn) / np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
 
     fnr = 1 - sens  # false negative rate, miss rate
     fpr = 1 - spec  # false positive rate, fall-out
@@ -429,6 +372,169 @@ def metrics_from_confusion_matrix(
     return metrics
 
 
+def _check_binary_pair(
+    labels: Union[np.ndarray, Tensor],
+    outputs: Union[np.ndarray, Tensor],
+    check_outputs: bool = False,
+) -> None:
+    """Check that `labels` (and `outputs`) are binary arrays of the same shape."""
+    assert tuple(labels.shape) == tuple(outputs.shape), "labels and outputs must have the same shape"
+    assert ((labels == 0) | (labels == 1)).all(), "labels must be binary"
+    if check_outputs:
+        assert ((outputs == 0) | (outputs == 1)).all(), "outputs must be binary"
+
+
+def _binarize(outputs: Union[np.ndarray, Tensor], thr: float) -> Union[np.ndarray, Tensor]:
+    """Binarize the probability outputs with the threshold `thr`."""
+    if isinstance(outputs, Tensor):
+        return (outputs >= thr).long()
+    return (outputs >= thr).astype(int)
+
+
+def _has_two_values(outputs: Union[np.ndarray, Tensor]) -> bool:
+    """Whether `outputs` has exactly two unique values, without sorting the whole array."""
+    if 0 in tuple(outputs.shape):
+        return False
+    lo, hi = outputs.min(), outputs.max()
+    return bool(lo != hi) and bool(((outputs == lo) | (outputs == hi)).all())
+
+
+def _ovr_confusion_matrix(labels: Union[np.ndarray, Tensor], outputs: Union[np.ndarray, Tensor]) -> np.ndarray:
+    """One-vs-rest confusion matrices of binary `labels` and `outputs`, of shape ``(n_samples, n_classes)``."""
+    labels, outputs = labels == 1, outputs == 1
+    counts = [
+        labels & outputs,  # TP
+        ~labels & outputs,  # FP
+        labels & ~outputs,  # FN
+        ~labels & ~outputs,  # TN
+    ]
+    if isinstance(labels, Tensor):
+        counts = torch.stack([c.sum(dim=0) for c in counts], dim=-1).cpu().numpy()
+    else:
+        counts = np.stack([c.sum(axis=0) for c in counts], axis=-1)
+    return counts.reshape(-1, 2, 2).astype(float)
+
+
+def _auc_from_counts(
+    pos: np.ndarray,
+    neg: np.ndarray,
+    boundary: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute AUROC and AUPRC from the counts of positive and negative samples.
+
+    Parameters
+    ----------
+    pos, neg : numpy.ndarray
+        Counts of positive and negative samples, of shape ``(n_classes, n_rows)``,
+        where the rows are sorted by the outputs (scores) in descending order.
+    boundary : numpy.ndarray
+        Boolean array of shape ``(n_classes, n_rows)``, marking the last row of
+        each group of equal scores (each threshold).
+
+    Returns
+    -------
+    auroc, auprc : numpy.ndarray
+        AUROCs and AUPRCs for each class, of shape ``(n_classes,)``.
+
+    NOTE
+    ----
+    AUROC is the area under the piecewise linear function with TPR/sensitivity (x-axis)
+    and TNR/specificity (y-axis), and AUPRC is the area under the piecewise constant function
+    with TPR/recall (x-axis) and PPV/precision (y-axis). The areas are accumulated in
+    descending order of the thresholds, hence the same as the per-threshold summation.
+
+    """
+    num_classes, num_rows = pos.shape
+    if num_rows == 0:
+        return np.full(num_classes, np.nan), np.full(num_classes, np.nan)
+    tp = np.cumsum(pos, axis=-1, dtype=float)
+    fp = np.cumsum(neg, axis=-1, dtype=float)
+    num_pos, num_neg = tp[:, -1:], fp[:, -1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tpr = np.where(num_pos > 0, tp / num_pos, np.nan)
+        tnr = np.where(num_neg > 0, (num_neg - fp) / num_neg, np.nan)
+        ppv = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+    # the last row of the previous threshold, -1 for the threshold above all scores
+    rows = np.where(boundary, np.arange(num_rows), -1)
+    prev = np.concatenate([np.full((num_classes, 1), -1), np.maximum.accumulate(rows, axis=-1)[:, :-1]], axis=-1)
+    prev_tpr = np.where(prev >= 0, np.take_along_axis(tpr, prev, axis=-1), np.where(num_pos > 0, 0.0, np.nan))
+    prev_tnr = np.where(prev >= 0, np.take_along_axis(tnr, prev, axis=-1), np.where(num_neg > 0, 1.0, np.nan))
+    auroc = np.where(boundary, 0.5 * (tpr - prev_tpr) * (tnr + prev_tnr), 0.0)
+    auprc = np.where(boundary, (tpr - prev_tpr) * ppv, 0.0)
+    # cumsum adds up sequentially
+    return np.cumsum(auroc, axis=-1)[:, -1], np.cumsum(auprc, axis=-1)[:, -1]
+
+
+def _auc(labels: np.ndarray, outputs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """AUROCs and AUPRCs of binary `labels` and probability `outputs`, of shape ``(n_samples, n_classes)``."""
+    # class-major, so that sorting and accumulating are along contiguous memory
+    labels, outputs = np.ascontiguousarray(labels.T), np.ascontiguousarray(outputs.T)
+    order = np.argsort(-outputs, axis=-1, kind="stable")
+    sorted_outputs = np.take_along_axis(outputs, order, axis=-1)
+    pos = np.take_along_axis(labels, order, axis=-1) != 0
+    boundary = np.ones_like(pos)
+    boundary[:, :-1] = sorted_outputs[:, 1:] != sorted_outputs[:, :-1]
+    return _auc_from_counts(pos, ~pos, boundary)
+
+
+def _auc_t(labels: Tensor, outputs: Tensor) -> Tuple[np.ndarray, np.ndarray]:
+    """The torch version of :func:`_auc`, computed on the device of the tensors."""
+    num_rows, num_classes = outputs.shape
+    if num_rows == 0:
+        return np.full(num_classes, np.nan), np.full(num_classes, np.nan)
+    dtype = torch.float32 if outputs.device.type == "mps" else torch.float64
+    labels, outputs = labels.T.contiguous(), outputs.T.contiguous()
+    sorted_outputs, order = torch.sort(outputs, dim=-1, descending=True, stable=True)
+    pos = labels.gather(-1, order) != 0
+    boundary = torch.ones_like(pos)
+    boundary[:, :-1] = sorted_outputs[:, 1:] != sorted_outputs[:, :-1]
+    tp = torch.cumsum(pos, dim=-1, dtype=dtype)
+    fp = torch.cumsum(~pos, dim=-1, dtype=dtype)
+    num_pos, num_neg = tp[:, -1:], fp[:, -1:]
+    nan = torch.tensor(float("nan"), dtype=dtype, device=outputs.device)
+    tpr = torch.where(num_pos > 0, tp / num_pos, nan)
+    tnr = torch.where(num_neg > 0, (num_neg - fp) / num_neg, nan)
+    ppv = torch.where(tp + fp > 0, tp / (tp + fp), nan)
+    rows = torch.where(boundary, torch.arange(num_rows, device=outputs.device), -1)
+    prev = torch.cat([torch.full_like(rows[:, :1], -1), torch.cummax(rows, dim=-1).values[:, :-1]], dim=-1)
+    prev_tpr = torch.where(prev >= 0, tpr.gather(-1, prev.clamp(min=0)), torch.where(num_pos > 0, 0.0, nan))
+    prev_tnr = torch.where(prev >= 0, tnr.gather(-1, prev.clamp(min=0)), torch.where(num_neg > 0, 1.0, nan))
+    auroc = torch.where(boundary, 0.5 * (tpr - prev_tpr) * (tnr + prev_tnr), 0.0).sum(dim=-1)
+    auprc = torch.where(boundary, (tpr - prev_tpr) * ppv, 0.0).sum(dim=-1)
+    return auroc.cpu().numpy().astype(float), auprc.cpu().numpy().astype(float)
+
+
+def _score_histograms(
+    labels: Union[np.ndarray, Tensor],
+    outputs: Union[np.ndarray, Tensor],
+    num_bins: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Histograms of the probability outputs of the positive and negative samples,
+    over `num_bins` equal-width bins of ``[0, 1]``.
+
+    Returns
+    -------
+    pos, neg : numpy.ndarray
+        Counts of positive and negative samples in the bins, of shape ``(n_classes, num_bins)``.
+
+    """
+    num_classes = outputs.shape[1]
+    if isinstance(outputs, Tensor):
+        bins = (outputs.float() * num_bins).long().clamp(0, num_bins - 1)
+        keys = bins * num_classes + torch.arange(num_classes, device=outputs.device)
+        pos = labels != 0
+        pos_hist = torch.bincount(keys[pos], minlength=num_bins * num_classes)
+        neg_hist = torch.bincount(keys[~pos], minlength=num_bins * num_classes)
+        pos_hist, neg_hist = pos_hist.cpu().numpy(), neg_hist.cpu().numpy()
+    else:
+        bins = np.clip((outputs * num_bins).astype(int), 0, num_bins - 1)
+        keys = bins * num_classes + np.arange(num_classes)
+        pos = labels != 0
+        pos_hist = np.bincount(keys[pos], minlength=num_bins * num_classes)
+        neg_hist = np.bincount(keys[~pos], minlength=num_bins * num_classes)
+    return pos_hist.reshape(num_bins, num_classes).T, neg_hist.reshape(num_bins, num_classes).T
+
+
 @add_docstring(
     _METRICS_FROM_CONFUSION_MATRIX_PARAMS.format(metric="F1-measure", metrics="F1-measures"),
     "prepend",
@@ -642,36 +748,39 @@ def QRS_score(
     record_flags = np.ones((len(rpeaks_truths),), dtype=float)
     thr_ = thr * fs
 
-    for idx, (truth_arr, pred_arr) in enumerate(zip(rpeaks_truths, rpeaks_preds)):
-        false_negative = 0
-        false_positive = 0
-        true_positive = 0
-        extended_truth_arr = np.concatenate((truth_arr.astype(int), [int(9.5 * fs)]))
-        for j, t_ind in enumerate(extended_truth_arr[:-1]):
-            next_t_ind = extended_truth_arr[j + 1]
-            loc = np.where(np.abs(pred_arr - t_ind) <= thr_)[0]
-            if j == 0:
-                err = np.where((pred_arr >= 0.5 * fs + thr_) & (pred_arr <= t_ind - thr_))[0]
-            else:
-                err = np.array([], dtype=int)
-            err = np.append(
-                err,
-                np.where((pred_arr >= t_ind + thr_) & (pred_arr <= next_t_ind - thr_))[0],
-            )
-
-            false_positive += len(err)
-            if len(loc) >= 1:
-                true_positive += 1
-                false_positive += len(loc) - 1
-            elif len(loc) == 0:
-                false_negative += 1
-
-        if false_negative + false_positive > 1:
-            record_flags[idx] = 0
-        elif false_negative == 1 and false_positive == 0:
-            record_flags[idx] = 0.3
-        elif false_negative == 0 and false_positive == 1:
-            record_flags[idx] = 0.7
+    # all records are processed at once, via the sorted array of
+    # the (record index, rpeak location) pairs of the predictions;
+    # the bounds are computed as in the per-record formulation,
+    # and then turned into integer bounds (the rpeaks are indices)
+    truths = [np.asarray(truth_arr).astype(int).reshape(-1) for truth_arr in rpeaks_truths]
+    preds = [np.asarray(pred_arr).astype(int).reshape(-1) for pred_arr in rpeaks_preds]
+    truth_rec = np.repeat(np.arange(n_records), [len(t) for t in truths])
+    pred_rec = np.repeat(np.arange(n_records), [len(p) for p in preds])
+    truths = np.concatenate(truths + [np.array([], dtype=int)])
+    preds = np.concatenate(preds + [np.array([], dtype=int)])
+    if len(truths) == 0:
+        return round(np.sum(record_flags) / n_records, 4)
+    # the next truth of each truth, and `9.5 * fs` for the last truth of each record
+    is_last = np.append(truth_rec[1:] != truth_rec[:-1], True)
+    next_truths = np.where(is_last, int(9.5 * fs), np.append(truths[1:], 0))
+    is_first = np.insert(truth_rec[1:] != truth_rec[:-1], 0, True)
+
+    counter = _SortedCounter(preds, pred_rec)
+    # predictions within the tolerance of each truth
+    n_loc = counter.count(truth_rec, truths - np.floor(thr_), truths + np.floor(thr_))
+    # predictions between each truth and the next truth
+    n_err = counter.count(truth_rec, np.ceil(truths + thr_), np.floor(next_truths - thr_))
+    # predictions before the first truth of each record
+    n_err += np.where(is_first, counter.count(truth_rec, np.ceil(0.5 * fs + thr_), np.floor(truths - thr_)), 0)
+
+    true_positive = np.bincount(truth_rec, weights=n_loc >= 1, minlength=n_records)
+    false_negative = np.bincount(truth_rec, weights=n_loc == 0, minlength=n_records)
+    false_positive = np.bincount(truth_rec, weights=n_err + np.maximum(n_loc - 1, 0), minlength=n_records)
+    assert (true_positive + false_negative == np.bincount(truth_rec, minlength=n_records)).all()
+
+    record_flags[false_negative + false_positive > 1] = 0
+    record_flags[(false_negative == 1) & (false_positive == 0)] = 0.3
+    record_flags[(false_negative == 0) & (false_positive == 1)] = 0.7
 
     rec_acc = round(np.sum(record_flags) / n_records, 4)
 
@@ -750,11 +859,40 @@ def _one_hot_pair(cls_array: Union[np.ndarray, Sequence[Sequence[int]]], shape:
     if isinstance(cls_array, np.ndarray) and cls_array.ndim == 2:
         return cls_array
     bin_array = np.zeros(shape)
+    if isinstance(cls_array, np.ndarray) and cls_array.ndim == 1 and cls_array.dtype != object:
+        bin_array[np.arange(shape[0]), cls_array] = 1
+        return bin_array
     for i in range(shape[0]):
         bin_array[i, cls_array[i]] = 1
     return bin_array
 
 
+def _one_hot_pair_t(
+    labels: Union[np.ndarray, Tensor, Sequence[Sequence[int]]],
+    outputs: Union[np.ndarray, Tensor, Sequence[Sequence[int]]],
+    num_classes: Optional[int] = None,
+) -> Tuple[Tensor, Tensor]:
+    """The torch version of :func:`one_hot_pair`,
+    the returned tensors are on the device of the input tensor(s).
+    """
+    device = outputs.device if isinstance(outputs, Tensor) else labels.device
+    if num_classes is None:  # determine `num_classes`
+        if isinstance(labels, (np.ndarray, Tensor)) and labels.ndim == 2:
+            num_classes = labels.shape[1]
+        elif isinstance(outputs, (np.ndarray, Tensor)) and outputs.ndim == 2:
+            num_classes = outputs.shape[1]
+    assert num_classes is not None, "num_classes is required if both labels and outputs are categorical"
+
+    def _convert(cls_array: Union[np.ndarray, Tensor, Sequence[Sequence[int]]]) -> Tensor:
+        if not isinstance(cls_array, Tensor):
+            cls_array = torch.as_tensor(_one_hot_pair(cls_array, (len(cls_array), num_classes)), device=device)
+        elif cls_array.ndim == 1:
+            cls_array = torch.nn.functional.one_hot(cls_array.long(), num_classes)
+        return cls_array.to(device)
+
+    return _convert(labels), _convert(outputs)
+
+
 @add_docstring(one_hot_pair.__doc__)
 def cls_to_bin(
     labels: Union[np.ndarray, Tensor, Sequence[Sequence[int]]],
@@ -867,23 +1005,17 @@ def compute_metrics_waveform(
         sensitivity, precision, f1_score, mean_error, standard_deviation.
 
     """
-    truth_positive = dict({f"{wave}_{term}": 0 for wave in ECGWaveFormNames for term in ["onset", "offset"]})
-    false_positive = dict({f"{wave}_{term}": 0 for wave in ECGWaveFormNames for term in ["onset", "offset"]})
-    false_negative = dict({f"{wave}_{term}": 0 for wave in ECGWaveFormNames for term in ["onset", "offset"]})
-    errors = dict({f"{wave}_{term}": [] for wave in ECGWaveFormNames for term in ["onset", "offset"]})
-    # accumulating results
-    for tw, pw in zip(truth_waveforms, pred_waveforms):
-        s = _compute_metrics_waveform(tw, pw, fs, tol)
-        for wave in [
-            "pwave",
-            "qrs",
-            "twave",
-        ]:
-            for term in ["onset", "offset"]:
-                truth_positive[f"{wave}_{term}"] += s[f"{wave}_{term}"]["truth_positive"]
-                false_positive[f"{wave}_{term}"] += s[f"{wave}_{term}"]["false_positive"]
-                false_negative[f"{wave}_{term}"] += s[f"{wave}_{term}"]["false_negative"]
-                errors[f"{wave}_{term}"] += s[f"{wave}_{term}"]["errors"]
+    truth_points = _collect_critical_points(truth_waveforms)
+    pred_points = _collect_critical_points(pred_waveforms)
+    truth_positive, false_positive, false_negative, errors = {}, {}, {}, {}
+    # accumulating results, all samples are processed at once
+    for key in truth_points:
+        (
+            truth_positive[key],
+            false_negative[key],
+            false_positive[key],
+            errors[key],
+        ) = _match_critical_points(*truth_points[key], *pred_points[key], round(tol * fs))
     scorings = dict()
     for wave in ECGWaveFormNames:
         for term in ["onset", "offset"]:
@@ -941,29 +1073,8 @@ def _compute_metrics_waveform(
         sensitivity, precision, f1_score, mean_error, standard_deviation
 
     """
-    pwave_onset_truths, pwave_offset_truths, pwave_onset_preds, pwave_offset_preds = (
-        [],
-        [],
-        [],
-        [],
-    )
-    qrs_onset_truths, qrs_offset_truths, qrs_onset_preds, qrs_offset_preds = (
-        [],
-        [],
-        [],
-        [],
-    )
-    twave_onset_truths, twave_offset_truths, twave_onset_preds, twave_offset_preds = (
-        [],
-        [],
-        [],
-        [],
-    )
-
-    for item in ["truths", "preds"]:
-        for w in eval(item):
-            for term in ["onset", "offset"]:
-                eval(f"{w.name}_{term}_{item}.append(w.{term})")
+    truth_points = _collect_critical_points([truths])
+    pred_points = _collect_critical_points([preds])
 
     scorings = dict()
     for wave in ECGWaveFormNames:
@@ -978,7 +1089,7 @@ def _compute_metrics_waveform(
                 f1_score,
                 mean_error,
                 standard_deviation,
-            ) = _compute_metrics_base(eval(f"{wave}_{term}_truths"), eval(f"{wave}_{term}_preds"), fs, tol)
+            ) = _compute_metrics_base(truth_points[f"{wave}_{term}"][0], pred_points[f"{wave}_{term}"][0], fs, tol)
             scorings[f"{wave}_{term}"] = dict(
                 truth_positive=truth_positive,
                 false_negative=false_negative,
@@ -1025,23 +1136,9 @@ def _compute_metrics_base(truths: Sequence[Real], preds: Sequence[Real], fs: Rea
                  Springer, Cham, 2019.
 
     """
-    _tolerance = round(tol * fs)
-    _truths = np.array(truths)
-    _preds = np.array(preds)
-    truth_positive, false_positive, false_negative = 0, 0, 0
-    errors = []
-    n_included = 0
-    for point in truths:
-        _pred = _preds[np.where(np.abs(_preds - point) <= _tolerance)[0].tolist()]
-        if len(_pred) > 0:
-            truth_positive += 1
-            idx = np.argmin(np.abs(_pred - point))
-            errors.append(_pred[idx] - point)
-        else:
-            false_negative += 1
-        n_included += len(_pred)
-
-    false_positive = len(_preds) - truth_positive
+    truth_positive, false_negative, false_positive, errors = _match_critical_points(
+        truths, np.zeros(len(truths), dtype=int), preds, np.zeros(len(preds), dtype=int), round(tol * fs)
+    )
 
     sensitivity = truth_positive / (truth_positive + false_negative + DEFAULTS.eps)
     precision = truth_positive / (truth_positive + false_positive + DEFAULTS.eps)
@@ -1060,3 +1157,114 @@ def _compute_metrics_base(truths: Sequence[Real], preds: Sequence[Real], fs: Rea
         mean_error,
         standard_deviation,
     )
+
+
+def _collect_critical_points(
+    waveforms: Sequence[Sequence[ECGWaveForm]],
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Collect the onsets and offsets of the waveforms of multiple samples.
+
+    Parameters
+    ----------
+    waveforms : Sequence[Sequence[ECGWaveForm]]
+        Each element is a sequence of :class:`ECGWaveForm` from the same sample.
+
+    Returns
+    -------
+    dict
+        Keys are of the form ``f"{wave}_{term}"``, values are 2-tuples of
+        the critical points and the indices of the samples they belong to.
+
+    """
+    points = {f"{wave}_{term}": ([], []) for wave in ECGWaveFormNames for term in ["onset", "offset"]}
+    for sample_idx, sample_waveforms in enumerate(waveforms):
+        for w in sample_waveforms:
+            for term in ["onset", "offset"]:
+                points[f"{w.name}_{term}"][0].append(getattr(w, term))
+                points[f"{w.name}_{term}"][1].append(sample_idx)
+    return {k: (np.array(v[0]), np.array(v[1], dtype=int)) for k, v in points.items()}
+
+
+class _SortedCounter:
+    """Sorted array of grouped (integer) points, for counting points in closed intervals.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        The points, of integer values.
+    groups : numpy.ndarray
+        Indices (non-negative) of the groups of the points.
+
+    """
+
+    def __init__(self, points: np.ndarray, groups: np.ndarray) -> None:
+        self.points = np.asarray(points).astype(np.int64)
+        self.groups = np.asarray(groups).astype(np.int64)
+        self.vmin = int(self.points.min()) if len(self.points) > 0 else 0
+        self.vmax = int(self.points.max()) if len(self.points) > 0 else 0
+        # values are clipped to ``[vmin - 1, vmax + 1]``,
+        # hence the keys of different groups never interleave
+        self.span = self.vmax - self.vmin + 3
+        self.order = np.argsort(self.keys(self.groups, self.points), kind="stable")
+        self.sorted_keys = self.keys(self.groups, self.points)[self.order]
+
+    def keys(self, groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return groups * self.span + (values - self.vmin + 1)
+
+    def _clip(self, values: np.ndarray) -> np.ndarray:
+        return np.clip(values, self.vmin - 1, self.vmax + 1).astype(np.int64)
+
+    def count(self, groups: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Number of points in the closed intervals ``[lower, upper]`` of the same groups."""
+        lower, upper = self._clip(lower), self._clip(upper)
+        start = np.searchsorted(self.sorted_keys, self.keys(groups, lower), side="left")
+        end = np.searchsorted(self.sorted_keys, self.keys(groups, upper), side="right")
+        return np.where(upper >= lower, np.maximum(end - start, 0), 0)
+
+
+def _match_critical_points(
+    truths: np.ndarray,
+    truth_groups: np.ndarray,
+    preds: np.ndarray,
+    pred_groups: np.ndarray,
+    tolerance: int,
+) -> Tuple[int, int, int, list]:
+    """Match the predicted critical points to the ground truths of the same groups (samples).
+
+    A truth is positive if there are predictions within the `tolerance`,
+    whose error is that of the nearest prediction (the first one in `preds` in case of ties).
+
+    Returns
+    -------
+    tuple
+        truth_positive, false_negative, false_positive, errors
+
+    """
+    truths, preds = np.asarray(truths).reshape(-1), np.asarray(preds).reshape(-1)
+    if len(truths) == 0 or len(preds) == 0:
+        return 0, len(truths), len(preds), []
+    counter = _SortedCounter(preds, pred_groups)
+    sorted_preds = counter.points[counter.order]
+    truth_keys = counter.keys(truth_groups, counter._clip(truths))
+    # window of the predictions within the tolerance
+    start = np.searchsorted(counter.sorted_keys, counter.keys(truth_groups, counter._clip(truths - tolerance)), side="left")
+    end = np.searchsorted(counter.sorted_keys, counter.keys(truth_groups, counter._clip(truths + tolerance)), side="right")
+    matched = end > start
+    # the nearest predictions to the left and to the right of the truths
+    right = np.searchsorted(counter.sorted_keys, truth_keys, side="left")
+    left = right - 1
+    has_left = left >= start
+    has_right = right < end
+    left_err = sorted_preds[np.clip(left, 0, len(preds) - 1)] - truths
+    right_err = sorted_preds[np.clip(right, 0, len(preds) - 1)] - truths
+    # position (in `preds`) of the first prediction of equal values
+    first_left = counter.order[np.searchsorted(counter.sorted_keys, counter.sorted_keys[np.clip(left, 0, len(preds) - 1)])]
+    first_right = counter.order[np.searchsorted(counter.sorted_keys, counter.sorted_keys[np.clip(right, 0, len(preds) - 1)])]
+    use_right = has_right & (
+        ~has_left
+        | (np.abs(right_err) < np.abs(left_err))
+        | ((np.abs(right_err) == np.abs(left_err)) & (first_right < first_left))
+    )
+    errors = np.where(use_right, right_err, left_err)[matched]
+    truth_positive = int(matched.sum())
+    return truth_positive, len(truths) - truth_positive, len(preds) - truth_positive, errors.tolist()
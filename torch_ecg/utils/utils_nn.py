@@ -12,7 +12,7 @@ from itertools import chain, repeat
 from math import floor
 from numbers import Real
 from pathlib import Path, PosixPath, WindowsPath
-from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
@@ -37,6 +37,7 @@ __all__ = [
     "default_collate_fn",
     "compute_receptive_field",
     "adjust_cnn_filter_lengths",
+    "sliding_window_inference",
     "SizeMixin",
     "CkptMixin",
 ]
@@ -1012,9 +1013,194 @@ def adjust_cnn_filter_lengths(
     return config
 
 
+@torch.no_grad()
+def sliding_window_inference(
+    model: Callable[[Tensor], Tensor],
+    sig: Union[np.ndarray, Tensor],
+    window: int,
+    step: Optional[int] = None,
+    reduction: Literal["mean", "max", "center"] = "mean",
+    batch_size: Optional[int] = None,
+    memory_budget: int = 64 * 2**20,
+    device: Optional[Union[str, torch.device]] = None,
+    dtype: Optional[torch.dtype] = None,
+) -> Union[np.ndarray, Tensor]:
+    """Make inference on a signal of arbitrary length with sliding windows.
+
+    The signal is sliced into overlapping windows of length `window`
+    (the last window is aligned to the end of the signal), which are
+    strided views of the signal, hence no copy is made except for
+    the windows of the batch being fed into the model.
+    Batches of windows are fed into the model one by one, and the outputs
+    are merged into a buffer of the length of the (downsampled) signal,
+    so that the peak memory usage does not depend on the length of the signal.
+
+    Parameters
+    ----------
+    model : Callable[[torch.Tensor], torch.Tensor]
+        The model (or any callable, e.g. a model followed by a sigmoid function)
+        that takes a batch of windows of shape ``(batch_size, n_leads, window)``
+        as input, and outputs a tensor of shape ``(batch_size, out_len, n_classes)``
+        (e.g. :class:`~torch_ecg.models.ECG_SEQ_LAB_NET`, :class:`~torch_ecg.models.ECG_UNET`),
+        where ``window`` should be divisible by ``out_len``,
+        or of shape ``(batch_size, n_classes)`` (e.g. :class:`~torch_ecg.models.ECG_CRNN`).
+        If is a :class:`~torch.nn.Module`, it should be set to evaluation mode beforehand.
+    sig : numpy.ndarray or torch.Tensor
+        The signal, of shape ``(n_leads, siglen)``.
+    window : int
+        Length of the windows, in number of samples.
+        If the signal is shorter than `window`,
+        the whole signal is fed into the model as one window.
+    step : int, optional
+        Step (stride) of the sliding windows, in number of samples.
+        Defaults to half of `window`. It is recommended to be divisible by
+        the reduction factor of the model, i.e. ``window // out_len``,
+        so that the outputs of the windows are aligned.
+    reduction : {"mean", "max", "center"}, default "mean"
+        How the outputs of overlapping windows are merged,
+        case insensitive:
+
+            - "mean": the outputs are averaged;
+            - "max": the maximum of the outputs is taken;
+            - "center": each output point is taken from the window
+              whose center is the closest, i.e. the overlaps are split
+              in halves between the neighbouring windows.
+
+        Not used if the outputs of `model` are not time-resolved.
+    batch_size : int, optional
+        Maximum number of windows in each batch.
+        If is None, it is determined by `memory_budget`.
+    memory_budget : int, default 64 MiB
+        Maximum number of bytes of the windows in each batch.
+        Note that the memory of the activations of the model
+        scales linearly with it.
+    device : str or torch.device, optional
+        Device to run the model on. Defaults to the device of
+        the parameters of `model` if it is a :class:`~torch.nn.Module`,
+        otherwise the device of `sig`.
+    dtype : torch.dtype, optional
+        Data type of the input of the model. Defaults to the data type
+        of the parameters of `model` if it is a :class:`~torch.nn.Module`,
+        otherwise the data type of `sig`.
+
+    Returns
+    -------
+    numpy.ndarray or torch.Tensor
+        The merged outputs, of shape ``(siglen // reduction_factor, n_classes)``,
+        where ``reduction_factor = window // out_len``,
+        or the outputs of the windows, of shape ``(n_windows, n_classes)``,
+        if the outputs of `model` are not time-resolved.
+        The windows start at ``0, step, 2 * step, ...``,
+        with the last window ending at the end of the signal.
+        Of the same type as `sig`, and on the device of `sig`.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        model = ECG_SEQ_LAB_NET(classes=["N"], n_leads=12).eval()
+        sig = torch.randn(12, 3600 * 500)  # one hour at 500 Hz
+        prob = sliding_window_inference(
+            lambda x: torch.sigmoid(model(x)), sig, window=5000, step=4000, reduction="max"
+        )
+
+    """
+    _reduction = reduction.lower()
+    if _reduction not in ["mean", "max", "center"]:
+        raise ValueError(f"`reduction` should be one of `mean|max|center`, but got `{reduction}`")
+    is_numpy = isinstance(sig, np.ndarray)
+    sig = torch.from_numpy(sig) if is_numpy else sig
+    assert sig.ndim == 2, f"`sig` should be of shape `(n_leads, siglen)`, but got `{tuple(sig.shape)}`"
+    if isinstance(model, nn.Module):
+        param = next(model.parameters(), None)
+        if param is not None:
+            device = device or param.device
+            dtype = dtype or param.dtype
+    device = device or sig.device
+    dtype = dtype or (sig.dtype if sig.is_floating_point() else DEFAULTS.DTYPE.TORCH)
+    output_device = sig.device
+
+    n_leads, siglen = sig.shape
+    window = min(window, siglen)
+    step = step or max(1, window // 2)
+    assert 0 < step <= window, "`step` should be positive and not greater than `window`"
+    # strided views of the signal, of shape (n_windows, n_leads, window)
+    windows = sig.unfold(-1, window, step).permute(1, 0, 2)
+    starts = list(range(0, siglen - window + 1, step))
+    if starts[-1] + window < siglen:
+        windows = [windows, sig[:, siglen - window :].unsqueeze(0)]
+        starts.append(siglen - window)
+    else:
+        windows = [windows]
+    n_windows = len(starts)
+    if batch_size is None:
+        batch_size = max(1, memory_budget // (n_leads * window * torch.finfo(dtype).bits // 8))
+
+    merged, counts, bounds = None, None, None
+    for batch_start in range(0, n_windows, batch_size):
+        batch_end = min(batch_start + batch_size, n_windows)
+        n_regular = windows[0].shape[0]
+        batch = windows[0][batch_start : min(batch_end, n_regular)]
+        if batch_end > n_regular:
+            batch = torch.cat([batch, windows[1]])
+        output = model(batch.to(device=device, dtype=dtype)).to(output_device)
+
+        if output.ndim == 2:  # outputs not time-resolved
+            if merged is None:
+                merged = output.new_empty((n_windows, output.shape[1]))
+            merged[batch_start:batch_end] = output
+            continue
+
+        out_len, n_classes = output.shape[1:]
+        if merged is None:
+            assert window % out_len == 0, f"`window` ({window}) should be divisible by the length of the outputs ({out_len})"
+            reduction_factor = window // out_len
+            out_starts = torch.tensor(starts, device=output_device) // reduction_factor
+            merged = output.new_zeros((siglen // reduction_factor, n_classes))
+            if _reduction == "mean":
+                counts = output.new_zeros((merged.shape[0], 1))
+            elif _reduction == "max":
+                merged.fill_(-float("inf"))
+            else:  # "center"
+                # window k covers output points in [bounds[k], bounds[k+1])
+                bounds = torch.cat(
+                    [
+                        out_starts.new_zeros(1),
+                        (out_starts[1:] + out_starts[:-1] + out_len + 1) // 2,
+                        out_starts.new_tensor([merged.shape[0]]),
+                    ]
+                )
+        # indices of the output points in the merged buffer, of shape (n, out_len)
+        indices = out_starts[batch_start:batch_end, None] + torch.arange(out_len, device=output_device)
+        if _reduction == "mean":
+            merged.index_add_(0, indices.flatten(), output.reshape(-1, n_classes))
+            counts.index_add_(0, indices.flatten(), counts.new_ones((indices.numel(), 1)))
+        elif _reduction == "max":
+            merged.scatter_reduce_(
+                0,
+                indices.flatten()[:, None].expand(-1, n_classes),
+                output.reshape(-1, n_classes),
+                reduce="amax",
+            )
+        else:
+            selected = (indices >= bounds[batch_start:batch_end, None]) & (
+                indices < bounds[batch_start + 1 : batch_end + 1, None]
+            )
+            merged[indices[selected]] = output[selected]
+
+    if counts is not None:
+        merged = merged / counts
+    if is_numpy:
+        merged = merged.numpy()
+    return merged
+
+
 class SizeMixin(object):
     """Mixin class for size related methods"""
 
+    # the properties are not compiled when the modules are scripted
+    __jit_unused_properties__ = ["module_size", "module_size_", "sizeof", "sizeof_", "dtype", "device", "dtype_", "device_"]
+
     @property
     def module_size(self) -> int:
         """Size of trainable parameters in the model in terms of number of parameters."""
@@ -1209,6 +1395,55 @@ class CkptMixin(object):
         model_path_or_dir = http_get(url, model_dir, extract="auto", filename=filename)
         return cls.from_checkpoint(model_path_or_dir, device=device, weights_only=weights_only)
 
+    def export(
+        self,
+        path: Union[str, bytes, os.PathLike],
+        format: Literal["torchscript", "onnx"] = "torchscript",
+        **kwargs: Any,
+    ) -> Path:
+        """Export the model to a TorchScript or ONNX artifact for deployment.
+
+        Parameters
+        ----------
+        path : `path-like`
+            Path to save the artifact.
+        format : {"torchscript", "onnx"}, default "torchscript"
+            Format of the artifact.
+        kwargs : dict, optional
+            Other keyword arguments passed to :func:`~torch_ecg.export.export_model`.
+
+        Returns
+        -------
+        pathlib.Path
+            Path to the artifact, which can be loaded via
+            :func:`~torch_ecg.export.load_exported`.
+
+        """
+        from ..export import export_model
+
+        return export_model(self, path, format=format, **kwargs)
+
+    def quantize(self, calibration_data: Any, **kwargs: Any) -> nn.Module:
+        """Post-training static int8 quantization of the convolutions of the model.
+
+        Parameters
+        ----------
+        calibration_data : torch.utils.data.Dataset or Iterable or numpy.ndarray or torch.Tensor
+            Data to calibrate the quantization parameters,
+            e.g. the datasets in :mod:`torch_ecg.databases.datasets`.
+        kwargs : dict, optional
+            Other keyword arguments passed to :func:`~torch_ecg.export.quantize_model`.
+
+        Returns
+        -------
+        torch.nn.Module
+            The quantized model, running on CPU.
+
+        """
+        from ..export import quantize_model
+
+        return quantize_model(self, calibration_data, **kwargs)
+
     def save(self, path: Union[str, bytes, os.PathLike], train_config: CFG) -> None:
         """Save the model to disk.
 
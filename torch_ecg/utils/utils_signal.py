@@ -5,10 +5,12 @@ including spatial, temporal, spatio-temporal domains.
 
 import warnings
 from copy import deepcopy
+from functools import lru_cache
 from numbers import Real
 from typing import Iterable, Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
+from biosppy.signals.tools import get_filter as _biosppy_get_filter
 from scipy import interpolate
 from scipy.signal import butter, filtfilt, peak_prominences
 
@@ -20,6 +22,7 @@ __all__ = [
     "detect_peaks",
     "remove_spikes_naive",
     "butter_bandpass_filter",
+    "get_filter",
     "get_ampl",
     "normalize",
 ]
@@ -532,6 +535,7 @@ def butter_bandpass(lowcut: Real, highcut: Real, fs: Real, order: int, verbose:
     -------
     b, a : numpy.ndarray
         Coefficients of numerator and denominator of the filter.
+        The designs are cached, hence the arrays are read-only.
 
     NOTE
     ----
@@ -569,8 +573,79 @@ def butter_bandpass(lowcut: Real, highcut: Real, fs: Real, order: int, verbose:
     if verbose >= 1:
         print(f"by the setup of lowcut and highcut, the filter type falls to {btype}, with Wn = {Wn}")
 
-    b, a = butter(order, Wn, btype=btype)
-    return b, a
+    return _butter(order, tuple(Wn) if isinstance(Wn, list) else Wn, btype)
+
+
+# maximum number of filter designs kept in the caches (per process)
+_FILTER_CACHE_SIZE = 128
+
+
+def _freeze(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Make the cached arrays read-only, so that they are not modified by the callers."""
+    for arr in arrays:
+        arr.setflags(write=False)
+    return arrays
+
+
+@lru_cache(maxsize=_FILTER_CACHE_SIZE)
+def _butter(order: int, Wn: Union[float, Tuple[float, float]], btype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Cached :func:`scipy.signal.butter`."""
+    return _freeze(*butter(order, Wn, btype=btype))
+
+
+def get_filter(
+    ftype: str,
+    band: Literal["lowpass", "highpass", "bandpass", "bandstop"],
+    order: int,
+    frequency: Union[Real, Sequence[Real]],
+    fs: Real,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Design a digital filter, with the designs cached.
+
+    The filter is designed via :func:`biosppy.signals.tools.get_filter`,
+    and the designs are kept in a bounded (least recently used) cache
+    keyed by the arguments, so that the same filter is not redesigned
+    for every record (and every lead).
+
+    Parameters
+    ----------
+    ftype : str
+        Type of the filter, e.g. "FIR", "butter", etc.
+        ref. :func:`biosppy.signals.tools.get_filter`.
+    band : {"lowpass", "highpass", "bandpass", "bandstop"}
+        Band type of the filter.
+    order : int
+        Order of the filter.
+    frequency : numbers.Real or Sequence[numbers.Real]
+        Cutoff frequency (frequencies) of the filter.
+    fs : numbers.Real
+        Sampling frequency.
+
+    Returns
+    -------
+    b, a : numpy.ndarray
+        Coefficients of numerator and denominator of the filter,
+        read-only since they are shared.
+
+    """
+    if not isinstance(frequency, Real):
+        frequency = tuple(float(f) for f in frequency)
+    return _get_filter(ftype, band, int(order), frequency, float(fs))
+
+
+@lru_cache(maxsize=_FILTER_CACHE_SIZE)
+def _get_filter(
+    ftype: str, band: str, order: int, frequency: Union[float, Tuple[float, ...]], fs: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Cached :func:`biosppy.signals.tools.get_filter`."""
+    b, a = _biosppy_get_filter(
+        ftype=ftype,
+        band=band,
+        order=order,
+        frequency=list(frequency) if isinstance(frequency, tuple) else frequency,
+        sampling_rate=fs,
+    )
+    return _freeze(np.atleast_1d(b).copy(), np.atleast_1d(a).copy())
 
 
 def butter_bandpass_filter(
@@ -690,6 +765,7 @@ def get_ampl(
                     ],
                     siglen=_window,
                     fmt="lead_first",
+                    copy=False,
                 )
                 for p in critical_points
             ],
@@ -4,14 +4,21 @@ utilities for signal processing on PyTorch tensors
 """
 
 import warnings
+from functools import lru_cache
+from math import gcd
 from numbers import Real
-from typing import Callable, Iterable, Literal, Optional, Union
+from typing import Callable, Iterable, Literal, Optional, Tuple, Union
 
+import numpy as np
 import torch
+from scipy.signal import firwin
 
 __all__ = [
     "normalize",
     "resample",
+    "resample_poly",
+    "filtfilt",
+    "median_filter",
 ]
 
 
@@ -172,6 +179,7 @@ def resample(
     dst_fs: Optional[int] = None,
     siglen: Optional[int] = None,
     inplace: bool = False,
+    method: Literal["linear", "poly", "fft"] = "linear",
 ) -> torch.Tensor:
     """Resample signal tensors to a new sampling frequency
     or a new signal length.
@@ -191,12 +199,30 @@ def resample(
         and `siglen` should be set.
     inplace : bool, default False
         Whether to perform the operation in-place or not.
+        Only effective for the "linear" method.
+    method : {"linear", "poly", "fft"}, default "linear"
+        Resampling method.
+
+            - "linear": linear interpolation (no anti-aliasing) via
+              :func:`torch.nn.functional.interpolate`;
+            - "poly": anti-aliased polyphase filtering (requires integer `fs` and `dst_fs`),
+              equivalent to :func:`scipy.signal.resample_poly`, ref. :func:`resample_poly`;
+            - "fft": Fourier method,
+              equivalent to :func:`scipy.signal.resample`.
+
+        .. versionadded:: 0.0.32
 
     Returns
     -------
     torch.Tensor
         The resampled signal, of shape ``(..., n_leads, siglen)``.
 
+    NOTE
+    ----
+    When resampling to `dst_fs`, the "linear" method outputs ``floor(siglen * dst_fs / fs)``
+    samples, while the "poly" and "fft" methods output ``ceil(siglen * dst_fs / fs)`` samples,
+    consistent with :func:`scipy.signal.resample_poly`.
+
     """
     assert sum([bool(dst_fs), bool(siglen)]) == 1, "one and only one of `dst_fs` and `siglen` should be set"
     if dst_fs is not None:
@@ -204,6 +230,17 @@ def resample(
         scale_factor = dst_fs / fs
     else:
         scale_factor = None
+    assert method in ["poly", "fft", "linear"], f"Unsupported resampling method `{method}`"
+    if inplace and method != "linear":
+        warnings.warn(f"`inplace` is not supported by the `{method}` method, and is ignored", RuntimeWarning)
+    if method == "poly":
+        assert scale_factor is not None, "the polyphase method requires `fs` and `dst_fs`"
+        assert float(fs).is_integer() and float(dst_fs).is_integer(), "the polyphase method requires integer `fs` and `dst_fs`"
+        return resample_poly(sig, up=int(dst_fs), down=int(fs))
+    if method == "fft":
+        if siglen is None:
+            siglen = int(np.ceil(sig.shape[-1] * scale_factor))
+        return _resample_fft(sig, siglen)
     recompute_scale_factor = True if siglen is None else None
     if not inplace:
         sig = sig.clone()
@@ -229,6 +266,272 @@ def resample(
     return sig
 
 
+def resample_poly(sig: torch.Tensor, up: int, down: int) -> torch.Tensor:
+    """Resample signal tensors along the last dimension using polyphase filtering.
+
+    Equivalent to :func:`scipy.signal.resample_poly` with the default
+    Kaiser window (beta 5.0) and zero padding. The windowed-sinc
+    anti-aliasing kernels are cached per ratio ``up / down``, and the
+    polyphase components are applied by one strided convolution
+    on the device of `sig`.
+
+    Parameters
+    ----------
+    sig : torch.Tensor
+        Signal to be resampled, of shape ``(..., siglen)``.
+    up : int
+        The upsampling factor.
+    down : int
+        The downsampling factor.
+
+    Returns
+    -------
+    torch.Tensor
+        The resampled signal, of shape ``(..., ceil(siglen * up / down))``.
+
+    """
+    assert up >= 1 and down >= 1, "`up` and `down` must be >= 1"
+    g = gcd(int(up), int(down))
+    up, down = int(up) // g, int(down) // g
+    if up == down == 1:
+        return sig.clone()
+    shape = sig.shape
+    n_in = shape[-1]
+    n_out = -(-n_in * up // down)
+    weight, left_pad = _polyphase_kernel(up, down)
+    kernel_len = weight.shape[-1]
+    n_frames = -(-n_out // up)
+    right_pad = (n_frames - 1) * down + kernel_len - left_pad - n_in
+    dtype = sig.dtype if sig.is_floating_point() else torch.get_default_dtype()
+    x = sig.reshape(-1, 1, n_in).to(dtype)
+    # negative paddings crop the signal
+    x = torch.nn.functional.pad(x, (left_pad, right_pad))
+    y = torch.nn.functional.conv1d(x, weight.to(dtype=dtype, device=sig.device).unsqueeze(1), stride=down)
+    # (n, up, n_frames) -> (n, n_frames * up), interleaving the polyphase components
+    y = y.transpose(1, 2).reshape(y.shape[0], -1)[:, :n_out]
+    return y.reshape(shape[:-1] + (n_out,))
+
+
+@lru_cache(maxsize=32)
+def _polyphase_kernel(up: int, down: int) -> Tuple[torch.Tensor, int]:
+    """Polyphase kernels of :func:`resample_poly`, of shape ``(up, kernel_len)``.
+
+    The `r`-th kernel computes the output samples of indices ``r + q * up``
+    via a convolution of stride `down`, after the signal is padded
+    by `left_pad` zeros on the left.
+    """
+    # the same anti-aliasing filter as `scipy.signal.resample_poly`
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    n_pre_pad = down - half_len % down
+    n_pre_remove = (half_len + n_pre_pad) // down
+    h = np.concatenate([np.zeros(n_pre_pad), h])
+    n_taps = -(-len(h) // up)
+    h = np.concatenate([h, np.zeros(n_taps * up - len(h))])
+    # output sample of index `k = r + q * up` is
+    # ``sum_i h[phases[r] + i * up] * x[offsets[r] + q * down - i]``
+    residues = (np.arange(up) + n_pre_remove) * down
+    phases, offsets = residues % up, residues // up
+    offsets = offsets - offsets[0]
+    weight = np.zeros((up, offsets[-1] + n_taps))
+    rows = np.arange(up)[:, np.newaxis]
+    weight[rows, offsets[:, np.newaxis] + np.arange(n_taps)[::-1]] = h[phases[:, np.newaxis] + np.arange(n_taps) * up]
+    left_pad = n_taps - 1 - int(residues[0] // up)
+    return torch.from_numpy(weight), left_pad
+
+
+def _resample_fft(sig: torch.Tensor, num: int) -> torch.Tensor:
+    """Resample signal tensors along the last dimension to `num` samples
+    using the Fourier method, equivalent to :func:`scipy.signal.resample`.
+    """
+    n_x = sig.shape[-1]
+    if num == n_x:
+        return sig.clone()
+    dtype = sig.dtype if sig.is_floating_point() else torch.get_default_dtype()
+    m = min(num, n_x)
+    spec = torch.fft.rfft(sig.to(dtype))[..., : m // 2 + 1]
+    if m % 2 == 0:
+        # account for the unpaired bin at m // 2
+        factor = torch.ones(spec.shape[-1], dtype=dtype, device=sig.device)
+        factor[m // 2] = 2.0 if num < n_x else 0.5
+        spec = spec * factor
+    return torch.fft.irfft(spec * (num / n_x), n=num)
+
+
+def filtfilt(
+    sig: torch.Tensor,
+    b: torch.Tensor,
+    a: torch.Tensor,
+    padlen: Optional[int] = None,
+    zi: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """Zero-phase filtering of signal tensors, equivalent to :func:`scipy.signal.filtfilt`.
+
+    The signals are extended by odd extension at both ends, and the filter ``b / a``
+    is applied forward and backward, with the initial conditions of the steady state
+    of the step response scaled by the first sample (ref. :func:`scipy.signal.lfilter_zi`),
+    the same as :func:`scipy.signal.filtfilt` (with ``padtype="odd"``),
+    computed in double precision on the device of `sig`.
+
+    Parameters
+    ----------
+    sig : torch.Tensor
+        Signal to be filtered, of shape ``(..., siglen)``.
+    b : torch.Tensor
+        Numerator coefficients of the filter, 1D tensor.
+    a : torch.Tensor
+        Denominator coefficients of the filter, 1D tensor.
+    padlen : int, optional
+        Number of samples of the odd extension at each end,
+        capped by ``siglen - 1``. If is None, defaults to
+        ``3 * max(len(a), len(b))``, the same as :func:`scipy.signal.filtfilt`.
+    zi : torch.Tensor, optional
+        Initial conditions of the steady state of the step response of the filter,
+        of shape ``(max(len(a), len(b)) - 1,)``, ref. :func:`scipy.signal.lfilter_zi`.
+        If is None, they are solved on the device of `sig`.
+
+    Returns
+    -------
+    torch.Tensor
+        The filtered signal, of the same shape and dtype as `sig`.
+
+    NOTE
+    ----
+    FIR filters (``len(a) == 1``) are applied as linear convolutions via FFT.
+    IIR filters are applied by the recursion of :func:`scipy.signal.lfilter`
+    (transposed direct form II) in the same order of operations, sample by sample,
+    since filters in the transfer function form with poles close to the unit circle
+    (e.g. Butterworth filters of high orders with low cutoff frequencies)
+    amplify rounding errors, so that any other way of computation
+    (e.g. via the frequency response) deviates from :func:`scipy.signal.filtfilt`.
+    For the same reason, the initial conditions are sensitive to how they are solved,
+    hence to reproduce :func:`scipy.signal.filtfilt` for such filters,
+    `zi` should be computed by :func:`scipy.signal.lfilter_zi`.
+    The recursion is sequential along the time axis, hence is much slower
+    than the FIR case for long signals.
+
+    """
+    shape = sig.shape
+    siglen = shape[-1]
+    if padlen is None:
+        padlen = 3 * max(a.shape[0], b.shape[0])
+    padlen = max(0, min(padlen, siglen - 1))
+    # the odd extension is computed in the dtype of `sig`, as in `scipy.signal.filtfilt`
+    x = sig.reshape(-1, siglen)
+    if padlen > 0:
+        x = torch.cat(
+            [
+                2 * x[:, :1] - x[:, 1 : padlen + 1].flip(-1),
+                x,
+                2 * x[:, -1:] - x[:, siglen - padlen - 1 : siglen - 1].flip(-1),
+            ],
+            dim=-1,
+        )
+    x = x.to(torch.float64)
+    b = b.to(device=x.device, dtype=torch.float64)
+    a = a.to(device=x.device, dtype=torch.float64)
+    b, a = b / a[0], a / a[0]
+    if a.shape[0] == 1:
+        # forward, then backward
+        for _ in range(2):
+            x = _fir_filter(x, b).flip(-1)
+    else:
+        order = max(a.shape[0], b.shape[0]) - 1
+        b = torch.nn.functional.pad(b, (0, order + 1 - b.shape[0]))
+        a = torch.nn.functional.pad(a, (0, order + 1 - a.shape[0]))
+        if zi is None:
+            zi = _lfilter_zi(b, a)
+        zi = zi.to(device=x.device, dtype=torch.float64)
+        for _ in range(2):
+            x = _iir_filter(x, b, a, zi).flip(-1)
+    return x[:, padlen : padlen + siglen].reshape(shape).to(sig.dtype)
+
+
+def _fir_filter(x: torch.Tensor, b: torch.Tensor) -> torch.Tensor:
+    """Apply the FIR filter `b` to `x` of shape ``(batch, siglen)``,
+    with the initial conditions of :func:`scipy.signal.filtfilt`,
+    via FFT.
+    """
+    siglen = x.shape[-1]
+    n_fft = siglen + b.shape[0] - 1
+    # the initial conditions `lfilter_zi(b, a) * x[0]` are those of the steady state of
+    # the constant input `x[0]`, hence equivalent to filtering `x - x[0]` from rest
+    x0 = x[:, :1]
+    y = torch.fft.irfft(torch.fft.rfft(x - x0, n=n_fft) * torch.fft.rfft(b, n=n_fft), n=n_fft)
+    return y[:, :siglen] + x0 * b.sum()
+
+
+def _lfilter_zi(b: torch.Tensor, a: torch.Tensor) -> torch.Tensor:
+    """Initial conditions of the steady state of the step response
+    of the filter ``b / a`` (normalized, of the same length),
+    the same as :func:`scipy.signal.lfilter_zi`.
+    """
+    order = a.shape[0] - 1
+    i_minus_a = torch.eye(order, dtype=a.dtype, device=a.device) - torch.diag(
+        torch.ones(order - 1, dtype=a.dtype, device=a.device), 1
+    )
+    i_minus_a[:, 0] += a[1:]
+    return torch.linalg.solve(i_minus_a, b[1:] - a[1:] * b[0])
+
+
+def _iir_filter(x: torch.Tensor, b: torch.Tensor, a: torch.Tensor, zi: torch.Tensor) -> torch.Tensor:
+    """Apply the IIR filter ``b / a`` (normalized, of the same length) to `x` of shape ``(batch, siglen)``,
+    with the initial conditions ``zi * x[:, 0]`` as in :func:`scipy.signal.filtfilt`,
+    by the recursion of :func:`scipy.signal.lfilter` (in the same order of operations).
+    """
+    order = a.shape[0] - 1
+    siglen = x.shape[-1]
+    xb = x.unsqueeze(-1) * b
+    xb0 = xb[:, :, 0].contiguous()
+    xb1 = xb[:, :, 1:].contiguous()
+    a = a[1:]
+    # the delays at step `n` are `z[:, n : n + order]`, so that shifting them is free,
+    # and `z[:, n] + xb0[:, n]` is the output at step `n`
+    z = torch.zeros(x.shape[0], siglen + order + 1, dtype=x.dtype, device=x.device)
+    z[:, :order] = zi * x[:, :1]
+    for n in range(siglen):
+        yn = z[:, n : n + 1] + xb0[:, n : n + 1]
+        z[:, n + 1 : n + order + 1].add_(xb1[:, n]).sub_(yn * a)
+    return z[:, :siglen] + xb0
+
+
+def median_filter(sig: torch.Tensor, window: int, chunk_numel: int = 2**24) -> torch.Tensor:
+    """Median filter of signal tensors along the last dimension.
+
+    Equivalent to :func:`scipy.ndimage.median_filter` with ``mode="nearest"``
+    along the last dimension, computed via :meth:`torch.Tensor.unfold`
+    on the device of `sig`.
+
+    Parameters
+    ----------
+    sig : torch.Tensor
+        Signal to be filtered, of shape ``(..., siglen)``.
+    window : int
+        Window size of the median filter, should be odd.
+    chunk_numel : int, default 2**24
+        The unfolded windows are computed in chunks along the last dimension,
+        with at most `chunk_numel` elements per chunk, to bound the memory usage.
+
+    Returns
+    -------
+    torch.Tensor
+        The median filtered signal, of the same shape as `sig`.
+
+    """
+    assert window % 2 == 1, "window size should be odd"
+    shape = sig.shape
+    siglen = shape[-1]
+    half = window // 2
+    x = torch.nn.functional.pad(sig.reshape(-1, 1, siglen), (half, half), mode="replicate").squeeze(1)
+    chunk = max(1, chunk_numel // max(1, x.shape[0] * window))
+    filtered = torch.empty((x.shape[0], siglen), dtype=sig.dtype, device=sig.device)
+    for start in range(0, siglen, chunk):
+        end = min(siglen, start + chunk)
+        filtered[:, start:end] = x[:, start : end + 2 * half].unfold(-1, window, 1).median(dim=-1).values
+    return filtered.reshape(shape)
+
+
 def spectrogram(
     waveform: torch.Tensor,
     pad: int,